@@ -11,6 +11,7 @@ from dataclasses import dataclass
 
 from utils.monitoring import monitoring, trace_operation
 from utils.cache import cache, generate_cache_key
+from utils.rate_limiter import RateWindow
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +47,7 @@ class TelegramAPI:
         
         # Rate limiting
         self.rate_limit_per_second = 30  # Limita Telegram: 30 req/sec
-        self.last_request_times = []
+        self.rate_window = RateWindow(self.rate_limit_per_second, 1.0)
         
         # Timeouts optimizate pentru Free Tier
         self.default_timeout = aiohttp.ClientTimeout(
@@ -79,24 +80,12 @@ class TelegramAPI:
             
     async def _check_rate_limit(self):
         """Verifică și respectă rate limiting-ul Telegram"""
-        current_time = time.time()
-        
-        # Curăță request-urile vechi (> 1 secundă)
-        self.last_request_times = [
-            t for t in self.last_request_times 
-            if current_time - t < 1.0
-        ]
-        
-        # Verifică dacă am depășit limita
-        if len(self.last_request_times) >= self.rate_limit_per_second:
-            wait_time = 1.0 - (current_time - self.last_request_times[0])
-            if wait_time > 0:
-                logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-                self.stats.rate_limit_hits += 1
-                
-        # Adaugă request-ul curent
-        self.last_request_times.append(current_time)
+        # Rezervă un slot: peste limită, request-ul așteaptă până devine conform
+        wait_time = self.rate_window.reserve('telegram')
+        if wait_time > 0:
+            logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+            self.stats.rate_limit_hits += 1
         
     @trace_operation("telegram_api.request")
     async def _make_request(self, method: str, endpoint: str, 
@@ -1,20 +1,33 @@
+# Profilul importurilor la pornire (IMPORT_PROFILE=1) trebuie instalat înaintea celorlalte importuri
+from utils.import_profiler import import_profiler
+import_profiler.install_from_env()
+
 import os
+import sys
 import logging
 import asyncio
 import html
 from flask import Flask, request, jsonify
 from telegram import Update, Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
-from downloader import download_video, is_supported_url, upgrade_to_nightly_ytdlp
+from downloader import download_video, acquire_download, download_flights, is_supported_url, upgrade_to_nightly_ytdlp, cleanup_job_temp_dir
 import tempfile
 import time
 import threading
 from utils.security.auth_manager import AuthenticationManager, require_permission
 from utils.security.security_monitor import SecurityMonitor
-from utils.security.input_sanitizer import InputSanitizer, ValidationLevel
+from utils.security.input_sanitizer import InputSanitizer
 # Force redeploy - 2025-08-09 - Facebook fixes deployed
 import re
 from utils.activity_logger import activity_logger, log_command_executed, log_download_success, log_download_error
+from utils.job_queue import JobQueue
+from utils.download.format_planner import format_planner
+from utils.file_id_cache import file_id_cache
+from utils.common.validators import URLValidator
+from utils.network.telegram_upload import get_telegram_session, upload_media, get_upload_stats
+from utils.platform_router import platform_router
+from utils.rate_limiter import RateWindow
+from utils.download.download_executor import download_executor, DownloadCancelled
 from urllib.parse import urlparse
 # Render optimized config - using built-in alternatives
 import tempfile
@@ -69,15 +82,24 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 logging.getLogger('requests').setLevel(logging.WARNING)
 logging.getLogger('telegram').setLevel(logging.WARNING)
 
+# Platformele ale căror link-uri sunt procesate din mesaje (YouTube nu este suportat momentan)
+WEBHOOK_LINK_PLATFORMS = frozenset({
+    'tiktok', 'instagram', 'facebook', 'twitter', 'threads',
+    'pinterest', 'reddit', 'vimeo', 'dailymotion'
+})
+
 # Metrici pentru monitoring
 class BotMetrics:
     """Colectează metrici pentru monitoring"""
     
     def __init__(self):
+        self.job_queue = None  # Setată după crearea cozii de job-uri pentru webhook
         self.reset_metrics()
     
     def reset_metrics(self):
         """Resetează metricile"""
+        if self.job_queue:
+            self.job_queue.reset_stats()
         self.downloads_total = 0
         self.downloads_success = 0
         self.downloads_failed = 0
@@ -149,7 +171,8 @@ class BotMetrics:
             'webhook_requests': self.webhook_requests,
             'rate_limited_requests': self.rate_limited_requests,
             'platform_stats': self.platform_stats,
-            'error_types': self.error_types
+            'error_types': self.error_types,
+            'job_queue': self.job_queue.get_stats() if self.job_queue else None
         }
     
     def log_periodic_stats(self):
@@ -166,6 +189,14 @@ class BotMetrics:
         
         if stats['rate_limited_requests'] > stats['webhook_requests'] * 0.3:
             logger.warning(f"🚨 ALERT: Prea multe cereri rate limited: {stats['rate_limited_requests']}")
+        
+        queue_stats = stats['job_queue']
+        if queue_stats:
+            logger.info(f"🧵 QUEUE: depth {queue_stats['depth']}/{queue_stats['max_queue_size']}, "
+                       f"active {queue_stats['active_jobs']}/{queue_stats['workers']}, "
+                       f"wait p95 {queue_stats['wait_time_ms']['p95']}ms")
+            if queue_stats['depth'] >= queue_stats['max_queue_size'] * 0.8:
+                logger.warning(f"🚨 ALERT: Coada de job-uri aproape plină: {queue_stats['depth']}")
 
 # Instanță globală pentru metrici
 metrics = BotMetrics()
@@ -411,10 +442,8 @@ class ErrorHandler:
 def safe_send_with_fallback(chat_id, text, parse_mode='HTML', reply_markup=None):
     """
     Trimite mesaj cu fallback la text simplu dacă parse_mode eșuează.
-    Versiune optimizată cu AsyncDownloadManager pentru performanță îmbunătățită.
+    Folosește sesiunea HTTP partajată (conexiuni TLS refolosite).
     """
-    import requests
-    
     if not TOKEN:
         logger.error("TOKEN nu este setat!")
         return False
@@ -437,7 +466,7 @@ def safe_send_with_fallback(chat_id, text, parse_mode='HTML', reply_markup=None)
     
     try:
         # Timeout mărit pentru Render (connect=20s, read=30s)
-        response = requests.post(url, json=data, timeout=(20, 30))
+        response = get_telegram_session().post(url, json=data, timeout=(20, 30))
         
         if response.status_code == 200:
             logger.info(f"Mesaj trimis cu succes către chat_id {chat_id} cu {parse_mode}")
@@ -455,7 +484,7 @@ def safe_send_with_fallback(chat_id, text, parse_mode='HTML', reply_markup=None)
                 data_fallback['reply_markup'] = reply_markup
             
             # Timeout mărit pentru fallback
-            response_fallback = requests.post(url, json=data_fallback, timeout=(20, 30))
+            response_fallback = get_telegram_session().post(url, json=data_fallback, timeout=(20, 30))
             
             if response_fallback.status_code == 200:
                 logger.info(f"Mesaj trimis cu succes către chat_id {chat_id} fără parse_mode")
@@ -1131,6 +1160,35 @@ async def safe_edit_callback_message(query, text, **kwargs):
             logger.error(f"Eroare la editarea mesajului callback: {e}")
             return None
 
+# Intervalul de verificare a mesajului de status în timpul descărcării (0 = dezactivat)
+DOWNLOAD_STATUS_PROBE_SECONDS = float(os.getenv('DOWNLOAD_STATUS_PROBE_SECONDS', '15'))
+
+async def watch_status_message(status_message, job, text, interval=None):
+    """
+    Anulează descărcarea dacă utilizatorul șterge mesajul de status.
+
+    Telegram nu trimite update-uri pentru mesajele șterse, așa că mesajul este
+    editat periodic cu timpul scurs; „message to edit not found” înseamnă că a fost șters.
+    """
+    interval = DOWNLOAD_STATUS_PROBE_SECONDS if interval is None else interval
+    if interval <= 0:
+        return
+    started = time.time()
+    while not job.future.done():
+        await asyncio.sleep(interval)
+        if job.future.done():
+            return
+        try:
+            await status_message.edit_text(f"{text}\n⏱️ {int(time.time() - started)}s")
+        except Exception as e:
+            error_msg = str(e).lower()
+            if 'message to edit not found' in error_msg or "message can't be edited" in error_msg:
+                logger.info(f"🗑️ Mesajul de status a fost șters - anulez descărcarea ({job.label})")
+                job.cancel()
+                return
+            if 'not modified' not in error_msg:
+                logger.debug(f"Nu s-a putut actualiza mesajul de status: {e}")
+
 async def process_single_video(update, url, video_index=None, total_videos=None, delay_seconds=3):
     """
     Procesează un singur video cu mesaje de status actualizate.
@@ -1155,14 +1213,20 @@ async def process_single_video(update, url, video_index=None, total_videos=None,
         logger.warning(f"Nu s-a putut trimite mesajul de status pentru user {user_id}")
         return False
     
+    lease = None
+    job = None
+    watcher = None
     try:
-        # Execută descărcarea în thread separat
-        import concurrent.futures
-        
-        loop = asyncio.get_event_loop()
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            result = await loop.run_in_executor(executor, download_video, url)
+        # Descărcarea rulează în executorul comun (link-urile identice simultane sunt descărcate o dată)
+        job = download_executor.submit(acquire_download, url, label=f"user {user_id}")
+        watcher = asyncio.create_task(watch_status_message(status_message, job, status_text))
+        lease = await job.wait()
+        watcher.cancel()
+        if job.cancelled:
+            # Mesajul de status a fost șters, dar rezultatul partajat a sosit oricum
+            logger.info(f"🛑 Descărcare anulată de user {user_id}, rezultatul nu mai este trimis: {url}")
+            return False
+        result = lease.result
         
         if result['success']:
             # Actualizează mesajul de status
@@ -1232,15 +1296,8 @@ async def process_single_video(update, url, video_index=None, total_videos=None,
                     else:
                         raise
             
-            # Șterge fișierul temporar cu cleanup optimizat pentru Render
-            try:
-                os.remove(file_path)
-                if is_render_environment():
-                    logger.info(f"[RENDER] Fișier temporar șters: {file_path}")
-            except Exception as e:
-                if is_render_environment():
-                    logger.warning(f"[RENDER] Nu s-a putut șterge fișierul temporar: {e}")
-                pass
+            # Fișierul și directorul job-ului sunt șterse la eliberarea rezultatului partajat
+            lease.release()
             
             # Șterge mesajul de status
             await safe_delete_message(status_message)
@@ -1264,6 +1321,29 @@ async def process_single_video(update, url, video_index=None, total_videos=None,
             await asyncio.sleep(5)
             await safe_delete_message(status_message)
 
+            return False
+
+    except DownloadCancelled:
+        if job is not None and job.cancelled:
+            logger.info(f"🛑 Descărcare anulată de user {user_id} (mesajul de status a fost șters): {url}")
+            return False
+        # Descărcarea partajată a fost oprită de alt utilizator (vezi acquire_download)
+        logger.warning(f"⚠️ Descărcarea partajată pentru user {user_id} a fost întreruptă: {url}")
+        await safe_edit_message(status_message, "❌ Descărcarea a fost întreruptă. Te rog trimite link-ul din nou.")
+        return False
+    except Exception as e:
+        logger.error(f"Eroare la procesarea video-ului {url}: {e}")
+        await safe_edit_message(status_message, f"❌ Eroare la procesarea videoclipului:\n{str(e)}")
+        return False
+    finally:
+        if watcher:
+            watcher.cancel()
+        if lease:
+            lease.release()
+        elif job is not None:
+            # Task-ul a fost anulat în timpul descărcării: rezultatul este eliberat când sosește
+            job.discard(lambda abandoned: abandoned.release())
+
 async def send_video_with_retry(update, file_path, title, uploader=None, description=None, duration=None, file_size=None, max_retries=3):
     """
     Trimite videoclip cu retry logic inteligent folosind ErrorHandler
@@ -1357,7 +1437,7 @@ async def send_video_with_retry(update, file_path, title, uploader=None, descrip
     
     # Dacă ajungem aici, toate încercările au eșuat
     metrics.record_download_failure(platform, 'max_retries_exceeded')
-            return False
+    return False
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -1396,32 +1476,33 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.warning(f"Nu s-a putut trimite mesajul de status pentru user {user_id}")
                 return
             
+            job = None
+            watcher = None
             try:
-                # Execută descărcarea în thread separat pentru a nu bloca event loop-ul
-                import concurrent.futures
-                import asyncio
+                # Descărcarea rulează în executorul comun, fără a bloca event loop-ul
+                job = download_executor.submit(download_video, message_text, label=f"user {user_id}")
                 
-                loop = asyncio.get_event_loop()
+                # Actualizează mesajul cu progres
+                await safe_edit_message(
+                    status_message,
+                    "🔄 Analizez videoclipul și verific compatibilitatea..."
+                )
                 
-                # Rulează descărcarea în thread pool cu progress updates
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    # Actualizează mesajul cu progres
-                    await safe_edit_message(
-                        status_message,
-                        "🔄 Analizez videoclipul și verific compatibilitatea..."
-                    )
-                    
-                    # Așteaptă puțin pentru a permite utilizatorului să vadă mesajul
-                    await asyncio.sleep(1)
-                    
-                    await safe_edit_message(
-                        status_message,
-                        "📥 Descarc videoclipul optimizat pentru Telegram..."
-                    )
-                    
-                    result = await loop.run_in_executor(executor, download_video, message_text)
+                # Așteaptă puțin pentru a permite utilizatorului să vadă mesajul
+                await asyncio.sleep(1)
+                
+                downloading_text = "📥 Descarc videoclipul optimizat pentru Telegram..."
+                await safe_edit_message(status_message, downloading_text)
                 
-                if result['success']:
+                watcher = asyncio.create_task(watch_status_message(status_message, job, downloading_text))
+                result = await job.wait()
+                watcher.cancel()
+                
+                if job.cancelled:
+                    # Mesajul de status a fost șters chiar înainte de finalizare
+                    logger.info(f"🛑 Descărcare anulată de user {user_id}, rezultatul nu mai este trimis")
+                    cleanup_job_temp_dir(result.get('job_dir'))
+                elif result['success']:
                     # Trimite videoclipul cu retry logic pentru caption-uri prea lungi
                     try:
                         await send_video_with_retry(
@@ -1444,6 +1525,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     await safe_delete_message(status_message)
                     
                     # Cleanup suplimentar pentru siguranță
+                    cleanup_job_temp_dir(result.get('job_dir'))
                     cleanup_temp_files()
                     
                 else:
@@ -1454,6 +1536,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     
                     await safe_edit_message(status_message, user_message)
                     
+            except DownloadCancelled:
+                logger.info(f"🛑 Descărcare anulată de user {user_id} (mesajul de status a fost șters)")
+            except asyncio.CancelledError:
+                if job is not None:
+                    job.discard(lambda abandoned: cleanup_job_temp_dir(abandoned.get('job_dir')))
+                raise
             except Exception as e:
                 error_msg = str(e)
                 error_type = ErrorHandler.classify_error(error_msg, "processing")
@@ -1462,6 +1550,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 
                 if status_message:
                     await safe_edit_message(status_message, user_message)
+            finally:
+                if watcher:
+                    watcher.cancel()
         else:
             logger.info(f"Mesaj primit de la {user_id} în chat {chat_id}: {message_text}")
         
@@ -1790,28 +1881,29 @@ def index():
 
 # Rate limiting și deduplicare pentru Render free tier
 processed_messages = set()
-user_last_request = {}  # chat_id -> timestamp
 MAX_REQUESTS_PER_MINUTE = 3  # Limită agresivă pentru Render free tier
+# O cerere la fiecare 60 / MAX_REQUESTS_PER_MINUTE secunde per chat (20 secunde între cereri)
+user_rate_window = RateWindow(limit=1, window=60 / MAX_REQUESTS_PER_MINUTE)
+
+# Coadă de job-uri pentru webhook: descărcările rulează pe un worker pool limitat,
+# iar webhook-ul răspunde imediat către Telegram (evită retry/redelivery)
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '2'))
+WEBHOOK_QUEUE_MAX_SIZE = int(os.getenv('WEBHOOK_QUEUE_MAX_SIZE', '50'))
+WEBHOOK_QUEUE_MAX_PER_CHAT = int(os.getenv('WEBHOOK_QUEUE_MAX_PER_CHAT', '3'))
+
+webhook_queue = JobQueue(
+    num_workers=WEBHOOK_WORKERS,
+    max_queue_size=WEBHOOK_QUEUE_MAX_SIZE,
+    max_per_chat=WEBHOOK_QUEUE_MAX_PER_CHAT,
+    name='webhook'
+)
+metrics.job_queue = webhook_queue
 
 def is_rate_limited(chat_id):
     """Verifică dacă utilizatorul este rate limited"""
-    current_time = time.time()
-    
-    if chat_id in user_last_request:
-        time_diff = current_time - user_last_request[chat_id]
-        if time_diff < 60 / MAX_REQUESTS_PER_MINUTE:  # 20 secunde între cereri
-            metrics.record_rate_limit()
-            return True
-    
-    user_last_request[chat_id] = current_time
-    
-    # Cleanup periodic pentru a economisi memorie
-    if len(user_last_request) > 100:
-        # Păstrează doar ultimele 50 de utilizatori
-        sorted_users = sorted(user_last_request.items(), key=lambda x: x[1], reverse=True)
-        user_last_request.clear()
-        user_last_request.update(dict(sorted_users[:50]))
-    
+    if not user_rate_window.allow(chat_id):
+        metrics.record_rate_limit()
+        return True
     return False
 
 @app.route('/webhook', methods=['POST', 'GET'])
@@ -1890,74 +1982,23 @@ def webhook():
                     'timestamp': time.time()
                 })
                 
-                # Sanitizează input-ul
-                sanitized_text = input_sanitizer.sanitize_text(text, ValidationLevel.STRICT)
+                # Sanitizează input-ul (o singură scanare; link-urile rămân intacte pentru descărcare)
+                sanitized_text = input_sanitizer.sanitize_message(text)
                 
                 logger.info(f"Procesez mesaj de la chat_id: {chat_id}, text: {sanitized_text}")
                 
-                # Procesează mesajul și trimite răspuns
-                try:
-                    if text == '/start':
-                        welcome_text = (
-                            "🎬 <b>Bun venit la Video Downloader Bot!</b>\n\n"
-                            "📱 Trimite-mi un link de pe:\n"
-                            "• TikTok\n"
-                            "• Instagram\n"
-                            "• Facebook\n"
-                            "• Twitter/X\n\n"
-                            "🔗 Doar copiază și lipește link-ul aici!"
-                        )
-                        success = send_telegram_message(chat_id, welcome_text)
-                        logger.info(f"Mesaj de bun venit trimis: {success}")
-                        
-                    elif text == '/help':
-                        help_text = (
-                            "🤖 <b>Bot Descărcare Video - Ghid Complet</b>\n\n"
-                            "📋 <b>Comenzi disponibile:</b>\n"
-                            "• /start - Pornește botul și afișează meniul\n"
-                            "• /help - Afișează acest ghid complet\n"
-                            "• /menu - Revine la meniul principal\n"
-                            "• /ping - Verifică dacă botul funcționează\n\n"
-                            "🆘 <b>Cum să folosești botul:</b>\n"
-                            "1️⃣ Copiază link-ul videoclipului\n"
-                            "2️⃣ Trimite-l în acest chat\n"
-                            "3️⃣ Așteaptă să fie procesat (30s-2min)\n"
-                            "4️⃣ Primești videoclipul descărcat automat\n\n"
-                            "🔗 <b>Platforme suportate:</b>\n"
-                            "• TikTok (tiktok.com, vm.tiktok.com)\n"
-                            "• Instagram (instagram.com, reels, stories)\n"
-                            "• Facebook (facebook.com, fb.watch, fb.me)\n"
-                            "• Twitter/X (twitter.com, x.com)\n"
-                            "• Threads (threads.net, threads.com)\n"
-                            "• Pinterest (pinterest.com, pin.it)\n"
-                            "• Reddit (reddit.com, redd.it, v.redd.it)\n"
-                            "• Vimeo (vimeo.com, player.vimeo.com)\n"
-                            "• Dailymotion (dailymotion.com, dai.ly)\n\n"
-                            "⚠️ <b>Limitări importante:</b>\n"
-                            "• Mărime max: 45MB (limita Telegram)\n"
-                            "• Durată max: 3 ore\n"
-                            "• Calitate max: 720p\n"
-                            "• Doar videoclipuri publice\n\n"
-                            "💡 <b>Sfaturi:</b>\n"
-                            "• Folosește link-uri directe\n"
-                            "• Verifică că videoclipul este public\n"
-                            "• Pentru probleme, folosește /ping"
-                        )
-                        success = send_telegram_message(chat_id, help_text)
-                        logger.info(f"Mesaj de ajutor trimis: {success}")
-                        
-                    elif sanitized_text and ('tiktok.com' in sanitized_text or 'instagram.com' in sanitized_text or 'facebook.com' in sanitized_text or 'fb.watch' in sanitized_text or 'twitter.com' in sanitized_text or 'x.com' in sanitized_text or 'threads.net' in sanitized_text or 'threads.com' in sanitized_text or 'pinterest.com' in sanitized_text or 'pin.it' in sanitized_text or 'reddit.com' in sanitized_text or 'redd.it' in sanitized_text or 'vimeo.com' in sanitized_text or 'dailymotion.com' in sanitized_text or 'dai.ly' in sanitized_text):
-                        logger.info(f"Link video detectat: {sanitized_text}")
-                        # Procesează link-ul video
-                        process_video_link_sync(chat_id, sanitized_text, user_id)
-                        
+                # Procesarea (inclusiv descărcarea și upload-ul) rulează pe worker pool,
+                # astfel încât Telegram primește confirmarea imediat
+                accepted, reason = webhook_queue.submit(
+                    chat_id, handle_webhook_message, chat_id, text, sanitized_text, user_id
+                )
+                if not accepted:
+                    metrics.record_rate_limit()
+                    logger.warning(f"Job respins pentru chat {chat_id}: {reason}")
+                    if reason == JobQueue.REJECTED_CHAT_LIMIT:
+                        send_telegram_message(chat_id, "⏳ Ai deja mai multe videoclipuri în procesare. Te rog așteaptă să se termine.")
                     else:
-                        success = send_telegram_message(chat_id, "❌ Te rog trimite un link valid de video sau folosește /help pentru ajutor.")
-                        logger.info(f"Mesaj de eroare trimis: {success}")
-                        
-                except Exception as msg_error:
-                    logger.error(f"Eroare la procesarea mesajului: {msg_error}")
-                    # Nu ridica excepția, doar loghează
+                        send_telegram_message(chat_id, "⏳ Serverul este ocupat momentan. Te rog încearcă din nou în câteva minute.")
         
         return jsonify({'status': 'ok'}), 200
         
@@ -1965,6 +2006,71 @@ def webhook():
         logger.error(f"Eroare în webhook: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def handle_webhook_message(chat_id, text, sanitized_text, user_id=None):
+    """Procesează un mesaj primit prin webhook; rulează pe worker pool-ul cozii de job-uri"""
+    try:
+        if text == '/start':
+            welcome_text = (
+                "🎬 <b>Bun venit la Video Downloader Bot!</b>\n\n"
+                "📱 Trimite-mi un link de pe:\n"
+                "• TikTok\n"
+                "• Instagram\n"
+                "• Facebook\n"
+                "• Twitter/X\n\n"
+                "🔗 Doar copiază și lipește link-ul aici!"
+            )
+            success = send_telegram_message(chat_id, welcome_text)
+            logger.info(f"Mesaj de bun venit trimis: {success}")
+            
+        elif text == '/help':
+            help_text = (
+                "🤖 <b>Bot Descărcare Video - Ghid Complet</b>\n\n"
+                "📋 <b>Comenzi disponibile:</b>\n"
+                "• /start - Pornește botul și afișează meniul\n"
+                "• /help - Afișează acest ghid complet\n"
+                "• /menu - Revine la meniul principal\n"
+                "• /ping - Verifică dacă botul funcționează\n\n"
+                "🆘 <b>Cum să folosești botul:</b>\n"
+                "1️⃣ Copiază link-ul videoclipului\n"
+                "2️⃣ Trimite-l în acest chat\n"
+                "3️⃣ Așteaptă să fie procesat (30s-2min)\n"
+                "4️⃣ Primești videoclipul descărcat automat\n\n"
+                "🔗 <b>Platforme suportate:</b>\n"
+                "• TikTok (tiktok.com, vm.tiktok.com)\n"
+                "• Instagram (instagram.com, reels, stories)\n"
+                "• Facebook (facebook.com, fb.watch, fb.me)\n"
+                "• Twitter/X (twitter.com, x.com)\n"
+                "• Threads (threads.net, threads.com)\n"
+                "• Pinterest (pinterest.com, pin.it)\n"
+                "• Reddit (reddit.com, redd.it, v.redd.it)\n"
+                "• Vimeo (vimeo.com, player.vimeo.com)\n"
+                "• Dailymotion (dailymotion.com, dai.ly)\n\n"
+                "⚠️ <b>Limitări importante:</b>\n"
+                "• Mărime max: 45MB (limita Telegram)\n"
+                "• Durată max: 3 ore\n"
+                "• Calitate max: 720p\n"
+                "• Doar videoclipuri publice\n\n"
+                "💡 <b>Sfaturi:</b>\n"
+                "• Folosește link-uri directe\n"
+                "• Verifică că videoclipul este public\n"
+                "• Pentru probleme, folosește /ping"
+            )
+            success = send_telegram_message(chat_id, help_text)
+            logger.info(f"Mesaj de ajutor trimis: {success}")
+            
+        elif sanitized_text and platform_router.find_in_text(sanitized_text, WEBHOOK_LINK_PLATFORMS):
+            logger.info(f"Link video detectat: {sanitized_text}")
+            # Procesează link-ul video
+            process_video_link_sync(chat_id, sanitized_text, user_id)
+            
+        else:
+            success = send_telegram_message(chat_id, "❌ Te rog trimite un link valid de video sau folosește /help pentru ajutor.")
+            logger.info(f"Mesaj de eroare trimis: {success}")
+            
+    except Exception as msg_error:
+        logger.error(f"Eroare la procesarea mesajului: {msg_error}")
+        # Nu ridica excepția, doar loghează
+
 def send_telegram_message(chat_id, text, reply_markup=None):
     """Trimite mesaj prin API-ul Telegram cu fallback automat și validare chat_id"""
     # Validează chat_id înainte de trimitere
@@ -2068,7 +2174,7 @@ def process_message_sync(update):
             )
             send_telegram_message(chat_id, help_text)
             
-        elif text and ('tiktok.com' in text or 'instagram.com' in text or 'facebook.com' in text or 'fb.watch' in text or 'twitter.com' in text or 'x.com' in text or 'threads.net' in text or 'threads.com' in text or 'pinterest.com' in text or 'pin.it' in text or 'reddit.com' in text or 'redd.it' in text or 'vimeo.com' in text or 'dailymotion.com' in text or 'dai.ly' in text):
+        elif text and platform_router.find_in_text(text, WEBHOOK_LINK_PLATFORMS):
             # Procesează link-ul video
             process_video_link_sync(chat_id, text, user_id)
             
@@ -2111,10 +2217,9 @@ def process_callback_sync(update):
 def answer_callback_query(callback_query_id):
     """Răspunde la callback query"""
     try:
-        import requests
         url = f"https://api.telegram.org/bot{TOKEN}/answerCallbackQuery"
         data = {'callback_query_id': callback_query_id}
-        requests.post(url, json=data, timeout=5)
+        get_telegram_session().post(url, json=data, timeout=5)
     except Exception as e:
         logger.error(f"Eroare la răspunsul callback: {e}")
 
@@ -2143,15 +2248,24 @@ def download_video_sync(chat_id, url, user_id=None):
     """Descarcă video-ul în mod sincron în 720p"""
     global error_messages_sent
     
+    lease = None
     try:
-        # Descarcă video-ul (funcția download_video folosește deja format 720p)
-        result = download_video(url)
+        # Videoclip deja încărcat pe Telegram: retrimite prin file_id, fără descărcare/upload
+        if send_cached_video(chat_id, url):
+            log_download_success(URLValidator.detect_platform(url) or 'unknown', url, 0, user_id or chat_id, chat_id)
+            error_messages_sent.discard(f"{chat_id}_{url}")
+            return
+        
+        # Descarcă video-ul (format 720p); cererile simultane pentru același link
+        # așteaptă aceeași descărcare
+        lease = acquire_download(url)
+        result = lease.result
         
         if result['success']:
             # Log succesul descărcării
             log_download_success(result.get('platform', 'unknown'), url, 0, user_id or chat_id, chat_id)
-            # Trimite fișierul cu toate informațiile
-            send_video_file(chat_id, result['file_path'], result)
+            # Trimite fișierul; directorul job-ului este șters la eliberarea rezultatului partajat
+            send_video_file(chat_id, result['file_path'], result, source_url=url, delete_file=False)
             # Șterge din cache-ul de erori dacă descărcarea a reușit
             error_key = f"{chat_id}_{url}"
             error_messages_sent.discard(error_key)
@@ -2184,14 +2298,70 @@ def download_video_sync(chat_id, url, user_id=None):
                 error_messages_sent.clear()
         else:
             logger.info(f"Mesaj de eroare pentru excepție deja trimis pentru {error_key}, ignorat")
+    finally:
+        if lease:
+            lease.release()
 
-def send_video_file(chat_id, file_path, video_info):
-    """Trimite fișierul video prin Telegram"""
+def send_cached_video(chat_id, url):
+    """
+    Retrimite un videoclip prin file_id-ul Telegram memorat pentru URL.
+    Returnează False dacă nu există în cache sau Telegram respinge file_id-ul.
+    """
+    entry = file_id_cache.get(url)
+    if not entry:
+        return False
+    
     try:
-        import requests
-        import os
+        media_methods = {'video': 'sendVideo', 'audio': 'sendAudio', 'document': 'sendDocument'}
+        media_type = entry.media_type if entry.media_type in media_methods else 'video'
+        method = media_methods[media_type]
+        data = {
+            'chat_id': chat_id,
+            media_type: entry.file_id,
+            'caption': entry.caption or '',
+            'parse_mode': 'HTML'
+        }
         
-        url = f"https://api.telegram.org/bot{TOKEN}/sendVideo"
+        response = get_telegram_session().post(f"https://api.telegram.org/bot{TOKEN}/{method}", json=data, timeout=(10, 30))
+        if response.status_code == 200:
+            logger.info(f"♻️ Video retrimis din file ID cache pentru chat {chat_id}: {entry.title or url}")
+            return True
+        
+        # file_id invalid sau expirat pe partea Telegram: se descarcă din nou
+        logger.warning(f"File ID respins ({response.status_code}) pentru {url}: {response.text[:200]}")
+        if response.status_code == 400:
+            file_id_cache.invalidate(url)
+    except Exception as e:
+        logger.warning(f"Eroare la retrimiterea din file ID cache: {e}")
+    return False
+
+def extract_sent_file_id(response):
+    """Extrage (file_id, tip media) din răspunsul sendVideo; Telegram poate converti în animation/document"""
+    try:
+        message = response.json().get('result') or {}
+    except Exception:
+        return None, None
+    for media_type in ('video', 'animation', 'document', 'audio'):
+        media = message.get(media_type)
+        if media and media.get('file_id'):
+            # Animațiile sunt retrimise tot prin sendVideo
+            return media['file_id'], 'video' if media_type == 'animation' else media_type
+    return None, None
+
+def is_cacheable_media(video_info):
+    """
+    Doar media reală a link-ului intră în file ID cache; un video informativ
+    (ex. IP blocat de TikTok) ar fi retrimis în locul videoclipului până la TTL.
+    """
+    return not video_info.get('is_info_video')
+
+def send_video_file(chat_id, file_path, video_info, source_url=None, delete_file=True):
+    """
+    Trimite fișierul video prin Telegram.
+    delete_file=False lasă fișierul pe disc (rezultat partajat între mai multe chat-uri).
+    """
+    try:
+        import os
         
         # Creează caption-ul detaliat
         title = video_info.get('title', 'Video')
@@ -2247,6 +2417,8 @@ def send_video_file(chat_id, file_path, video_info):
             )
             
             send_telegram_message(chat_id, error_message)
+            if not delete_file:
+                return
             try:
                 # Șterge fișierul
                 os.remove(file_path)
@@ -2276,53 +2448,48 @@ def send_video_file(chat_id, file_path, video_info):
         
         logger.info(f"Trimit video de {file_size_bytes / (1024*1024):.1f}MB pentru chat {chat_id}")
         
-        with open(file_path, 'rb') as video_file:
-            files = {'video': video_file}
-            data = {
-                'chat_id': chat_id,
-                'caption': caption,
-                'parse_mode': 'HTML'
-            }
-            
-            # Timeout mărit pentru Render (600 secunde = 10 minute)
-            response = requests.post(url, files=files, data=data, timeout=(30, 600))
-            
-            # Dacă eșuează cu HTML, încearcă fără parse_mode
-            if response.status_code != 200:
-                logger.warning(f"Eroare cu HTML parse_mode: {response.status_code} - {response.text[:200]}")
-                logger.info("Încerc să trimit caption fără parse_mode...")
-                
-                # Reset file pointer
-                video_file.seek(0)
-                
-                data_fallback = {
-                    'chat_id': chat_id,
-                    'caption': caption  # Fără parse_mode
-                }
-                
-                # Timeout mărit pentru fallback
-                response = requests.post(url, files={'video': video_file}, data=data_fallback, timeout=(30, 600))
+        # Upload în streaming pe sesiunea partajată; caption-ul este validat înainte,
+        # astfel încât fișierul nu este retransmis pentru erori de parsare HTML
+        response = upload_media(
+            TOKEN, 'sendVideo', chat_id, 'video', file_path,
+            caption=caption,
+            timeout=(30, 600)  # Timeout mărit pentru Render (10 minute)
+        )
             
         # Șterge fișierul temporar și directorul părinte dacă este temporar
-        try:
-            # Șterge fișierul
-            os.remove(file_path)
-            
-            # Dacă fișierul era într-un director temporar, șterge și directorul
-            parent_dir = os.path.dirname(file_path)
-            if 'tmp' in parent_dir.lower() or 'temp' in parent_dir.lower():
-                try:
-                    import shutil
-                    if os.path.exists(parent_dir) and os.path.isdir(parent_dir):
-                        shutil.rmtree(parent_dir)
-                        logger.info(f"Director temporar șters: {parent_dir}")
-                except Exception as cleanup_error:
-                    logger.warning(f"Nu s-a putut șterge directorul temporar {parent_dir}: {cleanup_error}")
-        except Exception as file_error:
-            logger.warning(f"Nu s-a putut șterge fișierul {file_path}: {file_error}")
+        if delete_file:
+            try:
+                # Șterge fișierul
+                os.remove(file_path)
+                
+                # Dacă fișierul era într-un director temporar, șterge și directorul
+                parent_dir = os.path.dirname(file_path)
+                if 'tmp' in parent_dir.lower() or 'temp' in parent_dir.lower():
+                    try:
+                        import shutil
+                        if os.path.exists(parent_dir) and os.path.isdir(parent_dir):
+                            shutil.rmtree(parent_dir)
+                            logger.info(f"Director temporar șters: {parent_dir}")
+                    except Exception as cleanup_error:
+                        logger.warning(f"Nu s-a putut șterge directorul temporar {parent_dir}: {cleanup_error}")
+            except Exception as file_error:
+                logger.warning(f"Nu s-a putut șterge fișierul {file_path}: {file_error}")
             
         if response.status_code == 200:
             logger.info(f"Video trimis cu succes pentru chat {chat_id}")
+            
+            # Memorează file_id-ul pentru retrimiterea fără descărcare a aceluiași link
+            if source_url and is_cacheable_media(video_info):
+                sent_file_id, media_type = extract_sent_file_id(response)
+                if sent_file_id:
+                    file_id_cache.put(
+                        source_url,
+                        sent_file_id,
+                        media_type=media_type,
+                        caption=caption,
+                        title=title,
+                        file_size=file_size_bytes
+                    )
         else:
             # Log mai detaliat pentru debugging
             try:
@@ -2531,12 +2698,105 @@ def recent_threats():
         return jsonify({
             'status': 'error',
             'message': 'Threats data unavailable'
+        }), 500
+
+def _wants_prometheus() -> bool:
+    """Formatul text Prometheus: ?format=prometheus sau Accept text/plain / OpenMetrics"""
+    requested = request.args.get('format', '').lower()
+    if requested:
+        return requested in ('prometheus', 'text', 'openmetrics')
+    accept = request.headers.get('Accept', '')
+    return 'text/plain' in accept or 'openmetrics' in accept
+
+
+def _publish_bot_metrics(collector):
+    """Copiază metricile BotMetrics în colectorul de monitoring (înainte de export)"""
+    stats = metrics.get_stats()
+    collector.set_counter('downloads_total', stats['downloads_total'])
+    collector.set_counter('webhook_requests_total', stats['webhook_requests'])
+    collector.set_counter('rate_limited_requests_total', stats['rate_limited_requests'])
+    for platform, counts in stats['platform_stats'].items():
+        for result, value in counts.items():
+            collector.set_counter('platform_downloads_total', value, {'platform': platform, 'result': result})
+    for error_type, value in stats['error_types'].items():
+        collector.set_counter('download_errors_total', value, {'error_type': error_type})
+    collector.set_gauge('uptime_seconds', round(metrics.get_uptime(), 1))
+    collector.set_gauge('download_success_rate_percent', stats['success_rate'])
+
+    session_pool = sys.modules.get('utils.network.session_pool')
+    if session_pool is not None:
+        http = session_pool.session_registry.get_stats()
+        collector.set_gauge('http_sessions', http['sessions'])
+        collector.set_counter('http_connections_total', http['connections_created'], {'kind': 'created'})
+        collector.set_counter('http_connections_total', http['connections_reused'], {'kind': 'reused'})
+        collector.set_counter('http_dns_cache_total', http['dns_cache_hits'], {'result': 'hit'})
+        collector.set_counter('http_dns_cache_total', http['dns_cache_misses'], {'result': 'miss'})
+
+    if import_profiler.records:
+        profile = import_profiler.get_report()
+        collector.set_gauge('startup_import_ms', profile['total_import_ms'])
+        for entry in profile['top']:
+            collector.set_gauge('startup_module_import_ms', entry['cumulative_ms'], {'module': entry['module']})
+
+    job_queue = stats['job_queue']
+    if job_queue:
+        collector.set_gauge('job_queue_depth', job_queue['depth'])
+        collector.set_gauge('job_queue_active_jobs', job_queue['active_jobs'])
+        collector.set_gauge('job_queue_workers', job_queue['workers'])
+        collector.set_gauge('job_queue_chats_active', job_queue['chats_active'])
+        for result in ('submitted', 'completed', 'failed'):
+            collector.set_counter('job_queue_jobs_total', job_queue[result], {'result': result})
+        for reason in ('queue_full', 'chat_limit'):
+            collector.set_counter('job_queue_rejected_total', job_queue[f'rejected_{reason}'], {'reason': reason})
+        wait = job_queue['wait_time_ms']
+        collector.set_counter('job_queue_waits_total', wait['count'])
+        collector.set_counter('job_queue_wait_ms_total', wait['total'])
+        for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('1', 'max')):
+            collector.set_gauge('job_queue_wait_ms', wait[key], {'quantile': quantile})
+
+    executor = download_executor.get_stats()
+    collector.set_gauge('download_executor_queued', executor['queued'])
+    collector.set_gauge('download_executor_running', executor['running'])
+    collector.set_gauge('download_executor_workers', executor['workers'])
+    for result in ('completed', 'failed', 'cancelled'):
+        collector.set_counter('download_executor_jobs_total', executor[result], {'result': result})
+    for worker in executor.get('process_pool', {}).get('workers', []):
+        labels = {'worker': str(worker['id'])}
+        collector.set_gauge('download_worker_rss_bytes', worker['rss_bytes'], labels)
+        collector.set_gauge('download_worker_jobs', worker['jobs'], labels)
+        collector.set_gauge('download_worker_latency_p95_ms', worker['latency_ms']['p95'], labels)
+
+
 @app.route('/metrics', methods=['GET'])
 def metrics_endpoint():
-    """Endpoint pentru metrici și monitoring"""
+    """Endpoint pentru metrici și monitoring (JSON sau format text Prometheus)"""
+    if _wants_prometheus():
+        try:
+            # Import leneș: thread-ul de monitoring pornește doar în worker-ul care servește /metrics
+            from utils.monitoring import monitoring
+            _publish_bot_metrics(monitoring.metrics)
+            return monitoring.export_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        except Exception as e:
+            logger.error(f"Eroare la exportul Prometheus: {e}")
+            return f"# error: {e}\n", 500, {'Content-Type': 'text/plain; charset=utf-8'}
+
     try:
         stats = metrics.get_stats()
         
+        # Selecția de format din metadata: octeți economisiți, respingeri înainte de descărcare
+        stats['format_planner'] = format_planner.get_stats()
+        stats['file_id_cache'] = file_id_cache.get_stats()
+        stats['download_dedup'] = download_flights.get_stats()
+        stats['download_executor'] = download_executor.get_stats()
+        stats['telegram_uploads'] = get_upload_stats()
+        stats['platform_router'] = platform_router.get_stats()
+        # Sesiunile aiohttp partajate: raportate doar dacă modulul a fost deja importat de cineva
+        session_pool = sys.modules.get('utils.network.session_pool')
+        if session_pool is not None:
+            stats['http_sessions'] = session_pool.session_registry.get_stats()
+        if import_profiler.records:
+            stats['import_profile'] = import_profiler.get_report()
+        
         # Adaugă informații despre sistem dacă psutil este disponibil
         try:
             import psutil
@@ -2649,6 +2909,11 @@ def initialize_on_startup():
 
 logger.info("Aplicația Telegram este configurată pentru webhook-uri")
 
+# Sfârșitul importului app.py: raportul de cold start per modul (doar cu IMPORT_PROFILE=1)
+if import_profiler.enabled:
+    import_profiler.uninstall()
+    import_profiler.log_report()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 10000))
     
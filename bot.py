@@ -1,12 +1,14 @@
 import os
 from utils.rate_limiter import rate_limiter
 import sys
+import asyncio
 import logging
 import re
 import html
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
-from downloader import download_video, is_supported_url
+from downloader import download_video, is_supported_url, cleanup_job_temp_dir
+from utils.download.download_executor import download_executor
 
 # Configurare logging
 logging.basicConfig(
@@ -311,9 +313,12 @@ async def process_download(update: Update, context: ContextTypes.DEFAULT_TYPE, u
         "✅ Procesez și descarc video-ul în 720p te rog asteapta"
     )
     
+    job = None
+    result = None
     try:
-        # Descarcă videoclipul
-        result = download_video(url)
+        # Descarcă videoclipul în executorul comun, fără a bloca event loop-ul
+        job = download_executor.submit(download_video, url, label='bot')
+        result = await job.wait()
         
         if not result['success']:
             raise Exception(result['error'])
@@ -386,12 +391,6 @@ async def process_download(update: Update, context: ContextTypes.DEFAULT_TYPE, u
             reply_markup=reply_markup
         )
         
-        # Șterge fișierul temporar
-        try:
-            os.remove(filepath)
-        except Exception as e:
-            logger.debug(f"Nu s-a putut șterge fișierul temporar {filepath}: {e}")
-            
         # Șterge mesajul de procesare
         try:
             await processing_message.delete()
@@ -432,6 +431,17 @@ async def process_download(update: Update, context: ContextTypes.DEFAULT_TYPE, u
             await processing_message.delete()
         except Exception as e:
             logger.debug(f"Nu s-a putut șterge mesajul de procesare în cazul de eroare: {e}")
+    
+    except asyncio.CancelledError:
+        # Handler anulat înaintea rezultatului: directorul job-ului este șters când descărcarea se termină
+        if job is not None and result is None:
+            job.discard(lambda abandoned: cleanup_job_temp_dir(abandoned.get('job_dir')))
+        raise
+    
+    finally:
+        # Directorul job-ului (fișierul și directorul creat de download_video), la succes sau eroare
+        if result:
+            cleanup_job_temp_dir(result.get('job_dir'))
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -449,7 +459,6 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Gestionează cererea pentru descărcare nouă
     elif query.data == 'new_download':
         await query.edit_message_text(
-<<<<<<< HEAD
             "📥 **Gata pentru o nouă descărcare!**\n\n"
             "Trimite-mi un link de pe TikTok, Instagram, Facebook, Twitter/X, Threads, Pinterest, Reddit, Vimeo sau Dailymotion"
         )
@@ -467,7 +476,6 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     elif query.data == 'help':
-<<<<<<< HEAD
         help_text = """🤖 **Telegram Video Downloader Bot**
 
 📱 **Platforme Suportate:**
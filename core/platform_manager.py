@@ -13,9 +13,12 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 
 from platforms.base import BasePlatform, VideoInfo, PlatformCapability, ExtractionError, DownloadError
-from utils.cache import cache, generate_cache_key
+from platforms.manifest import PLATFORM_MANIFEST, MANIFEST_MODULES, PlatformSpec
+from utils.cache import cache
 from utils.monitoring import monitoring, trace_operation
 from utils.rate_limiter import RateLimiter
+from utils.singleflight import AsyncSingleFlight, canonical_url_key
+from utils.platform_router import platform_router
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +30,10 @@ class PlatformManager:
     
     def __init__(self):
         self.platforms: Dict[str, BasePlatform] = {}
+        self.platform_specs: Dict[str, PlatformSpec] = {}  # Din manifest, încă neimportate
         self.platform_priorities: Dict[str, int] = {}
+        self.platform_load_times: Dict[str, float] = {}  # ms de import + instanțiere per platformă
+        self.failed_platforms: Dict[str, str] = {}
         self.cache = cache  # Pentru compatibilitate cu testele
         self.rate_limiters: Dict[str, RateLimiter] = {}
         self.url_cache: Dict[str, str] = {}  # URL -> platform_name cache
@@ -60,6 +66,10 @@ class PlatformManager:
         self.url_cache_ttl = 3600  # 1 oră
         self.platform_health_check_interval = 300  # 5 minute
         self.cleanup_interval = 600  # 10 minute
+        # Platformele din manifest sunt importate la primul URL (PLATFORM_LAZY_LOAD=false: toate la pornire)
+        self.lazy_loading = os.getenv('PLATFORM_LAZY_LOAD', 'true').lower() not in ('0', 'false', 'no', 'off')
+        # Platforme importate în fundal după pornire, ex. PLATFORM_PRELOAD=tiktok,instagram
+        self.preload = [name.strip() for name in os.getenv('PLATFORM_PRELOAD', '').split(',') if name.strip()]
         
         # Semafoare pentru concurrency
         self.download_semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
@@ -67,6 +77,8 @@ class PlatformManager:
         
         # Task management
         self.background_tasks: List[asyncio.Task] = []
+        self.download_flights = AsyncSingleFlight(name='platform_downloads')
+        self.platform_loads = AsyncSingleFlight(name='platform_loads')
         self._initialized = False
         self._shutdown = False
         
@@ -89,8 +101,13 @@ class PlatformManager:
             # Pornește task-urile de background
             await self._start_background_tasks()
             
+            # Importă în fundal platformele cerute explicit, fără să întârzie pornirea
+            if self.preload:
+                self.background_tasks.append(asyncio.create_task(self.preload_platforms(self.preload)))
+            
             self._initialized = True
-            logger.info(f"✅ Platform Manager initialized with {len(self.platforms)} platforms")
+            logger.info(f"✅ Platform Manager initialized with {len(self.platforms)} platforms "
+                        f"({len(self.platform_specs)} more registered for lazy loading)")
             
             # Log platformele încărcate
             for name, platform in self.platforms.items():
@@ -100,27 +117,43 @@ class PlatformManager:
                 
             if monitoring and hasattr(monitoring, 'record_metric'):
                  monitoring.record_metric("platform_manager.platforms_loaded", len(self.platforms))
+                 monitoring.record_metric("platform_manager.platforms_registered", self._registered_count())
                 
         except Exception as e:
             logger.error(f"❌ Failed to initialize Platform Manager: {e}")
             raise
             
     async def _load_all_platforms(self):
-        """Încarcă toate platformele dinamic din directorul platforms/"""
+        """
+        Înregistrează platformele din manifest (nume, domenii, prioritate) fără
+        să le importe; modulele din platforms/ care lipsesc din manifest sunt
+        importate imediat, în paralel.
+        """
+        for spec in PLATFORM_MANIFEST:
+            if spec.name in self.platforms:
+                continue
+            self.platform_specs[spec.name] = spec
+            self.platform_priorities[spec.name] = spec.priority
+            self.failed_platforms.pop(spec.name, None)
+            platform_router.register(spec.name, spec.domains, spec.priority)
+            
+        logger.info(f"📋 Registered {len(self.platform_specs)} platforms from manifest")
+        
         platforms_dir = Path(__file__).parent.parent / "platforms"
         
         if not platforms_dir.exists():
             logger.warning(f"⚠️ Platforms directory not found: {platforms_dir}")
             return
             
-        # Găsește toate fișierele Python din platforms/
+        # Fișierele din platforms/ care nu sunt descrise în manifest
         platform_files = []
         for file_path in platforms_dir.glob("*.py"):
-            if file_path.name.startswith('__') or file_path.name == 'base.py':
+            if file_path.name.startswith('__') or file_path.stem in MANIFEST_MODULES:
                 continue
             platform_files.append(file_path)
             
-        logger.info(f"🔍 Found {len(platform_files)} platform files to load")
+        if platform_files:
+            logger.info(f"🔍 Found {len(platform_files)} platform files outside the manifest")
         
         # Încarcă platformele în paralel cu error handling
         load_tasks = []
@@ -138,23 +171,20 @@ class PlatformManager:
             elif result:
                 loaded_count += 1
                 
-        logger.info(f"✅ Successfully loaded {loaded_count}/{len(platform_files)} platforms")
+        if platform_files:
+            logger.info(f"✅ Successfully loaded {loaded_count}/{len(platform_files)} platforms")
+        
+        if not self.lazy_loading:
+            await self.preload_platforms()
         
     async def _load_platform_file(self, file_path: Path) -> bool:
-        """Încarcă o platformă dintr-un fișier specific"""
+        """Încarcă o platformă dintr-un fișier specific (importul rulează în executor)"""
         module_name = file_path.stem
         
         try:
-            # Import dinamic
-            spec = importlib.util.spec_from_file_location(
-                f"platforms.{module_name}", 
-                file_path
-            )
-            if not spec or not spec.loader:
-                raise ImportError(f"Cannot load spec for {file_path}")
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            module = await loop.run_in_executor(None, self._import_platform_file, file_path)
             
             # Găsește clasa platformă în modul
             platform_class = self._find_platform_class(module)
@@ -164,26 +194,114 @@ class PlatformManager:
                 
             # Instanțiază platforma
             platform_instance = platform_class()
+            return self._register_platform(platform_instance, module_name.lower(), start_time=start)
             
-            # Validează că este o platformă validă
-            if not self._validate_platform(platform_instance):
-                logger.warning(f"⚠️ Invalid platform: {module_name}")
-                return False
-                
-            # Înregistrează platforma
-            platform_name = getattr(platform_instance, 'platform_name', module_name.lower())
-            self.platforms[platform_name] = platform_instance
+        except Exception as e:
+            logger.error(f"❌ Error loading platform {module_name}: {e}")
+            return False
+            
+    @staticmethod
+    def _import_platform_file(file_path: Path):
+        """Import dinamic al unui fișier de platformă"""
+        spec = importlib.util.spec_from_file_location(
+            f"platforms.{file_path.stem}", 
+            file_path
+        )
+        if not spec or not spec.loader:
+            raise ImportError(f"Cannot load spec for {file_path}")
+            
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+        
+    def _register_platform(self, platform_instance: BasePlatform, default_name: str,
+                           priority: Optional[int] = None, start_time: Optional[float] = None) -> bool:
+        """Validează și înregistrează o instanță de platformă"""
+        # Validează că este o platformă validă
+        if not self._validate_platform(platform_instance):
+            logger.warning(f"⚠️ Invalid platform: {default_name}")
+            return False
             
-            # Setează prioritatea
+        # Înregistrează platforma
+        platform_name = getattr(platform_instance, 'platform_name', None) or default_name
+        self.platforms[platform_name] = platform_instance
+        self.platform_specs.pop(platform_name, None)
+        
+        # Setează prioritatea (cea din manifest are întâietate)
+        if priority is None:
             priority = getattr(platform_instance, 'priority', 999)
-            self.platform_priorities[platform_name] = priority
+        self.platform_priorities[platform_name] = priority
+        
+        # Indexează domeniile pentru rutarea URL -> platformă
+        domains = getattr(platform_instance, 'supported_domains', None)
+        if domains:
+            platform_router.register(platform_name, domains, priority)
+            
+        if platform_name not in self.rate_limiters:
+            self._setup_rate_limiter(platform_name, platform_instance)
+            
+        load_ms = (time.perf_counter() - start_time) * 1000 if start_time is not None else 0.0
+        self.platform_load_times[platform_name] = round(load_ms, 1)
+        
+        logger.info(f"✅ Loaded platform: {platform_name} (priority: {priority}, {load_ms:.0f}ms)")
+        return True
+        
+    async def ensure_platform(self, platform_name: str) -> Optional[BasePlatform]:
+        """
+        Instanța unei platforme, importând-o la prima utilizare. Cererile
+        simultane pentru aceeași platformă așteaptă un singur import.
+        """
+        platform = self.platforms.get(platform_name)
+        if platform is not None:
+            return platform
+        spec = self.platform_specs.get(platform_name)
+        if spec is None:
+            return None
+        platform, _ = await self.platform_loads.do(platform_name, self._load_platform_spec, spec)
+        return platform
+        
+    async def _load_platform_spec(self, spec: PlatformSpec) -> Optional[BasePlatform]:
+        """Importă modulul unei platforme din manifest și o înregistrează"""
+        if spec.name in self.platforms:
+            return self.platforms[spec.name]
             
-            logger.info(f"✅ Loaded platform: {platform_name} (priority: {priority})")
-            return True
+        start = time.perf_counter()
+        try:
+            # Importul (yt-dlp, aiohttp etc.) nu blochează event loop-ul
+            loop = asyncio.get_running_loop()
+            platform_class = await loop.run_in_executor(None, spec.load_class)
+            platform_instance = platform_class()
             
+            if not self._register_platform(platform_instance, spec.name, spec.priority, start):
+                raise ImportError(f"Invalid platform class {spec.class_name}")
+                
         except Exception as e:
-            logger.error(f"❌ Error loading platform {module_name}: {e}")
-            return False
+            # Nu mai reîncercăm la fiecare URL; reload_platforms() o reînregistrează
+            self.platform_specs.pop(spec.name, None)
+            self.failed_platforms[spec.name] = str(e)
+            logger.error(f"❌ Error loading platform {spec.name} ({spec.module_path}): {e}")
+            return None
+            
+        if monitoring and hasattr(monitoring, 'record_metric'):
+            monitoring.record_metric(f"platform_manager.platform_{spec.name}_load_ms",
+                                     self.platform_load_times.get(spec.name, 0.0))
+        return self.platforms.get(spec.name)
+        
+    async def preload_platforms(self, platform_names: Optional[List[str]] = None) -> int:
+        """Importă în paralel platformele date (implicit toate cele încă neîncărcate)"""
+        if platform_names is None:
+            platform_names = list(self.platform_specs)
+        results = await asyncio.gather(
+            *(self.ensure_platform(name) for name in platform_names),
+            return_exceptions=True
+        )
+        loaded = sum(1 for result in results if isinstance(result, BasePlatform))
+        logger.info(f"🔥 Preloaded {loaded}/{len(platform_names)} platforms")
+        return loaded
+        
+    def _registered_count(self) -> int:
+        """Platformele încărcate plus cele înregistrate doar în manifest"""
+        return len(self.platforms) + len(self.platform_specs)
             
     def _find_platform_class(self, module) -> Optional[Type[BasePlatform]]:
         """Găsește clasa de platformă în modulul dat"""
@@ -214,18 +332,21 @@ class PlatformManager:
     async def _setup_rate_limiters(self):
         """Configurează rate limiters pentru fiecare platformă"""
         for platform_name, platform in self.platforms.items():
-            # Obține configurarea rate limit pentru platformă
-            rate_limit = getattr(platform, 'rate_limit_delay', 1.0)
-            max_burst = getattr(platform, 'rate_limit_per_minute', 10)
-            
-            # Creează rate limiter
-            self.rate_limiters[platform_name] = RateLimiter(
-                max_requests=max_burst,
-                time_window=60.0,
-                burst_allowance=3
-            )
-            
-            logger.debug(f"🔒 Set up rate limiter for {platform_name}: {max_burst}/min")
+            self._setup_rate_limiter(platform_name, platform)
+            
+    def _setup_rate_limiter(self, platform_name: str, platform: BasePlatform):
+        """Configurează rate limiter-ul unei platforme"""
+        # Obține configurarea rate limit pentru platformă
+        max_burst = getattr(platform, 'rate_limit_per_minute', 10)
+        
+        # Creează rate limiter
+        self.rate_limiters[platform_name] = RateLimiter(
+            max_requests=max_burst,
+            time_window=60.0,
+            burst_allowance=3
+        )
+        
+        logger.debug(f"🔒 Set up rate limiter for {platform_name}: {max_burst}/min")
             
     async def _start_background_tasks(self):
         """Pornește task-urile de background pentru mentenanță"""
@@ -307,32 +428,28 @@ class PlatformManager:
         if not url or not isinstance(url, str):
             return None
             
-        # Check cache first
-        cache_key = generate_cache_key("platform_url", url)
-        cached_platform = cache.get(cache_key)
-        if cached_platform and cached_platform in self.platforms:
-            return self.platforms[cached_platform]
-            
-        # Sortează platformele după prioritate
-        sorted_platforms = sorted(
-            self.platforms.items(),
-            key=lambda x: self.platform_priorities.get(x[0], 999)
-        )
-        
-        logger.debug(f"🔍 Available platforms: {list(self.platforms.keys())}")
-        logger.debug(f"🔍 Testing URL: {url}")
+        # Rutare după domeniu (o singură parsare a URL-ului, fără probarea fiecărei platforme)
+        candidates = [name for name in platform_router.candidates(url)
+                      if name in self.platforms or name in self.platform_specs]
+        if not candidates:
+            # Platformele neînregistrate în router (fără supported_domains) sunt verificate individual
+            candidates = sorted(
+                (name for name in self.platforms if not platform_router.has_platform(name)),
+                key=lambda name: self.platform_priorities.get(name, 999)
+            )
         
-        # Testează fiecare platformă
-        for platform_name, platform in sorted_platforms:
+        for platform_name in candidates:
+            # Prima potrivire pe domeniu importă platforma (o singură dată)
+            platform = await self.ensure_platform(platform_name)
+            if platform is None:
+                continue
             try:
-                logger.debug(f"🔍 Testing platform {platform_name} for URL: {url}")
-                supports = await platform.supports_url(url)
+                supports = platform.supports_url(url)
+                if inspect.isawaitable(supports):
+                    supports = await supports
                 logger.debug(f"🔍 Platform {platform_name} supports URL: {supports}")
                 
                 if supports:
-                    # Cache rezultatul pentru 30 minute
-                    cache.put(cache_key, platform_name, ttl=1800)
-                    
                     logger.debug(f"🎯 Found platform {platform_name} for URL: {url[:50]}...")
                     
                     if monitoring and hasattr(monitoring, 'record_metric'):
@@ -443,13 +560,30 @@ class PlatformManager:
         else:
             video_info = video_info_or_url
             url = video_info.webpage_url if hasattr(video_info, 'webpage_url') else ""
+            
+        # Cererile simultane pentru același video (și aceeași destinație) împart o singură descărcare
+        return_result = isinstance(video_info_or_url, str)
+        if isinstance(url, str) and url:
+            flight_key = (canonical_url_key(url), output_path, quality, return_result)
+        else:
+            flight_key = (id(video_info), output_path, quality, return_result)
+        result, shared = await self.download_flights.do(
+            flight_key, self._download_resolved, video_info, output_path, quality, return_result
+        )
+        if shared:
+            logger.info(f"🔗 Download deduplicat pentru {url or getattr(video_info, 'platform', 'unknown')}")
+        return result
+        
+    async def _download_resolved(self, video_info: VideoInfo, output_path: Optional[str],
+                                 quality: Optional[str], return_result: bool):
+        """Descarcă un video deja extras (executat o singură dată per cheie în curs)"""
         async with self.download_semaphore:
             start_time = time.time()
             
             try:
                 # Găsește platforma pentru acest video
                 platform_name = video_info.platform
-                platform = self.platforms.get(platform_name)
+                platform = await self.ensure_platform(platform_name)
                 
                 if not platform:
                     from platforms.base import DownloadResult
@@ -482,7 +616,7 @@ class PlatformManager:
                     monitoring.record_metric(f"platform_manager.{platform_name}_download_success", 1)
                 
                 # Pentru compatibilitate cu testele, returnează DownloadResult dacă e cerut URL
-                if isinstance(video_info_or_url, str):
+                if return_result:
                     from platforms.base import DownloadResult
                     return DownloadResult(
                         success=True,
@@ -505,7 +639,7 @@ class PlatformManager:
                     monitoring.record_error("platform_manager", "download_failed", str(e))
                 
                 # Pentru compatibilitate cu testele, returnează DownloadResult în loc de excepție
-                if isinstance(video_info_or_url, str):
+                if return_result:
                     from platforms.base import DownloadResult
                     return DownloadResult(
                         success=False,
@@ -543,8 +677,8 @@ class PlatformManager:
         platform_stats['avg_response_time'] = (current_avg + response_time) / 2
         
     def get_supported_platforms(self) -> List[str]:
-        """Returnează lista platformelor suportate"""
-        return list(self.platforms.keys())
+        """Returnează lista platformelor suportate (încărcate sau înregistrate din manifest)"""
+        return list(self.platforms.keys()) + [name for name in self.platform_specs if name not in self.platforms]
         
     def get_platform_info(self, platform_name: str) -> Optional[Dict[str, Any]]:
         """Returnează informații despre o platformă specifică"""
@@ -577,6 +711,9 @@ class PlatformManager:
         """Returnează statisticile complete ale manager-ului"""
         return {
             'platforms_loaded': len(self.platforms),
+            'platforms_registered': self._registered_count(),
+            'platforms_failed': dict(self.failed_platforms),
+            'platform_load_ms': dict(self.platform_load_times),
             'total_requests': self.stats['total_requests'],
             'successful_extractions': self.stats['successful_extractions'],
             'successful_downloads': self.stats['successful_downloads'],
@@ -586,6 +723,7 @@ class PlatformManager:
             'last_cleanup': self.stats['last_cleanup'].isoformat() if self.stats['last_cleanup'] else None,
             'background_tasks_running': len([t for t in self.background_tasks if not t.done()]),
             'cache_size': len(self.url_cache),
+            'download_dedup': self.download_flights.get_stats(),
             'initialized': self._initialized
         }
         
@@ -665,8 +803,8 @@ class PlatformManager:
         
     # Metode pentru compatibilitate cu testele
     def get_supported_platforms(self) -> List[str]:
-        """Returnează lista platformelor suportate"""
-        return list(self.platforms.keys())
+        """Returnează lista platformelor suportate (încărcate sau înregistrate din manifest)"""
+        return list(self.platforms.keys()) + [name for name in self.platform_specs if name not in self.platforms]
         
     def _cache_metadata(self, url: str, metadata: Dict[str, Any]):
         """Salvează metadata în cache"""
@@ -30,6 +30,8 @@ except ImportError:
         PlatformError, UnsupportedURLError
     )
 
+from utils.platform_router import platform_router
+
 logger = logging.getLogger(__name__)
 
 class LoadBalancingStrategy(Enum):
@@ -331,6 +333,7 @@ class PlatformRegistry:
         for platform_name, platform in self.platforms.items():
             for domain in platform.supported_domains:
                 self.domain_map[domain].add(platform_name)
+            platform_router.register(platform_name, platform.supported_domains, platform.priority)
         
         logger.info(f"🌐 Built domain mappings for {len(self.domain_map)} domains")
     
@@ -362,9 +365,11 @@ class PlatformRegistry:
         
         self.stats['cache_misses'] += 1
         
-        # Găsește platforma care suportă URL-ul
-        for platform_name, platform in self.platforms.items():
-            if (self.platform_status.get(platform_name) == PlatformStatus.HEALTHY and
+        # Doar platformele care revendică domeniul URL-ului (index partajat, O(1))
+        for platform_name in platform_router.candidates(url):
+            platform = self.platforms.get(platform_name)
+            if (platform is not None and
+                self.platform_status.get(platform_name) == PlatformStatus.HEALTHY and
                 platform.enabled and
                 platform.supports_url(url)):
                 
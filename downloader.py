@@ -2,7 +2,6 @@ import yt_dlp
 import os
 import tempfile
 import time
-import glob
 import re
 import unicodedata
 import random
@@ -19,6 +18,11 @@ from utils.common.validators import (
     ContentValidator,
     SecurityValidator
 )
+from utils.download.format_planner import format_planner
+from utils.singleflight import SingleFlight, canonical_url_key
+from utils.download.download_executor import download_executor, check_cancelled, current_job, DownloadCancelled, WORKER_PROCESS_ENV
+from utils.download.segmented_downloader import segmented_downloader
+from utils.platform_router import platform_router
 # Anti-bot detection functions removed - using built-in alternatives
 # Production config functions - using built-in alternatives
 def get_proxy_for_platform(platform):
@@ -41,8 +45,9 @@ def validate_url_security(url):
 def get_production_ydl_opts_enhancement():
     return {}
 
-def log_production_metrics(platform, success, duration, file_size):
-    logger.info(f"📊 {platform}: {'✅' if success else '❌'} {duration:.1f}s {file_size/(1024*1024):.1f}MB")
+def log_production_metrics(platform, success, duration, file_size, extractor_calls=None):
+    extractor_info = f" 🔎 {extractor_calls} extractări" if extractor_calls is not None else ""
+    logger.info(f"📊 {platform}: {'✅' if success else '❌'} {duration:.1f}s {file_size/(1024*1024):.1f}MB{extractor_info}")
 # Render optimized config - using built-in alternatives
 def get_render_ytdl_opts(platform):
     return {
@@ -150,9 +155,9 @@ def upgrade_to_nightly_ytdlp():
         logger.error(f"Eroare la upgrade yt-dlp: {e}")
         return False
 
-# Încercare upgrade la nightly la startup (doar o dată)
+# Încercare upgrade la nightly la startup (doar o dată; nu și în procesele worker de descărcare)
 try:
-    if not hasattr(upgrade_to_nightly_ytdlp, '_executed'):
+    if not hasattr(upgrade_to_nightly_ytdlp, '_executed') and not os.getenv(WORKER_PROCESS_ENV):
         upgrade_to_nightly_ytdlp()
         upgrade_to_nightly_ytdlp._executed = True
 except Exception as e:
@@ -375,15 +380,88 @@ def validate_and_create_temp_dir():
         logger.error(f"❌ Eroare la crearea directorului temporar: {e}")
         # Fallback securizat
         try:
-            fallback_dir = os.path.join(tempfile.gettempdir(), 'secure_fallback_downloads')
-            os.makedirs(fallback_dir, exist_ok=True)
-            os.chmod(fallback_dir, 0o700)
+            fallback_base = os.path.join(tempfile.gettempdir(), 'secure_fallback_downloads')
+            os.makedirs(fallback_base, exist_ok=True)
+            os.chmod(fallback_base, 0o700)
+            # Fiecare job primește propriul subdirector și în modul fallback
+            fallback_dir = tempfile.mkdtemp(prefix="job_", dir=fallback_base)
             logger.warning(f"Folosesc directorul fallback securizat: {fallback_dir}")
             return fallback_dir
         except Exception as e:
             raise SecurityError(f"Nu s-a putut crea un director temporar sigur: {e}")
 
 
+def create_job_temp_dir():
+    """
+    Creează un director de lucru dedicat unui singur job de descărcare.
+    Fiecare descărcare scrie doar în propriul director, astfel încât mai multe
+    descărcări pot rula în paralel fără să își preia fișierele una alteia.
+    """
+    if is_render_environment():
+        base_dir = get_render_temp_dir()
+        os.makedirs(base_dir, exist_ok=True)
+        job_dir = tempfile.mkdtemp(prefix="job_", dir=base_dir)
+        logger.info(f"🏭 Director de job Render creat: {job_dir}")
+        return job_dir
+    return validate_and_create_temp_dir()
+
+
+def cleanup_job_temp_dir(temp_dir):
+    """Șterge directorul de lucru al unui job (ignoră erorile)"""
+    if temp_dir and os.path.isdir(temp_dir):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def attach_output_path_hook(ydl_opts):
+    """
+    Adaugă un post-hook yt-dlp care reține calea exactă a fișierului final
+    (după post-procesare). Returnează lista în care sunt colectate căile.
+    """
+    output_paths = []
+    ydl_opts['post_hooks'] = list(ydl_opts.get('post_hooks') or []) + [output_paths.append]
+    return output_paths
+
+
+def get_downloaded_file_path(output_paths, info=None):
+    """
+    Returnează calea fișierului descărcat raportată de yt-dlp, fără scanarea
+    directorului: post-hook-uri, apoi requested_downloads/filepath din info.
+    """
+    candidates = list(reversed(output_paths or []))
+    if info:
+        for requested in reversed(info.get('requested_downloads') or []):
+            candidates.append(requested.get('filepath'))
+        candidates.append(info.get('filepath'))
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def count_extractor_invocations(ydl):
+    """
+    Numără apelurile extractorului pe o instanță YoutubeDL (inclusiv cele
+    interne, pentru rezultate de tip 'url'). Returnează un dict actualizat live.
+    """
+    counter = {'calls': 0}
+    extract_info = ydl.extract_info
+
+    def counted_extract_info(*args, **kwargs):
+        counter['calls'] += 1
+        return extract_info(*args, **kwargs)
+
+    ydl.extract_info = counted_extract_info
+    return counter
+
+
+def download_extracted_info(ydl, info):
+    """
+    Descarcă pornind de la info dict-ul deja extras, fără o nouă extracție a
+    paginii (ydl.download([url]) ar reapela extractorul platformei).
+    """
+    return ydl.process_ie_result(info, download=True) or info
+
+
 class SecurityError(Exception):
     """Excepție pentru probleme de securitate"""
     pass
@@ -607,31 +685,13 @@ ENHANCED_PLATFORM_CONFIGS = {
 }
 
 def get_platform_from_url(url):
-    """Determină platforma din URL"""
-    url_lower = url.lower()
-    
-    if any(domain in url_lower for domain in ['tiktok.com', 'vm.tiktok.com']):
-        return 'tiktok'
-    elif 'instagram.com' in url_lower:
-        return 'instagram'
-    elif any(domain in url_lower for domain in ['reddit.com', 'redd.it', 'v.redd.it']):
-        return 'reddit'
-    elif any(domain in url_lower for domain in ['facebook.com', 'fb.watch', 'fb.me']):
-        return 'facebook'
-    elif any(domain in url_lower for domain in ['twitter.com', 'x.com']):
-        return 'twitter'
-    elif 'vimeo.com' in url_lower:
-        return 'vimeo'
-    elif any(domain in url_lower for domain in ['dailymotion.com', 'dai.ly']):
-        return 'dailymotion'
-    elif any(domain in url_lower for domain in ['pinterest.com', 'pin.it']):
-        return 'pinterest'
-    elif 'threads.net' in url_lower:
-        return 'threads'
-    elif any(domain in url_lower for domain in ['soundcloud.com', 'snd.sc']):
-        return 'soundcloud'
-    
-    return 'generic'
+    """Determină platforma din URL prin indexul de domenii partajat (o singură parsare)"""
+    platform = platform_router.route(url)
+    if platform is None and url and len(url.split()) > 1:
+        # Textul unui mesaj, nu un URL simplu: caută primul link cunoscut
+        match = platform_router.find_in_text(url)
+        platform = match[0] if match else None
+    return platform or 'unknown'
 
 def create_enhanced_ydl_opts(url, temp_dir):
     """Creează opțiuni yt-dlp îmbunătățite cu anti-bot detection și configurații de producție"""
@@ -770,8 +830,12 @@ def download_with_enhanced_retry(url, temp_dir, max_attempts=3):
                 logger.info(f"⏱️ Așteptare {delay}s înainte de încercarea {attempt + 1}...")
                 time.sleep(delay)
             
+            output_paths = attach_output_path_hook(ydl_opts)
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extrage informații
+                extractor_calls = count_extractor_invocations(ydl)
+                
+                # Extrage informații (o singură dată per URL)
                 info = ydl.extract_info(url, download=False)
                 if not info:
                     raise Exception("Nu s-au putut extrage informațiile video")
@@ -780,19 +844,14 @@ def download_with_enhanced_retry(url, temp_dir, max_attempts=3):
                 if info.get('is_live'):
                     raise Exception("Live stream-urile nu sunt suportate")
                 
-                # Descarcă videoclipul
-                ydl.download([url])
+                # Descarcă videoclipul din informațiile deja extrase
+                info = download_extracted_info(ydl, info)
                 
-                # Găsește fișierul descărcat
-                downloaded_files = []
-                for file in os.listdir(temp_dir):
-                    if file.endswith(('.mp4', '.mkv', '.webm', '.avi', '.mov', '.flv', '.3gp')):
-                        downloaded_files.append(os.path.join(temp_dir, file))
-                
-                if not downloaded_files:
+                # Calea exactă a fișierului, raportată de yt-dlp
+                video_file = get_downloaded_file_path(output_paths, info)
+                if not video_file:
                     raise Exception("Nu s-a găsit fișierul video descărcat")
                 
-                video_file = downloaded_files[0]
                 file_size = os.path.getsize(video_file)
                 
                 # Calculează durata descărcării
@@ -801,7 +860,8 @@ def download_with_enhanced_retry(url, temp_dir, max_attempts=3):
                 logger.info(f"✅ Descărcare reușită pentru {platform} la încercarea {attempt + 1}")
                 # Log pentru producție
                 if 'log_production_metrics' in globals():
-                    log_production_metrics(platform, True, download_duration, file_size)
+                    log_production_metrics(platform, True, download_duration, file_size,
+                                           extractor_calls=extractor_calls['calls'])
                 
                 return {
                     'success': True,
@@ -1272,40 +1332,21 @@ def try_facebook_fallback(url, output_path, title):
         fallback_opts.update(config)
     
         try:
-            # Încearcă să obțină informații despre video mai întâi
-            info_opts = fallback_opts.copy()
-            info_opts['skip_download'] = True
-            
-            video_info = None
-            try:
-                with yt_dlp.YoutubeDL(info_opts) as ydl_info:
-                    video_info = ydl_info.extract_info(url, download=False)
-                    logger.info(f"Facebook video info extracted: {video_info.get('title', 'N/A')[:50]}...")
-            except Exception as info_error:
-                logger.warning(f"Nu s-au putut extrage informațiile video Facebook: {str(info_error)}")
-                if i == len(fallback_configs) - 1:  # Ultima configurație
-                    continue
-            
-            # Încearcă descărcarea efectivă
+            output_paths = attach_output_path_hook(fallback_opts)
             with yt_dlp.YoutubeDL(fallback_opts) as ydl:
-                logger.info(f"Începe descărcarea Facebook cu configurația {i+1}...")
-                ydl.download([url])
-                
-                # Găsește fișierul descărcat cu verificări îmbunătățite
-                temp_dir = os.path.dirname(output_path)
-                logger.info(f"Căutare fișiere în: {temp_dir}")
+                # Extrage informațiile o singură dată și descarcă din ele
+                video_info = ydl.extract_info(url, download=False)
+                if video_info:
+                    logger.info(f"Facebook video info extracted: {(video_info.get('title') or 'N/A')[:50]}...")
                 
-                # Caută toate fișierele din directorul temporar
-                all_files = glob.glob(os.path.join(temp_dir, "*"))
-                downloaded_files = [f for f in all_files if os.path.isfile(f) and not f.endswith('.part')]
+                logger.info(f"Începe descărcarea Facebook cu configurația {i+1}...")
+                video_info = download_extracted_info(ydl, video_info) if video_info else None
                 
-                logger.info(f"Fișiere găsite: {len(downloaded_files)}")
-                for file in downloaded_files:
-                    logger.info(f"Fișier: {os.path.basename(file)} ({os.path.getsize(file)} bytes)")
+                # Calea exactă a fișierului, raportată de yt-dlp
+                downloaded_file = get_downloaded_file_path(output_paths, video_info)
                 
-                if downloaded_files:
-                    # Ia cel mai mare fișier (probabil videoul)
-                    downloaded_file = max(downloaded_files, key=os.path.getsize)
+                if downloaded_file:
+                    logger.info(f"Fișier descărcat: {os.path.basename(downloaded_file)} ({os.path.getsize(downloaded_file)} bytes)")
                     file_size = os.path.getsize(downloaded_file)
                     
                     # Verifică că fișierul nu este prea mic (probabil corupt)
@@ -1330,7 +1371,7 @@ def try_facebook_fallback(url, output_path, title):
                         'file_size': file_size
                     }
                 else:
-                    logger.error("Nu s-au găsit fișiere descărcate în directorul temporar")
+                    logger.error("yt-dlp nu a raportat niciun fișier descărcat")
                     if i < len(fallback_configs) - 1:  # Nu e ultima configurație
                         continue
                     return {
@@ -1496,12 +1537,13 @@ def download_video(url, output_path=None):
     Returnează un dicționar cu rezultatul
     """
     logger.info(f"=== RENDER OPTIMIZED DOWNLOAD START === URL: {url}")
+    temp_dir = None
     
     try:
         # Verifică dacă rulează în mediul Render și aplică configurații specifice
         if is_render_environment():
             logger.info("🚀 Mediu Render detectat - aplicând configurații optimizate")
-            cleanup_render_temp_files()  # Curăță fișierele vechi
+            cleanup_render_temp_files(get_render_temp_dir())  # Curăță fișierele vechi
         
         # Validează URL-ul înainte de procesare
         logger.info(f"=== RENDER OPTIMIZED Validating URL ===")
@@ -1514,21 +1556,16 @@ def download_video(url, output_path=None):
                 'title': 'N/A'
             }
     
-        # Creează directorul temporar optimizat pentru Render
-        if is_render_environment():
-            temp_dir = get_render_temp_dir()
-            os.makedirs(temp_dir, exist_ok=True)
-            logger.info(f"🏭 Folosind directorul Render: {temp_dir}")
-        else:
-            temp_dir = validate_and_create_temp_dir()
-            if not temp_dir:
-                return {
-                    'success': False,
-                    'error': '❌ Nu s-a putut crea directorul temporar',
-                    'title': 'N/A'
-                }
+        # Creează un director de lucru dedicat acestui job (izolat de alte descărcări)
+        temp_dir = create_job_temp_dir()
+        if not temp_dir:
+            return {
+                'success': False,
+                'error': '❌ Nu s-a putut crea directorul temporar',
+                'title': 'N/A'
+            }
     
-        logger.info(f"=== RENDER OPTIMIZED Temp dir ready: {temp_dir} ===")
+        logger.info(f"=== RENDER OPTIMIZED Job dir ready: {temp_dir} ===")
         
         # Verifică dacă este un URL TikTok și folosește metoda alternativă direct
         platform = get_platform_from_url(url)
@@ -1538,6 +1575,13 @@ def download_video(url, output_path=None):
                 result = download_tiktok_alternative(url, temp_dir)
                 if result['success']:
                     logger.info(f"✅ TikTok descărcat cu succes prin metoda alternativă directă")
+                    # Directorul job-ului este șters după trimitere, ca pe calea standard
+                    file_path = result.get('file_path')
+                    result.update({
+                        'file_size': os.path.getsize(file_path) if file_path and os.path.exists(file_path) else 0,
+                        'platform': result.get('platform', platform),
+                        'job_dir': temp_dir
+                    })
                     return result
                 logger.warning(f"❌ Metoda alternativă directă pentru TikTok a eșuat: {result['error']}")
                 # Dacă metoda alternativă eșuează, vom încerca metoda standard
@@ -1547,157 +1591,55 @@ def download_video(url, output_path=None):
     
         # Folosește strategia îmbunătățită de descărcare cu configurații Render
         result = download_with_render_optimization(url, temp_dir, max_attempts=3)
-                    title = f"TikTok de la {uploader}"
-            
-            # Curăță titlul de caractere speciale problematice și emoticoane
-            title = clean_title(title)
-            if not title or title == 'video':
-                title = f"Video de pe {url.split('/')[2] if '/' in url else 'platformă necunoscută'}"
-            
-            # Verifică dacă videoul nu este prea lung (limită redusă pentru Render free tier)
-            max_duration = 1800  # 30 minute pentru Render free tier
-            if duration and duration > max_duration:
-                duration_minutes = int(duration // 60)
-                max_minutes = int(max_duration // 60)
-                return {
-                    'success': False,
-                    'error': f'❌ Videoul este prea lung ({duration_minutes} minute). Limita pentru Render free tier este {max_minutes} minute.\n\n💡 Încearcă un videoclip mai scurt.',
-                    'title': title
-                }
-            
-            # Afișează informații despre video înainte de descărcare
-            if duration:
-                duration_str = f"{int(duration // 60)}:{int(duration % 60):02d}"
-                logger.info(f"Video info: {title[:50]}... | Durată: {duration_str} | Creator: {uploader or 'N/A'}")
-            else:
-                logger.info(f"Video info: {title[:50]}... | Creator: {uploader or 'N/A'}")
-            
-            # Descarcă videoul
-            try:
-                logger.info("Încep descărcarea video-ului...")
-                ydl.download([url])
-                logger.info("Descărcare completă!")
-            except Exception as download_error:
-                logger.error(f"Eroare la descărcare: {download_error}")
-                error_str = str(download_error).lower()
-                # YouTube este dezactivat - returnează eroare
-                if ('youtube.com' in url.lower() or 'youtu.be' in url.lower()):
-                    return {
-                        'success': False,
-                        'error': '❌ YouTube nu este suportat momentan. Te rog să folosești alte platforme: Facebook, Instagram, TikTok, Twitter, etc.',
-                        'title': title
-                    }
-                # Încearcă cu opțiuni alternative pentru Facebook
-                elif 'facebook.com' in url.lower() or 'fb.watch' in url.lower():
-                    error_str = str(download_error).lower()
-                    if 'cannot parse data' in error_str:
-                        logger.warning(f"Facebook parsing error în download_video pentru URL: {url}")
-                        return {
-                            'success': False,
-                            'error': '❌ Facebook: Acest link nu poate fi procesat momentan din cauza schimbărilor recente ale Facebook. Te rog să încerci alt link sau să contactezi adminul.',
-                            'title': title
-                        }
-                    elif 'unsupported url' in error_str:
-                        logger.warning(f"Facebook URL nesuportat în download_video: {url}")
-                        return {
-                            'success': False,
-                            'error': '❌ Facebook: Formatul acestui link nu este suportat. Te rog să încerci un link direct către video.',
-                            'title': title
-                        }
-                    else:
-                        return try_facebook_fallback(url, output_path, title)
-                else:
-                    raise download_error
-            
-            # Pentru YouTube, fișierele au fost deja găsite în bucla de încercări
-            # Pentru alte platforme, găsește fișierul descărcat în directorul temporar
-            downloaded_files = []
-            if not ('youtube.com' in url.lower() or 'youtu.be' in url.lower()):
-                downloaded_files = glob.glob(os.path.join(temp_dir, "*"))
-                downloaded_files = [f for f in downloaded_files if os.path.isfile(f)]
-            
-            if not downloaded_files:
-                return {
-                    'success': False,
-                    'error': 'Fișierul nu a fost găsit după descărcare',
-                    'title': title
-                }
-            
-            # Ia primul fișier găsit (ar trebui să fie singurul)
-            downloaded_file = downloaded_files[0]
-            
-            # Verifică dimensiunea fișierului cu redownload automat la calitate mai mică
-            file_size = os.path.getsize(downloaded_file)
-            max_size = 50 * 1024 * 1024  # 50MB pentru Telegram (limită agresivă pentru Render)
-            
-            if file_size > max_size:
-                size_mb = file_size / (1024*1024)
-                logger.warning(f"Fișier prea mare: {size_mb:.1f}MB, încerc redownload cu calitate mai mică")
-                
-                # Șterge fișierul prea mare
-                os.remove(downloaded_file)
-                
-                # Încearcă redownload cu calități progresiv mai mici
-                quality_fallbacks = [
-                    'best[filesize<30M][height<=360]/best[height<=360]/best[filesize<30M]',
-                    'best[filesize<20M][height<=240]/best[height<=240]/best[filesize<20M]',
-                    'worst[filesize<15M]/worst'
-                ]
-                
-                for i, quality_format in enumerate(quality_fallbacks):
-                    try:
-                        logger.info(f"Redownload încercarea {i+1} cu format: {quality_format}")
-                        
-                        # Actualizează configurația cu calitatea mai mică
-                        retry_opts = ydl_opts.copy()
-                        retry_opts['format'] = quality_format
-                        
-                        with yt_dlp.YoutubeDL(retry_opts) as ydl_retry:
-                            ydl_retry.download([url])
-                        
-                        # Verifică din nou fișierele descărcate
-                        downloaded_files = glob.glob(os.path.join(temp_dir, "*"))
-                        downloaded_files = [f for f in downloaded_files if os.path.isfile(f) and not f.endswith('.part')]
-                        
-                        if downloaded_files:
-                            downloaded_file = max(downloaded_files, key=os.path.getsize)
-                            new_file_size = os.path.getsize(downloaded_file)
-                            
-                            if new_file_size <= max_size:
-                                logger.info(f"Redownload reușit: {new_file_size / (1024*1024):.1f}MB")
-                                file_size = new_file_size
-                                break
-                            else:
-                                # Încă prea mare, șterge și încearcă următoarea calitate
-                                os.remove(downloaded_file)
-                                continue
-                        
-                    except Exception as retry_error:
-                        logger.warning(f"Redownload încercarea {i+1} eșuată: {retry_error}")
-                        continue
-                
-                else:
-                    # Toate încercările au eșuat
-                    return {
-                        'success': False,
-                        'error': f'❌ Videoclipul este prea mare ({size_mb:.1f}MB) chiar și la calitate redusă. Limita pentru Telegram este 50MB.',
-                        'title': title
-                    }
-            
-            logger.info(f"=== DOWNLOAD_VIDEO SUCCESS === File: {downloaded_file}")
+        if not result.get('success') and platform == 'facebook' and not result.get('rejected_before_download'):
+            # Încearcă configurațiile alternative Facebook în același director de job
+            # (nu și pentru un video respins deja de planificator ca prea mare)
+            result = try_facebook_fallback(url, os.path.join(temp_dir, '%(title)s.%(ext)s'), None)
+        if not result.get('success'):
+            cleanup_job_temp_dir(temp_dir)
+            return result
+        
+        downloaded_file = result['file_path']
+        title = result.get('title')
+        
+        # Curăță titlul de caractere speciale problematice și emoticoane
+        title = clean_title(title)
+        if not title or title == 'video':
+            title = f"Video de pe {url.split('/')[2] if '/' in url else 'platformă necunoscută'}"
+        
+        # Formatul a fost ales din metadata înainte de descărcare; aici doar
+        # confirmăm dimensiunea reală (fără redownload la calitate mai mică)
+        file_size = os.path.getsize(downloaded_file)
+        max_size = 50 * 1024 * 1024  # 50MB pentru Telegram
+        
+        if file_size > max_size:
+            size_mb = file_size / (1024*1024)
+            logger.warning(f"Fișier prea mare după descărcare: {size_mb:.1f}MB (estimarea formatului a fost depășită)")
+            cleanup_job_temp_dir(temp_dir)
             return {
-                 'success': True,
-                 'file_path': downloaded_file,
-                 'title': title,
-                 'description': description,
-                 'uploader': uploader,
-                 'duration': duration,
-                 'file_size': file_size
-             }
+                'success': False,
+                'error': f'❌ Videoclipul este prea mare ({size_mb:.1f}MB). Limita pentru Telegram este 50MB.',
+                'title': title
+            }
+        
+        logger.info(f"=== DOWNLOAD_VIDEO SUCCESS === File: {downloaded_file}")
+        result.update({
+            'file_path': downloaded_file,
+            'title': title,
+            'file_size': file_size,
+            'platform': result.get('platform', platform),
+            'job_dir': temp_dir
+        })
+        return result
 
     
+    except DownloadCancelled:
+        logger.info(f"🛑 Descărcare anulată: {url}")
+        cleanup_job_temp_dir(temp_dir)
+        raise
     except yt_dlp.DownloadError as e:
         logger.error(f"=== DOWNLOAD_VIDEO DownloadError === {str(e)}")
+        cleanup_job_temp_dir(temp_dir)
         error_msg = str(e).lower()
         
         if 'private' in error_msg or 'login' in error_msg:
@@ -1726,6 +1668,7 @@ def download_video(url, output_path=None):
             }
     except Exception as e:
         logger.error(f"=== ENHANCED DOWNLOAD_VIDEO Exception === {str(e)}")
+        cleanup_job_temp_dir(temp_dir)
         import traceback
         logger.error(f"=== ENHANCED DOWNLOAD_VIDEO Traceback === {traceback.format_exc()}")
         return {
@@ -1735,10 +1678,67 @@ def download_video(url, output_path=None):
         }
     
     finally:
-        # Nu șterge temp_dir aici - va fi șters după trimiterea fișierului
+        # Nu șterge directorul job-ului aici la succes - va fi șters după trimiterea fișierului
         pass
 
 
+def _release_download_result(result):
+    """Șterge directorul job-ului după ce toți cei care au primit rezultatul l-au folosit"""
+    if result and result.get('success'):
+        cleanup_job_temp_dir(result.get('job_dir'))
+
+
+# Registrul descărcărilor în curs: link-uri identice trimise simultan sunt descărcate o singură dată
+download_flights = SingleFlight(name='downloads', on_release=_release_download_result)
+
+# De câte ori reia un apelant descărcarea partajată anulată de lider
+ABANDONED_FLIGHT_RETRIES = 2
+
+
+def acquire_download(url):
+    """
+    Descarcă un video sau se alătură descărcării în curs pentru același URL canonic.
+
+    Un apelant care s-a alăturat unei descărcări oprite de liderul ei (anulată
+    de alt utilizator înainte ca alăturarea să fie vizibilă) nu primește
+    DownloadCancelled: descărcarea este reluată pentru el.
+
+    Returns:
+        FlightLease cu rezultatul download_video în .result; apelantul trebuie
+        să apeleze release() după trimitere (directorul job-ului este șters la
+        ultimul release, nu de fiecare apelant)
+    """
+    flight_key = canonical_url_key(url)
+    for attempt in range(ABANDONED_FLIGHT_RETRIES + 1):
+        try:
+            return download_flights.acquire(flight_key, _run_download, url)
+        except DownloadCancelled:
+            job = current_job()
+            if (job is not None and job.cancelled) or attempt == ABANDONED_FLIGHT_RETRIES:
+                raise
+            logger.info(f"🔁 Descărcarea partajată pentru {flight_key} a fost anulată de alt utilizator, o reiau")
+
+
+def _run_download(url):
+    """download_video într-un proces worker yt-dlp încălzit (dacă este configurat), altfel în thread-ul curent"""
+    flight_key = canonical_url_key(url)
+    return download_executor.call_in_process(
+        download_video, url, abort=lambda: not download_flights.is_shared(flight_key)
+    )
+
+
+def raise_if_abandoned(flight_key):
+    """Oprește o descărcare anulată, doar dacă niciun alt utilizator nu așteaptă rezultatul partajat"""
+    check_cancelled(lambda: not download_flights.is_shared(flight_key))
+
+
+def attach_cancel_hook(ydl_opts, flight_key):
+    """Adaugă un progress hook yt-dlp care oprește descărcarea anulată (vezi raise_if_abandoned)"""
+    ydl_opts['progress_hooks'] = list(ydl_opts.get('progress_hooks') or []) + [
+        lambda _progress: raise_if_abandoned(flight_key)
+    ]
+
+
 def download_with_render_optimization(url, temp_dir, max_attempts=3):
     """Descarcă cu optimizări specifice pentru mediul Render"""
     platform = get_platform_from_url(url)
@@ -1774,7 +1774,9 @@ def download_with_render_optimization(url, temp_dir, max_attempts=3):
     
     last_error = None
     
+    flight_key = canonical_url_key(url)
     for attempt in range(max_attempts):
+        raise_if_abandoned(flight_key)
         try:
             logger.info(f"🔄 Render încercare {attempt + 1}/{max_attempts} pentru {platform}...")
             
@@ -1804,8 +1806,13 @@ def download_with_render_optimization(url, temp_dir, max_attempts=3):
             # Înregistrează timpul de început
             start_time = time.time()
             
+            output_paths = attach_output_path_hook(ydl_opts)
+            attach_cancel_hook(ydl_opts, flight_key)
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extrage informații
+                extractor_calls = count_extractor_invocations(ydl)
+                
+                # Extrage informații (o singură dată per URL)
                 info = ydl.extract_info(url, download=False)
                 if not info:
                     raise Exception("Nu s-au putut extrage informațiile video")
@@ -1814,33 +1821,56 @@ def download_with_render_optimization(url, temp_dir, max_attempts=3):
                 if info.get('is_live'):
                     raise Exception("Live stream-urile nu sunt suportate")
                 
-                # Verifică dimensiunea fișierului pentru Render
-                filesize = info.get('filesize') or info.get('filesize_approx')
-                if filesize and filesize > RENDER_OPTIMIZED_CONFIG['security']['max_file_size']:
-                    raise Exception(f"Fișier prea mare pentru Render: {filesize / (1024*1024):.1f}MB")
+                # Alege formatul din metadata, înainte de descărcare (o singură trecere)
+                max_file_size = RENDER_OPTIMIZED_CONFIG['security']['max_file_size']
+                plan = format_planner.plan(info, max_file_size)
+                if plan.fits is False:
+                    estimated_mb = plan.estimated_bytes / (1024 * 1024)
+                    logger.warning(f"📏 Niciun format sub {max_file_size / (1024*1024):.0f}MB pentru {platform} "
+                                   f"(cel mai mic estimat: {estimated_mb:.1f}MB, sursa: {plan.estimate_source})")
+                    return {
+                        'success': False,
+                        'error': f'❌ Videoclipul este prea mare (~{estimated_mb:.1f}MB). Limita este 50MB.',
+                        'title': info.get('title', 'Video'),
+                        'render_optimized': True,
+                        'rejected_before_download': True,
+                        'attempt': attempt + 1
+                    }
                 
-                # Descarcă videoclipul
-                ydl.download([url])
+                if plan.format_id:
+                    format_spec = plan.format_spec(ydl.params.get('format') or 'best')
+                    ydl.params['format'] = format_spec
+                    ydl.format_selector = ydl.build_format_selector(format_spec)
+                    if '+' in plan.format_id:
+                        # Pereche DASH video+audio: rezultatul unit rămâne MP4 pentru Telegram
+                        ydl.params.setdefault('merge_output_format', 'mp4')
+                    estimated_mb = plan.estimated_bytes / (1024 * 1024)
+                    logger.info(f"📐 Format planificat {plan.format_id} ({plan.height or '?'}p, "
+                                f"~{estimated_mb:.1f}MB, sursa: {plan.estimate_source})")
                 
-                # Găsește fișierul descărcat
-                downloaded_files = []
-                for file in os.listdir(temp_dir):
-                    if file.endswith(tuple(RENDER_OPTIMIZED_CONFIG['security']['allowed_extensions'])):
-                        downloaded_files.append(os.path.join(temp_dir, file))
+                # Descarcă videoclipul din informațiile deja extrase
+                info = download_extracted_info(ydl, info)
                 
-                if not downloaded_files:
+                # Calea exactă a fișierului, raportată de yt-dlp (fără scanarea directorului)
+                video_file = get_downloaded_file_path(output_paths, info)
+                if not video_file:
                     raise Exception("Nu s-a găsit fișierul video descărcat")
                 
-                video_file = downloaded_files[0]
+                if not video_file.endswith(tuple(RENDER_OPTIMIZED_CONFIG['security']['allowed_extensions'])):
+                    raise Exception(f"Tip de fișier nepermis: {os.path.basename(video_file)}")
+                
                 file_size = os.path.getsize(video_file)
                 download_duration = time.time() - start_time
+                if file_size > max_file_size:
+                    format_planner.record_oversize_download()
                 
                 logger.info(f"✅ Render download reușit pentru {platform} la încercarea {attempt + 1}")
                 logger.info(f"📊 Render stats: {file_size / (1024*1024):.1f}MB în {download_duration:.1f}s")
                 
                 # Log pentru producție
                 if 'log_production_metrics' in globals():
-                    log_production_metrics(platform, True, download_duration, file_size)
+                    log_production_metrics(platform, True, download_duration, file_size,
+                                           extractor_calls=extractor_calls['calls'])
                 
                 return {
                     'success': True,
@@ -1855,6 +1885,8 @@ def download_with_render_optimization(url, temp_dir, max_attempts=3):
                     'attempt': attempt + 1
                 }
                 
+        except DownloadCancelled:
+            raise
         except Exception as e:
             last_error = str(e)
             error_msg = f"Render încercare {attempt + 1} eșuată pentru {platform}: {last_error[:100]}"
@@ -1863,14 +1895,9 @@ def download_with_render_optimization(url, temp_dir, max_attempts=3):
             # Log pentru eroare
             logger.debug(f"Render încercarea {attempt + 1} eșuată: {last_error[:100]}")
             
-            # Cleanup parțial în caz de eroare
+            # Cleanup parțial în caz de eroare (directorul aparține doar acestui job)
             if is_render_environment():
-                try:
-                    for file in os.listdir(temp_dir):
-                        if file.endswith('.part') or file.endswith('.tmp'):
-                            os.remove(os.path.join(temp_dir, file))
-                except Exception as e:
-                    logger.debug(f"Nu s-a putut șterge fișierele temporare în Render: {e}")
+                cleanup_render_temp_files(temp_dir)
             
             if attempt == max_attempts - 1:
                 break
@@ -2253,20 +2280,21 @@ def download_reddit_video(video_url, temp_dir, session=None, proxy=None):
         # Actualizează headers în sesiune
         session.headers.update(download_headers)
         
-        response = session.get(
-            video_url, 
-            stream=True, 
+        # Segmente paralele (Range) când v.redd.it le suportă, altfel flux unic;
+        # extensia depinde de Content-Type, cunoscut abia după prima cerere
+        timestamp = int(time.time())
+        partial_path = os.path.join(temp_dir, f"reddit_video_{timestamp}.part")
+        outcome = segmented_downloader.download_sync(
+            session,
+            video_url,
+            partial_path,
             timeout=30,
             proxies=proxy,
             verify=False
         )
         
-        # Accept both 200 (OK) and 206 (Partial Content) for video streaming
-        if response.status_code not in [200, 206]:
-            raise Exception(f"HTTP {response.status_code}: {response.reason}")
-        
         # Determină extensia fișierului
-        content_type = response.headers.get('content-type', '')
+        content_type = outcome.content_type
         if 'mp4' in content_type:
             ext = '.mp4'
         elif 'webm' in content_type:
@@ -2275,14 +2303,9 @@ def download_reddit_video(video_url, temp_dir, session=None, proxy=None):
             ext = '.mp4'  # default
         
         # Salvează fișierul
-        timestamp = int(time.time())
         filename = f"reddit_video_{timestamp}{ext}"
         file_path = os.path.join(temp_dir, filename)
-        
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+        os.replace(partial_path, file_path)
         
         file_size = os.path.getsize(file_path)
         logger.info(f"✅ Video Reddit descărcat cu succes: {file_path} ({file_size} bytes)")
@@ -2561,35 +2584,6 @@ def is_supported_url(url):
     
     return any(pattern in url_lower for pattern in supported_patterns)
 
-def get_platform_from_url(url):
-    """
-    Determină platforma din URL pentru configurații specifice
-    """
-    url_lower = url.lower()
-    
-    if any(pattern in url_lower for pattern in ['tiktok.com', 'vm.tiktok.com', 'vt.tiktok.com']):
-        return 'tiktok'
-    elif any(pattern in url_lower for pattern in ['instagram.com', 'instagr.am', 'ig.me']):
-        return 'instagram'
-    elif any(pattern in url_lower for pattern in ['facebook.com', 'fb.watch', 'm.facebook.com']):
-        return 'facebook'
-    elif any(pattern in url_lower for pattern in ['twitter.com', 'x.com', 't.co']):
-        return 'twitter'
-    elif 'threads.net' in url_lower:
-        return 'threads'
-    elif any(pattern in url_lower for pattern in ['pinterest.com', 'pin.it']):
-        return 'pinterest'
-    elif any(pattern in url_lower for pattern in ['reddit.com', 'redd.it']):
-        return 'reddit'
-    elif 'vimeo.com' in url_lower:
-        return 'vimeo'
-    elif any(pattern in url_lower for pattern in ['dailymotion.com', 'dai.ly']):
-        return 'dailymotion'
-    elif 'soundcloud.com' in url_lower:
-        return 'soundcloud'
-    else:
-        return 'unknown'
-
 def get_platform_specific_config(platform):
     """
     Returnează configurații specifice pentru fiecare platformă optimizate pentru Render
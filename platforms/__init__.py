@@ -17,7 +17,7 @@ Supported Platforms:
 - Dailymotion: Geo-restriction bypass, family filter, multiple qualities
 
 New Architecture Features:
-- Dynamic platform loading cu import automat
+- Lazy platform loading din manifest (import la primul URL al platformei)
 - Enhanced error handling cu recovery mechanisms
 - Advanced caching cu TTL și priority management
 - Rate limiting per platform cu burst allowance
@@ -49,90 +49,55 @@ except ImportError as e:
     class DownloadError(Exception): pass
     class GenericPlatform(BasePlatform): pass
 
-# Import platform classes - cu fallback pentru missing modules
-try:
-    from .youtube_new import YouTubePlatform
-except ImportError:
-    YouTubePlatform = None
-    
-try:
-    from .instagram import InstagramPlatform  
-except ImportError:
-    InstagramPlatform = None
-    
-try:
-    from .tiktok import TikTokPlatform
-except ImportError:
-    TikTokPlatform = None
-    
-try:
-    from .facebook import FacebookPlatform
-except ImportError:
-    FacebookPlatform = None
-    
-try:
-    from .twitter import TwitterPlatform
-except ImportError:
-    TwitterPlatform = None
-    
-try:
-    from .threads import ThreadsPlatform
-except ImportError:
-    ThreadsPlatform = None
-    
-try:
-    from .pinterest import PinterestPlatform
-except ImportError:
-    PinterestPlatform = None
-    
-try:
-    from .reddit import RedditPlatform
-except ImportError:
-    RedditPlatform = None
-    
-try:
-    from .vimeo import VimeoPlatform
-except ImportError:
-    VimeoPlatform = None
-    
-try:
-    from .dailymotion import DailymotionPlatform
-except ImportError:
-    DailymotionPlatform = None
+from .manifest import PLATFORM_MANIFEST, PLATFORM_SPECS, PLATFORM_PRIORITIES, PlatformSpec
 
 logger = logging.getLogger(__name__)
 
-# Registry cu toate platformele disponibile - versiunea 3.0.0
-PLATFORM_REGISTRY: Dict[str, Optional[Type[BasePlatform]]] = {
-    'youtube': YouTubePlatform,
-    'instagram': InstagramPlatform,
-    'tiktok': TikTokPlatform,
-    'facebook': FacebookPlatform,
-    'twitter': TwitterPlatform,
-    'threads': ThreadsPlatform,
-    'pinterest': PinterestPlatform,
-    'reddit': RedditPlatform,
-    'vimeo': VimeoPlatform,
-    'dailymotion': DailymotionPlatform,
-}
+# Clasele platformelor sunt importate leneș (PEP 562): `from platforms.base import ...`
+# nu mai trage după sine yt-dlp și toate modulele platformelor
+_CLASS_TO_PLATFORM: Dict[str, str] = {spec.class_name: spec.name for spec in PLATFORM_MANIFEST}
+
+# Registry cu clasele deja rezolvate - versiunea 3.0.0 (None = import eșuat)
+_loaded_classes: Dict[str, Optional[Type[BasePlatform]]] = {}
+
+
+def _load_platform_class(platform_name: str) -> Optional[Type[BasePlatform]]:
+    """Importă (o singură dată) clasa unei platforme din manifest"""
+    if platform_name in _loaded_classes:
+        return _loaded_classes[platform_name]
+    spec = PLATFORM_SPECS.get(platform_name)
+    if spec is None:
+        return None
+    try:
+        platform_class = spec.load_class()
+    except (ImportError, AttributeError) as e:
+        logger.warning(f"⚠️ Failed to load platform {platform_name}: {e}")
+        platform_class = None
+    _loaded_classes[platform_name] = platform_class
+    return platform_class
+
+
+def _build_registry() -> Dict[str, Optional[Type[BasePlatform]]]:
+    """Importă toate platformele din manifest (doar pentru apelanții care au nevoie de toate)"""
+    registry = {spec.name: _load_platform_class(spec.name) for spec in PLATFORM_MANIFEST}
+    failed = [name for name, cls in registry.items() if cls is None]
+    if failed:
+        logger.warning(f"⚠️ Failed to load {len(failed)} platforms: {', '.join(failed)}")
+    return registry
+
+
+def __getattr__(name: str):
+    """Rezolvă leneș clasele platformelor și registry-ul complet"""
+    if name in _CLASS_TO_PLATFORM:
+        return _load_platform_class(_CLASS_TO_PLATFORM[name])
+    if name == 'PLATFORM_REGISTRY':
+        return _build_registry()
+    if name == 'SUPPORTED_PLATFORMS':
+        return [name for name, cls in _build_registry().items() if cls is not None]
+    if name == 'FAILED_PLATFORMS':
+        return [name for name, cls in _build_registry().items() if cls is None]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Filtrează platformele care au fost încărcate cu succes
-SUPPORTED_PLATFORMS = [name for name, cls in PLATFORM_REGISTRY.items() if cls is not None]
-FAILED_PLATFORMS = [name for name, cls in PLATFORM_REGISTRY.items() if cls is None]
-
-# Platform priorities pentru loading order
-PLATFORM_PRIORITIES: Dict[str, int] = {
-    'youtube': 1,      # Cea mai populară și stabilă
-    'instagram': 2,    # Popular, dar mai restrictiv
-    'tiktok': 3,       # Popular, anti-detection complex
-    'facebook': 4,     # Restrictiv, necesită atenție specială
-    'twitter': 5,      # Extrem de restrictiv
-    'vimeo': 6,        # Calitate înaltă, mai puțin restrictiv
-    'reddit': 7,       # Destul de stabil pentru v.redd.it
-    'threads': 8,      # Nou, pot fi probleme
-    'pinterest': 9,    # Specific use case
-    'dailymotion': 10, # Backup option
-}
 
 def get_platform_class(platform_name: str) -> Optional[Type[BasePlatform]]:
     """
@@ -144,7 +109,7 @@ def get_platform_class(platform_name: str) -> Optional[Type[BasePlatform]]:
     Returns:
         Clasa platformei sau None dacă nu există
     """
-    return PLATFORM_REGISTRY.get(platform_name.lower())
+    return _load_platform_class(platform_name.lower())
 
 def get_all_platform_classes() -> Dict[str, Type[BasePlatform]]:
     """
@@ -153,7 +118,7 @@ def get_all_platform_classes() -> Dict[str, Type[BasePlatform]]:
     Returns:
         Dictionary cu numele și clasele platformelor
     """
-    return {name: cls for name, cls in PLATFORM_REGISTRY.items() if cls is not None}
+    return {name: cls for name, cls in _build_registry().items() if cls is not None}
 
 def get_platforms_by_priority() -> List[str]:
     """
@@ -162,7 +127,7 @@ def get_platforms_by_priority() -> List[str]:
     Returns:
         Lista cu numele platformelor în ordinea priorității
     """
-    available = [p for p in SUPPORTED_PLATFORMS if p in PLATFORM_PRIORITIES]
+    available = [p for p in get_all_platform_classes() if p in PLATFORM_PRIORITIES]
     return sorted(available, key=lambda x: PLATFORM_PRIORITIES.get(x, 999))
 
 def is_platform_supported(platform_name: str) -> bool:
@@ -175,7 +140,7 @@ def is_platform_supported(platform_name: str) -> bool:
     Returns:
         True dacă platforma este suportată și disponibilă
     """
-    return platform_name.lower() in SUPPORTED_PLATFORMS
+    return _load_platform_class(platform_name.lower()) is not None
 
 def get_platform_info() -> Dict[str, Dict[str, any]]:
     """
@@ -186,7 +151,7 @@ def get_platform_info() -> Dict[str, Dict[str, any]]:
     """
     info = {}
     
-    for name, platform_class in PLATFORM_REGISTRY.items():
+    for name, platform_class in _build_registry().items():
         if platform_class is not None:
             try:
                 # Instanțiază temporary pentru a obține info
@@ -220,28 +185,24 @@ def get_platform_info() -> Dict[str, Dict[str, any]]:
 
 def get_registry_stats() -> Dict[str, any]:
     """
-    Obține statistici despre registry
+    Obține statistici despre registry (importă toate platformele)
     """
+    registry = _build_registry()
+    supported = [name for name, cls in registry.items() if cls is not None]
+    failed = [name for name, cls in registry.items() if cls is None]
     return {
-        'total_platforms': len(PLATFORM_REGISTRY),
-        'available_platforms': len(SUPPORTED_PLATFORMS),
-        'failed_platforms': len(FAILED_PLATFORMS),
-        'success_rate': round((len(SUPPORTED_PLATFORMS) / len(PLATFORM_REGISTRY)) * 100, 2),
-        'supported_platforms': SUPPORTED_PLATFORMS,
-        'failed_platforms': FAILED_PLATFORMS,
+        'total_platforms': len(registry),
+        'available_platforms': len(supported),
+        'failed_platforms': len(failed),
+        'success_rate': round((len(supported) / len(registry)) * 100, 2),
+        'supported_platforms': supported,
+        'failed_platforms': failed,
         'version': '3.0.0'
     }
 
-# Log initialization results
-stats = get_registry_stats()
-if FAILED_PLATFORMS:
-    logger.warning(f"⚠️ Failed to load {len(FAILED_PLATFORMS)} platforms: {', '.join(FAILED_PLATFORMS)}")
-    
-logger.info(
-    f"📦 Platform Registry v3.0.0 initialized: {stats['available_platforms']}/{stats['total_platforms']} "
-    f"platforms loaded ({stats['success_rate']}% success rate)"
+logger.debug(
+    f"📦 Platform Registry v3.0.0: {len(PLATFORM_MANIFEST)} platforms in manifest (imported on first use)"
 )
-logger.info(f"✅ Available platforms: {', '.join(SUPPORTED_PLATFORMS)}")
 
 # Export pentru utilizare externă - versiunea 3.0.0
 __all__ = [
@@ -268,6 +229,8 @@ __all__ = [
     'SUPPORTED_PLATFORMS',
     'FAILED_PLATFORMS',
     'PLATFORM_PRIORITIES',
+    'PLATFORM_MANIFEST',
+    'PlatformSpec',
     'get_platform_class',
     'get_all_platform_classes',
     'get_platforms_by_priority',
@@ -7,12 +7,15 @@ import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 import aiohttp
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 try:
     from platforms.base import BasePlatform, VideoInfo, PlatformCapability
     from utils.cache import cache, generate_cache_key, cached
     from utils.monitoring import monitoring, trace_operation
+    from utils.download.segmented_downloader import segmented_downloader
+    from utils.network.session_pool import redirect_session
     from utils.retry_manager import RetryStrategy
 except ImportError:
     # Fallback pentru development/testing
@@ -42,6 +45,7 @@ class InstagramPlatform(BasePlatform):
         super().__init__()
         self.platform_name = "instagram"
         self.base_url = "https://www.instagram.com"
+        self.supported_domains = ['instagram.com', 'www.instagram.com']
         
         # Capabilities specific Instagram
         self.capabilities = {
@@ -147,8 +151,12 @@ class InstagramPlatform(BasePlatform):
             
         return {'type': 'unknown', 'id': 'unknown'}
         
-    async def _make_request(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Face un request cu headers și rotation de user-agent"""
+    @asynccontextmanager
+    async def _make_request(self, url: str, **kwargs):
+        """
+        Request cu headers și rotation de user-agent, pe sesiunea partajată.
+        Răspunsul este valabil doar în interiorul `async with`.
+        """
         
         headers = self.headers.copy()
         headers['User-Agent'] = self._get_next_user_agent()
@@ -157,26 +165,26 @@ class InstagramPlatform(BasePlatform):
         if 'headers' in kwargs:
             headers.update(kwargs.pop('headers'))
             
-        timeout = aiohttp.ClientTimeout(total=30)
+        kwargs.setdefault('timeout', aiohttp.ClientTimeout(total=30))
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with redirect_session() as session:
             async with session.get(url, headers=headers, **kwargs) as response:
                 response.raise_for_status()
-                return response
+                yield response
                 
     async def _get_shared_data(self, url: str) -> Dict[str, Any]:
         """Extrage shared data din pagina Instagram"""
         
         cache_key = generate_cache_key("instagram_shared_data", url)
-        cached_data = cache.get(cache_key)
+        cached_data = await cache.aget(cache_key)
         
         if cached_data:
             logger.debug(f"📦 Using cached shared data for: {url}")
             return cached_data
             
         try:
-            response = await self._make_request(url)
-            html = await response.text()
+            async with self._make_request(url) as response:
+                html = await response.text()
             
             # Extract shared data din script tag
             shared_data_pattern = r'window\._sharedData\s*=\s*({.*?});'
@@ -186,7 +194,7 @@ class InstagramPlatform(BasePlatform):
                 shared_data = json.loads(match.group(1))
                 
                 # Cache pentru 10 minute
-                cache.put(cache_key, shared_data, ttl=600, priority="high")
+                await cache.aput(cache_key, shared_data, ttl=600, priority="high")
                 
                 return shared_data
             else:
@@ -456,22 +464,30 @@ class InstagramPlatform(BasePlatform):
         """Descarcă fișierul de la URL"""
         
         import os
-        import aiofiles
         
         full_filename = f"{filename}.{ext}"
         file_path = os.path.join(output_path, full_filename)
         
         try:
-            response = await self._make_request(url)
-            
             # Creează directorul dacă nu există
             os.makedirs(output_path, exist_ok=True)
             
-            async with aiofiles.open(file_path, 'wb') as f:
-                async for chunk in response.content.iter_chunked(8192):
-                    await f.write(chunk)
+            # Aceleași headers pentru toate segmentele (URL-urile CDN semnate verifică User-Agent-ul)
+            headers = self.headers.copy()
+            headers['User-Agent'] = self._get_next_user_agent()
+            
+            # Jar propriu cererii: cookie-urile setate de redirect-urile CDN-ului ajung la segmente;
+            # un răspuns de eroare ridică ClientResponseError înainte de scrierea fișierului
+            async with redirect_session() as session:
+                outcome = await segmented_downloader.download(
+                    session, url, file_path,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=300),
+                    raise_for_status=True
+                )
                     
-            logger.info(f"✅ Downloaded Instagram video: {file_path}")
+            logger.info(f"✅ Downloaded Instagram video: {file_path} "
+                        f"({outcome.segments} segment(s), {outcome.throughput / 1024 / 1024:.1f} MB/s)")
             return file_path
             
         except Exception as e:
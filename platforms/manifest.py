@@ -0,0 +1,75 @@
+# platforms/manifest.py - Manifestul platformelor (fără importuri grele)
+# Versiunea: 1.0.0
+
+"""
+Descrierea statică a platformelor: nume, modul, clasă, domenii și prioritate.
+
+PlatformManager și registry-ul din platforms/__init__.py înregistrează
+platformele din acest manifest la pornire; modulul platformei (cu yt-dlp,
+aiohttp etc.) este importat abia la primul URL care îi aparține.
+"""
+
+import importlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlatformSpec:
+    """Intrare din manifest pentru o platformă încărcată leneș"""
+    name: str
+    module: str
+    class_name: str
+    domains: Tuple[str, ...]
+    priority: int = 999
+
+    @property
+    def module_path(self) -> str:
+        return f"platforms.{self.module}"
+
+    def load_class(self) -> Type:
+        """Importă modulul platformei și returnează clasa ei"""
+        start = time.perf_counter()
+        module = importlib.import_module(self.module_path)
+        platform_class = getattr(module, self.class_name)
+        logger.debug(f"📦 Imported {self.module_path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return platform_class
+
+
+PLATFORM_MANIFEST: Tuple[PlatformSpec, ...] = (
+    PlatformSpec('youtube', 'youtube_new', 'YouTubePlatform',
+                 ('youtube.com', 'youtu.be', 'youtube-nocookie.com'), priority=1),
+    PlatformSpec('instagram', 'instagram', 'InstagramPlatform',
+                 ('instagram.com',), priority=2),
+    PlatformSpec('tiktok', 'tiktok', 'TikTokPlatform',
+                 ('tiktok.com',), priority=3),
+    PlatformSpec('facebook', 'facebook', 'FacebookPlatform',
+                 ('facebook.com', 'fb.watch', 'fb.me'), priority=4),
+    PlatformSpec('twitter', 'twitter', 'TwitterPlatform',
+                 ('twitter.com', 'x.com'), priority=5),
+    PlatformSpec('vimeo', 'vimeo', 'VimeoPlatform',
+                 ('vimeo.com',), priority=6),
+    PlatformSpec('reddit', 'reddit', 'RedditPlatform',
+                 ('reddit.com', 'redd.it'), priority=7),
+    PlatformSpec('threads', 'threads', 'ThreadsPlatform',
+                 ('threads.net', 'threads.com'), priority=8),
+    PlatformSpec('pinterest', 'pinterest', 'PinterestPlatform',
+                 ('pinterest.com', 'pinterest.co.uk', 'pinterest.fr', 'pinterest.de',
+                  'pinterest.ca', 'pin.it'), priority=9),
+    PlatformSpec('dailymotion', 'dailymotion', 'DailymotionPlatform',
+                 ('dailymotion.com', 'dai.ly'), priority=10),
+)
+
+# Module din platforms/ care nu sunt platforme de sine stătătoare
+# (youtube.py este implementarea veche, înlocuită de youtube_new.py)
+NON_PLATFORM_MODULES: FrozenSet[str] = frozenset({'base', 'manifest', 'youtube'})
+
+PLATFORM_SPECS: Dict[str, PlatformSpec] = {spec.name: spec for spec in PLATFORM_MANIFEST}
+
+PLATFORM_PRIORITIES: Dict[str, int] = {spec.name: spec.priority for spec in PLATFORM_MANIFEST}
+
+MANIFEST_MODULES: FrozenSet[str] = frozenset(spec.module for spec in PLATFORM_MANIFEST) | NON_PLATFORM_MODULES
@@ -8,6 +8,7 @@ import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 import aiohttp
+from contextlib import asynccontextmanager
 from datetime import datetime
 from urllib.parse import unquote, urlparse, parse_qs
 
@@ -15,6 +16,8 @@ try:
     from platforms.base import BasePlatform, VideoInfo, PlatformCapability
     from utils.cache import cache, generate_cache_key, cached
     from utils.monitoring import monitoring, trace_operation
+    from utils.download.segmented_downloader import segmented_downloader
+    from utils.network.session_pool import redirect_session
     from utils.retry_manager import RetryStrategy
 except ImportError:
     # Fallback pentru development/testing
@@ -44,6 +47,7 @@ class TikTokPlatform(BasePlatform):
         super().__init__()
         self.platform_name = "tiktok"
         self.base_url = "https://www.tiktok.com"
+        self.supported_domains = ['tiktok.com', 'www.tiktok.com', 'm.tiktok.com', 'vm.tiktok.com']
         
         # Capabilities specific TikTok
         self.capabilities = {
@@ -151,7 +155,7 @@ class TikTokPlatform(BasePlatform):
         """Rezolvă URL-urile scurte TikTok"""
         
         cache_key = generate_cache_key("tiktok_short_url", short_url)
-        cached_url = cache.get(cache_key)
+        cached_url = await cache.aget(cache_key)
         
         if cached_url:
             logger.debug(f"📦 Using cached resolved URL for: {short_url}")
@@ -163,27 +167,30 @@ class TikTokPlatform(BasePlatform):
             
             timeout = aiohttp.ClientTimeout(total=10)
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(short_url, headers=headers, allow_redirects=False) as response:
-                    
-                    # Urmărește redirect-urile manual pentru control
-                    redirect_url = short_url
-                    max_redirects = 5
-                    redirects = 0
+            # Urmărește redirect-urile manual pentru control (doar status și Location, fără corp);
+            # cookie-urile setate pe parcurs rămân în jar-ul cererii
+            redirect_url = short_url
+            max_redirects = 5
+            redirects = 0
+            
+            async with redirect_session() as session:
+                async with session.get(short_url, headers=headers, allow_redirects=False, timeout=timeout) as response:
+                    status = response.status
+                    location = response.headers.get('Location', '')
                     
-                    while response.status in (301, 302, 303, 307, 308) and redirects < max_redirects:
-                        redirect_url = response.headers.get('Location', '')
-                        if redirect_url:
-                            async with session.get(redirect_url, headers=headers, allow_redirects=False) as redirect_response:
-                                response = redirect_response
-                                redirects += 1
-                        else:
-                            break
-                            
-                    # Cache rezultatul pentru 1 oră
-                    cache.put(cache_key, redirect_url, ttl=3600, priority="high")
+                while status in (301, 302, 303, 307, 308) and redirects < max_redirects:
+                    if not location:
+                        break
+                    redirect_url = location
+                    async with session.get(redirect_url, headers=headers, allow_redirects=False, timeout=timeout) as response:
+                        status = response.status
+                        location = response.headers.get('Location', '')
+                    redirects += 1
                     
-                    return redirect_url
+            # Cache rezultatul pentru 1 oră
+            await cache.aput(cache_key, redirect_url, ttl=3600, priority="high")
+            
+            return redirect_url
                     
         except Exception as e:
             logger.error(f"❌ Error resolving TikTok short URL {short_url}: {e}")
@@ -191,8 +198,12 @@ class TikTokPlatform(BasePlatform):
                 monitoring.record_error("tiktok", "url_resolution", str(e))
             return short_url  # Returnează URL-ul original dacă nu poate rezolva
             
-    async def _make_request(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Face un request cu headers și protection bypass"""
+    @asynccontextmanager
+    async def _make_request(self, url: str, **kwargs):
+        """
+        Request cu headers și protection bypass, pe sesiunea partajată.
+        Răspunsul este valabil doar în interiorul `async with`.
+        """
         
         headers = self.base_headers.copy()
         headers['User-Agent'] = self._get_next_user_agent()
@@ -208,26 +219,26 @@ class TikTokPlatform(BasePlatform):
         if 'headers' in kwargs:
             headers.update(kwargs.pop('headers'))
             
-        timeout = aiohttp.ClientTimeout(total=30)
+        kwargs.setdefault('timeout', aiohttp.ClientTimeout(total=30))
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with redirect_session() as session:
             async with session.get(url, headers=headers, **kwargs) as response:
                 response.raise_for_status()
-                return response
+                yield response
                 
     async def _extract_from_webpage(self, url: str) -> Dict[str, Any]:
         """Extrage date din pagina web TikTok"""
         
         cache_key = generate_cache_key("tiktok_webpage_data", url)
-        cached_data = cache.get(cache_key)
+        cached_data = await cache.aget(cache_key)
         
         if cached_data:
             logger.debug(f"📦 Using cached webpage data for: {url}")
             return cached_data
             
         try:
-            response = await self._make_request(url)
-            html = await response.text()
+            async with self._make_request(url) as response:
+                html = await response.text()
             
             # Caută __NEXT_DATA__ script tag
             next_data_pattern = r'<script[^>]*id="__NEXT_DATA__"[^>]*>([^<]+)</script>'
@@ -238,7 +249,7 @@ class TikTokPlatform(BasePlatform):
                     next_data = json.loads(match.group(1))
                     
                     # Cache pentru 10 minute
-                    cache.put(cache_key, next_data, ttl=600, priority="high")
+                    await cache.aput(cache_key, next_data, ttl=600, priority="high")
                     
                     return next_data
                 except json.JSONDecodeError as e:
@@ -251,7 +262,7 @@ class TikTokPlatform(BasePlatform):
             if script_match:
                 try:
                     initial_state = json.loads(script_match.group(1))
-                    cache.put(cache_key, initial_state, ttl=600, priority="high")
+                    await cache.aput(cache_key, initial_state, ttl=600, priority="high")
                     return initial_state
                 except json.JSONDecodeError:
                     pass
@@ -520,22 +531,30 @@ class TikTokPlatform(BasePlatform):
         """Descarcă fișierul de la URL"""
         
         import os
-        import aiofiles
         
         full_filename = f"{filename}.{ext}"
         file_path = os.path.join(output_path, full_filename)
         
         try:
-            response = await self._make_request(url)
-            
             # Creează directorul dacă nu există
             os.makedirs(output_path, exist_ok=True)
             
-            async with aiofiles.open(file_path, 'wb') as f:
-                async for chunk in response.content.iter_chunked(8192):
-                    await f.write(chunk)
+            # Aceleași headers pentru toate segmentele (URL-urile CDN semnate verifică User-Agent-ul)
+            headers = self.base_headers.copy()
+            headers['User-Agent'] = self._get_next_user_agent()
+            
+            # Jar propriu cererii: cookie-urile setate de redirect-urile CDN-ului ajung la segmente;
+            # un răspuns de eroare ridică ClientResponseError înainte de scrierea fișierului
+            async with redirect_session() as session:
+                outcome = await segmented_downloader.download(
+                    session, url, file_path,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=300),
+                    raise_for_status=True
+                )
                     
-            logger.info(f"✅ Downloaded TikTok video: {file_path}")
+            logger.info(f"✅ Downloaded TikTok video: {file_path} "
+                        f"({outcome.segments} segment(s), {outcome.throughput / 1024 / 1024:.1f} MB/s)")
             return file_path
             
         except Exception as e:
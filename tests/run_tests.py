@@ -19,7 +19,7 @@ def main():
     parser = argparse.ArgumentParser(description="Rulează suite-ul de teste pentru arhitectura modulară")
     parser.add_argument(
         "--module", 
-        choices=["platform_manager", "memory_manager", "monitoring", "cache", "all"],
+        choices=["platform_manager", "memory_manager", "monitoring", "cache", "job_queue", "format_planner", "file_id_cache", "singleflight", "telegram_upload", "cache_codecs", "platform_router", "threat_scanner", "threat_log", "rate_window", "log_writer", "activity_index", "download_executor", "worker_pool", "platform_manifest", "session_pool", "method_planner", "json_scanner", "segmented_downloader", "download_journal", "all"],
         default="all",
         help="Modulul specific de testat"
     )
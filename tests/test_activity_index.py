@@ -0,0 +1,237 @@
+# tests/test_activity_index.py - Unit tests for Activity Index
+# Versiunea: 1.0.0
+
+import pytest
+import random
+import time
+from collections import defaultdict
+from unittest.mock import patch
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.activity_logger import ActivityLogger, ActivityLog, ActivityType, LogLevel
+from utils.log_writer import RotatingJsonlWriter
+
+PLATFORMS = ['tiktok', 'Instagram', 'facebook', None]
+ERRORS = ['timeout', 'private', 'geo_blocked']
+
+
+def legacy_get_logs(logs, hours=24, activity_types=None, platforms=None, success_only=None, user_id=None, now=None):
+    """Filtrarea liniară de dinainte de index (referință pentru paritate și benchmark)"""
+    cutoff_time = (now or time.time()) - (hours * 3600)
+    filtered = []
+    for log in logs:
+        if log.timestamp < cutoff_time:
+            continue
+        if activity_types and log.activity_type not in activity_types:
+            continue
+        if platforms and log.platform and log.platform.lower() not in [p.lower() for p in platforms]:
+            continue
+        if success_only is not None and log.success != success_only:
+            continue
+        if user_id and log.user_id != user_id:
+            continue
+        filtered.append(log)
+    filtered.sort(key=lambda x: x.timestamp, reverse=True)
+    return filtered
+
+
+def legacy_statistics(logs):
+    """Agregatele calculate linear de vechiul get_statistics"""
+    breakdown = defaultdict(int)
+    platforms = defaultdict(lambda: {"total": 0, "success": 0, "errors": 0})
+    errors = defaultdict(int)
+    times = []
+    for log in logs:
+        breakdown[log.activity_type.value] += 1
+        if not log.success and log.error_code:
+            errors[log.error_code] += 1
+        if log.platform:
+            platforms[log.platform.lower()]["total"] += 1
+            platforms[log.platform.lower()]["success" if log.success else "errors"] += 1
+        if log.duration_ms and log.activity_type == ActivityType.DOWNLOAD_SUCCESS:
+            times.append(log.duration_ms)
+    return {
+        "total_activities": len(logs),
+        "success": sum(log.success for log in logs),
+        "activity_breakdown": dict(breakdown),
+        "platform_breakdown": dict(platforms),
+        "error_breakdown": dict(errors),
+        "download_times": (min(times), max(times), sum(times) / len(times)) if times else None,
+    }
+
+
+def fill(activity, count, start, step, seed=7):
+    """Populează logger-ul cu activitate sintetică la timestamp-uri controlate"""
+    rng = random.Random(seed)
+    for i in range(count):
+        success = rng.random() > 0.2
+        activity_type = rng.choice([ActivityType.DOWNLOAD_SUCCESS, ActivityType.COMMAND_EXECUTED,
+                                    ActivityType.USER_MESSAGE]) if success else ActivityType.DOWNLOAD_ERROR
+        with patch('utils.activity_logger.time.time', return_value=start + i * step):
+            activity.log_activity(
+                activity_type, f"eveniment {rng.choice(ERRORS) if not success else 'ok'}",
+                level=LogLevel.INFO if success else LogLevel.ERROR,
+                user_id=rng.randrange(1, 30), platform=rng.choice(PLATFORMS),
+                duration_ms=rng.uniform(100, 5000) if activity_type == ActivityType.DOWNLOAD_SUCCESS else None,
+                success=success, error_code=None if success else rng.choice(ERRORS)
+            )
+
+
+@pytest.fixture
+def activity(tmp_path):
+    """ActivityLogger cu fișier temporar și memorie mică"""
+    with patch.dict(os.environ, {'ACTIVITY_LOG_ROTATE_HOURS': '0', 'ACTIVITY_LOG_MAX_BYTES': '20000'}):
+        activity = ActivityLogger(max_logs=500, log_file_path=str(tmp_path / "logs" / "bot_activity.jsonl"))
+    activity.writer.flush_interval = 30.0
+    yield activity
+    activity.close()
+
+
+class TestActivityIndex:
+    """Test suite pentru indexul pe ore al ActivityLogger"""
+
+    def test_get_logs_matches_linear_filter(self, activity):
+        """Test paritate cu filtrarea liniară, inclusiv după evacuarea din deque"""
+        now = time.time()
+        fill(activity, 800, now - 40 * 3600, 180)  # 800 > max_logs: primele 300 sunt evacuate
+        assert len(activity.logs) == 500
+
+        queries = [
+            {}, {'hours': 3}, {'user_id': 5}, {'platforms': ['TikTok']}, {'platforms': ['instagram', 'facebook']},
+            {'activity_types': [ActivityType.DOWNLOAD_ERROR]}, {'success_only': True, 'hours': 10},
+            {'user_id': 7, 'platforms': ['tiktok'], 'success_only': False},
+        ]
+        with patch('utils.activity_logger.time.time', return_value=now):
+            for query in queries:
+                expected = legacy_get_logs(activity.logs, now=now, **query)
+                assert activity.get_logs(**query) == expected, query
+
+    def test_statistics_match_linear_aggregation(self, activity):
+        """Test că agregatele incrementale (cu ora parțială la margine) sunt cele liniare"""
+        now = time.time()
+        fill(activity, 800, now - 40 * 3600, 180)
+
+        with patch('utils.activity_logger.time.time', return_value=now):
+            for hours in (1, 5, 24, 48):
+                stats = activity.get_statistics(hours=hours)
+                expected = legacy_statistics(legacy_get_logs(activity.logs, hours=hours, now=now))
+                assert stats["total_activities"] == expected["total_activities"]
+                assert stats["success_rate"] == pytest.approx(expected["success"] / expected["total_activities"] * 100)
+                assert dict(stats["activity_breakdown"]) == expected["activity_breakdown"]
+                assert dict(stats["platform_breakdown"]) == expected["platform_breakdown"]
+                assert dict(stats["error_breakdown"]) == expected["error_breakdown"]
+                assert sum(stats["hourly_activity"].values()) == expected["total_activities"]
+                perf = stats["performance_metrics"]
+                low, high, avg = expected["download_times"]
+                assert (perf["fastest_download"], perf["slowest_download"]) == (low, high)
+                assert perf["avg_download_time"] == pytest.approx(avg)
+
+    def test_cleanup_rebuilds_index(self, activity):
+        """Test că cleanup_old_logs păstrează indexul consistent"""
+        now = time.time()
+        fill(activity, 300, now - 10 * 24 * 3600, 3600)
+        activity.cleanup_old_logs(days=7)
+        with patch('utils.activity_logger.time.time', return_value=now):
+            assert activity.get_logs(hours=24 * 30) == legacy_get_logs(activity.logs, hours=24 * 30, now=now)
+            assert activity.get_statistics(hours=24 * 30)["total_activities"] == len(activity.logs)
+
+    def test_empty_statistics_shape(self, activity):
+        """Test formatul rezultatului fără activitate"""
+        stats = activity.get_statistics(hours=1)
+        assert stats["total_activities"] == 0
+        assert stats["performance_metrics"]["fastest_download"] is None
+        assert "ULTIMELE ACTIVITĂȚI" in activity.generate_report(hours=1)
+
+
+class TestActivityHistory:
+    """Test suite pentru interogarea log-urilor de pe disk"""
+
+    def test_include_history_reads_evicted_logs(self, activity):
+        """Test că log-urile evacuate din memorie sunt găsite în segmentele rotite"""
+        now = time.time()
+        fill(activity, 800, now - 40 * 3600, 180)
+        activity.flush()
+        assert activity.writer.get_stats()['rotations'] >= 1
+
+        with patch('utils.activity_logger.time.time', return_value=now):
+            logs = activity.get_logs(hours=48, include_history=True)
+            assert len(logs) == 800
+            assert [log.timestamp for log in logs] == sorted((log.timestamp for log in logs), reverse=True)
+            assert activity.get_statistics(hours=48, include_history=True)["total_activities"] == 800
+            assert activity.get_statistics(hours=48)["total_activities"] == 500
+
+    def test_search_history_filters_and_limit(self, activity):
+        """Test căutarea pe disk cu filtre, interval și limită"""
+        now = time.time()
+        fill(activity, 400, now - 20 * 3600, 180)
+        activity.flush()
+
+        since, until = now - 15 * 3600, now - 10 * 3600
+        found = activity.search_history(since, until, user_id=5)
+        expected = [log for log in legacy_get_logs(activity.logs, hours=48, user_id=5, now=now)
+                    if since <= log.timestamp <= until]
+        assert [log.id for log in found] == [log.id for log in expected]
+        assert len(activity.search_history(since, limit=3)) == 3
+
+    def test_seek_skips_to_timestamp(self, tmp_path):
+        """Test căutarea binară: citirea pornește aproape de prima înregistrare din interval"""
+        writer = RotatingJsonlWriter(tmp_path / "big.jsonl", flush_interval=30.0, max_bytes=0)
+        try:
+            for i in range(20000):
+                writer.append({'timestamp': 1700000000 + i, 'seq': i, 'pad': 'x' * 40})
+            writer.flush()
+
+            with open(writer.path, 'rb') as f:
+                offset = writer._seek_timestamp(f, 1700000000 + 15000)
+                assert 0 < offset <= 15000 * 90
+                f.seek(offset)
+                assert writer._line_time(f.readline()) <= 1700000000 + 15000
+
+            records = list(writer.iter_records(1700000000 + 15000, 1700000000 + 15004))
+            assert [r['seq'] for r in records] == [15000, 15001, 15002, 15003, 15004]
+        finally:
+            writer.close()
+
+    def test_from_dict_roundtrip(self):
+        """Test reconstrucția unui log din linia JSONL"""
+        log = ActivityLog("log_1", 1700000000.5, ActivityType.DOWNLOAD_ERROR, LogLevel.ERROR, 1, 2,
+                          "tiktok", "https://vm.tiktok.com/x/", None, "eroare", {"a": 1}, None, False, "timeout")
+        assert ActivityLog.from_dict(log.to_dict()) == log
+
+
+@pytest.mark.slow
+class TestActivityIndexBenchmark:
+    """Benchmark: rapoarte pe 24h peste 10k log-uri, filtrare liniară vs index pe ore"""
+
+    def test_report_latency(self, tmp_path):
+        activity = ActivityLogger(log_file_path=str(tmp_path / "logs" / "bot_activity.jsonl"))
+        now = time.time()
+        fill(activity, 10000, now - 72 * 3600, 72 * 3600 / 10000)
+        rounds = 50
+
+        with patch('utils.activity_logger.time.time', return_value=now):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                legacy_statistics(legacy_get_logs(activity.logs, hours=24, now=now))
+                legacy_get_logs(activity.logs, hours=72, user_id=5, now=now)
+            legacy_ms = (time.perf_counter() - start) * 1000 / rounds
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                activity.get_statistics(hours=24)
+                activity.get_logs(hours=72, user_id=5)
+            indexed_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        activity.flush()
+        start = time.perf_counter()
+        found = activity.search_history(now - 3600, now)
+        history_ms = (time.perf_counter() - start) * 1000
+        activity.close()
+
+        print(f"\nRaport 24h + log-uri utilizator: liniar {legacy_ms:.2f}ms, indexat {indexed_ms:.2f}ms; "
+              f"ultima oră de pe disk (seek) {history_ms:.2f}ms, {len(found)} log-uri")
+        assert found
@@ -6,18 +6,20 @@ import asyncio
 import time
 import tempfile
 import os
+import json
 from unittest.mock import Mock, patch, MagicMock
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Import system under test
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from utils.cache import (
-    SmartCache, LRUCache, DiskCache, 
+    SmartCache, LRUCache, DiskCache, SQLiteDiskCache,
     CacheStrategy, CacheTier, CacheEntry,
     generate_cache_key, cached, cache
 )
+from utils.cache_codecs import CodecRegistry
 
 
 class TestCacheEntry:
@@ -343,6 +345,164 @@ class TestDiskCache:
         assert stats["cache_dir"] == disk_cache.cache_dir
 
 
+class TestSQLiteDiskCache(TestDiskCache):
+    """Test suite pentru SQLiteDiskCache (rulează și testele DiskCache)"""
+    
+    @pytest.fixture
+    def disk_cache(self, tmp_path):
+        """Crează SQLiteDiskCache cu director temporar"""
+        cache = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=1)
+        yield cache
+        cache.close()
+
+    def test_size_based_eviction(self, disk_cache):
+        """Test eviction bazat pe mărimea de pe disk (payload necompresibil)"""
+        large_object = os.urandom(400000)
+
+        disk_cache.put("key1", large_object)
+        disk_cache.put("key2", large_object)
+        disk_cache.put("key3", large_object)  # 1.2MB pe disk > 1MB
+
+        assert disk_cache.get("key1") is None
+        assert disk_cache.get("key2") == large_object
+        assert disk_cache.get("key3") == large_object
+
+    def test_index_survives_restart(self, disk_cache, tmp_path):
+        """Test persistența indexului SQLite între instanțe"""
+        disk_cache.put("key1", {"data": 1}, ttl=3600)
+        disk_cache.get("key1")
+        disk_cache.close()
+        
+        reopened = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=1)
+        assert reopened.get("key1") == {"data": 1}
+        assert reopened.index["key1"]["access_count"] == 3
+        assert reopened.get_stats()["total_size_bytes"] == disk_cache.total_size
+        reopened.close()
+        
+    def test_access_updates_are_batched(self, tmp_path):
+        """Test că get() nu scrie în SQLite până la flush"""
+        cache = SQLiteDiskCache(cache_dir=str(tmp_path), access_flush_size=1000, access_flush_interval=3600)
+        cache.put("key1", "value1")
+        
+        for _ in range(5):
+            cache.get("key1")
+        assert cache.get_stats()["pending_access_updates"] == 1
+        stored = cache.conn.execute("SELECT access_count FROM entries WHERE key = 'key1'").fetchone()[0]
+        assert stored == 1
+        
+        cache.flush()
+        stored = cache.conn.execute("SELECT access_count FROM entries WHERE key = 'key1'").fetchone()[0]
+        assert stored == 6
+        cache.close()
+        
+    def test_running_total_size(self, disk_cache):
+        """Test contorul incremental al dimensiunii totale"""
+        disk_cache.put("key1", "a" * 1000)
+        disk_cache.put("key2", "b" * 2000)
+        disk_cache.put("key1", "c" * 10)
+        disk_cache.remove("key2")
+        
+        expected = os.path.getsize(disk_cache._get_cache_file_path("key1"))
+        assert disk_cache.total_size == expected
+        
+    def test_migrates_legacy_json_index(self, tmp_path):
+        """Test importul indexului JSON al DiskCache"""
+        legacy = DiskCache(cache_dir=str(tmp_path), max_size_mb=1)
+        legacy.put("old_key", "old_value")
+        
+        cache = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=1)
+        assert "old_key" in cache.index
+        assert not os.path.exists(legacy.index_file)
+        # Valoarea pickle veche este un miss (pickle dezactivat implicit) și este ștearsă
+        assert cache.get("old_key") is None
+        assert "old_key" not in cache.index
+        assert not os.path.exists(cache._get_cache_file_path("old_key"))
+        cache.close()
+    
+    def test_legacy_pickle_readable_when_allowed(self, tmp_path):
+        """Test că pickle permis explicit citește în continuare intrările vechi"""
+        legacy = DiskCache(cache_dir=str(tmp_path), max_size_mb=1)
+        legacy.put("old_key", "old_value")
+        
+        cache = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=1,
+                                codecs=CodecRegistry(allow_pickle=True))
+        assert cache.get("old_key") == "old_value"
+        cache.close()
+
+
+def _populate_disk_cache_index(cache_dir: str, backend: str, entries: int, file_keys: List[str]):
+    """
+    Populează direct indexul unui cache cu `entries` intrări (fără put, care la
+    DiskCache ar rescrie indexul de `entries` ori); doar `file_keys` au fișier.
+    """
+    import pickle
+    import sqlite3
+    
+    now = time.time()
+    probe = DiskCache.__new__(DiskCache)
+    probe.cache_dir = cache_dir
+    for key in file_keys:
+        with open(probe._get_cache_file_path(key), 'wb') as f:
+            if backend == "json":
+                pickle.dump({"value": key}, f)
+            else:
+                f.write(CodecRegistry().encode({"value": key}))
+    
+    if backend == "json":
+        index = {
+            f"key_{i}": {'created_at': now, 'last_accessed': now, 'access_count': 1, 'ttl': None,
+                         'size_bytes': 64, 'metadata': {}, 'file_path': ''}
+            for i in range(entries)
+        }
+        with open(os.path.join(cache_dir, "cache_index.json"), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        return DiskCache(cache_dir=cache_dir, max_size_mb=1024)
+    
+    cache = SQLiteDiskCache(cache_dir=cache_dir, max_size_mb=1024)
+    cache._executemany(
+        "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(f"key_{i}", now, now, 1, None, 64, '{}') for i in range(entries)]
+    )
+    cache.close()
+    return SQLiteDiskCache(cache_dir=cache_dir, max_size_mb=1024)
+
+
+@pytest.mark.slow
+class TestDiskCacheBenchmark:
+    """
+    Benchmark DiskCache (index JSON) vs SQLiteDiskCache. Rulează implicit doar
+    la 1k intrări; RUN_CACHE_BENCHMARK=1 include și 10k/100k.
+    """
+    
+    OPERATIONS = 40  # jumătate get pe chei existente, jumătate put pe chei noi
+    
+    @pytest.mark.parametrize("entries", [1000, 10000, 100000])
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_ops_per_second(self, tmp_path, backend, entries):
+        """Măsoară ops/sec pentru get/put mixte la un index de dimensiunea dată"""
+        if entries > 1000 and not os.getenv("RUN_CACHE_BENCHMARK"):
+            pytest.skip("Setează RUN_CACHE_BENCHMARK=1 pentru benchmark-ul la 10k/100k intrări")
+        
+        half = self.OPERATIONS // 2
+        existing_keys = [f"key_{i * (entries // half)}" for i in range(half)]
+        disk_cache = _populate_disk_cache_index(str(tmp_path), backend, entries, existing_keys)
+        assert len(disk_cache.index) == entries
+        
+        start = time.perf_counter()
+        for i, key in enumerate(existing_keys):
+            assert disk_cache.get(key) == {"value": key}
+            disk_cache.put(f"new_key_{i}", {"value": i})
+        elapsed = time.perf_counter() - start
+        
+        ops_per_second = self.OPERATIONS / elapsed
+        print(f"\n📊 disk cache {backend:6s} @ {entries:>6} entries: {ops_per_second:10.1f} ops/sec")
+        
+        if backend == "sqlite":
+            disk_cache.close()
+            # Indexul incremental nu depinde de numărul de intrări: cel puțin 200 ops/sec
+            assert ops_per_second > 200
+
+
 class TestSmartCache:
     """Test suite pentru SmartCache"""
     
@@ -468,6 +628,58 @@ class TestSmartCache:
         assert "disk_hits" in overall
         assert "misses" in overall
 
+    @pytest.mark.asyncio
+    async def test_async_get_put(self, smart_cache):
+        """Test aget/aput: memoria citită direct, disk-ul pe executor-ul dedicat"""
+        large_value = "x" * 50000
+
+        assert await smart_cache.aput("small_key", "small_value") is True
+        assert await smart_cache.aput("large_key", large_value) is True
+        assert smart_cache._disk_executor is not None
+        assert "large_key" in smart_cache.disk_cache.index
+
+        assert await smart_cache.aget("small_key") == "small_value"
+        assert await smart_cache.aget("large_key") == large_value
+        assert await smart_cache.aget("missing") is None
+
+        assert smart_cache.stats['memory_hits'] == 1
+        assert smart_cache.stats['disk_hits'] == 1
+        assert smart_cache.stats['misses'] == 1
+        smart_cache.stop()
+
+    @pytest.mark.asyncio
+    async def test_async_latency_per_tier(self, smart_cache):
+        """Test raportarea latenței per tier către monitoring"""
+        with patch('utils.cache.monitoring') as mock_monitoring:
+            await smart_cache.aput("key", "value")
+            await smart_cache.aget("key")
+            await smart_cache.aget("missing")
+
+        recorded = [
+            (call.kwargs['tier'], call.args[0], call.kwargs['hit'])
+            for call in mock_monitoring.record_cache_event.call_args_list
+        ]
+        assert recorded == [
+            ('memory', 'put', None),
+            ('memory', 'get', True),
+            ('memory', 'get', False),
+            ('disk', 'get', False),
+        ]
+        assert all(call.kwargs['duration_ms'] >= 0 for call in mock_monitoring.record_cache_event.call_args_list)
+        smart_cache.stop()
+
+    def test_lock_free_reads_keep_lru_order(self):
+        """Test că citirile fără lock sunt aplicate în ordinea LRU la următorul put"""
+        lru = LRUCache[str](max_size=2)
+        lru.put("a", "1")
+        lru.put("b", "2")
+
+        assert lru.get_nowait("a") == "1"
+        lru.put("c", "3")  # evacuează "b", nu "a"
+
+        assert lru.get("a") == "1"
+        assert lru.get("b") is None
+
 
 class TestCacheHelperFunctions:
     """Test suite pentru funcțiile helper de cache"""
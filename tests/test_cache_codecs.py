@@ -0,0 +1,156 @@
+# tests/test_cache_codecs.py - Unit tests for Cache Codecs
+# Versiunea: 1.0.0
+
+import pytest
+import time
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.cache import SQLiteDiskCache, CacheTier
+from utils.cache_codecs import CodecRegistry, UnsupportedCacheFormat, HEADER_SIZE, FLAG_COMPRESSED, msgpack
+
+METADATA_SAMPLE = {
+    'title': 'Videoclip de test',
+    'uploader': 'canal',
+    'duration': 213,
+    'formats': [{'format_id': str(i), 'height': 144 * (i % 6 + 1), 'tbr': 350.5 * i} for i in range(200)],
+    'tags': ['muzică', 'live', 'concert'] * 20
+}
+
+
+class TestCodecRegistry:
+    """Test suite pentru CodecRegistry"""
+
+    @pytest.fixture
+    def codecs(self):
+        """Registru nou cu statistici curate"""
+        return CodecRegistry(compress_threshold=1024, allow_pickle=True)
+
+    def test_codec_selection(self, codecs):
+        """Test alegerea codec-ului după tipul valorii"""
+        metadata_codec = 'msgpack' if msgpack is not None else 'json'
+        assert codecs.select(b'\x89PNG').name == 'raw'
+        assert codecs.select({'a': [1, 2.5, None, True]}).name == metadata_codec
+        # Tuple și chei non-string nu supraviețuiesc JSON -> pickle
+        assert codecs.select(('a', 1)).name == 'pickle'
+        assert codecs.select({1: 'a'}).name == ('msgpack' if msgpack is not None else 'pickle')
+
+    def test_round_trip_and_compression(self, codecs):
+        """Test round-trip exact și compresia peste prag"""
+        for value in ("text", 42, {'k': 'v'}, METADATA_SAMPLE, ('tuplu', 1), b'\x00' * 10):
+            assert codecs.decode(codecs.encode(value)) == value
+
+        data = codecs.encode(METADATA_SAMPLE)
+        assert data[5] & FLAG_COMPRESSED
+
+        uncompressed = codecs.encode(METADATA_SAMPLE, compress=False)
+        assert not uncompressed[5] & FLAG_COMPRESSED
+        assert len(data) < len(uncompressed)
+
+    def test_pickle_disabled_by_default(self, tmp_path):
+        """Test că pickle este interzis implicit, inclusiv pentru fișierele vechi fără antet"""
+        import pickle
+        codecs = CodecRegistry()
+        with pytest.raises(TypeError):
+            codecs.encode(('a', 1))
+
+        pickled = CodecRegistry(allow_pickle=True).encode(('a', 1))
+        with pytest.raises(UnsupportedCacheFormat):
+            codecs.decode(pickled)
+        with pytest.raises(UnsupportedCacheFormat):
+            codecs.decode(pickle.dumps({'legacy': True}))
+
+    def test_large_raw_payload_read_as_bytes(self, codecs, tmp_path):
+        """Test că payload-urile binare mari sunt returnate ca bytes, fără fișier ținut deschis"""
+        payload = os.urandom(64 * 1024)
+        path = tmp_path / "thumb.cache"
+        path.write_bytes(codecs.encode(payload))
+
+        value = codecs.read_file(str(path))
+
+        assert type(value) is bytes
+        assert value == payload
+        assert os.path.getsize(path) == len(payload) + HEADER_SIZE
+
+        small = tmp_path / "small.cache"
+        small.write_bytes(codecs.encode(b'tiny'))
+        assert codecs.read_file(str(small)) == b'tiny'
+
+    def test_stats(self, codecs):
+        """Test măsurătorile per codec"""
+        codecs.decode(codecs.encode(METADATA_SAMPLE))
+        name = codecs.select(METADATA_SAMPLE).name
+
+        stats = codecs.get_stats()[name]
+        assert stats['encoded'] == 1
+        assert stats['decoded'] == 1
+        assert stats['compressed'] == 1
+        assert 0 < stats['disk_ratio'] < 1
+
+
+class TestSQLiteDiskCacheCodecs:
+    """Test suite pentru codec-urile folosite de SQLiteDiskCache"""
+
+    def test_values_stored_without_pickle(self, tmp_path):
+        """Test valorile metadata/binare stocate cu codec-uri sigure"""
+        disk_cache = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=5,
+                                     codecs=CodecRegistry(allow_pickle=False))
+        thumbnail = os.urandom(16 * 1024)
+
+        assert disk_cache.put("info", METADATA_SAMPLE) is True
+        assert disk_cache.put("thumb", thumbnail) is True
+        assert disk_cache.put("tuple", ('a', 1)) is False
+
+        assert disk_cache.get("info") == METADATA_SAMPLE
+        assert disk_cache.get("thumb") == thumbnail
+        assert disk_cache.get("tuple") is None
+
+        stats = disk_cache.get_stats()
+        assert 'pickle' not in stats['codecs']
+        assert stats['codecs']['raw']['stored_bytes'] == len(thumbnail) + HEADER_SIZE
+        # Dimensiunea din index este cea de pe disk (după compresie)
+        assert disk_cache.index['info']['size_bytes'] == os.path.getsize(disk_cache._get_cache_file_path("info"))
+        disk_cache.close()
+
+    def test_hot_entries_stay_uncompressed(self, tmp_path):
+        """Test că intrările fierbinți (tier memory/hybrid) nu sunt comprimate"""
+        disk_cache = SQLiteDiskCache(cache_dir=str(tmp_path), max_size_mb=5)
+
+        disk_cache.put("cold", METADATA_SAMPLE)
+        disk_cache.put("hot", METADATA_SAMPLE, metadata={'tier': CacheTier.HYBRID.value})
+
+        with open(disk_cache._get_cache_file_path("cold"), 'rb') as f:
+            assert f.read(HEADER_SIZE)[5] & FLAG_COMPRESSED
+        with open(disk_cache._get_cache_file_path("hot"), 'rb') as f:
+            assert not f.read(HEADER_SIZE)[5] & FLAG_COMPRESSED
+        assert disk_cache.get("hot") == METADATA_SAMPLE
+        disk_cache.close()
+
+
+@pytest.mark.slow
+class TestCodecBenchmark:
+    """Măsoară timpii de serializare/deserializare și dimensiunea pe disk per codec"""
+
+    @pytest.mark.parametrize("codec_name", ["pickle", "json", "msgpack"])
+    def test_metadata_codecs(self, codec_name):
+        if codec_name == 'msgpack' and msgpack is None:
+            pytest.skip("msgpack nu este instalat")
+
+        codecs = CodecRegistry(preferred=[codec_name], allow_pickle=codec_name == 'pickle')
+        rounds = 200
+        start = time.perf_counter()
+        for _ in range(rounds):
+            data = codecs.encode(METADATA_SAMPLE)
+        encode_ms = (time.perf_counter() - start) * 1000 / rounds
+        start = time.perf_counter()
+        for _ in range(rounds):
+            assert codecs.decode(data) == METADATA_SAMPLE
+        decode_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        stats = codecs.get_stats()[codec_name]
+        print(f"\n{codec_name}: encode {encode_ms:.3f}ms, decode {decode_ms:.3f}ms, "
+              f"{stats['raw_bytes'] // rounds} -> {len(data)} bytes pe disk")
+        assert stats['encoded'] == rounds
@@ -0,0 +1,369 @@
+# tests/test_download_executor.py - Unit tests for Download Executor
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import concurrent.futures
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault('RENDER', '1')  # fără upgrade yt-dlp la importul downloader-ului
+
+from utils.download.download_executor import DownloadExecutor, DownloadCancelled, check_cancelled
+from utils.singleflight import SingleFlight, canonical_url_key
+
+
+@pytest.fixture
+def executor():
+    """Executor cu un singur thread (job-urile următoare așteaptă în coadă)"""
+    executor = DownloadExecutor(max_workers=1, name='test-downloads')
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def cooperative_download(started: threading.Event, rounds: int = 500):
+    """Simulează o descărcare care verifică anularea la fiecare „chunk”"""
+    started.set()
+    for _ in range(rounds):
+        check_cancelled()
+        time.sleep(0.01)
+    return 'done'
+
+
+class TestDownloadExecutor:
+    """Test suite pentru DownloadExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_reuses_single_pool(self, executor):
+        """Test că toate job-urile rulează în același pool, cu metrici de coadă"""
+        names = await asyncio.gather(*(executor.run(lambda: threading.current_thread().name) for _ in range(5)))
+        assert len(set(names)) == 1 and names[0].startswith('test-downloads-worker')
+
+        stats = executor.get_stats()
+        assert stats['submitted'] == stats['completed'] == 5
+        assert stats['queued'] == stats['running'] == 0
+        assert stats['wait_time_ms']['count'] == 5
+        assert stats['max_queued'] >= 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self, executor):
+        """Test că un job anulat în coadă nu mai pornește"""
+        started = threading.Event()
+        blocker = executor.submit(cooperative_download, started)
+        ran = []
+        queued = executor.submit(ran.append, 1)
+        assert executor.get_stats()['queued'] >= 1
+
+        assert queued.cancel() is True
+        with pytest.raises(DownloadCancelled):
+            await queued.wait()
+        blocker.cancel()
+        with pytest.raises(DownloadCancelled):
+            await blocker.wait()
+
+        assert ran == []
+        stats = executor.get_stats()
+        assert stats['cancelled'] == 2
+        assert stats['queued'] == stats['running'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cooperative_cancel_running_job(self, executor):
+        """Test că job-ul pornit se oprește la următorul check_cancelled()"""
+        started = threading.Event()
+        job = executor.submit(cooperative_download, started)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+        start = time.perf_counter()
+        job.cancel()
+        with pytest.raises(DownloadCancelled):
+            await job.wait()
+        assert time.perf_counter() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_awaiting_task_cancel_cancels_job(self, executor):
+        """Test că anularea task-ului care așteaptă anulează și descărcarea"""
+        started = threading.Event()
+        job = executor.submit(cooperative_download, started)
+        task = asyncio.create_task(job.wait())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert job.cancelled
+        with pytest.raises(DownloadCancelled):
+            job.future.result(timeout=5)
+
+    def test_discard_releases_late_result(self, executor):
+        """Test că rezultatul unui job abandonat este eliberat la sosire"""
+        released = []
+        gate = threading.Event()
+        job = executor.submit(lambda: gate.wait(5) and 'lease')
+        job.discard(released.append)
+        gate.set()
+        job.future.result(timeout=5)
+        assert released == ['lease']
+
+    def test_check_cancelled_outside_executor(self):
+        """Test că check_cancelled nu are efect în afara executorului"""
+        check_cancelled()
+        check_cancelled(lambda: True)
+
+    def test_call_in_process_without_pool_runs_inline(self, executor):
+        """Test că fără process_workers apelul rulează în thread-ul curent"""
+        assert executor.call_in_process(threading.get_ident) == threading.get_ident()
+        assert executor.get_stats()['process_calls'] == 0
+
+
+class TestSharedDownloadCancel:
+    """Test suite pentru anularea descărcărilor partajate (singleflight)"""
+
+    def test_shared_flight_is_not_aborted(self, executor):
+        """Test că descărcarea nu este oprită cât timp alt utilizator așteaptă rezultatul"""
+        flights = SingleFlight('test')
+        started, finish = threading.Event(), threading.Event()
+        checks = []
+
+        def download(key):
+            started.set()
+            finish.wait(5)
+            # Echivalentul raise_if_abandoned din downloader
+            try:
+                check_cancelled(lambda: not flights.is_shared(key))
+                checks.append('continued')
+            except DownloadCancelled:
+                checks.append('aborted')
+                raise
+            return 'file'
+
+        leader = executor.submit(flights.acquire, 'k', download, 'k')
+        started.wait(5)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as other:
+            follower = other.submit(flights.acquire, 'k', download, 'k')
+            while not flights.is_shared('k'):
+                time.sleep(0.01)
+
+            leader.cancel()
+            finish.set()
+            assert follower.result(timeout=5).result == 'file'
+        assert checks == ['continued']
+
+    def test_abandoned_flight_is_aborted(self, executor):
+        """Test că descărcarea fără alți deținători se oprește la anulare"""
+        flights = SingleFlight('test')
+        started = threading.Event()
+
+        def download(key):
+            started.set()
+            for _ in range(500):
+                check_cancelled(lambda: not flights.is_shared(key))
+                time.sleep(0.01)
+            return 'file'
+
+        job = executor.submit(flights.acquire, 'k', download, 'k')
+        started.wait(5)
+        job.cancel()
+        with pytest.raises(DownloadCancelled):
+            job.future.result(timeout=5)
+
+    def test_follower_of_aborted_flight_retries(self, monkeypatch):
+        """Test că un apelant alăturat după verificarea liderului reia descărcarea în loc de DownloadCancelled"""
+        import downloader
+
+        flights = SingleFlight('test')
+        monkeypatch.setattr(downloader, 'download_flights', flights)
+        started, abort = threading.Event(), threading.Event()
+        calls = []
+
+        def fake_run(url):
+            calls.append(url)
+            if len(calls) == 1:
+                started.set()
+                abort.wait(5)
+                # Liderul a văzut is_shared() == False chiar înainte de alăturare
+                raise DownloadCancelled()
+            return {'success': True}
+
+        monkeypatch.setattr(downloader, '_run_download', fake_run)
+        executor = DownloadExecutor(max_workers=2, name='test-flights')
+        try:
+            leader = executor.submit(downloader.acquire_download, 'https://example.com/v')
+            started.wait(5)
+            follower = executor.submit(downloader.acquire_download, 'https://example.com/v')
+            while not flights.is_shared(canonical_url_key('https://example.com/v')):
+                time.sleep(0.01)
+
+            leader.cancel()
+            abort.set()
+            with pytest.raises(DownloadCancelled):
+                leader.future.result(timeout=5)
+            assert follower.future.result(timeout=5).result == {'success': True}
+            assert len(calls) == 2
+        finally:
+            executor.shutdown(wait=True)
+
+    def test_cancel_hook_stops_yt_dlp_progress(self, executor):
+        """Test că hook-ul de progres atașat opțiunilor yt-dlp oprește descărcarea anulată"""
+        from downloader import attach_cancel_hook
+
+        opts = {'progress_hooks': [lambda progress: None]}
+        attach_cancel_hook(opts, 'https://example.com/video')
+        started = threading.Event()
+
+        def fake_download():
+            started.set()
+            for _ in range(500):
+                for hook in opts['progress_hooks']:
+                    hook({'status': 'downloading'})
+                time.sleep(0.01)
+
+        job = executor.submit(fake_download)
+        started.wait(5)
+        job.cancel()
+        with pytest.raises(DownloadCancelled):
+            job.future.result(timeout=5)
+        assert len(opts['progress_hooks']) == 2
+
+
+class TestJobDirectory:
+    """Test suite pentru directorul de lucru al fiecărui job"""
+
+    def test_tiktok_job_dir_is_removed_after_release(self, monkeypatch, tmp_path):
+        """Test că directorul job-ului creat pentru calea TikTok este raportat și șters după trimitere"""
+        import downloader
+
+        job_dir = str(tmp_path / 'job_tiktok')
+        os.makedirs(job_dir)
+
+        def fake_alternative(url, temp_dir):
+            output_file = os.path.join(temp_dir, 'tiktok_1.mp4')
+            with open(output_file, 'wb') as f:
+                f.write(b'\x00' * 128)
+            return {'success': True, 'file_path': output_file, 'title': 'TikTok', 'platform': 'tiktok',
+                    'is_info_video': True}
+
+        monkeypatch.setattr(downloader, 'is_render_environment', lambda: False)
+        monkeypatch.setattr(downloader, 'create_job_temp_dir', lambda: job_dir)
+        monkeypatch.setattr(downloader, 'download_tiktok_alternative', fake_alternative)
+
+        result = downloader.download_video('https://www.tiktok.com/@user/video/1')
+
+        assert result['success'] and result['job_dir'] == job_dir
+        assert result['file_size'] == 128 and result['platform'] == 'tiktok'
+        downloader._release_download_result(result)
+        assert not os.path.exists(job_dir)
+
+
+class TestBotJobDirectory:
+    """Test suite pentru ștergerea directorului de job din bot.process_download"""
+
+    @pytest.fixture
+    def bot_module(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('TELEGRAM_BOT_TOKEN', 'test')
+        bot = pytest.importorskip("bot")
+        job_dir = tmp_path / 'job_bot'
+        job_dir.mkdir()
+        video = job_dir / 'clip.mp4'
+        video.write_bytes(b'\x00' * 64)
+        monkeypatch.setattr(bot, 'download_video', lambda url: {
+            'success': True, 'file_path': str(video), 'title': 'Clip', 'job_dir': str(job_dir)
+        })
+        return bot, job_dir
+
+    def make_update(self, reply_video):
+        update = MagicMock()
+        update.callback_query.edit_message_text = AsyncMock(return_value=MagicMock(delete=AsyncMock()))
+        update.callback_query.message.reply_video = reply_video
+        return update
+
+    @pytest.mark.asyncio
+    async def test_job_dir_removed_after_send(self, bot_module):
+        """Test că fișierul și directorul job-ului sunt șterse după trimitere"""
+        bot, job_dir = bot_module
+        reply_video = AsyncMock()
+        await bot.process_download(self.make_update(reply_video), MagicMock(), 'https://vimeo.com/1')
+
+        assert reply_video.called
+        assert not job_dir.exists()
+
+    @pytest.mark.asyncio
+    async def test_job_dir_removed_when_send_fails(self, bot_module):
+        """Test că directorul job-ului este șters și când trimiterea eșuează"""
+        bot, job_dir = bot_module
+        update = self.make_update(AsyncMock(side_effect=RuntimeError("network down")))
+        await bot.process_download(update, MagicMock(), 'https://vimeo.com/1')
+
+        assert not job_dir.exists()
+
+
+class TestStatusMessageWatcher:
+    """Test suite pentru anularea la ștergerea mesajului de status"""
+
+    @pytest.mark.asyncio
+    async def test_deleted_status_message_cancels_job(self, executor):
+        """Test că eroarea „message to edit not found” anulează descărcarea"""
+        from app import watch_status_message
+
+        started = threading.Event()
+        job = executor.submit(cooperative_download, started)
+        message = MagicMock()
+        message.edit_text = AsyncMock(side_effect=Exception("Bad Request: message to edit not found"))
+
+        await asyncio.wait_for(watch_status_message(message, job, "📥 Descarc...", interval=0.01), 5)
+        assert job.cancelled
+        with pytest.raises(DownloadCancelled):
+            await job.wait()
+
+    @pytest.mark.asyncio
+    async def test_unmodified_message_keeps_job(self, executor):
+        """Test că alte erori de editare nu anulează descărcarea"""
+        from app import watch_status_message
+
+        gate = threading.Event()
+        job = executor.submit(gate.wait, 5)
+        message = MagicMock()
+        message.edit_text = AsyncMock(side_effect=Exception("Bad Request: message is not modified"))
+
+        watcher = asyncio.create_task(watch_status_message(message, job, "📥 Descarc...", interval=0.01))
+        await asyncio.sleep(0.1)
+        gate.set()
+        assert await job.wait() is True
+        await asyncio.wait_for(watcher, 5)
+        assert not job.cancelled
+        assert message.edit_text.await_count >= 2
+
+
+@pytest.mark.slow
+class TestDownloadExecutorBenchmark:
+    """Benchmark: ThreadPoolExecutor nou per video vs executorul comun"""
+
+    @pytest.mark.asyncio
+    async def test_per_call_pool_vs_shared(self):
+        jobs = 500
+        loop = asyncio.get_running_loop()
+
+        async def per_call():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+                return await loop.run_in_executor(pool, time.sleep, 0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(per_call() for _ in range(jobs)))
+        per_call_ms = (time.perf_counter() - start) * 1000
+        peak_threads = threading.active_count()
+
+        executor = DownloadExecutor(max_workers=4, name='bench')
+        start = time.perf_counter()
+        await asyncio.gather(*(executor.run(time.sleep, 0) for _ in range(jobs)))
+        shared_ms = (time.perf_counter() - start) * 1000
+        stats = executor.get_stats()
+        executor.shutdown()
+
+        print(f"\n{jobs} job-uri: pool per apel {per_call_ms:.1f}ms, executor comun {shared_ms:.1f}ms "
+              f"(așteptare p95 {stats['wait_time_ms']['p95']}ms, {stats['workers']} thread-uri; "
+              f"thread-uri active după pool-uri per apel: {peak_threads})")
+        assert stats['completed'] == jobs
@@ -0,0 +1,219 @@
+# tests/test_download_journal.py - Unit tests for the download journal and resumable segmented downloads
+# Versiunea: 1.0.0
+
+import pytest
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import system under test
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.download.download_journal import DownloadJournal, JournalEntry
+from utils.download.segmented_downloader import (
+    ResumeState, SegmentedDownloader, plan_segments, preallocate
+)
+
+PAYLOAD = os.urandom(2 * 1024 * 1024 + 77)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Server cu Range și ETag, pentru reluarea descărcărilor"""
+
+    protocol_version = 'HTTP/1.1'
+    payload = PAYLOAD
+    etag = '"v1"'
+    requests_log = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        range_header = self.headers.get('Range')
+        type(self).requests_log.append(range_header)
+        first, _, last = (range_header or 'bytes=0-').replace('bytes=', '').partition('-')
+        start, end = int(first), int(last) if last else len(self.payload) - 1
+
+        body = self.payload[start:end + 1]
+        self.send_response(206 if range_header else 200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.etag)
+        if range_header:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(self.payload)}')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def media_server():
+    RangeHandler.etag = '"v1"'
+    RangeHandler.requests_log = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = DownloadJournal(str(tmp_path / 'journal.sqlite3'))
+    yield journal
+    journal.close()
+
+
+def make_entry(task_id: str = 'task-1', **kwargs) -> JournalEntry:
+    fields = dict(url='https://cdn.example.com/v.mp4', filename='v.mp4', output_path='/tmp/out',
+                  priority=2, status='pending', headers={'Referer': 'https://example.com'},
+                  metadata={'platform': 'tiktok'})
+    fields.update(kwargs)
+    return JournalEntry(task_id=task_id, **fields)
+
+
+def partial_file(path: str, state: ResumeState, payload: bytes = PAYLOAD):
+    """Fișier prealocat în care fiecare segment are scriși doar primii `written` bytes"""
+    fd = preallocate(path, state.total)
+    try:
+        for segment in state.segments:
+            os.pwrite(fd, payload[segment.start:segment.start + segment.written], segment.start)
+    finally:
+        os.close(fd)
+
+
+def half_done_state() -> ResumeState:
+    segments = plan_segments(len(PAYLOAD), 4, 256 * 1024)
+    for segment in segments:
+        segment.written = segment.length // 2
+    return ResumeState(total=len(PAYLOAD), segments=segments, etag='"v1"')
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class TestDownloadJournal:
+    """Test suite pentru jurnalul SQLite"""
+
+    def test_round_trip(self, journal):
+        """Test că un task salvat este citit identic, cu offset-urile segmentelor"""
+        state = half_done_state()
+        journal.upsert(make_entry(resume_state=state, temp_file='/tmp/task-1.tmp'))
+
+        [entry] = journal.load()
+        assert entry.url == 'https://cdn.example.com/v.mp4'
+        assert entry.headers == {'Referer': 'https://example.com'}
+        assert entry.metadata == {'platform': 'tiktok'}
+        assert entry.resume_state.to_dict() == state.to_dict()
+        assert entry.resume_state.downloaded == state.downloaded
+
+    def test_status_progress_and_remove(self, journal):
+        """Test actualizările de stare, checkpoint-urile și ștergerea"""
+        journal.upsert(make_entry('a'))
+        journal.upsert(make_entry('b'))
+
+        journal.update_status('a', 'retrying', retry_count=2, error_message='timeout')
+        journal.save_progress('a', '/tmp/a.tmp', half_done_state())
+        journal.remove('b')
+
+        [entry] = journal.load()
+        assert (entry.task_id, entry.status, entry.retry_count) == ('a', 'retrying', 2)
+        assert entry.error_message == 'timeout'
+        assert entry.temp_file == '/tmp/a.tmp' and entry.resume_state is not None
+        assert journal.get_stats()['entries'] == 1
+
+    def test_survives_reopen(self, tmp_path):
+        """Test că jurnalul persistă după închidere (restart al procesului)"""
+        db_file = str(tmp_path / 'journal.sqlite3')
+        first = DownloadJournal(db_file)
+        first.upsert(make_entry())
+        first.close()
+
+        second = DownloadJournal(db_file)
+        assert [entry.task_id for entry in second.load()] == ['task-1']
+        assert os.stat(db_file).st_mode & 0o777 == 0o600
+        second.close()
+
+    def test_corrupt_rows_are_dropped(self, journal):
+        """Test că un rând corupt nu blochează reluarea celorlalte"""
+        journal.upsert(make_entry('good'))
+        journal.upsert(make_entry('bad'))
+        journal.conn.execute("UPDATE tasks SET resume_state = '{\"segments\": [[0]]}' WHERE id = 'bad'")
+
+        assert [entry.task_id for entry in journal.load()] == ['good']
+        assert journal.count() == 1
+
+    def test_resume_state_serialization(self):
+        state = half_done_state()
+        restored = ResumeState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert [(s.start, s.end, s.written) for s in restored.segments] == \
+               [(s.start, s.end, s.written) for s in state.segments]
+        assert restored.etag == '"v1"'
+
+
+class TestResumedSegmentedDownload:
+    """Test suite pentru reluarea descărcărilor pe segmente (aiohttp)"""
+
+    @pytest.fixture
+    def downloader(self):
+        return SegmentedDownloader(parts=4, min_segment_size=256 * 1024, max_retries=1)
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_saved_offsets(self, media_server, downloader, tmp_path):
+        """Test că doar restul fiecărui segment este descărcat, după verificarea marginii"""
+        aiohttp = pytest.importorskip("aiohttp")
+        state = half_done_state()
+        path = str(tmp_path / 'v.tmp')
+        partial_file(path, state)
+        checkpoints = []
+
+        async with aiohttp.ClientSession() as session:
+            outcome = await downloader.download(session, media_server, path, resume=state,
+                                                checkpoint=checkpoints.append)
+
+        assert read(path) == PAYLOAD
+        assert outcome.resumed_bytes == state.downloaded
+        for segment in state.segments:
+            verify_from = segment.start + segment.written - downloader.verify_bytes
+            assert f"bytes={verify_from}-{segment.end}" in RangeHandler.requests_log
+        assert checkpoints and checkpoints[0].downloaded == state.downloaded
+        assert downloader.get_stats()['resumed_downloads'] == 1
+
+    @pytest.mark.asyncio
+    async def test_corrupt_partial_file_restarts(self, media_server, downloader, tmp_path):
+        """Test că datele locale diferite de server duc la o descărcare de la zero"""
+        aiohttp = pytest.importorskip("aiohttp")
+        state = half_done_state()
+        path = str(tmp_path / 'v.tmp')
+        partial_file(path, state)
+        segment = state.segments[1]
+        with open(path, 'r+b') as f:
+            f.seek(segment.start + segment.written - 10)
+            f.write(b'\x00' * 10)
+
+        async with aiohttp.ClientSession() as session:
+            outcome = await downloader.download(session, media_server, path, resume=state)
+
+        assert read(path) == PAYLOAD
+        assert outcome.resumed_bytes == 0
+        assert downloader.get_stats()['resume_integrity_failures'] == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_etag_restarts(self, media_server, downloader, tmp_path):
+        """Test că un fișier schimbat pe server nu este completat peste datele vechi"""
+        aiohttp = pytest.importorskip("aiohttp")
+        state = half_done_state()
+        path = str(tmp_path / 'v.tmp')
+        partial_file(path, state)
+        RangeHandler.etag = '"v2"'
+
+        async with aiohttp.ClientSession() as session:
+            outcome = await downloader.download(session, media_server, path, resume=state)
+
+        assert read(path) == PAYLOAD
+        assert outcome.resumed_bytes == 0
+        assert downloader.get_stats()['resume_integrity_failures'] == 1
@@ -0,0 +1,128 @@
+# tests/test_file_id_cache.py - Unit tests for Telegram File ID Cache
+# Versiunea: 1.0.0
+
+import pytest
+import time
+from unittest.mock import MagicMock
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.file_id_cache import TelegramFileIdCache
+
+TIKTOK_URL = "https://www.tiktok.com/@user/video/7234567890123456789"
+TIKTOK_URL_WITH_QUERY = "https://www.tiktok.com/@user/video/7234567890123456789?is_from_webapp=1"
+
+
+class TestTelegramFileIdCache:
+    """Test suite pentru TelegramFileIdCache"""
+
+    @pytest.fixture
+    def cache_file(self, tmp_path):
+        """Calea fișierului de cache într-un director temporar"""
+        return str(tmp_path / "file_ids.json")
+
+    def test_key_is_canonical_video_id(self):
+        """Test cheia canonică platformă + ID video"""
+        assert TelegramFileIdCache.make_key(TIKTOK_URL) == "tiktok:7234567890123456789"
+        assert TelegramFileIdCache.make_key(TIKTOK_URL_WITH_QUERY) == "tiktok:7234567890123456789"
+        assert TelegramFileIdCache.make_key("https://example.com/video.mp4") is None
+
+    def test_put_get_and_stats(self, cache_file):
+        """Test hit/miss și statisticile"""
+        cache = TelegramFileIdCache(cache_file=cache_file)
+
+        assert cache.get(TIKTOK_URL) is None
+        assert cache.put(TIKTOK_URL, "FILE_ID_1", caption="Titlu", file_size=1024) is True
+
+        entry = cache.get(TIKTOK_URL_WITH_QUERY)
+        assert entry.file_id == "FILE_ID_1"
+        assert entry.caption == "Titlu"
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['bytes_saved'] == 1024
+
+    def test_persists_across_instances(self, cache_file):
+        """Test supraviețuirea intrărilor la restart"""
+        cache = TelegramFileIdCache(cache_file=cache_file)
+        cache.put(TIKTOK_URL, "FILE_ID_1")
+        assert cache.flush() is True
+
+        reloaded = TelegramFileIdCache(cache_file=cache_file)
+        assert reloaded.get(TIKTOK_URL).file_id == "FILE_ID_1"
+
+    def test_ttl_expiry(self, cache_file):
+        """Test expirarea intrărilor după TTL"""
+        cache = TelegramFileIdCache(cache_file=cache_file, ttl_seconds=1)
+        cache.put(TIKTOK_URL, "FILE_ID_1")
+        cache.entries["tiktok:7234567890123456789"].created_at = time.time() - 5
+
+        assert cache.get(TIKTOK_URL) is None
+        assert cache.get_stats()['expired'] == 1
+
+    def test_lru_eviction_and_invalidate(self, cache_file):
+        """Test evicția LRU și invalidarea unui file_id respins"""
+        cache = TelegramFileIdCache(cache_file=cache_file, max_entries=2)
+        urls = [f"https://vimeo.com/{i}" for i in range(3)]
+
+        cache.put(urls[0], "A")
+        cache.put(urls[1], "B")
+        cache.get(urls[0])          # urls[0] devine cel mai recent folosit
+        cache.put(urls[2], "C")     # evacuează urls[1]
+
+        assert cache.get(urls[1]) is None
+        assert cache.get(urls[0]).file_id == "A"
+        assert cache.get_stats()['evictions'] == 1
+
+        assert cache.invalidate(urls[0]) is True
+        assert cache.get(urls[0]) is None
+
+    def test_puts_are_persisted_in_background_batches(self, cache_file):
+        """Test că put() nu rescrie fișierul pe calea cererii, iar mai multe put-uri dau o singură scriere"""
+        cache = TelegramFileIdCache(cache_file=cache_file, flush_interval=60)
+        for i in range(50):
+            cache.put(f"https://vimeo.com/{i}", f"FILE_{i}")
+
+        assert not os.path.exists(cache_file)
+        assert cache.get_stats()['pending_writes'] > 0
+
+        cache.flush()
+        assert cache.get_stats()['disk_writes'] == 1
+        assert TelegramFileIdCache(cache_file=cache_file).get("https://vimeo.com/49").file_id == "FILE_49"
+        cache._writer.close()
+
+
+class TestSendVideoFileCaching:
+    """Test suite pentru memorarea file_id-ului după trimiterea unui video"""
+
+    @pytest.fixture
+    def app_module(self, monkeypatch, tmp_path):
+        """Modulul app cu upload-ul către Telegram înlocuit și un cache izolat"""
+        app = pytest.importorskip("app")
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'ok': True, 'result': {'video': {'file_id': 'SENT_FILE_ID'}}}
+        monkeypatch.setattr(app, 'upload_media', MagicMock(return_value=response))
+        monkeypatch.setattr(app, 'file_id_cache', TelegramFileIdCache(cache_file=str(tmp_path / "ids.json")))
+        return app
+
+    @pytest.fixture
+    def video_file(self, tmp_path):
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(b"\x00" * 1024)
+        return str(path)
+
+    def test_real_video_is_cached(self, app_module, video_file):
+        """Test că file_id-ul unui video real este memorat pentru link"""
+        app_module.send_video_file(1, video_file, {'title': 'Clip'}, source_url=TIKTOK_URL, delete_file=False)
+        assert app_module.file_id_cache.get(TIKTOK_URL).file_id == 'SENT_FILE_ID'
+
+    def test_info_video_is_not_cached(self, app_module, video_file):
+        """Test că video-ul informativ (IP blocat de TikTok) nu ia locul videoclipului în cache"""
+        app_module.send_video_file(1, video_file, {'title': 'TikTok Download - Informare', 'is_info_video': True},
+                                   source_url=TIKTOK_URL, delete_file=False)
+        assert app_module.upload_media.called
+        assert app_module.file_id_cache.get(TIKTOK_URL) is None
@@ -0,0 +1,133 @@
+# tests/test_format_planner.py - Unit tests for Format Planner
+# Versiunea: 1.0.0
+
+import pytest
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.download.format_planner import FormatPlanner, estimate_format_size
+
+MB = 1024 * 1024
+
+
+class TestFormatPlanner:
+    """Test suite pentru FormatPlanner"""
+
+    @pytest.fixture
+    def planner(self):
+        """Crează un planificator nou cu statistici curate"""
+        return FormatPlanner(max_height=720, merge_formats=True)
+
+    def test_estimate_sources(self):
+        """Test ordinea surselor de estimare a dimensiunii"""
+        assert estimate_format_size({'filesize': 10 * MB}, 60) == (10 * MB, 'exact')
+        assert estimate_format_size({'filesize_approx': 10 * MB}, 60)[1] == 'approx'
+
+        size, source = estimate_format_size({'tbr': 1000}, 80)
+        assert source == 'bitrate'
+        # 1000 kbps × 80s = 10MB (zecimal), plus marja de siguranță
+        assert 10_000_000 < size < 12_000_000
+
+        assert estimate_format_size({'height': 720}, 60)[1] == 'model'
+        assert estimate_format_size({'height': 720}, None) == (None, None)
+
+    def test_picks_best_fitting_format(self, planner):
+        """Test alegerea celui mai bun format sub limită"""
+        info = {
+            'duration': 300,
+            'formats': [
+                {'format_id': '18', 'height': 360, 'filesize': 20 * MB},
+                {'format_id': '22', 'height': 720, 'filesize': 80 * MB},
+                {'format_id': '59', 'height': 480, 'filesize': 40 * MB},
+                {'format_id': '137', 'height': 1080, 'vcodec': 'avc1', 'acodec': 'none', 'filesize': 5 * MB},
+            ]
+        }
+
+        plan = planner.plan(info, 45 * MB)
+
+        assert plan.fits is True
+        assert plan.format_id == '59'
+        assert plan.format_spec('best') == '59/best'
+
+        stats = planner.get_stats()
+        assert stats['downscaled'] == 1
+        assert stats['bytes_saved'] == 80 * MB
+
+    def test_rejects_before_download(self, planner):
+        """Test respingerea când niciun format nu încape"""
+        info = {
+            'duration': 3600,
+            'formats': [
+                {'format_id': 'low', 'height': 240, 'tbr': 400},
+                {'format_id': 'high', 'height': 720, 'tbr': 2500},
+            ]
+        }
+
+        plan = planner.plan(info, 45 * MB)
+
+        assert plan.fits is False
+        assert plan.format_id is None
+        assert plan.height == 240
+        assert planner.get_stats()['rejected_before_download'] == 1
+
+    def test_unknown_sizes_keep_default_selection(self, planner):
+        """Test că lipsa metadatelor nu schimbă selecția implicită"""
+        plan = planner.plan({'formats': [{'format_id': 'x', 'height': 720}]}, 45 * MB)
+
+        assert plan.fits is None
+        assert plan.format_id is None
+        assert plan.format_spec('best') == 'best'
+        assert planner.get_stats()['no_metadata'] == 1
+
+    def test_plans_dash_video_audio_pairs(self, planner):
+        """Test perechile video+audio pe site-uri doar DASH, dimensiunea = video + audio"""
+        info = {
+            'duration': 300,
+            'formats': [
+                {'format_id': 'a-hi', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 128, 'filesize': 5 * MB},
+                {'format_id': 'a-lo', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 48, 'filesize': 2 * MB},
+                {'format_id': 'v720', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720, 'filesize': 60 * MB},
+                {'format_id': 'v480', 'vcodec': 'avc1', 'acodec': 'none', 'height': 480, 'filesize': 38 * MB},
+                {'format_id': 'v360', 'vcodec': 'avc1', 'acodec': 'none', 'height': 360, 'filesize': 20 * MB},
+            ]
+        }
+
+        plan = planner.plan(info, 45 * MB)
+
+        assert plan.fits is True
+        assert plan.format_id == 'v480+a-hi'
+        assert plan.estimated_bytes == 43 * MB
+        assert plan.format_spec('best') == 'v480+a-hi/best'
+        assert planner.get_stats()['downscaled'] == 1
+
+    def test_dash_pairs_rejected_only_when_no_pair_fits(self, planner):
+        """Test respingerea pe baza celei mai mici perechi, nu a estimării din info"""
+        info = {
+            'duration': 300,
+            'filesize_approx': 500 * MB,
+            'formats': [
+                {'format_id': 'a', 'vcodec': 'none', 'acodec': 'opus', 'filesize': 4 * MB},
+                {'format_id': 'v', 'vcodec': 'vp9', 'acodec': 'none', 'height': 360, 'filesize': 50 * MB},
+            ]
+        }
+
+        plan = planner.plan(info, 45 * MB)
+
+        assert plan.fits is False
+        assert plan.estimated_bytes == 54 * MB
+        assert plan.height == 360
+
+    def test_no_pairs_without_ffmpeg(self):
+        """Test că fără ffmpeg nu sunt planificate perechi care ar trebui unite"""
+        planner = FormatPlanner(max_height=720, merge_formats=False)
+        info = {
+            'duration': 60,
+            'formats': [
+                {'format_id': 'a', 'vcodec': 'none', 'acodec': 'opus', 'filesize': 1 * MB},
+                {'format_id': 'v', 'vcodec': 'vp9', 'acodec': 'none', 'height': 360, 'filesize': 5 * MB},
+            ]
+        }
+        assert planner.plan(info, 45 * MB).format_id is None
@@ -0,0 +1,129 @@
+# tests/test_job_queue.py - Unit tests for Job Queue
+# Versiunea: 1.0.0
+
+import pytest
+import time
+import threading
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.job_queue import JobQueue
+
+
+class TestJobQueue:
+    """Test suite pentru JobQueue"""
+
+    @pytest.fixture
+    def job_queue(self):
+        """Crează o coadă cu un singur worker"""
+        queue = JobQueue(num_workers=1, max_queue_size=5, max_per_chat=2, name='test')
+        yield queue
+        queue.stop(timeout=1)
+
+    def test_submit_runs_job(self, job_queue):
+        """Test execuția unui job pe worker"""
+        done = threading.Event()
+
+        accepted, reason = job_queue.submit(1, done.set)
+
+        assert accepted is True
+        assert reason is None
+        assert done.wait(timeout=2)
+
+    def test_per_chat_limit(self, job_queue):
+        """Test limita de job-uri per chat, inclusiv cele aflate deja în execuție"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking_job():
+            started.set()
+            release.wait(timeout=2)
+
+        job_queue.submit(1, blocking_job)
+        assert started.wait(timeout=2)
+
+        # Job-ul în execuție ocupă deja un loc din cele 2 ale chat-ului
+        assert job_queue.submit(1, lambda: None)[0] is True
+        accepted, reason = job_queue.submit(1, lambda: None)
+
+        assert accepted is False
+        assert reason == JobQueue.REJECTED_CHAT_LIMIT
+        # Alt chat este încă acceptat
+        assert job_queue.submit(2, lambda: None)[0] is True
+
+        release.set()
+
+    def test_queue_full_backpressure(self):
+        """Test respingerea job-urilor când coada este plină"""
+        queue = JobQueue(num_workers=1, max_queue_size=2, max_per_chat=5)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking_job():
+            started.set()
+            release.wait(timeout=2)
+
+        queue.submit(1, blocking_job)
+        assert started.wait(timeout=2)
+        queue.submit(2, lambda: None)
+        queue.submit(3, lambda: None)
+        accepted, reason = queue.submit(4, lambda: None)
+
+        assert accepted is False
+        assert reason == JobQueue.REJECTED_QUEUE_FULL
+        assert queue.get_stats()['rejected_queue_full'] == 1
+
+        release.set()
+        queue.stop(timeout=1)
+
+    def test_round_robin_between_chats(self, job_queue):
+        """Test fairness: job-urile sunt servite alternativ între chat-uri"""
+        release = threading.Event()
+        started = threading.Event()
+        order = []
+
+        def blocking_job():
+            started.set()
+            release.wait(timeout=2)
+
+        job_queue.submit(0, blocking_job)
+        assert started.wait(timeout=2)
+
+        job_queue.submit('a', order.append, 'a1')
+        job_queue.submit('a', order.append, 'a2')
+        job_queue.submit('b', order.append, 'b1')
+
+        release.set()
+        deadline = time.time() + 2
+        while len(order) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert order == ['a1', 'b1', 'a2']
+
+    def test_wait_time_stats(self, job_queue):
+        """Test statisticile timpului de așteptare și ale job-urilor eșuate"""
+        def failing_job():
+            raise ValueError("boom")
+
+        job_queue.submit(1, failing_job)
+        job_queue.submit(2, lambda: None)
+
+        deadline = time.time() + 2
+        while job_queue.get_stats()['completed'] + job_queue.get_stats()['failed'] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        stats = job_queue.get_stats()
+        assert stats['submitted'] == 2
+        assert stats['completed'] == 1
+        assert stats['failed'] == 1
+        assert stats['depth'] == 0
+        assert stats['wait_time_ms']['count'] == 2
+        assert stats['wait_time_ms']['total'] >= stats['wait_time_ms']['max']
+        assert stats['chats_active'] == 0
+        assert stats['wait_time_ms']['max'] >= stats['wait_time_ms']['avg'] >= 0
+
+        job_queue.reset_stats()
+        assert job_queue.get_stats()['wait_time_ms']['count'] == 0
@@ -0,0 +1,157 @@
+# tests/test_json_scanner.py - Unit tests for the single-pass script JSON scanner
+# Versiunea: 1.0.0
+
+import pytest
+import json
+import re
+import time
+import tracemalloc
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.extraction.json_scanner import extract_script_json, find_string_values, iter_script_json
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'html')
+
+MEDIA_KEYS = ['url', 'src', 'video_url', 'media_url', 'download_url']
+THUMBNAIL_KEYS = ['thumbnail', 'thumb', 'poster', 'image', 'cover']
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def is_media_url(url: str) -> bool:
+    """Aceeași euristică ca ContentExtractor._is_media_url"""
+    indicators = ['.mp4', '.webm', '.mov', '.m4a', 'video', 'media', 'stream', 'download']
+    return url.startswith(('http://', 'https://')) and any(i in url.lower() for i in indicators)
+
+
+def is_image_url(url: str) -> bool:
+    return url.startswith(('http://', 'https://')) and url.lower().endswith(('.jpg', '.jpeg', '.png', '.webp'))
+
+
+def legacy_extract_json(html_content: str) -> dict:
+    """Implementarea anterioară din ContentExtractor (regex-uri DOTALL), pentru comparație"""
+    json_data = {}
+    script_patterns = [
+        r'<script[^>]*>\s*window\.__INITIAL_STATE__\s*=\s*({.+?});',
+        r'<script[^>]*>\s*window\.__APOLLO_STATE__\s*=\s*({.+?});',
+        r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>\s*({.+?})\s*</script>',
+        r'<script[^>]*>\s*var\s+\w+\s*=\s*({.+?});'
+    ]
+    for pattern in script_patterns:
+        for match in re.findall(pattern, html_content, re.DOTALL | re.IGNORECASE):
+            try:
+                json_data.update(json.loads(match))
+            except json.JSONDecodeError:
+                continue
+    return json_data
+
+
+def pad_page(html_content: str, target_bytes: int, state_items: int = 0) -> str:
+    """
+    Umflă o pagină salvată până la dimensiunea unei pagini reale (multi-MB):
+    markup/scripturi de umplutură plus, opțional, un blob de stare mare.
+    """
+    if state_items:
+        feed = [{'id': i, 'caption': 'golden hour', 'likes': i,
+                 'video_url': f'https://scontent.cdninstagram.com/v/{i}.mp4'} for i in range(state_items)]
+        state = '<script>window.__APOLLO_STATE__ = ' + json.dumps({'feed': feed}) + ';</script>\n'
+        html_content = html_content.replace('</head>', state + '</head>', 1)
+    filler_script = '<script>requireLazy(["Bootloader"], function (b) { b.markComponentsAsImmediate(["x"]); });</script>\n'
+    filler_markup = '<div class="x1n2onr6"><span dir="auto">' + 'lorem ipsum { dolor } ' * 20 + '</span></div>\n'
+    block = filler_script + filler_markup
+    repeats = max(1, target_bytes // len(block))
+    return html_content.replace('<body>', '<body>\n' + block * repeats, 1)
+
+
+class TestScriptJsonScanner:
+    """Test suite pentru scanarea script tags"""
+
+    def test_tiktok_fixture(self):
+        """Test rehydration JSON + ld+json (listă) din pagina TikTok"""
+        data = extract_script_json(load_fixture('tiktok_video.html'))
+
+        item = data['__DEFAULT_SCOPE__']['webapp.video-detail']['itemInfo']['itemStruct']
+        assert item['desc'] == 'Dance challenge }; #fyp <3'
+        assert data['name'] == 'Dance challenge'
+        assert data['page'] == 'video'  # var tracking = {...}
+
+        media = find_string_values(data, MEDIA_KEYS, is_media_url)
+        assert sorted(media) == [
+            'https://v16-webapp.tiktok.com/video/tos/7301/480p.mp4?mime_type=video_mp4',
+            'https://v16-webapp.tiktok.com/video/tos/7301/720p.mp4?mime_type=video_mp4',
+            'https://v16-webapp.tiktok.com/video/tos/7301/download.mp4',
+        ]
+        thumbnails = find_string_values(data, THUMBNAIL_KEYS, is_image_url)
+        assert sorted(thumbnails) == ['https://p16-sign.tiktokcdn.com/obj/cover-7301.jpeg',
+                                      'https://p16-sign.tiktokcdn.com/obj/thumb-7301.jpg']
+
+    def test_instagram_fixture(self):
+        """Test data-sjs JSON și window.__INITIAL_STATE__ cu '};' în interiorul unui string"""
+        html_content = load_fixture('instagram_reel.html')
+        data = extract_script_json(html_content)
+
+        assert data['caption'] == 'golden hour }; still inside a string'
+        media = find_string_values(data, MEDIA_KEYS, is_media_url)
+        assert media == [
+            'https://scontent.cdninstagram.com/v/t50.2886-16/reel_720.mp4',
+            'https://scontent.cdninstagram.com/v/t50.2886-16/reel_480.mp4',
+        ]
+        # Regex-ul leneș vechi tăia obiectul la primul '};' din string
+        assert 'caption' not in legacy_extract_json(html_content)
+
+    def test_ignores_non_json_scripts_and_invalid_payloads(self):
+        """Test că scripturile fără marker sau cu JSON invalid sunt sărite"""
+        html_content = (
+            '<script src="app.js"></script>'
+            '<script>console.log({"a": 1});</script>'
+            '<script type="application/json">{broken</script>'
+            '<SCRIPT TYPE="application/ld+json">{"ok": true}</SCRIPT>'
+        )
+        assert list(iter_script_json(html_content)) == [{'ok': True}]
+
+    def test_walker_handles_deep_nesting(self):
+        """Test că parcurgerea iterativă nu atinge limita de recursivitate"""
+        data = {'url': 'https://cdn.example.com/top.mp4'}
+        for _ in range(sys.getrecursionlimit() * 2):
+            data = {'child': [data]}
+        assert find_string_values(data, MEDIA_KEYS, is_media_url) == ['https://cdn.example.com/top.mp4']
+
+
+@pytest.mark.slow
+class TestScannerBenchmark:
+    """Benchmark: regex-urile DOTALL vechi vs scanner-ul într-o singură trecere"""
+
+    @pytest.mark.parametrize('fixture', ['tiktok_video.html', 'instagram_reel.html'])
+    def test_scanner_vs_regex_on_multi_mb_page(self, fixture):
+        html_content = pad_page(load_fixture(fixture), 3 * 1024 * 1024, state_items=20000)
+        rounds = 3
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            legacy_extract_json(html_content)
+        legacy_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            data = extract_script_json(html_content)
+        scanner_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        peaks = []
+        for implementation in (legacy_extract_json, extract_script_json):
+            tracemalloc.start()
+            implementation(html_content)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+            tracemalloc.stop()
+
+        print(f"\n{fixture} ({len(html_content) / 1024 / 1024:.1f}MB): "
+              f"regex {legacy_ms:.1f}ms / {peaks[0]:.1f}MB peak, "
+              f"scanner {scanner_ms:.1f}ms / {peaks[1]:.1f}MB peak")
+        assert len(data['feed']) == 20000
+        assert len(find_string_values(data, MEDIA_KEYS, is_media_url)) > 20000
@@ -0,0 +1,180 @@
+# tests/test_log_writer.py - Unit tests for Log Writer
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.log_writer import RotatingJsonlWriter
+from utils.activity_logger import ActivityLogger, ActivityType
+
+
+def read_jsonl(path):
+    """Înregistrările dintr-un fișier JSONL, comprimat sau nu"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestRotatingJsonlWriter:
+    """Test suite pentru RotatingJsonlWriter"""
+
+    @pytest.fixture
+    def writer(self, tmp_path):
+        """Writer fără rotație, cu interval lung (scrierea se face la flush)"""
+        writer = RotatingJsonlWriter(tmp_path / "activity.jsonl", flush_interval=30.0, max_bytes=0)
+        yield writer
+        writer.close()
+
+    def test_batches_into_single_write(self, writer):
+        """Test că intrările din coadă sunt scrise ca un singur lot"""
+        for i in range(50):
+            writer.append({'timestamp': time.time(), 'seq': i})
+        assert not writer.path.exists() or writer.path.stat().st_size == 0
+
+        assert writer.flush(timeout=5)
+        assert [r['seq'] for r in read_jsonl(writer.path)] == list(range(50))
+        stats = writer.get_stats()
+        assert stats['written'] == 50
+        assert stats['batches'] == 1
+
+    def test_size_rotation_with_gzip(self, tmp_path):
+        """Test rotația după mărime, compresia și numărul de segmente păstrate"""
+        writer = RotatingJsonlWriter(tmp_path / "activity.jsonl", flush_interval=30.0,
+                                     max_bytes=300, backup_count=2, compress=True)
+        try:
+            for i in range(6):
+                for j in range(5):
+                    writer.append({'timestamp': 1700000000 + i * 60 + j, 'seq': i * 5 + j})
+                writer.flush()
+
+            segments = writer.segments()
+            assert len(segments) == 2
+            assert all(path.name.endswith('.jsonl.gz') for _, path in segments)
+            assert segments[0][0] < segments[1][0]
+            assert writer.get_stats()['removed_segments'] >= 1
+
+            # Segmentele păstrate + fișierul activ conțin ultimele înregistrări, în ordine
+            records = [r for _, path in segments for r in read_jsonl(path)] + read_jsonl(writer.path)
+            seqs = [r['seq'] for r in records]
+            assert seqs == sorted(seqs) and seqs[-1] == 29
+        finally:
+            writer.close()
+
+    def test_segment_named_after_first_record(self, tmp_path):
+        """Test că numele segmentului rotit conține momentul primei înregistrări"""
+        writer = RotatingJsonlWriter(tmp_path / "activity.jsonl", flush_interval=30.0,
+                                     max_bytes=0, rotate_interval=3600, compress=False)
+        try:
+            first = time.time() - 7200
+            writer.append({'timestamp': first, 'seq': 0})
+            writer.flush()
+            writer.append({'timestamp': time.time(), 'seq': 1})
+            writer.flush()
+
+            (start, path), = writer.segments()
+            assert start == int(first)
+            assert path.name == f"activity.{datetime.fromtimestamp(first).strftime('%Y%m%d-%H%M%S')}.jsonl"
+            assert read_jsonl(writer.path)[0]['seq'] == 1
+        finally:
+            writer.close()
+
+    def test_existing_file_keeps_segment_start(self, tmp_path):
+        """Test că la repornire vechimea segmentului activ se citește din prima linie"""
+        path = tmp_path / "activity.jsonl"
+        path.write_text(json.dumps({'timestamp': time.time() - 7200, 'seq': 0}) + '\n', encoding='utf-8')
+
+        writer = RotatingJsonlWriter(path, flush_interval=30.0, max_bytes=0, rotate_interval=3600)
+        try:
+            writer.append({'timestamp': time.time(), 'seq': 1})
+            writer.flush()
+            assert writer.get_stats()['rotations'] == 1
+            assert len(writer.segments()) == 1
+        finally:
+            writer.close()
+
+    def test_serializer_errors_do_not_stop_batch(self, writer):
+        """Test că o înregistrare neserializabilă nu pierde restul lotului"""
+        writer.serializer = lambda record: json.dumps(record, allow_nan=False)
+        writer.append({'seq': 1})
+        writer.append({'seq': float('nan')})
+        writer.append({'seq': 3})
+        writer.flush()
+        assert [r['seq'] for r in read_jsonl(writer.path)] == [1, 3]
+        assert writer.get_stats()['errors'] == 1
+
+
+class TestActivityLoggerWriter:
+    """Test suite pentru scrierea în background a ActivityLogger"""
+
+    @pytest.fixture
+    def activity(self, tmp_path):
+        """ActivityLogger cu fișier temporar"""
+        activity = ActivityLogger(log_file_path=str(tmp_path / "logs" / "bot_activity.jsonl"))
+        yield activity
+        activity.close()
+
+    @pytest.mark.asyncio
+    async def test_log_activity_does_no_io_on_event_loop(self, activity, monkeypatch):
+        """Test că log_activity din event loop nu deschide fișiere"""
+        import builtins
+        opened = []
+        real_open = builtins.open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(args[0])
+            return real_open(*args, **kwargs)
+
+        activity.writer.flush_interval = 30.0
+        monkeypatch.setattr(builtins, 'open', tracking_open)
+        activity.log_download_success('tiktok', 'https://vm.tiktok.com/x/', 1200.0, 1, 1)
+        await asyncio.sleep(0)
+        monkeypatch.setattr(builtins, 'open', real_open)
+
+        assert opened == []
+        activity.flush()
+        record, = read_jsonl(activity.writer.path)
+        assert record['activity_type'] == ActivityType.DOWNLOAD_SUCCESS.value
+        assert record['platform'] == 'tiktok'
+
+
+@pytest.mark.slow
+class TestLogWriterBenchmark:
+    """Benchmark de debit: open/append/close per intrare vs writer în background"""
+
+    def test_entries_per_second(self, tmp_path):
+        count = 10000  # = max_logs implicit al ActivityLogger
+        source = ActivityLogger(log_file_path=str(tmp_path / "legacy" / "bot_activity.jsonl"))
+        for i in range(count):
+            source.log_activity(ActivityType.USER_MESSAGE, f"mesaj {i}", user_id=i % 50, platform='tiktok')
+        source.close()
+        entries = list(source.logs)
+
+        legacy_path = tmp_path / "legacy.jsonl"
+        start = time.perf_counter()
+        for entry in entries:
+            with open(legacy_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry.to_dict(), ensure_ascii=False) + '\n')
+        legacy_rate = count / (time.perf_counter() - start)
+
+        writer = RotatingJsonlWriter(tmp_path / "batched.jsonl", serializer=ActivityLogger._serialize_entry)
+        start = time.perf_counter()
+        for entry in entries:
+            writer.append(entry)
+        append_rate = count / (time.perf_counter() - start)
+        writer.flush(timeout=30)
+        batched_rate = count / (time.perf_counter() - start)
+        writer.close()
+
+        print(f"\nActivityLogger: open/append per intrare {legacy_rate:,.0f} intrări/s, "
+              f"writer în background {batched_rate:,.0f} intrări/s până pe disk "
+              f"(append pe apelant {append_rate:,.0f}/s, {writer.get_stats()['batches']} loturi)")
+        assert writer.get_stats()['written'] == count
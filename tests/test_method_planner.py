@@ -0,0 +1,100 @@
+# tests/test_method_planner.py - Unit tests for adaptive extraction method planning
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+from types import SimpleNamespace
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.extraction.method_planner import MethodPlanner, first_confident
+
+
+def make_result(success: bool, confidence: float = 0.0, error: str = None):
+    """Rezultat minimal cu interfața ExtractionResult folosită de cursă"""
+    return SimpleNamespace(success=success, confidence_score=confidence, error_message=error)
+
+
+async def delayed(delay: float, result=None, error: Exception = None):
+    await asyncio.sleep(delay)
+    if error:
+        raise error
+    return result
+
+
+class TestMethodPlanner:
+    """Test suite pentru MethodPlanner"""
+
+    def test_orders_by_success_then_latency(self):
+        """Test că metodele reușite și rapide sunt planificate primele"""
+        planner = MethodPlanner(min_samples=3)
+        for _ in range(3):
+            planner.record('tiktok', 'regex', 0.5, True)
+            planner.record('tiktok', 'html', 0.1, True)
+            planner.record('tiktok', 'metadata', 0.05, False)
+            planner.record('tiktok', 'metadata', 0.05, True)
+
+        assert planner.plan('tiktok', ['regex', 'metadata', 'html']) == ['html', 'regex', 'metadata']
+        # Platformă fără statistici: ordinea implicită
+        assert planner.plan('vimeo', ['regex', 'metadata', 'html']) == ['regex', 'metadata', 'html']
+
+    def test_skips_failing_method_and_reprobes(self):
+        """Test că o metodă care eșuează constant este sărită, cu re-probare periodică"""
+        planner = MethodPlanner(min_samples=5, skip_below=0.1, probe_every=3)
+        for _ in range(5):
+            planner.record('instagram', 'api', 0.01, False)
+            planner.record('instagram', 'html', 0.2, True)
+
+        plans = [planner.plan('instagram', ['api', 'html']) for _ in range(3)]
+        assert plans == [['html'], ['html'], ['html', 'api']]
+        assert planner.get_stats()['instagram']['api']['skipped'] == 3
+
+    def test_never_skips_every_method(self):
+        """Test că dacă toate metodele ar fi sărite, sunt încercate toate"""
+        planner = MethodPlanner(min_samples=1, probe_every=100)
+        planner.record('reddit', 'api', 0.01, False)
+        assert planner.plan('reddit', ['api']) == ['api']
+
+
+class TestFirstConfident:
+    """Test suite pentru cursa primului rezultat de încredere"""
+
+    @pytest.mark.asyncio
+    async def test_failed_first_result_does_not_end_race(self):
+        """Test că un eșec rapid nu câștigă cursa (vechiul FIRST_COMPLETED)"""
+        slow = asyncio.create_task(delayed(0.3, make_result(True, 0.9)))
+        tasks = [
+            asyncio.create_task(delayed(0.01, make_result(False, error="not found"))),
+            asyncio.create_task(delayed(0.02, error=RuntimeError("boom"))),
+            asyncio.create_task(delayed(0.05, make_result(True, 0.8))),
+            slow,
+        ]
+
+        best, errors = await first_confident(tasks, min_confidence=0.7, timeout=5)
+
+        assert best.confidence_score == 0.8
+        assert errors == ["not found", "boom"]
+        await asyncio.sleep(0)
+        assert slow.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_below_threshold_keeps_best(self):
+        """Test că fără rezultat peste prag se returnează cel mai bun reușit"""
+        tasks = [
+            asyncio.create_task(delayed(0.01, make_result(True, 0.3))),
+            asyncio.create_task(delayed(0.02, make_result(True, 0.6))),
+        ]
+        best, _ = await first_confident(tasks, min_confidence=0.7, timeout=5)
+        assert best.confidence_score == 0.6
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_pending(self):
+        """Test că la timeout task-urile rămase sunt anulate"""
+        task = asyncio.create_task(delayed(10, make_result(True, 1.0)))
+        best, errors = await first_confident([task], min_confidence=0.7, timeout=0.05)
+        assert best is None and errors == ["timeout"]
+        await asyncio.sleep(0)
+        assert task.cancelled()
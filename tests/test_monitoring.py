@@ -124,19 +124,65 @@ class TestMetricsCollector:
         assert collector.get_counter("complex", {"a": "1", "b": "2"}) == 2.0
         
     def test_histogram_size_limit(self, collector):
-        """Test limitarea dimensiunii histogram-ului"""
-        # Adaugă mai mult de 1000 de valori
+        """Test că histogram-ul are memorie fixă, dar count/min/max rămân exacte"""
         for i in range(1500):
             collector.record_histogram("large_histogram", i)
             
-        # Ar trebui să păstreze doar ultimele 1000
         key = collector._get_metric_key("large_histogram", None)
-        assert len(collector.histograms[key]) == 1000
-        
-        # Ultimele valori ar trebui să fie 500-1499
-        values = collector.histograms[key]
-        assert min(values) == 500
-        assert max(values) == 1499
+        histogram = collector.histograms[key]
+        assert len(histogram.bucket_counts) == len(histogram.bounds) + 1
+        
+        stats = collector.get_histogram_stats("large_histogram")
+        assert stats["count"] == 1500
+        assert stats["min"] == 0
+        assert stats["max"] == 1499
+        assert stats["mean"] == 749.5
+        
+    def test_histogram_percentiles_estimate(self, collector):
+        """Test percentilele estimate din bucket-uri"""
+        for i in range(1, 1001):
+            collector.record_histogram("latency_ms", i)
+            
+        stats = collector.get_histogram_stats("latency_ms")
+        assert stats["p50"] == pytest.approx(500, rel=0.05)
+        assert stats["p99"] == pytest.approx(990, rel=0.05)
+        assert stats["min"] <= stats["p50"] <= stats["p90"] <= stats["p95"] <= stats["p99"] <= stats["max"]
+        
+        collector.record_histogram("single", 7.5)
+        assert collector.get_histogram_stats("single")["p50"] == 7.5
+        
+    def test_export_prometheus(self, collector):
+        """Test formatul text Prometheus: TYPE, label-uri escapate, bucket-uri cumulative"""
+        collector.increment_counter("downloads", 3, labels={"platform": "tiktok"})
+        collector.set_gauge("queue.depth", 2)
+        collector.set_histogram_buckets("size", [1, 10])
+        for value in (0.5, 5, 50):
+            collector.record_histogram("size", value, labels={"path": 'a"b\\c\nd'})
+        collector.record_timer("download_duration", 120)
+        
+        text = collector.export_prometheus()
+        lines = text.splitlines()
+        
+        assert "# TYPE downloads counter" in lines
+        assert 'downloads{platform="tiktok"} 3' in lines
+        assert "# TYPE queue_depth gauge" in lines
+        assert "queue_depth 2" in lines
+        assert "# TYPE size histogram" in lines
+        assert 'size_bucket{path="a\\"b\\\\c\\nd",le="1"} 1' in lines
+        assert 'size_bucket{path="a\\"b\\\\c\\nd",le="10"} 2' in lines
+        assert 'size_bucket{path="a\\"b\\\\c\\nd",le="+Inf"} 3' in lines
+        assert 'size_count{path="a\\"b\\\\c\\nd"} 3' in lines
+        assert "# TYPE download_duration_ms histogram" in lines
+        assert "download_duration_ms_sum 120" in lines
+        assert text.endswith("\n")
+        
+    def test_export_uses_label_registry(self, collector):
+        """Test că valorile label-urilor cu '=' sau ',' nu sunt stricate la export"""
+        collector.record_timer("op", 5, labels={"url": "https://x.com/a?b=1,c=2"})
+        assert collector.series[collector._get_metric_key("op", {"url": "https://x.com/a?b=1,c=2"})] == (
+            "op", (("url", "https://x.com/a?b=1,c=2"),)
+        )
+        assert 'op_ms_count{url="https://x.com/a?b=1,c=2"} 1' in collector.export_prometheus()
 
 
 class TestAlertManager:
@@ -453,6 +499,20 @@ class TestMonitoringSystem:
         assert cache_events == 2
         assert cache_hits == 1
         assert cache_misses == 1
+
+    def test_record_cache_event_latency(self, monitoring_system):
+        """Test histograma de latență per tier pentru evenimentele de cache"""
+        monitoring_system.record_cache_event("get", hit=True, tier="memory", duration_ms=0.01)
+        monitoring_system.record_cache_event("get", hit=False, tier="disk", duration_ms=2.5)
+        monitoring_system.record_cache_event("put", hit=None, tier="disk", duration_ms=4.0)
+
+        disk_get = monitoring_system.metrics.get_histogram_stats("cache_latency_ms", {"event_type": "get", "tier": "disk"})
+        assert disk_get["count"] == 1
+        assert disk_get["max"] == 2.5
+
+        # Scrierile nu sunt contorizate ca hit/miss
+        assert monitoring_system.metrics.get_counter("cache_events", {"event_type": "put"}) == 1
+        assert monitoring_system.metrics.get_counter("cache_misses", {"event_type": "put"}) == 0
         
     def test_operation_tracing(self, monitoring_system):
         """Test urmărirea operațiunilor"""
@@ -533,6 +593,18 @@ class TestMonitoringSystem:
         import json
         parsed = json.loads(json_export)
         assert "timestamp" in parsed
+        
+    def test_export_metrics_prometheus(self, monitoring_system):
+        """Test exportul în format Prometheus"""
+        monitoring_system.metrics.record_timer("operation_download", 250, labels={"platform": "tiktok"})
+        
+        text = monitoring_system.export_metrics("prometheus")
+        
+        assert 'operation_download_ms_count{platform="tiktok"} 1' in text
+        assert "# TYPE active_alerts gauge" in text
+        
+        export_data = monitoring_system.export_metrics("dict")
+        assert export_data["timers"]["operation_download[platform=tiktok]"]["count"] == 1
 
 
 class TestTraceContext:
@@ -669,5 +741,38 @@ class TestMonitoringIntegration:
                 system.stop()
 
 
+@pytest.mark.slow
+class TestHistogramBenchmark:
+    """Micro-benchmark: înregistrare + statistici, listă sortată la fiecare citire vs bucket-uri fixe"""
+    
+    def test_record_and_stats_cost(self):
+        import random
+        rng = random.Random(5)
+        values = [rng.lognormvariate(5, 1) for _ in range(50000)]
+        
+        legacy = {}
+        start = time.perf_counter()
+        for i, value in enumerate(values):
+            samples = legacy.setdefault("latency", [])
+            samples.append(value)
+            legacy["latency"] = samples[-1000:]
+            if i % 100 == 0:
+                ordered = sorted(legacy["latency"])
+                ordered[int(len(ordered) * 0.99)]
+        legacy_us = (time.perf_counter() - start) * 1e6 / len(values)
+        
+        collector = MetricsCollector()
+        start = time.perf_counter()
+        for i, value in enumerate(values):
+            collector.record_histogram("latency", value)
+            if i % 100 == 0:
+                collector.get_histogram_stats("latency")
+        streaming_us = (time.perf_counter() - start) * 1e6 / len(values)
+        
+        print(f"\nHistogram (1 citire la 100 de valori): listă {legacy_us:.2f}µs/valoare, "
+              f"bucket-uri {streaming_us:.2f}µs/valoare")
+        assert collector.get_histogram_stats("latency")["count"] == len(values)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -142,6 +142,8 @@ class TestPlatformManager:
              patch('core.platform_manager.monitoring') as mock_monitoring:
             mock_cache.get = AsyncMock(return_value=None)
             mock_cache.set = AsyncMock()
+            mock_cache.aget = AsyncMock(return_value=None)
+            mock_cache.aput = AsyncMock()
             mock_monitoring.record_metric = Mock()
             
             # Test URL care match-uiește
@@ -164,6 +166,8 @@ class TestPlatformManager:
              patch('core.platform_manager.monitoring') as mock_monitoring:
             mock_cache.get = AsyncMock(return_value=None)
             mock_cache.set = AsyncMock()
+            mock_cache.aget = AsyncMock(return_value=None)
+            mock_cache.aput = AsyncMock()
             mock_monitoring.record_metric = Mock()
             
             # Extrage video info mai întâi
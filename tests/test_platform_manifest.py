@@ -0,0 +1,144 @@
+# tests/test_platform_manifest.py - Unit tests for Platform Manifest and lazy loading
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import subprocess
+import textwrap
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from platforms.manifest import PLATFORM_MANIFEST, PLATFORM_PRIORITIES, MANIFEST_MODULES, PlatformSpec
+from utils.import_profiler import ImportProfiler
+from utils.platform_router import DomainRouter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> str:
+    """Rulează cod într-un interpretor nou (sys.modules curat)"""
+    result = subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(code)],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+class TestPlatformManifest:
+    """Test suite pentru manifestul platformelor"""
+
+    def test_manifest_modules_exist(self):
+        """Test că fiecare intrare indică un fișier existent din platforms/"""
+        for spec in PLATFORM_MANIFEST:
+            assert os.path.exists(os.path.join(ROOT_DIR, 'platforms', f'{spec.module}.py')), spec.module
+        assert MANIFEST_MODULES >= {spec.module for spec in PLATFORM_MANIFEST}
+
+    def test_manifest_routes_platform_urls(self):
+        """Test că domeniile din manifest rutează URL-urile fără a importa platformele"""
+        router = DomainRouter({spec.name: spec.domains for spec in PLATFORM_MANIFEST})
+        assert router.route("https://vm.tiktok.com/ZMabc/") == 'tiktok'
+        assert router.route("https://www.instagram.com/reel/Cabc/") == 'instagram'
+        assert router.route("https://youtu.be/abc") == 'youtube'
+        assert router.route("https://v.redd.it/abc") == 'reddit'
+        assert PLATFORM_PRIORITIES['youtube'] < PLATFORM_PRIORITIES['dailymotion']
+
+    def test_platforms_package_import_is_lazy(self):
+        """Test că importul pachetului platforms nu importă modulele platformelor"""
+        output = run_python("""
+            import sys
+            import platforms
+            from platforms.base import BasePlatform
+            print(any(name.startswith('platforms.') and name.split('.')[1] not in ('base', 'manifest')
+                      for name in sys.modules), 'yt_dlp' in sys.modules)
+        """)
+        assert output == "False False"
+
+
+class FakeSpec(PlatformSpec):
+    """Intrare de manifest care numără importurile în loc să importe un modul"""
+
+    loads = 0
+
+    def load_class(self):
+        type(self).loads += 1
+        from tests.test_platform_manager import MockPlatform
+
+        class FakePlatform(MockPlatform):
+            def __init__(self):
+                super().__init__(name='fake')
+
+        return FakePlatform
+
+
+class TestLazyPlatformLoading:
+    """Test suite pentru încărcarea leneșă în PlatformManager"""
+
+    @pytest.fixture
+    def manager(self):
+        from core.platform_manager import PlatformManager
+        manager = PlatformManager()
+        FakeSpec.loads = 0
+        manager.platform_specs['fake'] = FakeSpec('fake', 'fake', 'FakePlatform', ('fake.com',), priority=3)
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_imports_once(self, manager):
+        """Test că cererile simultane pentru aceeași platformă așteaptă un singur import"""
+        results = await asyncio.gather(*(manager.ensure_platform('fake') for _ in range(5)))
+
+        assert FakeSpec.loads == 1
+        assert all(result is results[0] for result in results)
+        assert 'fake' in manager.platforms and 'fake' not in manager.platform_specs
+        assert manager.platform_priorities['fake'] == 3
+        assert 'fake' in manager.rate_limiters
+        assert 'fake' in manager.get_manager_stats()['platform_load_ms']
+
+    @pytest.mark.asyncio
+    async def test_registered_platforms_are_supported_before_import(self, manager):
+        """Test că platformele din manifest apar ca suportate înainte de import"""
+        assert 'fake' in manager.get_supported_platforms()
+        assert manager.get_manager_stats()['platforms_registered'] == 1
+        assert await manager.ensure_platform('missing') is None
+
+
+class TestImportProfiler:
+    """Test suite pentru profilarea timpului de import"""
+
+    def test_records_self_and_cumulative_time(self, tmp_path, monkeypatch):
+        """Test timpul propriu vs cumulativ pentru importuri imbricate"""
+        (tmp_path / 'prof_outer.py').write_text("import time\nimport prof_inner\ntime.sleep(0.02)\n")
+        (tmp_path / 'prof_inner.py').write_text("import time\ntime.sleep(0.05)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        profiler = ImportProfiler().install()
+        try:
+            import prof_outer  # noqa: F401
+        finally:
+            profiler.uninstall()
+            sys.modules.pop('prof_outer', None)
+            sys.modules.pop('prof_inner', None)
+
+        outer = profiler.records['prof_outer']
+        inner = profiler.records['prof_inner']
+        assert inner['cumulative_ms'] >= 50
+        assert outer['cumulative_ms'] >= outer['self_ms'] + inner['cumulative_ms'] - 1
+        assert outer['self_ms'] < inner['self_ms']
+        assert profiler.get_report(top=1)['top'][0]['module'] == 'prof_outer'
+        assert 'prof_inner' in profiler.format_report()
+
+    def test_env_flag_controls_install(self, monkeypatch):
+        """Test că profiler-ul e instalat doar cu IMPORT_PROFILE activ"""
+        monkeypatch.setenv('IMPORT_PROFILE', '0')
+        assert not ImportProfiler().install_from_env().enabled
+
+        monkeypatch.setenv('IMPORT_PROFILE', '1')
+        profiler = ImportProfiler().install_from_env()
+        try:
+            assert profiler.enabled and profiler in sys.meta_path
+        finally:
+            profiler.uninstall()
+        assert profiler not in sys.meta_path
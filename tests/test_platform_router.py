@@ -0,0 +1,133 @@
+# tests/test_platform_router.py - Unit tests for Platform Router
+# Versiunea: 1.0.0
+
+import pytest
+import time
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.platform_router import DomainRouter, DEFAULT_PLATFORM_DOMAINS, extract_host
+
+SAMPLE_URLS = [
+    "https://www.tiktok.com/@user/video/7234567890123456789",
+    "https://vm.tiktok.com/ZMabc123/",
+    "https://www.instagram.com/reel/Cabc123/",
+    "https://www.facebook.com/watch?v=123456789",
+    "https://fb.watch/abc123/",
+    "https://x.com/user/status/1234567890",
+    "https://www.threads.net/@user/post/abc",
+    "https://pin.it/abc123",
+    "https://old.reddit.com/r/videos/comments/abc/title/",
+    "https://player.vimeo.com/video/123456",
+    "https://www.dailymotion.com/video/x8abc12",
+    "https://example.com/video.mp4",
+]
+
+
+def legacy_substring_route(url: str) -> str:
+    """Lanțul de verificări pe substring înlocuit de router (referință pentru benchmark)"""
+    url_lower = url.lower()
+    if any(pattern in url_lower for pattern in ['tiktok.com', 'vm.tiktok.com', 'vt.tiktok.com']):
+        return 'tiktok'
+    elif any(pattern in url_lower for pattern in ['instagram.com', 'instagr.am', 'ig.me']):
+        return 'instagram'
+    elif any(pattern in url_lower for pattern in ['facebook.com', 'fb.watch', 'm.facebook.com']):
+        return 'facebook'
+    elif any(pattern in url_lower for pattern in ['twitter.com', 'x.com', 't.co']):
+        return 'twitter'
+    elif 'threads.net' in url_lower:
+        return 'threads'
+    elif any(pattern in url_lower for pattern in ['pinterest.com', 'pin.it']):
+        return 'pinterest'
+    elif any(pattern in url_lower for pattern in ['reddit.com', 'redd.it']):
+        return 'reddit'
+    elif 'vimeo.com' in url_lower:
+        return 'vimeo'
+    elif any(pattern in url_lower for pattern in ['dailymotion.com', 'dai.ly']):
+        return 'dailymotion'
+    elif 'soundcloud.com' in url_lower:
+        return 'soundcloud'
+    return 'unknown'
+
+
+class TestDomainRouter:
+    """Test suite pentru DomainRouter"""
+
+    @pytest.fixture
+    def router(self):
+        """Router nou cu domeniile implicite"""
+        return DomainRouter(DEFAULT_PLATFORM_DOMAINS)
+
+    def test_extract_host(self):
+        """Test parsarea host-ului"""
+        assert extract_host("HTTPS://User@WWW.TikTok.com:443/@a/video/1") == "www.tiktok.com"
+        assert extract_host("tiktok.com/@a/video/1") == "tiktok.com"
+        assert extract_host("https://[invalid") is None
+        assert extract_host("") is None
+
+    def test_routes_subdomains_by_suffix(self, router):
+        """Test rutarea subdomeniilor și a URL-urilor fără schemă"""
+        assert router.route("https://vm.tiktok.com/ZMabc/") == 'tiktok'
+        assert router.route("https://m.facebook.com/watch?v=1") == 'facebook'
+        assert router.route("player.vimeo.com/video/1") == 'vimeo'
+        assert router.route("https://x.com/u/status/1") == 'twitter'
+        assert router.route("https://example.com/video.mp4") is None
+
+    def test_no_false_substring_matches(self, router):
+        """Test că domeniile care doar conțin un domeniu suportat nu sunt rutate"""
+        assert router.route("https://dropbox.com/s/abc/x.com.mp4") is None
+        assert router.route("https://notinstagram.com/p/abc") is None
+        assert router.route("https://tiktok.com.evil.example/video") is None
+
+    def test_priority_and_restriction(self, router):
+        """Test ordinea candidaților după prioritate și filtrarea platformelor"""
+        router.register('youtube_new', ['www.youtube.com'], priority=1)
+        router.register('youtube', ['youtube.com'], priority=5)
+
+        assert router.candidates("https://youtube.com/watch?v=1") == ('youtube_new', 'youtube')
+        assert router.route("https://youtube.com/watch?v=1", platforms={'youtube'}) == 'youtube'
+        assert router.has_platform('youtube_new')
+
+    def test_find_in_text(self, router):
+        """Test găsirea primului link suportat într-un mesaj"""
+        text = "uite asta (https://www.instagram.com/reel/Cabc/) și https://youtu.be/abc"
+        assert router.find_in_text(text) == ('instagram', 'https://www.instagram.com/reel/Cabc/')
+        assert router.find_in_text("https://youtu.be/abc", platforms={'tiktok'}) is None
+        assert router.find_in_text("salut, ce faci?") is None
+
+    def test_matches_legacy_routing(self, router):
+        """Test că rezultatele coincid cu lanțul vechi, cu excepția potrivirilor false ale acestuia"""
+        for url in SAMPLE_URLS:
+            expected = legacy_substring_route(url)
+            if url.startswith("https://old.reddit.com"):
+                # 't.co' apare în 'reddit.com': lanțul vechi îl trimitea la twitter
+                assert expected == 'twitter'
+                expected = 'reddit'
+            assert (router.route(url) or 'unknown') == expected
+
+
+@pytest.mark.slow
+class TestRouterBenchmark:
+    """Micro-benchmark: costul rutării per URL, index de domenii vs lanț de substring-uri"""
+
+    def test_routing_cost_per_url(self):
+        router = DomainRouter(DEFAULT_PLATFORM_DOMAINS)
+        rounds = 2000
+        urls = SAMPLE_URLS * rounds
+
+        start = time.perf_counter()
+        for url in urls:
+            legacy_substring_route(url)
+        legacy_us = (time.perf_counter() - start) * 1e6 / len(urls)
+
+        start = time.perf_counter()
+        for url in urls:
+            router.route(url)
+        router_us = (time.perf_counter() - start) * 1e6 / len(urls)
+
+        print(f"\nRutare per URL: substring {legacy_us:.2f}µs, index domenii {router_us:.2f}µs "
+              f"({router.get_stats()['domains']} domenii)")
+        assert router.get_stats()['lookups'] == len(urls)
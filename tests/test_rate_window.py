@@ -0,0 +1,170 @@
+# tests/test_rate_window.py - Unit tests for Rate Window
+# Versiunea: 1.0.0
+
+import pytest
+import random
+import time
+from collections import defaultdict, deque
+from unittest.mock import patch, AsyncMock
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.rate_limiter import RateWindow, SimpleRateLimiter
+
+
+class LegacyListRateLimiter:
+    """Implementarea veche (listă de timestamp-uri reconstruită la fiecare cerere), pentru benchmark"""
+
+    def __init__(self, max_requests: int, time_window: float):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.requests = defaultdict(list)
+
+    def is_allowed(self, user_id, now: float) -> bool:
+        user_requests = self.requests[user_id]
+        user_requests[:] = [t for t in user_requests if now - t < self.time_window]
+        if len(user_requests) >= self.max_requests:
+            return False
+        user_requests.append(now)
+        return True
+
+
+class TestRateWindow:
+    """Test suite pentru RateWindow"""
+
+    def test_burst_then_sustained_rate(self):
+        """Test rafala de `limit` cereri, apoi o cerere la fiecare window / limit"""
+        window = RateWindow(limit=5, window=60)
+        assert all(window.allow('u', now=1000.0) for _ in range(5))
+        assert window.allow('u', now=1000.0) is False
+        assert window.allow('u', now=1011.9) is False
+        assert window.allow('u', now=1012.0) is True
+        assert window.get_stats()['rejected'] == 2
+
+    def test_minimum_interval(self):
+        """Test limit=1: exact semantica „o cerere la N secunde”"""
+        window = RateWindow(limit=1, window=20)
+        assert window.allow(42, now=0.0)
+        assert not window.allow(42, now=19.9)
+        assert window.allow(42, now=20.0)
+        assert window.allow(43, now=5.0)
+
+    def test_reserve_paces_requests(self):
+        """Test că reserve întoarce întârzierea până la conformitate"""
+        window = RateWindow(limit=30, window=1.0)
+        delays = [window.reserve(now=0.0) for _ in range(32)]
+        assert delays[:30] == [0.0] * 30
+        assert delays[30] == pytest.approx(1 / 30)
+        assert delays[31] == pytest.approx(2 / 30)
+
+    def test_hit_estimates_requests_per_window(self):
+        """Test estimarea numărului de cereri din ultima fereastră"""
+        window = RateWindow(limit=30, window=60)
+        counts = [window.hit('ip', now=100.0) for _ in range(31)]
+        assert counts[-1] == 31
+        assert window.hit('ip', now=160.0) < 3
+
+    def test_remaining_and_reset(self):
+        """Test cererile rămase și timpul până la resetare"""
+        window = RateWindow(limit=4, window=8)
+        assert window.remaining('u', now=0.0) == 4
+        window.allow('u', now=0.0)
+        window.allow('u', now=0.0)
+        assert window.remaining('u', now=0.0) == 2
+        assert window.reset_after('u', now=0.0) == pytest.approx(4.0)
+        assert window.remaining('u', now=2.0) == 3
+        assert window.forget('u') and window.remaining('u', now=2.0) == 4
+
+    def test_memory_bounded_by_active_keys(self):
+        """Test că cheile expirate sunt eliminate și max_keys este respectat"""
+        window = RateWindow(limit=3, window=30)
+        for user in range(1000):
+            window.allow(user, now=0.0)
+        assert window.active_keys(now=5.0) == 1000
+        window.allow('late', now=11.0)
+        assert window.active_keys(now=11.0) == 1
+
+        capped = RateWindow(limit=3, window=30, max_keys=10)
+        for user in range(50):
+            capped.allow(user, now=float(user) / 100)
+        assert capped.get_stats()['evicted'] == 40
+
+
+class TestSimpleRateLimiterWindow:
+    """Test suite pentru SimpleRateLimiter peste RateWindow"""
+
+    def test_compatible_api(self):
+        """Test API-ul existent: is_allowed, rămase, resetare, curățare, statistici"""
+        limiter = SimpleRateLimiter(max_requests=3, time_window=60)
+        assert [limiter.is_allowed('u') for _ in range(4)] == [True, True, True, False]
+        assert limiter.get_remaining_requests('u') == 0
+        assert 0 < limiter.get_reset_time('u') <= 60
+        limiter.clear_user('u')
+        assert limiter.is_allowed('u')
+        assert limiter.get_stats()['active_users'] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_and_burst_allowance(self):
+        """Test constructorul și acquire folosite de PlatformManager"""
+        limiter = SimpleRateLimiter(max_requests=2, time_window=60.0, burst_allowance=1)
+        results = [await limiter.acquire('tiktok') for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_telegram_api_pacing(self):
+        """Test că TelegramAPI așteaptă doar peste limita de 30 req/s"""
+        from api.telegram_api import TelegramAPI
+
+        api = TelegramAPI("123:abc")
+        with patch('api.telegram_api.asyncio.sleep', new=AsyncMock()) as sleep:
+            for _ in range(31):
+                await api._check_rate_limit()
+        assert sleep.await_count == 1
+        assert api.stats.rate_limit_hits == 1
+
+
+@pytest.mark.slow
+class TestRateWindowBenchmark:
+    """Benchmark de încărcare: 10k utilizatori distincți, listă per utilizator vs GCRA"""
+
+    def test_load_10k_users(self):
+        users = 10000
+        requests_count = 100000
+        rng = random.Random(3)
+        # ~60s de trafic; jumătate din cereri vin de la 10 utilizatori foarte activi
+        events = [(rng.randrange(10) if rng.random() < 0.5 else rng.randrange(users), i * 0.0006)
+                  for i in range(requests_count)]
+
+        legacy = LegacyListRateLimiter(max_requests=5, time_window=60)
+        start = time.perf_counter()
+        legacy_allowed = sum(legacy.is_allowed(user, now) for user, now in events)
+        legacy_us = (time.perf_counter() - start) * 1e6 / requests_count
+
+        window = RateWindow(limit=5, window=60)
+        start = time.perf_counter()
+        window_allowed = sum(window.allow(user, now=now) for user, now in events)
+        window_us = (time.perf_counter() - start) * 1e6 / requests_count
+
+        # Contorul de cereri pe minut al SecurityMonitor: deque(maxlen=100) + list comprehension
+        history = defaultdict(lambda: deque(maxlen=100))
+        start = time.perf_counter()
+        for user, now in events:
+            history[user].append(now)
+            len([t for t in history[user] if now - t < 60])
+        history_us = (time.perf_counter() - start) * 1e6 / requests_count
+
+        counter = RateWindow(limit=30, window=60)
+        start = time.perf_counter()
+        for user, now in events:
+            counter.hit(user, now=now)
+        counter_us = (time.perf_counter() - start) * 1e6 / requests_count
+
+        end = events[-1][1] + 61
+        print(f"\n10k utilizatori, limitare: listă {legacy_us:.2f}µs/cerere, GCRA {window_us:.2f}µs/cerere; "
+              f"cereri/minut: deque {history_us:.2f}µs, GCRA {counter_us:.2f}µs; "
+              f"chei după fereastră: listă {len(legacy.requests)}, GCRA {window.active_keys(now=end)}")
+        assert window_allowed >= legacy_allowed * 0.95
+        assert window.active_keys(now=end) == 0
@@ -0,0 +1,318 @@
+# tests/test_segmented_downloader.py - Unit tests for the segmented (HTTP Range) downloader
+# Versiunea: 1.0.0
+
+import pytest
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# Import system under test
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.download.segmented_downloader import (
+    SegmentedDownloader, parse_content_range, plan_segments, preallocate
+)
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    """Server de fișiere media cu suport opțional pentru Range"""
+
+    protocol_version = 'HTTP/1.1'
+    payload = PAYLOAD
+    ranges = True
+    unknown_total = False       # Content-Range fără dimensiune totală (bytes 0-0/*)
+    chunk_delay = 0.0           # limitare per conexiune (ca un CDN)
+    fail_once_at = set()        # offset-uri de segment care eșuează la prima cerere
+    error_status = None         # răspunde cu această eroare și o pagină HTML (ex. URL CDN expirat)
+    requests_log = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        range_header = self.headers.get('Range')
+        type(self).requests_log.append(range_header)
+        if self.error_status:
+            body = b'<html>Access denied</html>'
+            self.send_response(self.error_status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        start, end = 0, len(self.payload) - 1
+        status = 200
+        if self.ranges and range_header:
+            first, _, last = range_header.replace('bytes=', '').partition('-')
+            start, end = int(first), int(last) if last else end
+            status = 206
+
+        body = self.payload[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes' if self.ranges else 'none')
+        if status == 206:
+            size = '*' if self.unknown_total else len(self.payload)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+
+        if start in self.fail_once_at and end > start:
+            type(self).fail_once_at = self.fail_once_at - {start}
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+
+        for offset in range(0, len(body), 64 * 1024):
+            self.wfile.write(body[offset:offset + 64 * 1024])
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+
+
+@pytest.fixture
+def media_server():
+    MediaHandler.ranges = True
+    MediaHandler.unknown_total = False
+    MediaHandler.chunk_delay = 0.0
+    MediaHandler.fail_once_at = set()
+    MediaHandler.error_status = None
+    MediaHandler.requests_log = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader():
+    return SegmentedDownloader(parts=4, min_segment_size=256 * 1024, max_retries=2)
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class TestSegmentPlanning:
+    """Test suite pentru împărțirea pe segmente"""
+
+    def test_segments_cover_file_exactly(self):
+        """Test că segmentele acoperă fișierul fără goluri sau suprapuneri"""
+        segments = plan_segments(10_000_003, parts=4, min_segment_size=1024)
+        assert len(segments) == 4
+        assert segments[0].start == 0 and segments[-1].end == 10_000_002
+        for previous, current in zip(segments, segments[1:]):
+            assert current.start == previous.end + 1
+        assert sum(segment.length for segment in segments) == 10_000_003
+
+    def test_small_files_use_fewer_segments(self):
+        """Test că fișierele mici nu sunt împărțite sub dimensiunea minimă"""
+        assert len(plan_segments(1500, parts=4, min_segment_size=1000)) == 1
+        assert len(plan_segments(2500, parts=4, min_segment_size=1000)) == 2
+
+    def test_parse_content_range(self):
+        assert parse_content_range('bytes 0-0/12345') == 12345
+        assert parse_content_range('bytes 0-0/*') is None
+        assert parse_content_range(None) is None
+
+    def test_preallocate_and_pwrite(self, tmp_path):
+        """Test că scrierile la offset ajung în fișierul prealocat"""
+        path = str(tmp_path / 'out.bin')
+        fd = preallocate(path, 10)
+        try:
+            os.pwrite(fd, b'world', 5)
+            os.pwrite(fd, b'hello', 0)
+        finally:
+            os.close(fd)
+        assert read(path) == b'helloworld'
+
+
+class TestSyncSegmentedDownload:
+    """Test suite pentru varianta sincronă (requests)"""
+
+    @pytest.fixture
+    def session(self):
+        requests = pytest.importorskip("requests")
+        with requests.Session() as session:
+            yield session
+
+    def test_segmented_download(self, media_server, downloader, session, tmp_path):
+        """Test descărcare pe 4 segmente, conținut identic"""
+        outcome = downloader.download_sync(session, media_server, str(tmp_path / 'v.mp4'))
+
+        assert outcome.segmented and outcome.segments == 4
+        assert outcome.content_type == 'video/mp4'
+        assert read(outcome.path) == PAYLOAD
+        assert MediaHandler.requests_log[0] == 'bytes=0-0'
+
+    def test_falls_back_to_single_stream(self, media_server, downloader, session, tmp_path):
+        """Test că fără Range răspunsul probei este folosit ca flux unic"""
+        MediaHandler.ranges = False
+        outcome = downloader.download_sync(session, media_server, str(tmp_path / 'v.mp4'))
+
+        assert not outcome.segmented
+        assert read(outcome.path) == PAYLOAD
+        assert len(MediaHandler.requests_log) == 1
+
+    def test_probe_without_total_is_not_the_file(self, media_server, downloader, session, tmp_path):
+        """Test că un 206 fără dimensiune totală duce la un GET complet, nu la un fișier de 1 byte"""
+        MediaHandler.unknown_total = True
+        outcome = downloader.download_sync(session, media_server, str(tmp_path / 'v.mp4'))
+
+        assert not outcome.segmented
+        assert read(outcome.path) == PAYLOAD
+        assert MediaHandler.requests_log == ['bytes=0-0', None]
+
+    def test_retries_only_failed_segment(self, media_server, downloader, session, tmp_path):
+        """Test că doar segmentul întrerupt este reluat, de la ultimul byte scris"""
+        segments = plan_segments(len(PAYLOAD), 4, 256 * 1024)
+        MediaHandler.fail_once_at = {segments[2].start}
+
+        outcome = downloader.download_sync(session, media_server, str(tmp_path / 'v.mp4'))
+
+        assert read(outcome.path) == PAYLOAD
+        assert outcome.retried_segments == 1
+        # probă + 4 segmente + reluarea segmentului 2 (doar restul lui)
+        assert len(MediaHandler.requests_log) == 6
+        resumed_from = int(MediaHandler.requests_log[-1].split('=')[1].split('-')[0])
+        assert segments[2].start < resumed_from <= segments[2].end
+
+    def test_error_status_raises_before_writing(self, media_server, downloader, session, tmp_path):
+        """Test că, cu raise_for_status, o eroare HTTP nu scrie pagina de eroare și nu repetă cererea"""
+        requests = pytest.importorskip("requests")
+        MediaHandler.error_status = 403
+        path = str(tmp_path / 'v.mp4')
+
+        with pytest.raises(requests.HTTPError):
+            downloader.download_sync(session, media_server, path, raise_for_status=True)
+
+        assert not os.path.exists(path)
+        assert MediaHandler.requests_log == ['bytes=0-0']
+
+
+class TestAsyncSegmentedDownload:
+    """Test suite pentru varianta async (aiohttp)"""
+
+    @pytest.mark.asyncio
+    async def test_segmented_and_fallback(self, media_server, downloader, tmp_path):
+        aiohttp = pytest.importorskip("aiohttp")
+        async with aiohttp.ClientSession() as session:
+            outcome = await downloader.download(session, media_server, str(tmp_path / 'a.mp4'))
+            assert outcome.segmented and read(outcome.path) == PAYLOAD
+
+            MediaHandler.ranges = False
+            outcome = await downloader.download(session, media_server, str(tmp_path / 'b.mp4'))
+            assert not outcome.segmented and read(outcome.path) == PAYLOAD
+
+    @pytest.mark.asyncio
+    async def test_progress_reports_all_bytes(self, media_server, downloader, tmp_path):
+        aiohttp = pytest.importorskip("aiohttp")
+        seen = []
+
+        async def progress(downloaded, total):
+            seen.append((downloaded, total))
+
+        async with aiohttp.ClientSession() as session:
+            await downloader.download(session, media_server, str(tmp_path / 'a.mp4'), progress=progress)
+        assert seen[-1] == (len(PAYLOAD), len(PAYLOAD))
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises_before_writing(self, media_server, downloader, tmp_path):
+        """Test că, cu raise_for_status, o eroare HTTP ridică ClientResponseError fără să scrie fișierul"""
+        aiohttp = pytest.importorskip("aiohttp")
+        MediaHandler.error_status = 403
+        path = str(tmp_path / 'a.mp4')
+
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(aiohttp.ClientResponseError) as error:
+                await downloader.download(session, media_server, path, raise_for_status=True)
+
+        assert error.value.status == 403
+        assert not os.path.exists(path)
+        assert MediaHandler.requests_log == ['bytes=0-0']
+
+
+class TestPlatformDownloads:
+    """Test suite pentru _download_file al platformelor (URL-uri CDN semnate)"""
+
+    async def start_cdn(self):
+        """CDN care setează un cookie pe redirect și îl cere pentru fiecare segment"""
+        from aiohttp import web
+
+        async def signed(request):
+            response = web.HTTPFound('/media.mp4')
+            response.set_cookie('cdn_token', 'ok')
+            raise response
+
+        async def media(request):
+            if request.cookies.get('cdn_token') != 'ok':
+                return web.Response(status=403, text='<html>Access denied</html>', content_type='text/html')
+            return web.Response(body=PAYLOAD, content_type='video/mp4')
+
+        app = web.Application()
+        app.router.add_get('/signed', signed)
+        app.router.add_get('/media.mp4', media)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('module_name, class_name', [
+        ('platforms.tiktok', 'TikTokPlatform'),
+        ('platforms.instagram', 'InstagramPlatform'),
+    ])
+    async def test_redirect_cookie_reaches_segments(self, tmp_path, module_name, class_name):
+        """Test că cookie-ul setat de redirect ajunge la cererile de segmente, iar o eroare nu scrie fișierul"""
+        aiohttp = pytest.importorskip("aiohttp")
+        download_file = getattr(pytest.importorskip(module_name), class_name)._download_file
+        from utils.network.session_pool import session_registry
+
+        # Doar atributele folosite de _download_file (headers și rotația User-Agent)
+        platform = SimpleNamespace(base_headers={}, headers={}, _get_next_user_agent=lambda: 'test-agent')
+        runner, base = await self.start_cdn()
+        try:
+            path = await download_file(platform, f"{base}/signed", str(tmp_path), 'video', 'mp4')
+            assert read(path) == PAYLOAD
+
+            with pytest.raises(aiohttp.ClientResponseError):
+                await download_file(platform, f"{base}/media.mp4", str(tmp_path / 'denied'), 'video', 'mp4')
+            assert not os.path.exists(tmp_path / 'denied' / 'video.mp4')
+        finally:
+            await session_registry.close()
+            await runner.cleanup()
+
+
+@pytest.mark.slow
+class TestSegmentedThroughput:
+    """Benchmark: fluxul unic cu chunk-uri de 8KB (calea actuală) vs 4 segmente"""
+
+    def test_segmented_vs_single_stream(self, media_server, tmp_path):
+        requests = pytest.importorskip("requests")
+        MediaHandler.chunk_delay = 0.01  # ~6MB/s per conexiune
+
+        with requests.Session() as session:
+            start = time.perf_counter()
+            with session.get(media_server, stream=True, timeout=60) as response:
+                with open(tmp_path / 'single.mp4', 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+            single_elapsed = time.perf_counter() - start
+
+            downloader = SegmentedDownloader(parts=4, min_segment_size=256 * 1024)
+            outcome = downloader.download_sync(session, media_server, str(tmp_path / 'segmented.mp4'))
+
+        single_mbps = len(PAYLOAD) / single_elapsed / 1024 / 1024
+        segmented_mbps = outcome.throughput / 1024 / 1024
+        print(f"\nSingle stream {single_mbps:.1f}MB/s, {outcome.segments} segments {segmented_mbps:.1f}MB/s")
+        assert read(outcome.path) == PAYLOAD
+        assert segmented_mbps > single_mbps * 1.5
@@ -0,0 +1,179 @@
+# tests/test_session_pool.py - Unit tests for Session Pool
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import time
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from utils.network.network_manager import NetworkManager
+from utils.network.session_pool import ConnectionStats, SessionRegistry, SessionProfile
+
+
+async def start_server():
+    """Server HTTP local care răspunde cu keep-alive"""
+    async def handle(request):
+        return web.Response(text="ok")
+
+    async def login(request):
+        # Cookie setat pe redirect, verificat de pagina finală
+        response = web.HTTPFound('/video')
+        response.set_cookie('token', 'abc')
+        raise response
+
+    async def video(request):
+        return web.Response(text=request.cookies.get('token', 'missing'))
+
+    app = web.Application()
+    app.router.add_get('/', handle)
+    app.router.add_get('/login', login)
+    app.router.add_get('/video', video)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+@pytest.fixture
+def registry():
+    """Registry peste un NetworkManager izolat"""
+    return SessionRegistry(NetworkManager(), limit=10, limit_per_host=2, keepalive_timeout=30)
+
+
+class TestSessionProfile:
+    """Test suite pentru cheile profilurilor"""
+
+    def test_key_ignores_cookie_order_and_hides_values(self):
+        """Test că aceleași cookie-uri dau aceeași cheie, fără să apară în ea"""
+        first = SessionProfile.create(cookies={'a': '1', 'sessionid': 'secret'})
+        second = SessionProfile.create(cookies={'sessionid': 'secret', 'a': '1'})
+        assert first.key == second.key
+        assert 'secret' not in first.key
+        assert SessionProfile.create().key == 'anonymous'
+        assert SessionProfile.create(proxy='http://proxy:8080').key != first.key
+
+
+class TestSessionRegistry:
+    """Test suite pentru SessionRegistry"""
+
+    @pytest.mark.asyncio
+    async def test_same_profile_shares_session(self, registry):
+        """Test că același profil primește aceeași sesiune, iar alt profil una separată"""
+        anonymous = await registry.get_session()
+        assert await registry.get_session() is anonymous
+        with_cookies = await registry.get_session(cookies={'sessionid': 'x'})
+        assert with_cookies is not anonymous
+        assert isinstance(anonymous.cookie_jar, aiohttp.DummyCookieJar)
+        await registry.close()
+        assert anonymous.closed and with_cookies.closed
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, registry):
+        """Test că cererile succesive către același host refolosesc conexiunea"""
+        runner, url = await start_server()
+        try:
+            session = await registry.get_session()
+            for _ in range(5):
+                async with session.get(url) as response:
+                    assert await response.text() == "ok"
+        finally:
+            await registry.close()
+            await runner.cleanup()
+
+        stats = registry.get_stats()
+        assert stats['requests'] == 5
+        assert stats['connections_created'] == 1
+        assert stats['connections_reused'] == 4
+        assert stats['top_hosts'] == {'127.0.0.1': 5}
+
+    @pytest.mark.asyncio
+    async def test_redirect_session_keeps_redirect_cookies(self, registry):
+        """Test că un cookie setat în lanțul de redirect-uri ajunge la pagina finală, fără să rămână în sesiunea partajată"""
+        runner, url = await start_server()
+        try:
+            shared = await registry.get_session()
+            async with shared.get(url + 'login') as response:
+                assert await response.text() == 'missing'
+
+            async with registry.redirect_session() as session:
+                assert session is not shared and session.connector is shared.connector
+                async with session.get(url + 'login') as response:
+                    assert await response.text() == 'abc'
+            assert session.closed and not shared.closed
+
+            # O cerere nouă pornește cu jar gol
+            async with registry.redirect_session() as session:
+                async with session.get(url + 'video') as response:
+                    assert await response.text() == 'missing'
+        finally:
+            await registry.close()
+            await runner.cleanup()
+
+        assert registry.get_stats()['redirect_sessions'] == 2
+
+    @pytest.mark.asyncio
+    async def test_redirect_session_reuses_profile_jar(self, registry):
+        """Test că profilurile cu cookie-uri folosesc direct sesiunea partajată"""
+        shared = await registry.get_session(cookies={'sessionid': 'x'})
+        async with registry.redirect_session(cookies={'sessionid': 'x'}) as session:
+            assert session is shared
+        await registry.close()
+
+    def test_per_host_stats_are_bounded(self):
+        """Test că host-urile peste limită sunt numărate împreună în 'other'"""
+        stats = ConnectionStats(max_hosts=3)
+        for i in range(10):
+            stats.count_host(f"cdn{i}.example.com")
+        stats.count_host('cdn0.example.com')
+
+        assert len(stats.per_host) == 4
+        assert stats.per_host['cdn0.example.com'] == 2
+        assert stats.per_host[ConnectionStats.OTHER_HOSTS] == 7
+
+    def test_sessions_are_per_event_loop(self, registry):
+        """Test că fiecare event loop primește propria sesiune"""
+        first = asyncio.run(registry.get_session())
+        second = asyncio.run(registry.get_session())
+        assert first is not second
+        assert registry.get_stats()['sessions'] == 1  # sesiunea loop-ului închis a fost uitată
+
+
+@pytest.mark.slow
+class TestSessionPoolBenchmark:
+    """Benchmark: sesiune nouă per cerere (vechiul _fetch_html) vs sesiune partajată"""
+
+    @pytest.mark.asyncio
+    async def test_per_call_vs_shared_session(self, registry):
+        runner, url = await start_server()
+        rounds = 200
+        try:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(url) as response:
+                        await response.read()
+            per_call_ms = (time.perf_counter() - start) * 1000 / rounds
+
+            session = await registry.get_session()
+            start = time.perf_counter()
+            for _ in range(rounds):
+                async with session.get(url) as response:
+                    await response.read()
+            shared_ms = (time.perf_counter() - start) * 1000 / rounds
+        finally:
+            await registry.close()
+            await runner.cleanup()
+
+        stats = registry.get_stats()
+        print(f"\nCerere: sesiune per apel {per_call_ms:.2f}ms, sesiune partajată {shared_ms:.2f}ms "
+              f"(refolosire conexiuni {stats['connection_reuse_rate']}%)")
+        assert stats['connections_created'] == 1
@@ -0,0 +1,99 @@
+# tests/test_singleflight.py - Unit tests for SingleFlight request coalescing
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import threading
+import time
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.singleflight import SingleFlight, AsyncSingleFlight, canonical_url_key
+
+
+class TestSingleFlight:
+    """Test suite pentru SingleFlight"""
+
+    def test_canonical_url_key(self):
+        """Test cheia canonică pentru variante ale aceluiași link"""
+        assert canonical_url_key("https://www.tiktok.com/@a/video/123?lang=en") == "tiktok:123"
+        assert canonical_url_key("https://tiktok.com/@b/video/123") == "tiktok:123"
+        assert canonical_url_key("https://www.example.com/clip/#t=1") == canonical_url_key("https://example.com/clip")
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Test că apelurile simultane execută funcția o singură dată"""
+        released = []
+        flights = SingleFlight(name='test', on_release=released.append)
+        gate = threading.Event()
+        calls = []
+
+        def slow_download(url):
+            calls.append(url)
+            gate.wait(timeout=2)
+            return {'success': True, 'url': url}
+
+        leases = []
+
+        def worker():
+            leases.append(flights.acquire('key', slow_download, 'u'))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while flights.get_stats()['calls'] < 4:
+            time.sleep(0.001)
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert calls == ['u']
+        assert all(lease.result == {'success': True, 'url': 'u'} for lease in leases)
+        assert sum(lease.shared for lease in leases) == 3
+
+        stats = flights.get_stats()
+        assert stats['executions'] == 1
+        assert stats['deduplicated'] == 3
+        assert stats['in_flight'] == 0
+
+        # on_release rulează o singură dată, după ultimul deținător
+        for lease in leases[:-1]:
+            lease.release()
+        assert released == []
+        leases[-1].release()
+        leases[-1].release()
+        assert released == [{'success': True, 'url': 'u'}]
+
+    def test_errors_propagate_and_are_not_cached(self):
+        """Test propagarea excepțiilor și reexecutarea ulterioară"""
+        flights = SingleFlight()
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flights.acquire('key', failing)
+
+        with flights.acquire('key', lambda: 42) as lease:
+            assert lease.result == 42
+        assert flights.get_stats()['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_coalescing(self):
+        """Test varianta asyncio"""
+        flights = AsyncSingleFlight(name='test')
+        calls = []
+
+        async def download(url):
+            calls.append(url)
+            await asyncio.sleep(0.05)
+            return f"/tmp/{url}.mp4"
+
+        results = await asyncio.gather(*[flights.do('k', download, 'v') for _ in range(3)])
+
+        assert calls == ['v']
+        assert [path for path, _ in results] == ['/tmp/v.mp4'] * 3
+        assert [shared for _, shared in results].count(True) == 2
+        assert flights.get_stats()['in_flight'] == 0
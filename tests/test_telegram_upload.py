@@ -0,0 +1,123 @@
+# tests/test_telegram_upload.py - Unit tests for Telegram streaming upload helpers
+# Versiunea: 1.0.0
+
+import pytest
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.network import telegram_upload
+from utils.network.telegram_upload import (
+    MultipartStream, validate_html_caption, prepare_caption, caption_to_plain_text, upload_media
+)
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    """Handler care memorează cererile și răspunde ca Bot API"""
+    requests_seen = []
+    responses = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.requests_seen.append((self.path, dict(self.headers), body))
+        status, payload = self.responses.pop(0) if self.responses else (200, {'ok': True, 'result': {}})
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTelegramUpload:
+    """Test suite pentru upload-ul în streaming către Telegram"""
+
+    @pytest.fixture
+    def video_file(self, tmp_path):
+        """Fișier video fals de 300KB"""
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(os.urandom(300 * 1024))
+        return str(path)
+
+    @pytest.fixture
+    def bot_api(self):
+        """Server HTTP local care imită api.telegram.org"""
+        _RecordingHandler.requests_seen = []
+        _RecordingHandler.responses = []
+        server = HTTPServer(('127.0.0.1', 0), _RecordingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_port}"
+
+        original_post = telegram_upload.get_telegram_session().post
+
+        def local_post(url, *args, **kwargs):
+            return original_post(url.replace("https://api.telegram.org", base), *args, **kwargs)
+
+        with patch.object(telegram_upload.get_telegram_session(), 'post', side_effect=local_post):
+            yield _RecordingHandler
+        server.shutdown()
+
+    def test_multipart_stream_reads_in_chunks(self, video_file):
+        """Test corpul multipart: lungime corectă și conținutul fișierului intact"""
+        with open(video_file, 'rb') as f:
+            body = MultipartStream({'chat_id': 1, 'caption': 'Titlu'}, {'video': ('clip.mp4', f, 'video/mp4')},
+                                   chunk_size=4096)
+            chunks = []
+            while True:
+                chunk = body.read(4096)
+                if not chunk:
+                    break
+                assert len(chunk) <= 4096
+                chunks.append(chunk)
+        data = b''.join(chunks)
+
+        assert len(data) == body.len == body.bytes_read
+        with open(video_file, 'rb') as f:
+            assert f.read() in data
+        assert data.endswith(f'--{body.boundary}--\r\n'.encode())
+
+    def test_caption_validation(self):
+        """Test validarea caption-ului HTML înainte de upload"""
+        assert validate_html_caption("✅ <b>Titlu &amp; mai mult</b>")[0] is True
+        assert validate_html_caption("<b>neînchis")[0] is False
+        assert validate_html_caption("<b><i>greșit</b></i>")[0] is False
+        assert validate_html_caption("<div>nesuportat</div>")[0] is False
+        assert validate_html_caption("a < b")[0] is False
+        assert validate_html_caption("x" * 1025)[0] is False
+
+        caption, parse_mode = prepare_caption("<b>neînchis &amp; text")
+        assert parse_mode is None
+        assert caption == "neînchis & text"
+        assert len(caption_to_plain_text("y" * 2000)) == 1024
+
+    def test_upload_streams_once_with_valid_caption(self, video_file, bot_api):
+        """Test upload-ul cu caption valid: o singură cerere, fișierul trimis o dată"""
+        response = upload_media('TOKEN', 'sendVideo', 42, 'video', video_file, caption="<b>Titlu</b>")
+
+        assert response.status_code == 200
+        assert len(bot_api.requests_seen) == 1
+        path, headers, body = bot_api.requests_seen[0]
+        assert path == '/botTOKEN/sendVideo'
+        assert headers['Content-Type'].startswith('multipart/form-data; boundary=')
+        assert b'name="parse_mode"\r\n\r\nHTML' in body
+        assert os.path.getsize(video_file) < len(body) < os.path.getsize(video_file) + 2048
+
+    def test_invalid_caption_is_sent_as_plain_text(self, video_file, bot_api):
+        """Test caption invalid: trimis ca text simplu, fără retransmiterea fișierului"""
+        response = upload_media('TOKEN', 'sendVideo', 42, 'video', video_file, caption="<b>Titlu")
+
+        assert response.status_code == 200
+        assert len(bot_api.requests_seen) == 1
+        body = bot_api.requests_seen[0][2]
+        assert b'name="parse_mode"' not in body
+        assert b'name="caption"\r\n\r\nTitlu\r\n' in body
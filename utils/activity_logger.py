@@ -4,16 +4,17 @@
 import os
 import json
 import logging
-import asyncio
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Any, Union
+from dataclasses import dataclass, field
 from enum import Enum
-from collections import deque, defaultdict
+from collections import Counter, deque, defaultdict
 import threading
 from pathlib import Path
 
+from utils.log_writer import RotatingJsonlWriter
+
 logger = logging.getLogger(__name__)
 
 class ActivityType(Enum):
@@ -60,12 +61,24 @@ class ActivityLog:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convertește log-ul în dicționar"""
-        data = asdict(self)
+        # Copie superficială a câmpurilor (asdict copiază recursiv și costă ~3x la serializare)
+        data = dict(self.__dict__)
+        if self.details is not None:
+            data['details'] = dict(self.details)
         data['activity_type'] = self.activity_type.value
         data['level'] = self.level.value
         data['datetime'] = datetime.fromtimestamp(self.timestamp).isoformat()
         return data
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ActivityLog':
+        """Reconstruiește log-ul dintr-o linie JSONL (inversul to_dict)"""
+        values = {name: data.get(name) for name in cls.__dataclass_fields__}
+        values['activity_type'] = ActivityType(data['activity_type'])
+        values['level'] = LogLevel(data.get('level', LogLevel.INFO.value))
+        values['success'] = data.get('success', True)
+        return cls(**values)
+    
     def to_readable_string(self) -> str:
         """Convertește log-ul într-un string lizibil"""
         dt = datetime.fromtimestamp(self.timestamp)
@@ -88,6 +101,91 @@ class ActivityLog:
             
         return base_info
 
+@dataclass
+class _LogBucket:
+    """
+    Index pentru log-urile dintr-o oră: liste per utilizator, platformă și tip de
+    activitate, plus agregatele folosite de get_statistics.
+
+    Log-urile sunt adăugate în ordinea sosirii, deci cel mai vechi log din deque-ul
+    principal este mereu primul din listele bucket-ului său (eliminare O(1)).
+    """
+    entries: deque = field(default_factory=deque)
+    by_user: Dict[Optional[int], deque] = field(default_factory=lambda: defaultdict(deque))
+    by_platform: Dict[Optional[str], deque] = field(default_factory=lambda: defaultdict(deque))
+    by_type: Dict[ActivityType, deque] = field(default_factory=lambda: defaultdict(deque))
+    activity_counts: Counter = field(default_factory=Counter)
+    platform_counts: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    error_codes: Counter = field(default_factory=Counter)
+    error_messages: Counter = field(default_factory=Counter)
+    hour_labels: Counter = field(default_factory=Counter)
+    success: int = 0
+    download_count: int = 0
+    download_total_ms: float = 0.0
+    download_min_ms: Optional[float] = None
+    download_max_ms: Optional[float] = None
+    download_range_stale: bool = False
+    
+    def add(self, log: ActivityLog, hour_label: str):
+        self._index(log, hour_label, 1)
+        self.entries.append(log)
+        self.by_user[log.user_id].append(log)
+        self.by_platform[_platform_key(log.platform)].append(log)
+        self.by_type[log.activity_type].append(log)
+        
+        if _is_timed_download(log):
+            self.download_min_ms = log.duration_ms if self.download_min_ms is None else min(self.download_min_ms, log.duration_ms)
+            self.download_max_ms = log.duration_ms if self.download_max_ms is None else max(self.download_max_ms, log.duration_ms)
+    
+    def remove_oldest(self, log: ActivityLog):
+        """Elimină log-ul cel mai vechi (evacuat din deque-ul principal)"""
+        self.entries.popleft()
+        for index, key in ((self.by_user, log.user_id),
+                           (self.by_platform, _platform_key(log.platform)),
+                           (self.by_type, log.activity_type)):
+            index[key].popleft()
+            if not index[key]:
+                del index[key]
+        self._index(log, datetime.fromtimestamp(log.timestamp).strftime("%H:00"), -1)
+        if _is_timed_download(log):
+            self.download_range_stale = True
+    
+    def _index(self, log: ActivityLog, hour_label: str, sign: int):
+        self.activity_counts[log.activity_type.value] += sign
+        if log.success:
+            self.success += sign
+        else:
+            if log.error_code:
+                self.error_codes[log.error_code] += sign
+            self.error_messages[log.message] += sign
+        if log.platform:
+            counts = self.platform_counts[log.platform.lower()]
+            counts["total"] += sign
+            counts["success" if log.success else "errors"] += sign
+        self.hour_labels[hour_label] += sign
+        if _is_timed_download(log):
+            self.download_count += sign
+            self.download_total_ms += sign * log.duration_ms
+    
+    def download_range(self):
+        """(min, max) pentru duratele download-urilor reușite din bucket"""
+        if self.download_range_stale:
+            durations = [log.duration_ms for log in self.by_type.get(ActivityType.DOWNLOAD_SUCCESS, ())
+                         if _is_timed_download(log)]
+            self.download_min_ms = min(durations) if durations else None
+            self.download_max_ms = max(durations) if durations else None
+            self.download_range_stale = False
+        return self.download_min_ms, self.download_max_ms
+
+
+def _platform_key(platform: Optional[str]) -> Optional[str]:
+    return platform.lower() if platform else None
+
+
+def _is_timed_download(log: ActivityLog) -> bool:
+    return bool(log.duration_ms) and log.activity_type == ActivityType.DOWNLOAD_SUCCESS
+
+
 class ActivityLogger:
     """Sistem de logging pentru activitățile botului"""
     
@@ -99,11 +197,26 @@ class ActivityLogger:
         self.platform_stats = defaultdict(lambda: defaultdict(int))
         self.hourly_stats = defaultdict(lambda: defaultdict(int))
         self.lock = threading.Lock()
-        self.file_lock = threading.Lock()
+        
+        # Index pe ore (cheie: timestamp // 3600) peste log-urile din memorie
+        self._buckets: Dict[int, _LogBucket] = {}
         
         # Asigură că directorul pentru log-uri există
         os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
         
+        # Scriere pe disk în background: un write per lot, rotație și gzip pentru segmentele vechi
+        rotate_hours = float(os.getenv('ACTIVITY_LOG_ROTATE_HOURS', '24'))
+        self.writer = RotatingJsonlWriter(
+            self.log_file_path,
+            flush_interval=float(os.getenv('ACTIVITY_LOG_FLUSH_MS', '200')) / 1000,
+            max_bytes=int(os.getenv('ACTIVITY_LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+            rotate_interval=rotate_hours * 3600 if rotate_hours > 0 else None,
+            backup_count=int(os.getenv('ACTIVITY_LOG_BACKUPS', '14')),
+            compress=os.getenv('ACTIVITY_LOG_COMPRESS', 'true').lower() == 'true',
+            serializer=self._serialize_entry,
+            thread_name="activity-log-writer"
+        )
+        
         logger.info(f"📝 Activity Logger initialized with max {max_logs} logs")
     
     def _generate_log_id(self) -> str:
@@ -143,17 +256,13 @@ class ActivityLogger:
         )
         
         with self.lock:
+            if len(self.logs) == self.logs.maxlen:
+                self._unindex(self.logs[0])
             self.logs.append(log_entry)
             self._update_stats(log_entry)
         
-        # Scrie în fișier - gestionează contextul async/sincron
-        try:
-            loop = asyncio.get_running_loop()
-            # Dacă există un loop activ, creează task
-            loop.create_task(self._write_to_file(log_entry))
-        except RuntimeError:
-            # Nu există loop activ, scrie sincron
-            self._write_to_file_sync(log_entry)
+        # Scrierea în fișier se face pe thread-ul writer-ului (nu blochează event loop-ul)
+        self.writer.append(log_entry)
         
         # Log în sistemul standard de logging
         log_level = getattr(logging, level.value.upper())
@@ -180,75 +289,192 @@ class ActivityLogger:
                 self.platform_stats[platform_key]["errors"] += 1
         
         # Statistici pe ore
-        hour_key = datetime.fromtimestamp(log_entry.timestamp).strftime("%Y-%m-%d_%H")
+        moment = datetime.fromtimestamp(log_entry.timestamp)
+        hour_key = moment.strftime("%Y-%m-%d_%H")
         self.hourly_stats[hour_key][log_entry.activity_type.value] += 1
+        
+        self._bucket_for(log_entry.timestamp).add(log_entry, moment.strftime("%H:00"))
+    
+    def _bucket_for(self, timestamp: float) -> _LogBucket:
+        key = int(timestamp // 3600)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _LogBucket()
+        return bucket
     
-    async def _write_to_file(self, log_entry: ActivityLog):
-        """Scrie log-ul în fișier (async)"""
-        try:
-            with self.file_lock:
-                with open(self.log_file_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(log_entry.to_dict(), ensure_ascii=False) + '\n')
-        except Exception as e:
-            logger.error(f"Error writing log to file: {e}")
+    def _unindex(self, log_entry: ActivityLog):
+        """Scoate din index log-ul care urmează să fie evacuat din deque"""
+        key = int(log_entry.timestamp // 3600)
+        bucket = self._buckets[key]
+        bucket.remove_oldest(log_entry)
+        if not bucket.entries:
+            del self._buckets[key]
     
-    def _write_to_file_sync(self, log_entry: ActivityLog):
-        """Scrie log-ul în fișier (sincron)"""
-        try:
-            with self.file_lock:
-                with open(self.log_file_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(log_entry.to_dict(), ensure_ascii=False) + '\n')
-        except Exception as e:
-            logger.error(f"Error writing log to file: {e}")
+    def _rebuild_index(self):
+        """Reconstruiește indexul după înlocuirea deque-ului de log-uri; apelat cu lock-ul deținut"""
+        self._buckets = {}
+        for log in self.logs:
+            self._bucket_for(log.timestamp).add(log, datetime.fromtimestamp(log.timestamp).strftime("%H:00"))
+    
+    def _buckets_since(self, cutoff_time: float) -> List[tuple]:
+        """(cheie, bucket) pentru orele care se suprapun cu [cutoff_time, acum], în ordine"""
+        first = int(cutoff_time // 3600)
+        return sorted((key, bucket) for key, bucket in self._buckets.items() if key >= first)
+    
+    @staticmethod
+    def _serialize_entry(log_entry: ActivityLog) -> str:
+        """Linia JSONL a unui log (rulează pe thread-ul writer-ului)"""
+        return json.dumps(log_entry.to_dict(), ensure_ascii=False, default=str)
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Așteaptă scrierea pe disk a log-urilor din coadă"""
+        return self.writer.flush(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Scrie log-urile rămase și oprește writer-ul"""
+        self.writer.close(timeout)
     
     def get_logs(self, 
                 hours: int = 24,
                 activity_types: Optional[List[ActivityType]] = None,
                 platforms: Optional[List[str]] = None,
                 success_only: Optional[bool] = None,
-                user_id: Optional[int] = None) -> List[ActivityLog]:
-        """Obține log-urile filtrate"""
+                user_id: Optional[int] = None,
+                include_history: bool = False) -> List[ActivityLog]:
+        """
+        Obține log-urile filtrate.
+        
+        Cu include_history=True, partea din interval care nu mai este în memorie
+        (evacuată sau dinaintea repornirii) este citită din fișierele JSONL.
+        """
         
         cutoff_time = time.time() - (hours * 3600)
+        platform_keys = {p.lower() for p in platforms} if platforms else None
+        history = []
+        if include_history:
+            history = [log for log in self._history_logs(cutoff_time)
+                       if self._log_matches(log, activity_types, platform_keys, success_only, user_id)]
         
         with self.lock:
             filtered_logs = []
             
-            for log in self.logs:
-                # Filtru timp
-                if log.timestamp < cutoff_time:
-                    continue
-                
-                # Filtru tip activitate
-                if activity_types and log.activity_type not in activity_types:
-                    continue
-                
-                # Filtru platformă
-                if platforms and log.platform and log.platform.lower() not in [p.lower() for p in platforms]:
-                    continue
-                
-                # Filtru success
-                if success_only is not None and log.success != success_only:
-                    continue
-                
-                # Filtru user
-                if user_id and log.user_id != user_id:
-                    continue
+            for _, bucket in self._buckets_since(cutoff_time):
+                # Pornește de la cea mai selectivă listă din index
+                if user_id:
+                    candidates = [bucket.by_user.get(user_id, ())]
+                elif platform_keys:
+                    # Log-urile fără platformă trec de filtrul de platformă
+                    candidates = [bucket.by_platform.get(key, ()) for key in (*platform_keys, None)]
+                elif activity_types:
+                    candidates = [bucket.by_type.get(activity_type, ()) for activity_type in set(activity_types)]
+                else:
+                    candidates = [bucket.entries]
                 
-                filtered_logs.append(log)
+                for source in candidates:
+                    filtered_logs.extend(
+                        log for log in source
+                        if log.timestamp >= cutoff_time
+                        and self._log_matches(log, activity_types, platform_keys, success_only, user_id)
+                    )
             
-            # Sortează după timestamp (cel mai recent primul)
-            filtered_logs.sort(key=lambda x: x.timestamp, reverse=True)
-            
-            return filtered_logs
+        filtered_logs.extend(history)
+        
+        # Sortează după timestamp (cel mai recent primul)
+        filtered_logs.sort(key=lambda x: x.timestamp, reverse=True)
+        
+        return filtered_logs
     
-    def get_statistics(self, hours: int = 24) -> Dict[str, Any]:
-        """Obține statistici pentru perioada specificată"""
-        logs = self.get_logs(hours=hours)
+    @staticmethod
+    def _log_matches(log: ActivityLog,
+                     activity_types: Optional[List[ActivityType]],
+                     platform_keys: Optional[set],
+                     success_only: Optional[bool],
+                     user_id: Optional[int]) -> bool:
+        """Filtrele din get_logs (fără cel de timp)"""
+        if activity_types and log.activity_type not in activity_types:
+            return False
+        if platform_keys and log.platform and log.platform.lower() not in platform_keys:
+            return False
+        if success_only is not None and log.success != success_only:
+            return False
+        if user_id and log.user_id != user_id:
+            return False
+        return True
+    
+    def _history_logs(self, since: float) -> List[ActivityLog]:
+        """Log-urile de pe disk mai vechi decât cel mai vechi log din memorie (evacuate sau din rulări anterioare)"""
+        with self.lock:
+            until = self.logs[0].timestamp if self.logs else None
+        if until is not None and since >= until:
+            return []
+        logs = []
+        for record in self.writer.iter_records(since, until):
+            try:
+                log = ActivityLog.from_dict(record)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if until is None or log.timestamp < until:
+                logs.append(log)
+        return logs
+    
+    def search_history(self,
+                       since: float,
+                       until: Optional[float] = None,
+                       activity_types: Optional[List[ActivityType]] = None,
+                       platforms: Optional[List[str]] = None,
+                       success_only: Optional[bool] = None,
+                       user_id: Optional[int] = None,
+                       limit: Optional[int] = None) -> List[ActivityLog]:
+        """
+        Caută direct în fișierele JSONL (inclusiv segmentele rotite), cel mai recent primul.
+        
+        Doar segmentele care se suprapun cu [since, until] sunt citite. I/O blocant:
+        din cod async se apelează prin run_in_executor.
+        """
+        platform_keys = {p.lower() for p in platforms} if platforms else None
+        logs = []
+        for record in self.writer.iter_records(since, until):
+            try:
+                log = ActivityLog.from_dict(record)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if self._log_matches(log, activity_types, platform_keys, success_only, user_id):
+                logs.append(log)
+        logs.reverse()
+        return logs[:limit] if limit else logs
+    
+    def get_statistics(self, hours: int = 24, include_history: bool = False) -> Dict[str, Any]:
+        """
+        Obține statistici pentru perioada specificată, din agregatele pe ore ale indexului.
+        
+        Cu include_history=True se adaugă log-urile de pe disk care nu mai sunt în memorie.
+        """
+        cutoff_time = time.time() - (hours * 3600)
         
+        buckets = []
+        if include_history:
+            history = _LogBucket()
+            for log in self._history_logs(cutoff_time):
+                history.add(log, datetime.fromtimestamp(log.timestamp).strftime("%H:00"))
+            buckets.append(history)
+        
+        with self.lock:
+            for key, bucket in self._buckets_since(cutoff_time):
+                if key * 3600 < cutoff_time:
+                    # Ora de la marginea intervalului: agregate doar pentru log-urile din interval
+                    partial = _LogBucket()
+                    for log in bucket.entries:
+                        if log.timestamp >= cutoff_time:
+                            partial.add(log, datetime.fromtimestamp(log.timestamp).strftime("%H:00"))
+                    bucket = partial
+                buckets.append(bucket)
+            return self._merge_statistics(hours, buckets)
+    
+    def _merge_statistics(self, hours: int, buckets: Iterable[_LogBucket]) -> Dict[str, Any]:
+        """Combină agregatele bucket-urilor în formatul get_statistics"""
         stats = {
             "period_hours": hours,
-            "total_activities": len(logs),
+            "total_activities": 0,
             "success_rate": 0,
             "activity_breakdown": defaultdict(int),
             "platform_breakdown": defaultdict(lambda: {"total": 0, "success": 0, "errors": 0}),
@@ -262,61 +488,58 @@ class ActivityLogger:
             }
         }
         
-        if not logs:
-            return stats
-        
         success_count = 0
-        download_times = []
-        error_messages = defaultdict(int)
-        
-        for log in logs:
-            # Breakdown activități
-            stats["activity_breakdown"][log.activity_type.value] += 1
+        download_count = 0
+        download_total = 0.0
+        fastest = slowest = None
+        error_messages = Counter()
+        
+        for bucket in buckets:
+            stats["total_activities"] += len(bucket.entries)
+            success_count += bucket.success
+            for activity, count in bucket.activity_counts.items():
+                if count:
+                    stats["activity_breakdown"][activity] += count
+            for code, count in bucket.error_codes.items():
+                if count:
+                    stats["error_breakdown"][code] += count
+            for platform, counts in bucket.platform_counts.items():
+                if counts["total"]:
+                    for name in ("total", "success", "errors"):
+                        stats["platform_breakdown"][platform][name] += counts[name]
+            for hour, count in bucket.hour_labels.items():
+                if count:
+                    stats["hourly_activity"][hour] += count
+            error_messages.update(bucket.error_messages)
             
-            # Success rate
-            if log.success:
-                success_count += 1
-            else:
-                if log.error_code:
-                    stats["error_breakdown"][log.error_code] += 1
-                error_messages[log.message] += 1
-            
-            # Platform breakdown
-            if log.platform:
-                platform = log.platform.lower()
-                stats["platform_breakdown"][platform]["total"] += 1
-                if log.success:
-                    stats["platform_breakdown"][platform]["success"] += 1
-                else:
-                    stats["platform_breakdown"][platform]["errors"] += 1
-            
-            # Activitate pe ore
-            hour = datetime.fromtimestamp(log.timestamp).strftime("%H:00")
-            stats["hourly_activity"][hour] += 1
-            
-            # Timpi de download
-            if log.duration_ms and log.activity_type == ActivityType.DOWNLOAD_SUCCESS:
-                download_times.append(log.duration_ms)
+            if bucket.download_count:
+                download_count += bucket.download_count
+                download_total += bucket.download_total_ms
+                low, high = bucket.download_range()
+                fastest = low if fastest is None else min(fastest, low)
+                slowest = high if slowest is None else max(slowest, high)
+        
+        if not stats["total_activities"]:
+            return stats
         
         # Calculează success rate
-        if len(logs) > 0:
-            stats["success_rate"] = (success_count / len(logs)) * 100
+        stats["success_rate"] = (success_count / stats["total_activities"]) * 100
         
         # Top erori
-        stats["top_errors"] = sorted(error_messages.items(), key=lambda x: x[1], reverse=True)[:5]
+        stats["top_errors"] = [item for item in error_messages.most_common() if item[1] > 0][:5]
         
         # Metrici de performanță
-        if download_times:
-            stats["performance_metrics"]["avg_download_time"] = sum(download_times) / len(download_times)
-            stats["performance_metrics"]["fastest_download"] = min(download_times)
-            stats["performance_metrics"]["slowest_download"] = max(download_times)
+        if download_count:
+            stats["performance_metrics"]["avg_download_time"] = download_total / download_count
+            stats["performance_metrics"]["fastest_download"] = fastest
+            stats["performance_metrics"]["slowest_download"] = slowest
         
         return dict(stats)
     
-    def generate_report(self, hours: int = 24, format_type: str = "text") -> str:
+    def generate_report(self, hours: int = 24, format_type: str = "text", include_history: bool = False) -> str:
         """Generează un raport complet"""
-        logs = self.get_logs(hours=hours)
-        stats = self.get_statistics(hours=hours)
+        logs = self.get_logs(hours=hours, include_history=include_history)
+        stats = self.get_statistics(hours=hours, include_history=include_history)
         
         if format_type == "json":
             return json.dumps({
@@ -385,6 +608,7 @@ class ActivityLogger:
                 [log for log in self.logs if log.timestamp >= cutoff_time],
                 maxlen=self.max_logs
             )
+            self._rebuild_index()
         
         logger.info(f"🧹 Cleaned up logs older than {days} days")
     
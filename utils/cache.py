@@ -6,12 +6,17 @@ import threading
 import asyncio
 import os
 import pickle
+import sqlite3
 import tempfile
 import weakref
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Union, List, Callable, TypeVar, Generic
 from dataclasses import dataclass
 from enum import Enum
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, deque
+
+from utils.cache_codecs import CodecRegistry, UnsupportedCacheFormat
 
 try:
     from utils.config import config
@@ -79,6 +84,8 @@ class LRUCache(Generic[T]):
         self.ttl = ttl  # Alias pentru compatibilitate cu testele
         self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.lock = threading.RLock()
+        # Citirile fără lock nu reordonează OrderedDict; cheile sunt aplicate la următoarea operație cu lock
+        self._read_buffer: deque = deque(maxlen=max(64, max_size))
         self._hits = 0
         self._misses = 0
         self.stats = {
@@ -88,6 +95,35 @@ class LRUCache(Generic[T]):
             'expired_removals': 0
         }
     
+    def get_nowait(self, key: str) -> Optional[T]:
+        """
+        Citire fără lock pentru hot path-ul async. Lookup-ul în dict este atomic
+        sub GIL; mutarea la sfârșitul listei LRU este amânată prin _read_buffer.
+        Intrările expirate sunt lăsate pentru calea cu lock.
+        """
+        entry = self.cache.get(key)
+        if entry is None or entry.is_expired:
+            self.stats['misses'] += 1
+            self._misses += 1
+            return None
+        
+        entry.last_accessed = time.time()
+        entry.access_count += 1
+        self._read_buffer.append(key)
+        self.stats['hits'] += 1
+        self._hits += 1
+        return entry.value
+    
+    def _drain_reads(self):
+        """Aplică ordinea LRU pentru citirile fără lock; apelat cu lock-ul deținut"""
+        while self._read_buffer:
+            try:
+                key = self._read_buffer.popleft()
+            except IndexError:
+                break
+            if key in self.cache:
+                self.cache.move_to_end(key)
+    
     def get(self, key: str) -> Optional[T]:
         """Obține valoare din cache"""
         with self.lock:
@@ -120,6 +156,7 @@ class LRUCache(Generic[T]):
     def put(self, key: str, value: T, ttl: Optional[float] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Adaugă valoare în cache"""
         with self.lock:
+            self._drain_reads()
             current_time = time.time()
             effective_ttl = ttl if ttl is not None else self.default_ttl
             
@@ -170,6 +207,7 @@ class LRUCache(Generic[T]):
         """Curăță întregul cache"""
         with self.lock:
             self.cache.clear()
+            self._read_buffer.clear()
             self._hits = 0
             self._misses = 0
             self.stats = {
@@ -418,6 +456,325 @@ class DiskCache:
                 'cache_dir': self.cache_dir
             }
 
+class SQLiteDiskCache:
+    """
+    Cache persistent pe disk cu index incremental în SQLite (WAL).
+
+    Spre deosebire de DiskCache, indexul nu este rescris integral la fiecare
+    acces: put/remove actualizează un singur rând, dimensiunea totală este un
+    contor menținut incremental, iar actualizările de acces (last_accessed,
+    access_count) sunt păstrate în memorie și scrise în loturi.
+
+    Valorile sunt serializate prin CodecRegistry (raw/msgpack/JSON, pickle doar
+    ca fallback permis explicit), cu compresie peste prag.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: int = 20,
+                 access_flush_size: int = 256, access_flush_interval: float = 5.0,
+                 codecs: Optional[CodecRegistry] = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), "telegram_bot_cache")
+        
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.db_file = os.path.join(cache_dir, "cache_index.sqlite3")
+        self.access_flush_size = access_flush_size
+        self.access_flush_interval = access_flush_interval
+        self.codecs = codecs or CodecRegistry(
+            compress_threshold=int(os.getenv('CACHE_COMPRESS_THRESHOLD_BYTES', '4096')),
+            allow_pickle=os.getenv('CACHE_ALLOW_PICKLE', 'false').lower() == 'true'
+        )
+        self.lock = threading.RLock()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " last_accessed REAL NOT NULL,"
+            " access_count INTEGER NOT NULL DEFAULT 1,"
+            " ttl REAL,"
+            " size_bytes INTEGER NOT NULL,"
+            " metadata TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries(last_accessed)")
+        
+        # Acces pe cheie fără interogări: copie în memorie a coloanelor necesare la get()
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.total_size = 0
+        self._pending_access: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._load_index()
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexiunea SQLite a procesului curent (redeschisă după fork, ex. gunicorn --preload)"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn_pid = pid
+        return self._conn
+    
+    def _load_index(self):
+        """Încarcă indexul din SQLite și migrează un index JSON vechi, dacă există"""
+        legacy_index_file = os.path.join(self.cache_dir, "cache_index.json")
+        if os.path.exists(legacy_index_file):
+            self._migrate_json_index(legacy_index_file)
+        
+        for key, created_at, last_accessed, access_count, ttl, size_bytes in self.conn.execute(
+                "SELECT key, created_at, last_accessed, access_count, ttl, size_bytes FROM entries"):
+            self.index[key] = {
+                'created_at': created_at,
+                'last_accessed': last_accessed,
+                'access_count': access_count,
+                'ttl': ttl,
+                'size_bytes': size_bytes
+            }
+            self.total_size += size_bytes
+    
+    def _migrate_json_index(self, legacy_index_file: str):
+        """Importă intrările din indexul JSON al DiskCache (o singură dată)"""
+        try:
+            with open(legacy_index_file, 'r', encoding='utf-8') as f:
+                legacy_index = json.load(f)
+            rows = [
+                (key, info.get('created_at', time.time()), info.get('last_accessed', time.time()),
+                 info.get('access_count', 1), info.get('ttl'), info.get('size_bytes', 0),
+                 json.dumps(info.get('metadata') or {}))
+                for key, info in legacy_index.items()
+                if os.path.exists(self._get_cache_file_path(key))
+            ]
+            self._executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            os.replace(legacy_index_file, legacy_index_file + ".migrated")
+            logger.info(f"📦 Migrated {len(rows)} disk cache entries from JSON index to SQLite")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not migrate legacy cache index: {e}")
+    
+    def _executemany(self, sql: str, rows: List[tuple]):
+        """Execută un lot de instrucțiuni într-o singură tranzacție"""
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _get_cache_file_path(self, key: str) -> str:
+        """Generează calea fișierului pentru o cheie"""
+        safe_key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{safe_key}.cache")
+    
+    def _record_access(self, key: str, entry_info: Dict[str, Any]):
+        """Înregistrează accesul în memorie; scrierea în SQLite se face în loturi"""
+        now = time.time()
+        entry_info['last_accessed'] = now
+        entry_info['access_count'] = entry_info.get('access_count', 0) + 1
+        self._pending_access[key] = now
+        if (len(self._pending_access) >= self.access_flush_size
+                or now - self._last_flush >= self.access_flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Scrie actualizările de acces în așteptare într-o singură tranzacție"""
+        with self.lock:
+            self._last_flush = time.time()
+            if not self._pending_access:
+                return
+            rows = [
+                (accessed_at, self.index[key]['access_count'], key)
+                for key, accessed_at in self._pending_access.items()
+                if key in self.index
+            ]
+            self._pending_access.clear()
+            try:
+                self._executemany("UPDATE entries SET last_accessed = ?, access_count = ? WHERE key = ?", rows)
+            except Exception as e:
+                logger.error(f"❌ Could not flush disk cache access times: {e}")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Obține valoare din cache-ul de pe disk"""
+        with self.lock:
+            entry_info = self.index.get(key)
+            if entry_info is None:
+                return None
+            
+            # Verifică expirarea
+            if entry_info.get('ttl') and time.time() - entry_info['created_at'] > entry_info['ttl']:
+                self.remove(key)
+                return None
+            
+            cache_file = self._get_cache_file_path(key)
+            try:
+                value = self.codecs.read_file(cache_file)
+            except FileNotFoundError:
+                self.remove(key)
+                return None
+            except UnsupportedCacheFormat:
+                # Intrare pickle veche: tratată ca miss și înlocuită la următorul put
+                logger.info(f"🧹 Dropping legacy pickle cache entry: {key}")
+                self.remove(key)
+                return None
+            except Exception as e:
+                logger.error(f"❌ Error loading from disk cache: {e}")
+                self.remove(key)
+                return None
+            
+            self._record_access(key, entry_info)
+            return value
+    
+    @staticmethod
+    def _should_compress(metadata: Optional[Dict[str, Any]]) -> bool:
+        """
+        Intrările marcate ca fierbinți (prioritate 'high' sau tier memory/hybrid)
+        sunt promovate des în memorie, deci rămân necomprimate pentru citiri rapide.
+        """
+        metadata = metadata or {}
+        if metadata.get('priority') == 'high':
+            return False
+        return metadata.get('tier') not in (CacheTier.MEMORY.value, CacheTier.HYBRID.value)
+    
+    def put(self, key: str, value: Any, ttl: Optional[float] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Salvează valoare în cache-ul de pe disk"""
+        with self.lock:
+            try:
+                data = self.codecs.encode(value, compress=self._should_compress(metadata))
+                cache_file = self._get_cache_file_path(key)
+                # Scriere atomică: un cititor concurent nu vede date parțiale
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, cache_file)
+                file_size = len(data)
+                
+                current_time = time.time()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, current_time, current_time, 1, ttl, file_size, json.dumps(metadata or {}))
+                )
+                
+                previous = self.index.get(key)
+                if previous:
+                    self.total_size -= previous['size_bytes']
+                self._pending_access.pop(key, None)
+                self.index[key] = {
+                    'created_at': current_time,
+                    'last_accessed': current_time,
+                    'access_count': 1,
+                    'ttl': ttl,
+                    'size_bytes': file_size
+                }
+                self.total_size += file_size
+                
+                if self.total_size > self.max_size_bytes:
+                    self._cleanup_lru(self.total_size - self.max_size_bytes, keep=key)
+                return True
+                
+            except Exception as e:
+                logger.error(f"❌ Error saving to disk cache: {e}")
+                return False
+    
+    def remove(self, key: str) -> bool:
+        """Elimină o intrare din cache"""
+        with self.lock:
+            entry_info = self.index.pop(key, None)
+            if entry_info is None:
+                return False
+            
+            self.total_size -= entry_info['size_bytes']
+            self._pending_access.pop(key, None)
+            try:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                cache_file = self._get_cache_file_path(key)
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+                return True
+            except Exception as e:
+                logger.error(f"❌ Error removing from disk cache: {e}")
+                return False
+    
+    def _get_total_size(self) -> int:
+        """Dimensiunea totală a cache-ului (contor incremental, O(1))"""
+        return self.total_size
+    
+    def _cleanup_lru(self, needed_space: int, keep: Optional[str] = None):
+        """Curăță intrările mai puțin folosite recent, în ordinea indexului last_accessed"""
+        self.flush()
+        freed_space = 0
+        keys_to_remove = []
+        for key, size_bytes in self.conn.execute(
+                "SELECT key, size_bytes FROM entries ORDER BY last_accessed"):
+            if freed_space >= needed_space:
+                break
+            if key == keep:
+                continue
+            freed_space += size_bytes
+            keys_to_remove.append(key)
+            logger.debug(f"🗑️ Marking LRU disk cache entry for removal: {key}")
+        
+        for key in keys_to_remove:
+            self.remove(key)
+    
+    def cleanup_expired(self) -> int:
+        """Curăță intrările expirate"""
+        with self.lock:
+            current_time = time.time()
+            expired_keys = [
+                key for key, entry_info in self.index.items()
+                if entry_info.get('ttl') and (current_time - entry_info['created_at']) > entry_info['ttl']
+            ]
+            for key in expired_keys:
+                self.remove(key)
+            
+            if expired_keys:
+                logger.debug(f"🧹 Removed {len(expired_keys)} expired disk entries")
+            
+            return len(expired_keys)
+    
+    def clear(self):
+        """Curăță întregul cache de pe disk"""
+        with self.lock:
+            for key in list(self.index.keys()):
+                cache_file = self._get_cache_file_path(key)
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+            self.conn.execute("DELETE FROM entries")
+            self.index.clear()
+            self._pending_access.clear()
+            self.total_size = 0
+    
+    def close(self):
+        """Scrie actualizările în așteptare și închide conexiunea SQLite"""
+        with self.lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Obține statistici cache disk"""
+        with self.lock:
+            total_size = self.total_size
+            
+            return {
+                'entries': len(self.index),
+                'total_size_bytes': total_size,
+                'total_size_mb': round(total_size / (1024 * 1024), 6),
+                'max_size_mb': self.max_size_mb,
+                'utilization_percent': round((total_size / self.max_size_bytes) * 100, 2) if self.max_size_bytes > 0 else 0,
+                'pending_access_updates': len(self._pending_access),
+                'codecs': self.codecs.get_stats(),
+                'backend': 'sqlite',
+                'cache_dir': self.cache_dir
+            }
+
 class SmartCache(Generic[T]):
     """Cache inteligent cu strategie adaptivă și management automat"""
     
@@ -430,7 +787,7 @@ class SmartCache(Generic[T]):
         self.strategy = strategy
         self.default_ttl = default_ttl
         self.memory_cache = LRUCache[T](max_size=memory_cache_size, ttl=default_ttl)
-        self.disk_cache = DiskCache(max_size_mb=disk_cache_size_mb)
+        self.disk_cache = SQLiteDiskCache(max_size_mb=disk_cache_size_mb)
         
         # Statistici globale
         self.stats = {
@@ -440,6 +797,13 @@ class SmartCache(Generic[T]):
             'misses': 0
         }
         
+        # Executor dedicat pentru I/O-ul tier-ului disk apelat din cod async
+        self.disk_workers = max(1, int(os.getenv('CACHE_DISK_WORKERS', '2')))
+        self._disk_executor: Optional[ThreadPoolExecutor] = None
+        self._disk_executor_pid: Optional[int] = None
+        self._executor_lock = threading.Lock()
+        self._latency_labels: set = set()
+        
         # Background cleanup
         self.cleanup_thread: Optional[threading.Thread] = None
         self.should_stop = False
@@ -471,6 +835,92 @@ class SmartCache(Generic[T]):
         self.stats['misses'] += 1
         return None
     
+    def _get_disk_executor(self) -> ThreadPoolExecutor:
+        """Executor-ul tier-ului disk, creat leneș și recreat după fork (gunicorn --preload)"""
+        pid = os.getpid()
+        if self._disk_executor is None or self._disk_executor_pid != pid:
+            with self._executor_lock:
+                if self._disk_executor is None or self._disk_executor_pid != pid:
+                    self._disk_executor = ThreadPoolExecutor(
+                        max_workers=self.disk_workers,
+                        thread_name_prefix="cache-disk"
+                    )
+                    self._disk_executor_pid = pid
+        return self._disk_executor
+    
+    def _record_latency(self, tier: str, operation: str, hit: Optional[bool], start: float):
+        """Trimite latența operației în histograma per tier din monitoring"""
+        if not monitoring:
+            return
+        duration_ms = (time.perf_counter() - start) * 1000
+        self._latency_labels.add((tier, operation))
+        monitoring.record_cache_event(operation, hit=hit, tier=tier, duration_ms=duration_ms)
+    
+    async def aget(self, key: str) -> Optional[T]:
+        """
+        Varianta async a get(): tier-ul memorie este citit fără lock, iar
+        tier-ul disk rulează pe executor-ul dedicat, fără să blocheze event loop-ul.
+        """
+        self.stats['total_requests'] += 1
+        
+        start = time.perf_counter()
+        value = self.memory_cache.get_nowait(key)
+        self._record_latency('memory', 'get', value is not None, start)
+        if value is not None:
+            self.stats['memory_hits'] += 1
+            return value
+        
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        value = await loop.run_in_executor(self._get_disk_executor(), self.disk_cache.get, key)
+        self._record_latency('disk', 'get', value is not None, start)
+        if value is not None:
+            self.stats['disk_hits'] += 1
+            self._promote_to_memory(key, value)
+            return value
+        
+        self.stats['misses'] += 1
+        return None
+    
+    async def aput(self, key: str,
+                   value: T,
+                   ttl: Optional[float] = None,
+                   priority: str = "normal",
+                   metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Varianta async a put(): scrierile care ajung pe disk (valori mari sau
+        transferul intrării evacuate din memorie) rulează pe executor-ul dedicat.
+        """
+        start = time.perf_counter()
+        if self._put_touches_disk(key, value):
+            loop = asyncio.get_running_loop()
+            success = await loop.run_in_executor(
+                self._get_disk_executor(),
+                functools.partial(self.put, key, value, ttl, priority, metadata)
+            )
+            self._record_latency('disk', 'put', None, start)
+        else:
+            success = self.put(key, value, ttl, priority, metadata)
+            self._record_latency('memory', 'put', None, start)
+        return success
+    
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Dimensiunea aproximativă a unei valori"""
+        try:
+            return sys.getsizeof(value)
+        except Exception as e:
+            logger.debug(f"Nu s-a putut calcula dimensiunea valorii pentru cache: {e}")
+            return 1024
+    
+    def _put_touches_disk(self, key: str, value: T) -> bool:
+        """Verifică dacă put() ar scrie pe disk (aceleași reguli ca _smart_put)"""
+        if self.strategy != CacheStrategy.SMART:
+            return False
+        if self._estimate_size(value) >= 10240:
+            return True
+        return key not in self.memory_cache.cache and len(self.memory_cache.cache) >= self.memory_cache.max_size
+    
     def put(self, key: str, 
             value: T, 
             ttl: Optional[float] = None,
@@ -483,11 +933,7 @@ class SmartCache(Generic[T]):
         cache_metadata['priority'] = priority
         
         # Calculează dimensiunea aproximativă
-        try:
-            value_size = sys.getsizeof(value)
-        except Exception as e:
-            logger.debug(f"Nu s-a putut calcula dimensiunea valorii pentru cache: {e}")
-            value_size = 1024
+        value_size = self._estimate_size(value)
         
         # Strategie de plasare
         if self.strategy == CacheStrategy.SMART:
@@ -614,6 +1060,13 @@ class SmartCache(Generic[T]):
         memory_stats = self.memory_cache.get_stats()
         disk_stats = self.disk_cache.get_stats()
         
+        latency = {}
+        if monitoring:
+            for tier, operation in sorted(self._latency_labels):
+                latency[f"{tier}_{operation}"] = monitoring.metrics.get_histogram_stats(
+                    "cache_latency_ms", labels={"event_type": operation, "tier": tier}
+                )
+        
         total_requests = self.stats['total_requests']
         overall_hit_rate = 0
         
@@ -634,6 +1087,7 @@ class SmartCache(Generic[T]):
             },
             "memory_cache": memory_stats,
             "disk_cache": disk_stats,
+            "latency_ms": latency,
             "health": {
                 "cleanup_thread_alive": self.cleanup_thread.is_alive() if self.cleanup_thread else False,
                 "total_entries": memory_stats.get('entries', 0) + disk_stats.get('entries', 0)
@@ -645,6 +1099,9 @@ class SmartCache(Generic[T]):
         self.should_stop = True
         if self.cleanup_thread and self.cleanup_thread.is_alive():
             self.cleanup_thread.join(timeout=5)
+        if self._disk_executor is not None:
+            self._disk_executor.shutdown(wait=False)
+            self._disk_executor = None
             
         logger.info("🧠 Smart Cache stopped")
 
@@ -685,7 +1142,7 @@ def cached(ttl: Optional[float] = None,
                 cache_key = generate_cache_key(f"{key_prefix}_{func.__name__}", *args, **kwargs)
                 
                 # Încearcă să obții din cache
-                cached_result = cache.get(cache_key)
+                cached_result = await cache.aget(cache_key)
                 if cached_result is not None:
                     return cached_result
                     
@@ -694,7 +1151,7 @@ def cached(ttl: Optional[float] = None,
                 
                 # Salvează în cache
                 if result is not None:
-                    cache.put(cache_key, result, ttl=ttl, priority=priority)
+                    await cache.aput(cache_key, result, ttl=ttl, priority=priority)
                     
                 return result
             return async_wrapper
@@ -0,0 +1,242 @@
+# utils/cache_codecs.py - Codec-uri pentru valorile din cache-ul de pe disk
+# Versiunea: 1.0.0
+
+import os
+import json
+import time
+import zlib
+import pickle
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Antetul fișierelor: magic (4 bytes) + id codec (1 byte) + flags (1 byte)
+MAGIC = b'TBC1'
+HEADER_SIZE = 6
+FLAG_COMPRESSED = 0x01
+
+
+class UnsupportedCacheFormat(ValueError):
+    """Intrare scrisă cu pickle (sau fără antet) când pickle este dezactivat"""
+
+
+class CacheCodec:
+    """Codec de bază: transformă o valoare în bytes și înapoi"""
+    name = 'base'
+    codec_id = 0
+
+    def accepts(self, value: Any) -> bool:
+        """Verifică dacă valoarea poate fi codificată fără pierderi"""
+        raise NotImplementedError
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data) -> Any:
+        raise NotImplementedError
+
+
+def _is_json_safe(value: Any, depth: int = 0) -> bool:
+    """Tipuri care supraviețuiesc nemodificate unui round-trip JSON"""
+    if depth > 64:
+        return False
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_safe(item, depth + 1) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_json_safe(v, depth + 1) for k, v in value.items())
+    return False
+
+
+def _is_msgpack_safe(value: Any, depth: int = 0) -> bool:
+    """Tipuri care supraviețuiesc nemodificate unui round-trip msgpack"""
+    if depth > 64:
+        return False
+    if value is None or isinstance(value, (str, bytes, bool, int, float)):
+        return not isinstance(value, int) or -2 ** 63 <= value < 2 ** 64
+    if isinstance(value, list):
+        return all(_is_msgpack_safe(item, depth + 1) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, (str, int)) and not isinstance(k, bool) and _is_msgpack_safe(v, depth + 1)
+                   for k, v in value.items())
+    return False
+
+
+class RawBytesCodec(CacheCodec):
+    """Payload-uri binare (thumbnail-uri etc.) stocate ca atare, fără compresie"""
+    name = 'raw'
+    codec_id = 1
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, (bytes, bytearray, memoryview))
+
+    def encode(self, value: Any) -> bytes:
+        return bytes(value)
+
+    def decode(self, data) -> Any:
+        return bytes(data)
+
+
+class JSONCodec(CacheCodec):
+    """Metadata (dict/list/str/numere) ca JSON compact"""
+    name = 'json'
+    codec_id = 2
+
+    def accepts(self, value: Any) -> bool:
+        return _is_json_safe(value)
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, data) -> Any:
+        return json.loads(bytes(data))
+
+
+class MsgpackCodec(CacheCodec):
+    """Metadata ca msgpack (mai compact și mai rapid decât JSON, acceptă bytes)"""
+    name = 'msgpack'
+    codec_id = 3
+
+    def accepts(self, value: Any) -> bool:
+        return _is_msgpack_safe(value)
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class PickleCodec(CacheCodec):
+    """Fallback pentru obiecte Python arbitrare; nesigur dacă directorul este partajat"""
+    name = 'pickle'
+    codec_id = 4
+
+    def accepts(self, value: Any) -> bool:
+        return True
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data) -> Any:
+        return pickle.loads(data)
+
+
+class CodecRegistry:
+    """
+    Alege codec-ul pentru fiecare valoare (raw -> msgpack -> json -> pickle),
+    comprimă payload-urile peste prag și măsoară timpii și dimensiunile per codec.
+    """
+
+    def __init__(self, compress_threshold: int = 4096, compress_level: int = 6,
+                 allow_pickle: bool = False,
+                 preferred: Optional[List[str]] = None):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.allow_pickle = allow_pickle
+
+        available = {codec.name: codec for codec in (RawBytesCodec(), JSONCodec(), PickleCodec())}
+        if msgpack is not None:
+            available['msgpack'] = MsgpackCodec()
+        order = preferred or ['raw', 'msgpack', 'json', 'pickle']
+        self.codecs = [available[name] for name in order if name in available]
+        if not allow_pickle:
+            self.codecs = [codec for codec in self.codecs if codec.name != 'pickle']
+        self.by_id = {codec.codec_id: codec for codec in available.values()}
+
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _record(self, codec_name: str, **values):
+        with self.lock:
+            stats = self.stats.setdefault(codec_name, {
+                'encoded': 0, 'decoded': 0, 'encode_ms': 0.0, 'decode_ms': 0.0,
+                'raw_bytes': 0, 'stored_bytes': 0, 'compressed': 0
+            })
+            for name, value in values.items():
+                stats[name] += value
+
+    def select(self, value: Any) -> CacheCodec:
+        """Primul codec care acceptă valoarea fără pierderi"""
+        for codec in self.codecs:
+            if codec.accepts(value):
+                return codec
+        raise TypeError(f"Valoare de tip {type(value).__name__} nu poate fi serializată fără pickle")
+
+    def encode(self, value: Any, compress: bool = True) -> bytes:
+        """Serializează valoarea cu antet (codec + flags), comprimată peste prag"""
+        start = time.perf_counter()
+        codec = self.select(value)
+        payload = codec.encode(value)
+        raw_size = len(payload)
+
+        flags = 0
+        # Payload-urile raw (deja comprimate: imagini, video) rămân necomprimate
+        if compress and codec.name != 'raw' and raw_size >= self.compress_threshold:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < raw_size:
+                payload = compressed
+                flags |= FLAG_COMPRESSED
+
+        data = MAGIC + bytes((codec.codec_id, flags)) + payload
+        self._record(codec.name, encoded=1, encode_ms=(time.perf_counter() - start) * 1000,
+                     raw_bytes=raw_size, stored_bytes=len(data), compressed=1 if flags else 0)
+        return data
+
+    def decode(self, data) -> Any:
+        """Deserializează un buffer complet (antet + payload)"""
+        start = time.perf_counter()
+        view = memoryview(data)
+        if bytes(view[:4]) != MAGIC:
+            # Fișier scris înainte de codec-uri (pickle fără antet)
+            if not self.allow_pickle:
+                raise UnsupportedCacheFormat("Format de cache necunoscut și pickle este dezactivat")
+            value = pickle.loads(view)
+            self._record('pickle', decoded=1, decode_ms=(time.perf_counter() - start) * 1000)
+            return value
+
+        codec = self.by_id.get(view[4])
+        if codec is None or (codec.name == 'pickle' and not self.allow_pickle):
+            raise UnsupportedCacheFormat(f"Codec de cache nepermis: {view[4]}")
+        payload = view[HEADER_SIZE:]
+        if view[5] & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+        value = codec.decode(payload)
+        self._record(codec.name, decoded=1, decode_ms=(time.perf_counter() - start) * 1000)
+        return value
+
+    def read_file(self, path: str) -> Any:
+        """
+        Citește o valoare de pe disk. Payload-urile raw sunt citite direct
+        după antet ca bytes (o singură copie, fără a decoda tot buffer-ul).
+        """
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if (len(header) == HEADER_SIZE and header[:4] == MAGIC and header[4] == RawBytesCodec.codec_id
+                    and not header[5] & FLAG_COMPRESSED):
+                start = time.perf_counter()
+                value = f.read()
+                self._record('raw', decoded=1, decode_ms=(time.perf_counter() - start) * 1000)
+                return value
+            f.seek(0)
+            return self.decode(f.read())
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistici per codec: timpi medii și raportul de compresie pe disk"""
+        with self.lock:
+            snapshot = {name: dict(values) for name, values in self.stats.items()}
+        for values in snapshot.values():
+            values['avg_encode_ms'] = round(values['encode_ms'] / values['encoded'], 4) if values['encoded'] else 0.0
+            values['avg_decode_ms'] = round(values['decode_ms'] / values['decoded'], 4) if values['decoded'] else 0.0
+            values['disk_ratio'] = round(values['stored_bytes'] / values['raw_bytes'], 3) if values['raw_bytes'] else 0.0
+            values['encode_ms'] = round(values['encode_ms'], 3)
+            values['decode_ms'] = round(values['decode_ms'], 3)
+        return snapshot
@@ -0,0 +1,290 @@
+# utils/download/download_executor.py - Executor unic (per proces) pentru descărcările blocante
+# Versiunea: 1.0.0
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence
+
+try:
+    # yt-dlp re-aruncă explicit DownloadCancelled din hook-uri, fără retry sau ignoreerrors
+    from yt_dlp.utils import DownloadCancelled as _CancelledBase
+except ImportError:  # pragma: no cover
+    _CancelledBase = Exception
+
+from utils.download.worker_pool import (
+    WORKER_PROCESS_ENV, WARMUP_URLS, WorkerCrashed, WorkerProcessPool, summarize_ms, warm_ytdlp
+)
+
+logger = logging.getLogger(__name__)
+
+_job_context = threading.local()
+
+
+class DownloadCancelled(_CancelledBase):
+    """Descărcarea a fost anulată de utilizator (ex. mesajul de status a fost șters)"""
+
+    def __init__(self, msg: str = 'Descărcare anulată'):
+        super().__init__(msg)
+
+
+class DownloadJob:
+    """O descărcare trimisă executorului; permite așteptarea din asyncio și anularea"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[concurrent.futures.Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> bool:
+        """
+        Cere anularea: job-ul încă în coadă nu mai pornește, iar cel în execuție
+        se oprește la următorul check_cancelled() (ex. hook-ul de progres yt-dlp).
+
+        Returns:
+            True dacă job-ul a fost scos din coadă înainte de a porni
+        """
+        self.cancel_event.set()
+        return self.future.cancel() if self.future is not None else False
+
+    async def wait(self) -> Any:
+        """Așteaptă rezultatul; anularea task-ului care așteaptă anulează și job-ul"""
+        try:
+            return await asyncio.wrap_future(self.future)
+        except asyncio.CancelledError:
+            if self.cancelled and self.future.cancelled():
+                raise DownloadCancelled() from None
+            self.cancel()
+            raise
+
+    def discard(self, cleanup: Callable[[Any], None]):
+        """Eliberează rezultatul unui job abandonat, acum sau când se termină"""
+        def on_done(future: concurrent.futures.Future):
+            if not future.cancelled() and future.exception() is None:
+                try:
+                    cleanup(future.result())
+                except Exception as e:
+                    logger.warning(f"⚠️ Cleanup failed for abandoned download job: {e}")
+
+        self.future.add_done_callback(on_done)
+
+
+def current_job() -> Optional[DownloadJob]:
+    """Job-ul executat de thread-ul curent (None în afara executorului)"""
+    return getattr(_job_context, 'job', None)
+
+
+def check_cancelled(abort: Optional[Callable[[], bool]] = None):
+    """
+    Aruncă DownloadCancelled dacă job-ul thread-ului curent a fost anulat.
+
+    Args:
+        abort: Condiție suplimentară (ex. nimeni altcineva nu așteaptă rezultatul)
+    """
+    job = current_job()
+    if job is not None and job.cancelled and (abort is None or abort()):
+        raise DownloadCancelled()
+
+
+class DownloadExecutor:
+    """
+    Pool unic de thread-uri pentru descărcările blocante (yt-dlp, I/O pe fișiere),
+    folosit de toți handler-ii în locul unui ThreadPoolExecutor nou per video.
+
+    - mărime configurabilă, creat leneș și recreat după fork (gunicorn --preload);
+    - metrici de coadă: job-uri în așteptare / în execuție, timp de așteptare și de rulare;
+    - anulare: job-urile din coadă sunt scoase, cele pornite se opresc cooperativ;
+    - opțional, procese worker yt-dlp încălzite (process_workers > 0, vezi WorkerProcessPool)
+      în care call_in_process rulează descărcările în afara GIL-ului procesului principal.
+    """
+
+    def __init__(self, max_workers: int = 4, process_workers: int = 0,
+                 name: str = 'downloads', samples: int = 500, process_max_jobs: int = 50,
+                 warm_platforms: Sequence[str] = ()):
+        self.max_workers = max(1, max_workers)
+        self.process_workers = max(0, process_workers)
+        self.process_max_jobs = process_max_jobs
+        self.warm_platforms = tuple(warm_platforms)
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._process_pool: Optional[WorkerProcessPool] = None
+        self._pid: Optional[int] = None
+        self._queued = 0
+        self._running = 0
+
+        self._wait_samples: Deque[float] = deque(maxlen=samples)
+        self._run_samples: Deque[float] = deque(maxlen=samples)
+        self.reset_stats()
+
+        logger.info(f"🧵 Download executor '{name}': {self.max_workers} threads, "
+                    f"{self.process_workers or 'fără'} procese")
+
+    def reset_stats(self):
+        """Resetează statisticile (starea curentă a cozii este păstrată)"""
+        with self._lock:
+            self.stats = {
+                'submitted': 0,
+                'completed': 0,
+                'failed': 0,
+                'cancelled': 0,
+                'max_queued': self._queued,
+                'process_calls': 0,
+                'process_fallbacks': 0
+            }
+            self._wait_samples.clear()
+            self._run_samples.clear()
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Pool-ul procesului curent; apelat cu lock-ul deținut"""
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            if self._pid != pid:
+                # Proces copil: pool-urile moștenite nu au thread-uri/procese în acest proces
+                self._process_pool = None
+                self._queued = self._running = 0
+            self._pid = pid
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+            )
+        return self._pool
+
+    def submit(self, func: Callable, *args, label: Optional[str] = None, **kwargs) -> DownloadJob:
+        """Pune func(*args, **kwargs) în coada executorului"""
+        job = DownloadJob(label or getattr(func, '__name__', 'job'))
+        with self._lock:
+            pool = self._get_pool()
+            self._queued += 1
+            self.stats['submitted'] += 1
+            if self._queued > self.stats['max_queued']:
+                self.stats['max_queued'] = self._queued
+            job.future = pool.submit(self._run_job, job, func, args, kwargs)
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job
+
+    async def run(self, func: Callable, *args, label: Optional[str] = None, **kwargs) -> Any:
+        """Rulează func în executor și așteaptă rezultatul fără a bloca event loop-ul"""
+        return await self.submit(func, *args, label=label, **kwargs).wait()
+
+    def _run_job(self, job: DownloadJob, func: Callable, args, kwargs) -> Any:
+        job.started_at = time.time()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_samples.append(job.started_at - job.submitted_at)
+        try:
+            if job.cancelled:
+                raise DownloadCancelled()
+            _job_context.job = job
+            return func(*args, **kwargs)
+        finally:
+            _job_context.job = None
+            with self._lock:
+                self._running -= 1
+                self._run_samples.append(time.time() - job.started_at)
+
+    def _on_done(self, job: DownloadJob, future: concurrent.futures.Future):
+        with self._lock:
+            if future.cancelled():
+                self._queued -= 1  # scos din coadă înainte de a porni
+                self.stats['cancelled'] += 1
+            elif isinstance(future.exception(), DownloadCancelled):
+                self.stats['cancelled'] += 1
+            elif future.exception() is not None:
+                self.stats['failed'] += 1
+            else:
+                self.stats['completed'] += 1
+
+    def get_process_pool(self) -> Optional[WorkerProcessPool]:
+        """Pool-ul de procese worker (creat leneș; None dacă process_workers = 0)"""
+        if not self.process_workers or os.getenv(WORKER_PROCESS_ENV):
+            return None
+        with self._lock:
+            self._get_pool()
+            if self._process_pool is None:
+                self._process_pool = WorkerProcessPool(
+                    self.process_workers, max_jobs=self.process_max_jobs,
+                    warmup=warm_ytdlp if self.warm_platforms else None,
+                    warmup_args=(self.warm_platforms,), name=f"{self.name}-process"
+                )
+            return self._process_pool
+
+    def call_in_process(self, func: Callable, *args, abort: Optional[Callable[[], bool]] = None, **kwargs) -> Any:
+        """
+        Apel blocant al func într-un proces worker (dacă este configurat), altfel direct.
+
+        func și argumentele trebuie să fie picklable (funcții la nivel de modul).
+        Anularea job-ului curent (cu condiția abort, ca la check_cancelled) este
+        transmisă worker-ului; dacă worker-ul moare, apelul rulează local.
+        """
+        process_pool = self.get_process_pool()
+        if process_pool is None:
+            return func(*args, **kwargs)
+
+        job = current_job()
+        check_cancelled(abort)
+        with self._lock:
+            self.stats['process_calls'] += 1
+        try:
+            return process_pool.call(
+                func, *args,
+                should_cancel=(lambda: job.cancelled and (abort is None or abort())) if job else None,
+                **kwargs
+            )
+        except WorkerCrashed as e:
+            logger.error(f"❌ {e}, running download locally")
+            with self._lock:
+                self.stats['process_fallbacks'] += 1
+            return func(*args, **kwargs)
+
+    _summary_ms = staticmethod(summarize_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Starea cozii și statisticile timpilor de așteptare/rulare"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'workers': self.max_workers,
+                'process_workers': self.process_workers,
+                'queued': self._queued,
+                'running': self._running
+            })
+            wait_samples = list(self._wait_samples)
+            run_samples = list(self._run_samples)
+            process_pool = self._process_pool if self._pid == os.getpid() else None
+        stats['wait_time_ms'] = self._summary_ms(wait_samples)
+        stats['run_time_ms'] = self._summary_ms(run_samples)
+        if process_pool is not None:
+            stats['process_pool'] = process_pool.get_stats()
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Oprește pool-urile (job-urile din coadă sunt anulate)"""
+        with self._lock:
+            pool, process_pool = self._pool, self._process_pool
+            self._pool = self._process_pool = None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown()
+
+
+# Instanță globală
+download_executor = DownloadExecutor(
+    max_workers=int(os.getenv('DOWNLOAD_EXECUTOR_WORKERS', '4')),
+    process_workers=int(os.getenv('DOWNLOAD_PROCESS_WORKERS', '0')),
+    process_max_jobs=int(os.getenv('DOWNLOAD_PROCESS_MAX_JOBS', '50')),
+    warm_platforms=[p.strip() for p in os.getenv('DOWNLOAD_PROCESS_WARM_PLATFORMS', ','.join(WARMUP_URLS)).split(',')
+                    if p.strip()]
+)
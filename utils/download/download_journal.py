@@ -0,0 +1,184 @@
+# utils/download/download_journal.py - Jurnal persistent al descărcărilor (SQLite)
+# Versiunea: 1.0.0
+
+"""
+Jurnalul DownloadManager-ului: starea fiecărui DownloadTask nefinalizat și
+offset-urile segmentelor descărcate, într-o bază SQLite (WAL).
+
+La pornire, DownloadManager.initialize() citește jurnalul, reia fișierele
+parțiale (după verificarea integrității) și re-adaugă în coadă task-urile
+în așteptare. Task-urile terminate, eșuate definitiv sau anulate sunt
+șterse din jurnal.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.download.segmented_downloader import ResumeState
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JournalEntry:
+    """Un task de descărcare, așa cum este salvat în jurnal"""
+    task_id: str
+    url: str
+    filename: str
+    output_path: str
+    priority: int
+    status: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    cookies: Dict[str, str] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    retry_count: int = 0
+    temp_file: Optional[str] = None
+    error_message: Optional[str] = None
+    resume_state: Optional[ResumeState] = None
+    updated_at: float = 0.0
+
+
+class DownloadJournal:
+    """
+    Jurnal SQLite al task-urilor de descărcare.
+
+    Scrierile sunt mici (un rând per task) și pot veni din thread-uri
+    (checkpoint-urile segmentelor rulează în executor), de aceea conexiunea
+    este partajată sub lock. Fișierul conține headers/cookies ale
+    task-urilor și este creat cu permisiuni 0600.
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        self.stats = {
+            'writes': 0,
+            'checkpoints': 0,
+            'replayed': 0,
+        }
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(db_file):
+            os.close(os.open(db_file, os.O_CREAT | os.O_WRONLY, 0o600))
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " filename TEXT NOT NULL,"
+            " output_path TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " headers TEXT,"
+            " cookies TEXT,"
+            " metadata TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " retry_count INTEGER NOT NULL DEFAULT 0,"
+            " temp_file TEXT,"
+            " error_message TEXT,"
+            " resume_state TEXT)"
+        )
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexiunea SQLite a procesului curent (redeschisă după fork)"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn_pid = pid
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            self.stats['writes'] += 1
+            return cursor.rowcount
+
+    def upsert(self, entry: JournalEntry):
+        """Salvează task-ul complet (la adăugare sau la schimbări de stare)"""
+        self._execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.task_id, entry.url, entry.filename, entry.output_path, entry.priority, entry.status,
+             json.dumps(entry.headers), json.dumps(entry.cookies), json.dumps(entry.metadata, default=str),
+             entry.created_at, time.time(), entry.retry_count, entry.temp_file, entry.error_message,
+             json.dumps(entry.resume_state.to_dict()) if entry.resume_state else None)
+        )
+
+    def update_status(self, task_id: str, status: str, retry_count: Optional[int] = None,
+                      error_message: Optional[str] = None):
+        """Actualizează doar starea unui task"""
+        self._execute(
+            "UPDATE tasks SET status = ?, retry_count = COALESCE(?, retry_count),"
+            " error_message = COALESCE(?, error_message), updated_at = ? WHERE id = ?",
+            (status, retry_count, error_message, time.time(), task_id)
+        )
+
+    def save_progress(self, task_id: str, temp_file: Optional[str], state: Optional[ResumeState]):
+        """Checkpoint: fișierul parțial și offset-urile segmentelor"""
+        self._execute(
+            "UPDATE tasks SET temp_file = ?, resume_state = ?, updated_at = ? WHERE id = ?",
+            (temp_file, json.dumps(state.to_dict()) if state else None, time.time(), task_id)
+        )
+        self.stats['checkpoints'] += 1
+
+    def remove(self, task_id: str):
+        """Șterge task-ul din jurnal (terminat, eșuat definitiv sau anulat)"""
+        self._execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def load(self) -> List[JournalEntry]:
+        """Task-urile din jurnal, în ordinea creării"""
+        entries = []
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, url, filename, output_path, priority, status, headers, cookies, metadata,"
+                " created_at, retry_count, temp_file, error_message, resume_state, updated_at"
+                " FROM tasks ORDER BY created_at"
+            ).fetchall()
+
+        for row in rows:
+            try:
+                resume_state = ResumeState.from_dict(json.loads(row[13])) if row[13] else None
+                entries.append(JournalEntry(
+                    task_id=row[0], url=row[1], filename=row[2], output_path=row[3],
+                    priority=row[4], status=row[5],
+                    headers=json.loads(row[6] or '{}'), cookies=json.loads(row[7] or '{}'),
+                    metadata=json.loads(row[8] or '{}'), created_at=row[9], retry_count=row[10],
+                    temp_file=row[11], error_message=row[12], resume_state=resume_state,
+                    updated_at=row[14]
+                ))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️ Skipping corrupt journal entry {row[0]}: {e}")
+                self.remove(row[0])
+
+        self.stats['replayed'] += len(entries)
+        return entries
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['entries'] = self.count()
+        stats['db_file'] = self.db_file
+        return stats
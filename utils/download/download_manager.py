@@ -33,6 +33,10 @@ except ImportError:
         PlatformError, DownloadError
     )
 
+from utils.download.download_journal import DownloadJournal, JournalEntry
+from utils.download.segmented_downloader import ResumeState, segmented_downloader
+from utils.network.session_pool import redirect_session
+
 logger = logging.getLogger(__name__)
 
 class DownloadStatus(Enum):
@@ -148,6 +152,8 @@ class DownloadConfig:
     verify_ssl: bool = True
     follow_redirects: bool = True
     resume_downloads: bool = True
+    journal_downloads: bool = True  # coada și fișierele parțiale supraviețuiesc unui restart
+    journal_file: Optional[str] = None  # implicit DOWNLOAD_JOURNAL_FILE sau <temp_directory>/download_journal.sqlite3
     auto_retry: bool = True
     compression: CompressionType = CompressionType.NONE
     progress_callback: Optional[Callable] = None
@@ -173,6 +179,7 @@ class DownloadTask:
     error_message: Optional[str] = None
     retry_count: int = 0
     temp_file: Optional[str] = None
+    resume_state: Optional[ResumeState] = None  # offset-urile segmentelor, din ultimul checkpoint
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -282,7 +289,9 @@ class DownloadManager:
             'cancelled_downloads': 0,
             'total_bytes_downloaded': 0,
             'average_speed': 0.0,
-            'active_downloads': 0
+            'active_downloads': 0,
+            'replayed_downloads': 0,
+            'resumed_downloads': 0
         }
         
         # Callback-uri globale
@@ -309,6 +318,18 @@ class DownloadManager:
         # Asigură-te că directoarele există
         self._ensure_directories()
         
+        # Jurnalul persistent al task-urilor (reluat în initialize())
+        self.journal: Optional[DownloadJournal] = None
+        if self.config.journal_downloads:
+            journal_file = self.config.journal_file or os.getenv(
+                'DOWNLOAD_JOURNAL_FILE',
+                os.path.join(self.config.temp_directory, "download_journal.sqlite3")
+            )
+            try:
+                self.journal = DownloadJournal(journal_file)
+            except Exception as e:
+                logger.error(f"❌ Could not open download journal {journal_file}: {e}")
+        
         logger.info("📥 Download Manager initialized")
     
     def _ensure_directories(self):
@@ -320,11 +341,115 @@ class DownloadManager:
         """Inițializează managerul de descărcări"""
         logger.info("🚀 Starting Download Manager...")
         
+        # Reia task-urile din jurnal înainte ca procesorul cozii să pornească
+        await self._replay_journal()
+        
         # Start background tasks
         await self._start_background_tasks()
         
         logger.info("✅ Download Manager initialized")
     
+    def _journal_entry(self, task: DownloadTask) -> JournalEntry:
+        return JournalEntry(
+            task_id=task.id,
+            url=task.url,
+            filename=task.filename,
+            output_path=task.output_path,
+            priority=task.priority.value,
+            status=task.status.value,
+            headers=task.headers,
+            cookies=task.cookies,
+            metadata=task.metadata,
+            created_at=task.created_at.timestamp(),
+            retry_count=task.retry_count,
+            temp_file=task.temp_file,
+            error_message=task.error_message,
+            resume_state=task.resume_state
+        )
+    
+    def _journal_call(self, method: str, *args, **kwargs):
+        """Scrie în jurnal; o eroare de jurnal nu oprește descărcarea"""
+        if not self.journal:
+            return
+        try:
+            getattr(self.journal, method)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"⚠️ Download journal {method} failed: {e}")
+    
+    async def _replay_journal(self):
+        """Re-adaugă în coadă task-urile nefinalizate din jurnal, cu fișierele lor parțiale"""
+        if not self.journal:
+            return
+        
+        try:
+            entries = self.journal.load()
+        except Exception as e:
+            logger.error(f"❌ Could not read download journal: {e}")
+            return
+        
+        resumable = 0
+        for entry in entries:
+            paused = entry.status == DownloadStatus.PAUSED.value
+            task = DownloadTask(
+                id=entry.task_id,
+                url=entry.url,
+                filename=entry.filename,
+                output_path=entry.output_path,
+                priority=DownloadPriority(entry.priority),
+                status=DownloadStatus.PAUSED if paused else DownloadStatus.PENDING,
+                metadata=entry.metadata,
+                headers=entry.headers,
+                cookies=entry.cookies,
+                created_at=datetime.fromtimestamp(entry.created_at),
+                retry_count=entry.retry_count,
+                temp_file=entry.temp_file,
+                error_message=entry.error_message,
+                resume_state=entry.resume_state
+            )
+            
+            if self._verify_partial_file(task):
+                resumable += 1
+            
+            # Task-urile PAUSED rămân în coadă, dar pornesc doar după resume_download()
+            await self.queue.add_task(task)
+            self._journal_call('upsert', self._journal_entry(task))
+        
+        if entries:
+            self.stats['replayed_downloads'] += len(entries)
+            logger.info(f"📒 Replayed {len(entries)} download(s) from journal ({resumable} with partial data)")
+    
+    def _verify_partial_file(self, task: DownloadTask) -> bool:
+        """
+        Verifică fișierul parțial al unui task reluat din jurnal.
+        
+        Un fișier pe segmente trebuie să existe cu dimensiunea prealocată;
+        datele de la marginea fiecărui segment sunt verificate apoi față de
+        server, la reluare. Un fișier care nu trece verificarea este șters,
+        iar descărcarea pornește de la zero.
+        """
+        if not task.temp_file or not os.path.exists(task.temp_file):
+            task.temp_file = None
+            task.resume_state = None
+            return False
+        
+        state = task.resume_state
+        if state is None:
+            # Fișier dintr-un flux unic: reluat prin Range de la dimensiunea lui
+            return os.path.getsize(task.temp_file) > 0
+        
+        if os.path.getsize(task.temp_file) != state.total or state.downloaded > state.total:
+            logger.warning(f"⚠️ Partial file for {task.filename} is corrupt, restarting download")
+            try:
+                os.remove(task.temp_file)
+            except OSError:
+                pass
+            task.temp_file = None
+            task.resume_state = None
+            return False
+        
+        task.progress.update(state.downloaded, state.total)
+        return state.downloaded > 0
+    
     async def _start_background_tasks(self):
         """Pornește task-urile de background"""
         # Task pentru procesarea cozii
@@ -363,6 +488,7 @@ class DownloadManager:
         """Pornește o descărcare"""
         task.status = DownloadStatus.DOWNLOADING
         task.started_at = datetime.now()
+        self._journal_call('update_status', task.id, task.status.value)
         
         # Creează task-ul de descărcare
         download_task = asyncio.create_task(self._download_file(task))
@@ -383,95 +509,61 @@ class DownloadManager:
             if 'User-Agent' not in headers:
                 headers['User-Agent'] = self.config.user_agent or self.user_agents[0]
             
-            # Verifică dacă putem resume descărcarea
+            # Verifică dacă putem resume descărcarea (fișier dintr-un flux unic; cele pe segmente au resume_state)
             resume_pos = 0
-            if self.config.resume_downloads and task.temp_file and os.path.exists(task.temp_file):
+            if (self.config.resume_downloads and task.resume_state is None
+                    and task.temp_file and os.path.exists(task.temp_file)):
                 resume_pos = os.path.getsize(task.temp_file)
-                headers['Range'] = f'bytes={resume_pos}-'
                 logger.info(f"🔄 Resuming download from byte {resume_pos}")
             
             # Configurează timeout
             timeout = aiohttp.ClientTimeout(total=self.config.timeout)
             
-            async with aiohttp.ClientSession(
-                timeout=timeout,
-                headers=headers,
-                cookies=self.config.cookies
-            ) as session:
-                async with session.get(
-                    task.url,
-                    ssl=self.config.verify_ssl,
-                    allow_redirects=self.config.follow_redirects,
-                    proxy=self.config.proxy
-                ) as response:
-                    
-                    # Verifică status code
-                    if response.status not in [200, 206]:  # 206 pentru partial content
-                        raise DownloadError(f"HTTP {response.status}: {response.reason}")
-                    
-                    # Obține informații despre fișier
-                    content_length = response.headers.get('Content-Length')
-                    if content_length:
-                        total_size = int(content_length) + resume_pos
-                        task.progress.total_bytes = total_size
-                    
-                    # Verifică dimensiunea maximă
-                    if task.progress.total_bytes > self.config.max_file_size:
-                        raise DownloadError(f"File too large: {task.progress.total_bytes} bytes")
-                    
-                    # Determină numele fișierului temporar
-                    if not task.temp_file:
-                        task.temp_file = os.path.join(
-                            self.config.temp_directory,
-                            f"{task.id}.tmp"
-                        )
-                    
-                    # Descarcă fișierul
-                    mode = 'ab' if resume_pos > 0 else 'wb'
-                    async with aiofiles.open(task.temp_file, mode) as file:
-                        downloaded = resume_pos
-                        
-                        async for chunk in response.content.iter_chunked(self.config.chunk_size):
-                            if task.status == DownloadStatus.CANCELLED:
-                                raise asyncio.CancelledError("Download cancelled")
-                            
-                            if task.status == DownloadStatus.PAUSED:
-                                # Așteaptă până când descărcarea este resumed
-                                while task.status == DownloadStatus.PAUSED:
-                                    await asyncio.sleep(1)
-                            
-                            await file.write(chunk)
-                            downloaded += len(chunk)
-                            
-                            # Actualizează progresul
-                            task.progress.update(downloaded, task.progress.total_bytes)
-                            
-                            # Apelează callback-ul de progres
-                            await self._call_progress_callbacks(task)
-                    
-                    # Mută fișierul la destinația finală
-                    final_path = os.path.join(task.output_path, task.filename)
-                    os.makedirs(os.path.dirname(final_path), exist_ok=True)
-                    
-                    if os.path.exists(final_path):
-                        # Generează nume unic
-                        base, ext = os.path.splitext(final_path)
-                        counter = 1
-                        while os.path.exists(f"{base}_{counter}{ext}"):
-                            counter += 1
-                        final_path = f"{base}_{counter}{ext}"
-                        task.filename = os.path.basename(final_path)
-                    
-                    os.rename(task.temp_file, final_path)
-                    task.temp_file = None
-                    
-                    # Marchează ca completat
-                    task.status = DownloadStatus.COMPLETED
-                    task.completed_at = datetime.now()
-                    
-                    logger.info(f"✅ Download completed: {task.filename}")
-                    
+            # Determină numele fișierului temporar
+            if not task.temp_file:
+                task.temp_file = os.path.join(
+                    self.config.temp_directory,
+                    f"{task.id}.tmp"
+                )
+            
+            # Conexiuni partajate (keep-alive, cache DNS), cu cookie jar propriu pentru redirect-uri
+            async with redirect_session(self.config.proxy, self.config.cookies) as session:
+                if resume_pos > 0:
+                    # Fișier parțial dintr-un flux unic anterior: continuă cu Range de la final
+                    await self._download_stream(task, session, headers, timeout, resume_pos)
+                else:
+                    await self._download_segmented(task, session, headers, timeout)
+            
+            # Mută fișierul la destinația finală
+            final_path = os.path.join(task.output_path, task.filename)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            
+            if os.path.exists(final_path):
+                # Generează nume unic
+                base, ext = os.path.splitext(final_path)
+                counter = 1
+                while os.path.exists(f"{base}_{counter}{ext}"):
+                    counter += 1
+                final_path = f"{base}_{counter}{ext}"
+                task.filename = os.path.basename(final_path)
+            
+            os.rename(task.temp_file, final_path)
+            task.temp_file = None
+            task.resume_state = None
+            
+            # Marchează ca completat
+            task.status = DownloadStatus.COMPLETED
+            task.completed_at = datetime.now()
+            self._journal_call('remove', task.id)
+            
+            logger.info(f"✅ Download completed: {task.filename}")
+            
         except asyncio.CancelledError:
+            if self._shutdown and task.status != DownloadStatus.CANCELLED:
+                # Oprire (restart): task-ul rămâne în jurnal și este reluat la pornire
+                self._journal_call('update_status', task.id, DownloadStatus.PENDING.value)
+            else:
+                self._journal_call('remove', task.id)
             task.status = DownloadStatus.CANCELLED
             logger.info(f"🛑 Download cancelled: {task.filename}")
             raise
@@ -481,6 +573,8 @@ class DownloadManager:
             if self.config.auto_retry and task.retry_count < self.config.max_retries:
                 task.retry_count += 1
                 task.status = DownloadStatus.RETRYING
+                self._journal_call('update_status', task.id, task.status.value,
+                                   retry_count=task.retry_count, error_message=task.error_message)
                 
                 # Așteaptă înainte de retry
                 delay = self.config.retry_delay * (2 ** (task.retry_count - 1))  # Exponential backoff
@@ -492,11 +586,112 @@ class DownloadManager:
                 await self._start_download(task)
             else:
                 task.status = DownloadStatus.FAILED
+                self._journal_call('remove', task.id)
                 logger.error(f"❌ Download failed: {task.filename} - {e}")
                 
                 # Apelează callback-ul de eroare
                 await self._call_error_callbacks(task, e)
     
+    async def _check_task_state(self, task: DownloadTask):
+        """Oprește descărcarea dacă a fost anulată; așteaptă cât timp este pe pauză"""
+        if task.status == DownloadStatus.CANCELLED:
+            raise asyncio.CancelledError("Download cancelled")
+        
+        while task.status == DownloadStatus.PAUSED:
+            await asyncio.sleep(1)
+    
+    async def _download_segmented(self, task: DownloadTask, session: aiohttp.ClientSession,
+                                  headers: Dict[str, str], timeout: aiohttp.ClientTimeout):
+        """Descarcă pe segmente paralele (Range); flux unic dacă serverul nu suportă Range"""
+        async def on_progress(downloaded: int, total: int):
+            await self._check_task_state(task)
+            task.progress.update(downloaded, total or task.progress.total_bytes)
+            await self._call_progress_callbacks(task)
+        
+        def on_checkpoint(state: ResumeState):
+            # Apelat după fsync: offset-urile salvate nu depășesc datele de pe disk
+            task.resume_state = state
+            self._journal_call('save_progress', task.id, task.temp_file, state)
+        
+        try:
+            outcome = await segmented_downloader.download(
+                session,
+                task.url,
+                task.temp_file,
+                headers=headers,
+                timeout=timeout,
+                proxy=self.config.proxy,
+                ssl=self.config.verify_ssl,
+                max_size=self.config.max_file_size,
+                progress=on_progress,
+                resume=task.resume_state if self.config.resume_downloads else None,
+                checkpoint=on_checkpoint if self.journal else None,
+                allow_redirects=self.config.follow_redirects
+            )
+        except BaseException:
+            if not (self.journal and self.config.resume_downloads and task.resume_state):
+                # Fără offset-uri salvate, fișierul prealocat nu poate fi reluat: retry-ul pornește de la zero
+                task.resume_state = None
+                if task.temp_file and os.path.exists(task.temp_file):
+                    os.remove(task.temp_file)
+            raise
+        
+        task.progress.update(outcome.total_bytes, outcome.total_bytes)
+        if outcome.resumed_bytes:
+            self.stats['resumed_downloads'] += 1
+            logger.info(f"♻️ Resumed {task.filename} from {outcome.resumed_bytes} bytes")
+        if outcome.segmented:
+            logger.debug(f"🧩 {task.filename}: {outcome.segments} segments, "
+                         f"{outcome.throughput / 1024 / 1024:.1f} MB/s")
+    
+    async def _download_stream(self, task: DownloadTask, session: aiohttp.ClientSession,
+                               headers: Dict[str, str], timeout: aiohttp.ClientTimeout, resume_pos: int):
+        """Descarcă într-un singur flux, continuând fișierul temporar de la resume_pos"""
+        headers = dict(headers, Range=f'bytes={resume_pos}-')
+        async with session.get(
+            task.url,
+            headers=headers,
+            timeout=timeout,
+            ssl=self.config.verify_ssl,
+            allow_redirects=self.config.follow_redirects,
+            proxy=self.config.proxy
+        ) as response:
+            
+            # Verifică status code
+            if response.status not in [200, 206]:  # 206 pentru partial content
+                raise DownloadError(f"HTTP {response.status}: {response.reason}")
+            
+            if response.status == 200:
+                # Serverul a ignorat Range: trimite fișierul întreg
+                resume_pos = 0
+            
+            # Obține informații despre fișier
+            content_length = response.headers.get('Content-Length')
+            if content_length:
+                total_size = int(content_length) + resume_pos
+                task.progress.total_bytes = total_size
+            
+            # Verifică dimensiunea maximă
+            if task.progress.total_bytes > self.config.max_file_size:
+                raise DownloadError(f"File too large: {task.progress.total_bytes} bytes")
+            
+            # Descarcă fișierul
+            mode = 'ab' if resume_pos > 0 else 'wb'
+            async with aiofiles.open(task.temp_file, mode) as file:
+                downloaded = resume_pos
+                
+                async for chunk in response.content.iter_chunked(self.config.chunk_size):
+                    await self._check_task_state(task)
+                    
+                    await file.write(chunk)
+                    downloaded += len(chunk)
+                    
+                    # Actualizează progresul
+                    task.progress.update(downloaded, task.progress.total_bytes)
+                    
+                    # Apelează callback-ul de progres
+                    await self._call_progress_callbacks(task)
+    
     async def _on_download_complete(self, task_id: str):
         """Callback pentru finalizarea unei descărcări"""
         if task_id in self.active_downloads:
@@ -684,6 +879,7 @@ class DownloadManager:
         
         # Adaugă în coadă
         await self.queue.add_task(task)
+        self._journal_call('upsert', self._journal_entry(task))
         
         self.stats['total_downloads'] += 1
         
@@ -695,6 +891,7 @@ class DownloadManager:
         task = await self.queue.get_task(task_id)
         if task and task.status == DownloadStatus.DOWNLOADING:
             task.status = DownloadStatus.PAUSED
+            self._journal_call('update_status', task.id, task.status.value)
             logger.info(f"⏸️ Paused download: {task.filename}")
             return True
         return False
@@ -703,7 +900,13 @@ class DownloadManager:
         """Reia o descărcare pusă în pauză"""
         task = await self.queue.get_task(task_id)
         if task and task.status == DownloadStatus.PAUSED:
-            task.status = DownloadStatus.DOWNLOADING
+            if task_id in self.active_downloads:
+                task.status = DownloadStatus.DOWNLOADING
+            else:
+                # Task reluat din jurnal pe pauză: nu are încă o descărcare activă
+                task.status = DownloadStatus.PENDING
+                await self.queue.add_task(task)
+            self._journal_call('update_status', task.id, task.status.value)
             logger.info(f"▶️ Resumed download: {task.filename}")
             return True
         return False
@@ -720,6 +923,8 @@ class DownloadManager:
         
         # Marchează ca anulat
         task.status = DownloadStatus.CANCELLED
+        task.resume_state = None
+        self._journal_call('remove', task.id)
         
         # Șterge fișierul temporar
         if task.temp_file and os.path.exists(task.temp_file):
@@ -761,7 +966,14 @@ class DownloadManager:
     
     def get_stats(self) -> Dict[str, Any]:
         """Obține statisticile managerului"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['segmented'] = segmented_downloader.get_stats()
+        if self.journal:
+            try:
+                stats['journal'] = self.journal.get_stats()
+            except Exception as e:
+                stats['journal'] = {'error': str(e)}
+        return stats
     
     async def clear_completed_downloads(self):
         """Curăță toate descărcările completate"""
@@ -787,9 +999,13 @@ class DownloadManager:
         for task in self.background_tasks:
             task.cancel()
         
-        # Așteaptă ca task-urile să se termine
-        if self.background_tasks:
-            await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        # Așteaptă ca task-urile să se termine (descărcările își salvează ultimul checkpoint)
+        pending = list(self.active_downloads.values()) + self.background_tasks
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        if self.journal:
+            self.journal.close()
         
         logger.info("✅ Download Manager shutdown complete")
     
@@ -0,0 +1,308 @@
+# utils/download/format_planner.py - Selecție de format bazată pe metadata, înainte de descărcare
+# Versiunea: 1.0.0
+
+import logging
+import shutil
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Limita Telegram pentru bot-uri este 50MB; păstrăm un buffer de siguranță
+TELEGRAM_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TARGET_BYTES = 45 * 1024 * 1024
+
+# Marjă aplicată estimărilor (bitrate-ul real variază față de tbr-ul raportat)
+ESTIMATE_SAFETY_MARGIN = {
+    'exact': 1.0,
+    'approx': 1.05,
+    'bitrate': 1.10,
+    'model': 1.25
+}
+
+# Model de estimare pentru formatele fără filesize/tbr: bitrate tipic (kbps) pe înălțime
+TYPICAL_VIDEO_KBPS = (
+    (240, 400),
+    (360, 700),
+    (480, 1200),
+    (720, 2500),
+    (1080, 5000),
+    (1440, 9000),
+    (2160, 18000),
+)
+TYPICAL_AUDIO_KBPS = 128
+
+
+@dataclass
+class FormatPlan:
+    """Rezultatul planificării: formatul ales și estimarea dimensiunii"""
+    format_id: Optional[str]
+    estimated_bytes: Optional[int]
+    estimate_source: Optional[str]
+    fits: Optional[bool]               # None = nu există suficientă metadata
+    height: Optional[int] = None
+    unplanned_bytes: Optional[int] = None  # Estimarea formatului ales fără planificare
+    candidates: int = 0
+
+    def format_spec(self, fallback_spec: str) -> str:
+        """Spec-ul yt-dlp: formatul planificat, cu spec-ul original ca fallback"""
+        if self.format_id:
+            return f"{self.format_id}/{fallback_spec}" if fallback_spec else self.format_id
+        return fallback_spec
+
+
+def _typical_kbps(height: Optional[int]) -> float:
+    """Bitrate tipic pentru o înălțime dată, conform modelului"""
+    if not height:
+        height = 480
+    for max_height, kbps in TYPICAL_VIDEO_KBPS:
+        if height <= max_height:
+            return kbps + TYPICAL_AUDIO_KBPS
+    return TYPICAL_VIDEO_KBPS[-1][1] + TYPICAL_AUDIO_KBPS
+
+
+def estimate_format_size(fmt: Dict[str, Any], duration: Optional[float]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Estimează dimensiunea unui format yt-dlp.
+
+    Ordinea surselor: filesize (exact), filesize_approx, tbr/vbr+abr × durată,
+    apoi modelul de bitrate tipic pe înălțime × durată.
+
+    Returns:
+        (bytes estimați incluzând marja de siguranță, sursa estimării)
+    """
+    if fmt.get('filesize'):
+        return int(fmt['filesize']), 'exact'
+    if fmt.get('filesize_approx'):
+        return int(fmt['filesize_approx'] * ESTIMATE_SAFETY_MARGIN['approx']), 'approx'
+    if not duration or duration <= 0:
+        return None, None
+
+    kbps = fmt.get('tbr')
+    if not kbps and (fmt.get('vbr') or fmt.get('abr')):
+        kbps = (fmt.get('vbr') or 0) + (fmt.get('abr') or 0)
+    if kbps:
+        size = kbps * 1000 / 8 * duration
+        return int(size * ESTIMATE_SAFETY_MARGIN['bitrate']), 'bitrate'
+
+    if _is_audio_only(fmt):
+        kbps = TYPICAL_AUDIO_KBPS
+    elif _is_video_only(fmt):
+        kbps = _typical_kbps(fmt.get('height')) - TYPICAL_AUDIO_KBPS
+    else:
+        kbps = _typical_kbps(fmt.get('height'))
+    size = kbps * 1000 / 8 * duration
+    return int(size * ESTIMATE_SAFETY_MARGIN['model']), 'model'
+
+
+def _is_downloadable(fmt: Dict[str, Any]) -> bool:
+    """Exclude manifest-urile/storyboard-urile fără media descărcabilă direct"""
+    return fmt.get('ext') != 'mhtml' and fmt.get('format_note') != 'storyboard'
+
+
+def _is_video_only(fmt: Dict[str, Any]) -> bool:
+    return fmt.get('acodec') == 'none' and fmt.get('vcodec') not in (None, 'none')
+
+
+def _is_audio_only(fmt: Dict[str, Any]) -> bool:
+    return fmt.get('vcodec') == 'none' and fmt.get('acodec') not in (None, 'none')
+
+
+def _is_single_file_format(fmt: Dict[str, Any]) -> bool:
+    """Formatele care conțin video și audio (ce selectează 'best' fără merge ffmpeg)"""
+    if fmt.get('vcodec') == 'none' or fmt.get('acodec') == 'none':
+        return False
+    return _is_downloadable(fmt)
+
+
+def _quality_key(fmt: Dict[str, Any]) -> Tuple:
+    """Cheie de sortare: calitate mai bună = valoare mai mare"""
+    return (
+        fmt.get('height') or 0,
+        fmt.get('tbr') or 0,
+        fmt.get('quality') or 0,
+        fmt.get('preference') or 0
+    )
+
+
+@dataclass
+class _Candidate:
+    """Un format simplu sau o pereche DASH video+audio (unite de yt-dlp cu ffmpeg)"""
+    format_id: Optional[str]
+    height: Optional[int]
+    quality: Tuple
+    size: Optional[int]
+    source: Optional[str]
+
+
+# Sursele estimării, de la cea mai sigură; o pereche moștenește sursa mai slabă
+_SOURCE_ORDER = ('exact', 'approx', 'bitrate', 'model')
+
+
+def _single_candidate(fmt: Dict[str, Any], duration: Optional[float]) -> _Candidate:
+    size, source = estimate_format_size(fmt, duration)
+    return _Candidate(fmt.get('format_id'), fmt.get('height'), _quality_key(fmt), size, source)
+
+
+def _pair_candidate(video: Dict[str, Any], audio: Dict[str, Any], duration: Optional[float]) -> _Candidate:
+    video_size, video_source = estimate_format_size(video, duration)
+    audio_size, audio_source = estimate_format_size(audio, duration)
+    if video_size is None or audio_size is None:
+        size, source = None, None
+    else:
+        size = video_size + audio_size
+        source = max(video_source, audio_source, key=_SOURCE_ORDER.index)
+    quality = (
+        video.get('height') or 0,
+        (video.get('tbr') or video.get('vbr') or 0) + (audio.get('tbr') or audio.get('abr') or 0),
+        video.get('quality') or 0,
+        video.get('preference') or 0
+    )
+    return _Candidate(f"{video.get('format_id')}+{audio.get('format_id')}",
+                      video.get('height'), quality, size, source)
+
+
+class FormatPlanner:
+    """
+    Alege, din info['formats'] deja extras, cel mai bun format (sau pereche
+    DASH video+audio) care încape în limita Telegram, înainte ca vreun byte
+    să fie descărcat. Înlocuiește bucla de redownload la calitate mai mică
+    cu o singură trecere de descărcare.
+    """
+
+    def __init__(self, max_height: int = 720, merge_formats: Optional[bool] = None):
+        self.max_height = max_height
+        # Perechile video+audio sunt unite de yt-dlp cu ffmpeg
+        self.merge_formats = shutil.which('ffmpeg') is not None if merge_formats is None else merge_formats
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resetează statisticile planificatorului"""
+        with self.lock:
+            self.stats = {
+                'plans': 0,
+                'exact_size': 0,
+                'estimated_size': 0,
+                'no_metadata': 0,
+                'downscaled': 0,
+                'rejected_before_download': 0,
+                'oversize_after_download': 0,
+                'bytes_saved': 0
+            }
+
+    def plan(self, info: Dict[str, Any], max_bytes: int = DEFAULT_TARGET_BYTES) -> FormatPlan:
+        """
+        Planifică formatul pentru un info dict yt-dlp.
+
+        Args:
+            info: Rezultatul extract_info(download=False)
+            max_bytes: Dimensiunea maximă acceptată
+
+        Returns:
+            FormatPlan; fits=False înseamnă că niciun format nu încape
+        """
+        duration = info.get('duration')
+        all_formats = [f for f in (info.get('formats') or []) if _is_downloadable(f)]
+        formats = [f for f in all_formats if _is_single_file_format(f)]
+        video_only = [f for f in all_formats if _is_video_only(f)] if self.merge_formats else []
+        audio_only = [f for f in all_formats if _is_audio_only(f)] if self.merge_formats else []
+
+        if not formats and not (video_only and audio_only):
+            # Un singur format la nivelul info dict-ului (ex. extractor generic)
+            size, source = estimate_format_size(info, duration)
+            plan = FormatPlan(
+                format_id=None,
+                estimated_bytes=size,
+                estimate_source=source,
+                fits=None if size is None else size <= max_bytes,
+                height=info.get('height'),
+                unplanned_bytes=size
+            )
+            self._record(plan, max_bytes)
+            return plan
+
+        # Formate simple plus perechi bestvideo+bestaudio (site-uri doar DASH)
+        options: List[_Candidate] = [_single_candidate(fmt, duration) for fmt in formats]
+        options.extend(_pair_candidate(video, audio, duration)
+                       for video in video_only for audio in audio_only)
+
+        within_height = [c for c in options if not c.height or c.height <= self.max_height]
+        # La calitate egală, formatul simplu (fără merge) este preferat
+        candidates = sorted(within_height or options,
+                            key=lambda c: (c.quality, '+' not in (c.format_id or '')), reverse=True)
+        unplanned_bytes = candidates[0].size
+
+        chosen = next((c for c in candidates if c.size is not None and c.size <= max_bytes), None)
+
+        if chosen:
+            plan = FormatPlan(
+                format_id=chosen.format_id,
+                estimated_bytes=chosen.size,
+                estimate_source=chosen.source,
+                fits=True,
+                height=chosen.height,
+                unplanned_bytes=unplanned_bytes,
+                candidates=len(candidates)
+            )
+        elif all(c.size is not None for c in candidates):
+            smallest = min(candidates, key=lambda c: c.size)
+            plan = FormatPlan(
+                format_id=None,
+                estimated_bytes=smallest.size,
+                estimate_source=smallest.source,
+                fits=False,
+                height=smallest.height,
+                unplanned_bytes=unplanned_bytes,
+                candidates=len(candidates)
+            )
+        else:
+            plan = FormatPlan(
+                format_id=None,
+                estimated_bytes=None,
+                estimate_source=None,
+                fits=None,
+                unplanned_bytes=unplanned_bytes,
+                candidates=len(candidates)
+            )
+
+        self._record(plan, max_bytes)
+        return plan
+
+    def _record(self, plan: FormatPlan, max_bytes: int = DEFAULT_TARGET_BYTES):
+        """Actualizează statisticile pentru un plan"""
+        with self.lock:
+            self.stats['plans'] += 1
+            if plan.estimate_source == 'exact':
+                self.stats['exact_size'] += 1
+            elif plan.estimate_source:
+                self.stats['estimated_size'] += 1
+            else:
+                self.stats['no_metadata'] += 1
+
+            # Octeți economisiți: descărcarea supradimensionată care ar fi fost aruncată
+            oversize = plan.unplanned_bytes is not None and plan.unplanned_bytes > max_bytes
+            if plan.fits is False:
+                self.stats['rejected_before_download'] += 1
+                if oversize:
+                    self.stats['bytes_saved'] += plan.unplanned_bytes
+            elif plan.fits and oversize:
+                self.stats['downscaled'] += 1
+                self.stats['bytes_saved'] += plan.unplanned_bytes
+
+    def record_oversize_download(self):
+        """Estimarea a fost prea optimistă: fișierul descărcat depășește limita"""
+        with self.lock:
+            self.stats['oversize_after_download'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returnează statisticile planificatorului"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['bytes_saved_mb'] = round(stats['bytes_saved'] / (1024 * 1024), 2)
+        return stats
+
+
+# Instanță globală
+format_planner = FormatPlanner()
@@ -0,0 +1,632 @@
+# utils/download/segmented_downloader.py - Descărcare pe segmente (HTTP Range) în paralel
+# Versiunea: 1.0.0
+
+"""
+Descărcare pe segmente: fișierul este împărțit în N intervale de bytes
+descărcate concurent și scrise direct la offset-ul lor (os.pwrite) într-un
+fișier prealocat.
+
+Suportul pentru Range este verificat cu o cerere `Range: bytes=0-0`:
+- 206 + Content-Range -> dimensiunea totală este cunoscută, se descarcă pe segmente
+- 200 (Range ignorat, `Accept-Ranges: none`) -> răspunsul probei este folosit
+  direct ca flux unic, fără o a doua cerere
+
+Un segment eșuat este reluat de la ultimul byte scris, fără să afecteze
+segmentele terminate. Există o variantă async (aiohttp) și una sincronă
+(requests + thread-uri) pentru codul din downloader.py.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)', re.IGNORECASE)
+
+
+class SegmentedDownloadError(Exception):
+    """Descărcarea nu a putut fi finalizată"""
+
+
+class RangeNotSupported(SegmentedDownloadError):
+    """Serverul a ignorat Range pentru un segment (răspuns 200 în loc de 206)"""
+
+
+class ResumeIntegrityError(SegmentedDownloadError):
+    """Datele deja scrise ale unui fișier reluat nu corespund celor de pe server"""
+
+
+@dataclass
+class Segment:
+    """Interval de bytes [start, end] (inclusiv) și cât s-a scris din el"""
+    index: int
+    start: int
+    end: int
+    written: int = 0
+    attempts: int = 0
+    resumed: bool = False  # reluat dintr-o stare salvată: marginea trebuie verificată
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def offset(self) -> int:
+        """Următorul byte de descărcat"""
+        return self.start + self.written
+
+    @property
+    def done(self) -> bool:
+        return self.written >= self.length
+
+    @property
+    def range_header(self) -> str:
+        return f"bytes={self.offset}-{self.end}"
+
+
+@dataclass
+class ResumeState:
+    """Starea persistabilă a unei descărcări pe segmente (salvată în jurnal)"""
+    total: int
+    segments: List[Segment]
+    etag: str = ''
+    last_modified: str = ''
+
+    @property
+    def downloaded(self) -> int:
+        return sum(segment.written for segment in self.segments)
+
+    def snapshot(self) -> 'ResumeState':
+        return replace(self, segments=[replace(segment) for segment in self.segments])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'segments': [[segment.start, segment.end, segment.written] for segment in self.segments],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ResumeState':
+        segments = [Segment(index=index, start=start, end=end, written=written)
+                    for index, (start, end, written) in enumerate(data.get('segments', []))]
+        return cls(total=data['total'], segments=segments,
+                   etag=data.get('etag', ''), last_modified=data.get('last_modified', ''))
+
+
+@dataclass
+class DownloadOutcome:
+    """Rezultatul unei descărcări"""
+    path: str
+    total_bytes: int
+    segmented: bool
+    segments: int = 1
+    retried_segments: int = 0
+    resumed_bytes: int = 0
+    content_type: str = ''
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Bytes pe secundă"""
+        return self.total_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class _Progress:
+    """Contor de bytes comun tuturor segmentelor unei descărcări"""
+    total: int
+    downloaded: int = 0
+    last_checkpoint: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, count: int) -> int:
+        with self.lock:
+            self.downloaded += count
+            return self.downloaded
+
+    def checkpoint_due(self, interval: float) -> bool:
+        """True pentru un singur apelant odată ce a trecut intervalul"""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_checkpoint < interval:
+                return False
+            self.last_checkpoint = now
+            return True
+
+
+def parse_content_range(value: Optional[str]) -> Optional[int]:
+    """Dimensiunea totală din `Content-Range: bytes 0-0/12345` (None dacă lipsește)"""
+    if not value:
+        return None
+    match = _CONTENT_RANGE.match(value.strip())
+    if not match or match.group(3) == '*':
+        return None
+    return int(match.group(3))
+
+
+def plan_segments(total: int, parts: int, min_segment_size: int) -> List[Segment]:
+    """Împarte [0, total) în cel mult `parts` segmente de minimum `min_segment_size` bytes"""
+    count = max(1, min(parts, total // max(1, min_segment_size)))
+    base = total // count
+    segments = []
+    start = 0
+    for index in range(count):
+        end = total - 1 if index == count - 1 else start + base - 1
+        segments.append(Segment(index=index, start=start, end=end))
+        start = end + 1
+    return segments
+
+
+def preallocate(path: str, size: int) -> int:
+    """Creează fișierul cu dimensiunea finală și returnează descriptorul deschis pentru scriere"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                os.ftruncate(fd, size)
+        else:
+            os.ftruncate(fd, size)
+    except Exception:
+        os.close(fd)
+        raise
+    return fd
+
+
+class SegmentedDownloader:
+    """
+    Descărcător pe segmente, partajat de DownloadManager, platforme și
+    downloader.py. Pe sisteme fără os.pwrite descarcă mereu în flux unic.
+    """
+
+    def __init__(self, parts: Optional[int] = None, min_segment_size: Optional[int] = None,
+                 chunk_size: int = 64 * 1024, max_retries: Optional[int] = None,
+                 verify_bytes: int = 64 * 1024, checkpoint_interval: float = 1.0):
+        self.parts = parts or int(os.getenv('SEGMENTED_DOWNLOAD_PARTS', '4'))
+        self.min_segment_size = min_segment_size or int(
+            float(os.getenv('SEGMENTED_DOWNLOAD_MIN_SEGMENT_MB', '1')) * 1024 * 1024
+        )
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.getenv('SEGMENTED_DOWNLOAD_RETRIES', '3')
+        )
+        self.verify_bytes = verify_bytes
+        self.checkpoint_interval = checkpoint_interval
+        self.enabled = self.parts > 1 and hasattr(os, 'pwrite')
+        self.stats = {
+            'downloads': 0,
+            'segmented_downloads': 0,
+            'single_stream_downloads': 0,
+            'segment_retries': 0,
+            'bytes_downloaded': 0,
+            'resumed_downloads': 0,
+            'resumed_bytes': 0,
+            'resume_integrity_failures': 0,
+        }
+
+    def _record(self, outcome: DownloadOutcome):
+        self.stats['downloads'] += 1
+        self.stats['segmented_downloads' if outcome.segmented else 'single_stream_downloads'] += 1
+        self.stats['segment_retries'] += outcome.retried_segments
+        self.stats['bytes_downloaded'] += outcome.total_bytes - outcome.resumed_bytes
+        if outcome.resumed_bytes:
+            self.stats['resumed_downloads'] += 1
+            self.stats['resumed_bytes'] += outcome.resumed_bytes
+
+    def _check_size(self, total: int, max_size: Optional[int]):
+        if max_size and total > max_size:
+            raise SegmentedDownloadError(f"File too large: {total} bytes")
+
+    @staticmethod
+    def _check_segment_response(status: int, headers, segment: Segment, start: Optional[int] = None):
+        if status == 200:
+            raise RangeNotSupported(f"Range ignored for segment {segment.index}")
+        if status != 206:
+            raise SegmentedDownloadError(f"HTTP {status} for segment {segment.index}")
+        content_range = headers.get('Content-Range', '')
+        start = segment.offset if start is None else start
+        if not content_range.replace(' ', '').startswith(f"bytes{start}-"):
+            raise SegmentedDownloadError(f"Unexpected Content-Range '{content_range}' for segment {segment.index}")
+
+    @staticmethod
+    def _verify(fd: int, segments: List[Segment], total: int):
+        if not all(segment.done for segment in segments):
+            raise SegmentedDownloadError("Incomplete segments")
+        if os.fstat(fd).st_size != total:
+            raise SegmentedDownloadError("File size does not match Content-Range")
+
+    # ===== Varianta async (aiohttp) =====
+
+    async def download(self, session, url: str, path: str, headers: Optional[Dict[str, str]] = None,
+                       timeout=None, proxy: Optional[str] = None, ssl: Any = None,
+                       max_size: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], Any]] = None,
+                       resume: Optional[ResumeState] = None,
+                       checkpoint: Optional[Callable[[ResumeState], None]] = None,
+                       allow_redirects: bool = True, raise_for_status: bool = False) -> DownloadOutcome:
+        """
+        Descarcă `url` în `path` folosind o sesiune aiohttp.
+
+        `progress(downloaded, total)` poate fi funcție sau corutină; o
+        excepție ridicată din el (ex. anulare) oprește descărcarea.
+
+        `checkpoint(state)` primește periodic (și la oprire) starea
+        segmentelor, după fsync; cu `resume` (o stare salvată anterior)
+        descărcarea continuă fișierul parțial, dacă serverul raportează
+        aceeași dimensiune/ETag și datele de la marginea fiecărui segment
+        coincid cu cele de pe disk. Altfel pornește de la zero.
+
+        Cu `raise_for_status`, un răspuns de eroare la prima cerere ridică
+        aiohttp.ClientResponseError înainte de a scrie ceva pe disk (fără
+        cererea suplimentară fără Range).
+        """
+        start = time.perf_counter()
+        headers = dict(headers or {})
+        request_kwargs: Dict[str, Any] = {'proxy': proxy, 'allow_redirects': allow_redirects}
+        if timeout is not None:
+            request_kwargs['timeout'] = timeout
+        if ssl is not None:
+            request_kwargs['ssl'] = ssl
+
+        if not self.enabled:
+            async with session.get(url, headers=headers, **request_kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+                outcome = await self._stream_async(response, path, max_size, progress)
+        else:
+            probe_headers = dict(headers, Range='bytes=0-0')
+            async with session.get(url, headers=probe_headers, **request_kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+                total = parse_content_range(response.headers.get('Content-Range')) \
+                    if response.status == 206 else None
+                content_type = response.headers.get('Content-Type', '')
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+                reuse_probe = total is None and response.status == 200
+                if reuse_probe:
+                    # Range ignorat: răspunsul probei conține deja tot fișierul
+                    outcome = await self._stream_async(response, path, max_size, progress)
+                else:
+                    await response.release()
+            if total is None and not reuse_probe:
+                # 206 fără dimensiune totală (bytes 0-0/*) sau eroare: corpul probei nu e fișierul
+                async with session.get(url, headers=headers, **request_kwargs) as response:
+                    outcome = await self._stream_async(response, path, max_size, progress)
+            elif total is not None:
+                self._check_size(total, max_size)
+                state = self._usable_resume_state(resume, path, total, etag, last_modified)
+                try:
+                    try:
+                        outcome = await self._download_segments_async(
+                            session, url, path, headers, request_kwargs, total, progress,
+                            state or ResumeState(total, [], etag, last_modified), checkpoint
+                        )
+                    except ResumeIntegrityError as e:
+                        self.stats['resume_integrity_failures'] += 1
+                        logger.warning(f"⚠️ Partial file rejected, restarting download: {e}")
+                        outcome = await self._download_segments_async(
+                            session, url, path, headers, request_kwargs, total, progress,
+                            ResumeState(total, [], etag, last_modified), checkpoint
+                        )
+                    outcome.content_type = content_type
+                except RangeNotSupported:
+                    logger.info(f"↩️ Range not honoured for segments, falling back to single stream: {url}")
+                    async with session.get(url, headers=headers, **request_kwargs) as response:
+                        outcome = await self._stream_async(response, path, max_size, progress)
+
+        outcome.elapsed = time.perf_counter() - start
+        self._record(outcome)
+        return outcome
+
+    def _usable_resume_state(self, resume: Optional[ResumeState], path: str, total: int,
+                             etag: str, last_modified: str) -> Optional[ResumeState]:
+        """Starea salvată, dacă fișierul de pe server și cel parțial de pe disk sunt aceleași"""
+        if resume is None or not resume.segments:
+            return None
+
+        reason = None
+        if resume.total != total:
+            reason = f"size changed ({resume.total} -> {total})"
+        elif resume.etag and etag and resume.etag != etag:
+            reason = "ETag changed"
+        elif resume.last_modified and last_modified and resume.last_modified != last_modified:
+            reason = "Last-Modified changed"
+        elif not os.path.exists(path) or os.path.getsize(path) != total:
+            reason = "partial file missing or truncated"
+
+        if reason:
+            self.stats['resume_integrity_failures'] += 1
+            logger.warning(f"⚠️ Cannot resume {os.path.basename(path)}: {reason}; restarting")
+            return None
+
+        state = resume.snapshot()
+        for segment in state.segments:
+            segment.resumed = segment.written > 0
+        return state
+
+    async def _stream_async(self, response, path: str, max_size: Optional[int],
+                            progress: Optional[Callable]) -> DownloadOutcome:
+        if response.status not in (200, 206):
+            raise SegmentedDownloadError(f"HTTP {response.status}: {response.reason}")
+        total = int(response.headers.get('Content-Length') or 0)
+        self._check_size(total, max_size)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        downloaded = 0
+        with open(path, 'wb') as file:
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                file.write(chunk)
+                downloaded += len(chunk)
+                if max_size and downloaded > max_size:
+                    raise SegmentedDownloadError(f"File too large: more than {max_size} bytes")
+                await _notify(progress, downloaded, total)
+
+        return DownloadOutcome(path=path, total_bytes=downloaded, segmented=False,
+                               content_type=response.headers.get('Content-Type', ''))
+
+    async def _download_segments_async(self, session, url: str, path: str, headers: Dict[str, str],
+                                       request_kwargs: Dict[str, Any], total: int,
+                                       progress: Optional[Callable], state: ResumeState,
+                                       checkpoint: Optional[Callable[[ResumeState], None]]) -> DownloadOutcome:
+        if state.segments:
+            fd = os.open(path, os.O_RDWR)
+        else:
+            state.segments = plan_segments(total, self.parts, self.min_segment_size)
+            fd = preallocate(path, total)
+        segments = state.segments
+        resumed_bytes = state.downloaded
+        counter = _Progress(total, downloaded=resumed_bytes)
+        retried = set()
+        completed = False
+        try:
+            if checkpoint:
+                self._checkpoint(state, fd, counter, checkpoint)
+            for attempt in range(self.max_retries + 1):
+                pending = [segment for segment in segments if not segment.done or segment.resumed]
+                if not pending:
+                    break
+                if attempt:
+                    retried.update(segment.index for segment in pending)
+                    await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 4))
+
+                results = await asyncio.gather(*(
+                    self._fetch_segment_async(session, url, headers, request_kwargs, segment, fd,
+                                              counter, progress, state, checkpoint)
+                    for segment in pending
+                ), return_exceptions=True)
+
+                for segment, result in zip(pending, results):
+                    if isinstance(result, (RangeNotSupported, ResumeIntegrityError)) or \
+                            (isinstance(result, BaseException) and not isinstance(result, Exception)):
+                        # Range ignorat, date locale greșite sau anulare: reluarea segmentelor nu ajută
+                        raise result
+                    if isinstance(result, Exception):
+                        logger.debug(f"🔁 Segment {segment.index} failed at byte {segment.offset}: {result}")
+
+            if any(not segment.done for segment in segments):
+                raise SegmentedDownloadError(
+                    f"{sum(not s.done for s in segments)} segment(s) failed after {self.max_retries} retries"
+                )
+            self._verify(fd, segments, total)
+            completed = True
+        finally:
+            if checkpoint and not completed:
+                # Ultimele offset-uri, ca o reluare ulterioară să nu descarce din nou ce e pe disk
+                try:
+                    self._checkpoint(state, fd, counter, checkpoint)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not checkpoint {os.path.basename(path)}: {e}")
+            os.close(fd)
+
+        return DownloadOutcome(path=path, total_bytes=total, segmented=True,
+                               segments=len(segments), retried_segments=len(retried),
+                               resumed_bytes=resumed_bytes)
+
+    async def _fetch_segment_async(self, session, url: str, headers: Dict[str, str],
+                                   request_kwargs: Dict[str, Any], segment: Segment, fd: int,
+                                   counter: _Progress, progress: Optional[Callable],
+                                   state: ResumeState, checkpoint: Optional[Callable[[ResumeState], None]]):
+        segment.attempts += 1
+        # Segment reluat din jurnal: descarcă din nou ultimii bytes scriși și compară-i cu disk-ul
+        verify_left = min(segment.written, self.verify_bytes) if segment.resumed else 0
+        verify_pos = segment.offset - verify_left
+        segment_headers = dict(headers, Range=f"bytes={verify_pos}-{segment.end}")
+        async with session.get(url, headers=segment_headers, **request_kwargs) as response:
+            self._check_segment_response(response.status, response.headers, segment, verify_pos)
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                if verify_left:
+                    expected = chunk[:verify_left]
+                    if os.pread(fd, len(expected), verify_pos) != expected:
+                        raise ResumeIntegrityError(
+                            f"Segment {segment.index} differs from the server before byte {segment.offset}"
+                        )
+                    verify_left -= len(expected)
+                    verify_pos += len(expected)
+                    chunk = chunk[len(expected):]
+                    if not verify_left:
+                        segment.resumed = False
+
+                chunk = chunk[:segment.length - segment.written]
+                if not chunk:
+                    continue
+                os.pwrite(fd, chunk, segment.offset)
+                segment.written += len(chunk)
+                await _notify(progress, counter.add(len(chunk)), counter.total)
+                if checkpoint and counter.checkpoint_due(self.checkpoint_interval):
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._checkpoint, state, fd, counter, checkpoint
+                    )
+        if verify_left or not segment.done:
+            raise SegmentedDownloadError(f"Segment {segment.index} ended early at byte {segment.offset}")
+
+    @staticmethod
+    def _checkpoint(state: ResumeState, fd: int, counter: _Progress,
+                    checkpoint: Callable[[ResumeState], None]):
+        """Salvează offset-urile segmentelor; fsync înainte, ca offset-urile să nu depășească datele de pe disk"""
+        snapshot = state.snapshot()
+        os.fsync(fd)
+        counter.last_checkpoint = time.monotonic()
+        checkpoint(snapshot)
+
+    # ===== Varianta sincronă (requests) =====
+
+    def download_sync(self, session, url: str, path: str, headers: Optional[Dict[str, str]] = None,
+                      timeout: float = 30, proxies: Optional[Dict[str, str]] = None, verify: bool = True,
+                      max_size: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      allow_redirects: bool = True, raise_for_status: bool = False) -> DownloadOutcome:
+        """Aceeași descărcare, pentru cod sincron (requests.Session, thread-uri pentru segmente)"""
+        start = time.perf_counter()
+        headers = dict(headers or {})
+        request_kwargs = {'timeout': timeout, 'proxies': proxies, 'verify': verify, 'stream': True,
+                          'allow_redirects': allow_redirects}
+
+        if not self.enabled:
+            with session.get(url, headers=headers, **request_kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+                outcome = self._stream_sync(response, path, max_size, progress)
+        else:
+            with session.get(url, headers=dict(headers, Range='bytes=0-0'), **request_kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+                total = parse_content_range(response.headers.get('Content-Range')) \
+                    if response.status_code == 206 else None
+                content_type = response.headers.get('Content-Type', '')
+                reuse_probe = total is None and response.status_code == 200
+                if reuse_probe:
+                    outcome = self._stream_sync(response, path, max_size, progress)
+            if total is None and not reuse_probe:
+                with session.get(url, headers=headers, **request_kwargs) as response:
+                    outcome = self._stream_sync(response, path, max_size, progress)
+            elif total is not None:
+                self._check_size(total, max_size)
+                try:
+                    outcome = self._download_segments_sync(session, url, path, headers, request_kwargs, total, progress)
+                    outcome.content_type = content_type
+                except RangeNotSupported:
+                    logger.info(f"↩️ Range not honoured for segments, falling back to single stream: {url}")
+                    with session.get(url, headers=headers, **request_kwargs) as response:
+                        outcome = self._stream_sync(response, path, max_size, progress)
+
+        outcome.elapsed = time.perf_counter() - start
+        self._record(outcome)
+        return outcome
+
+    def _stream_sync(self, response, path: str, max_size: Optional[int],
+                     progress: Optional[Callable]) -> DownloadOutcome:
+        if response.status_code not in (200, 206):
+            raise SegmentedDownloadError(f"HTTP {response.status_code}: {response.reason}")
+        total = int(response.headers.get('Content-Length') or 0)
+        self._check_size(total, max_size)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        downloaded = 0
+        with open(path, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                file.write(chunk)
+                downloaded += len(chunk)
+                if max_size and downloaded > max_size:
+                    raise SegmentedDownloadError(f"File too large: more than {max_size} bytes")
+                if progress:
+                    progress(downloaded, total)
+
+        return DownloadOutcome(path=path, total_bytes=downloaded, segmented=False,
+                               content_type=response.headers.get('Content-Type', ''))
+
+    def _download_segments_sync(self, session, url: str, path: str, headers: Dict[str, str],
+                                request_kwargs: Dict[str, Any], total: int,
+                                progress: Optional[Callable]) -> DownloadOutcome:
+        segments = plan_segments(total, self.parts, self.min_segment_size)
+        counter = _Progress(total)
+        retried = set()
+        fd = preallocate(path, total)
+        try:
+            with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix='segment') as pool:
+                for attempt in range(self.max_retries + 1):
+                    pending = [segment for segment in segments if not segment.done]
+                    if not pending:
+                        break
+                    if attempt:
+                        retried.update(segment.index for segment in pending)
+                        time.sleep(min(0.5 * 2 ** (attempt - 1), 4))
+
+                    futures = [
+                        (segment, pool.submit(self._fetch_segment_sync, session, url, headers,
+                                              request_kwargs, segment, fd, counter, progress))
+                        for segment in pending
+                    ]
+                    for segment, future in futures:
+                        error = future.exception()
+                        if isinstance(error, RangeNotSupported):
+                            raise error
+                        if error is not None:
+                            logger.debug(f"🔁 Segment {segment.index} failed at byte {segment.offset}: {error}")
+
+            if any(not segment.done for segment in segments):
+                raise SegmentedDownloadError(
+                    f"{sum(not s.done for s in segments)} segment(s) failed after {self.max_retries} retries"
+                )
+            self._verify(fd, segments, total)
+        finally:
+            os.close(fd)
+
+        return DownloadOutcome(path=path, total_bytes=total, segmented=True,
+                               segments=len(segments), retried_segments=len(retried))
+
+    def _fetch_segment_sync(self, session, url: str, headers: Dict[str, str],
+                            request_kwargs: Dict[str, Any], segment: Segment, fd: int,
+                            counter: _Progress, progress: Optional[Callable]):
+        segment.attempts += 1
+        segment_headers = dict(headers, Range=segment.range_header)
+        with session.get(url, headers=segment_headers, **request_kwargs) as response:
+            self._check_segment_response(response.status_code, response.headers, segment)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                chunk = chunk[:segment.length - segment.written]
+                if not chunk:
+                    break
+                os.pwrite(fd, chunk, segment.offset)
+                segment.written += len(chunk)
+                downloaded = counter.add(len(chunk))
+                if progress:
+                    progress(downloaded, counter.total)
+        if not segment.done:
+            raise SegmentedDownloadError(f"Segment {segment.index} ended early at byte {segment.offset}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats.update(enabled=self.enabled, parts=self.parts, min_segment_size=self.min_segment_size)
+        return stats
+
+
+async def _notify(progress: Optional[Callable], downloaded: int, total: int):
+    if progress is None:
+        return
+    result = progress(downloaded, total)
+    if inspect.isawaitable(result):
+        await result
+
+
+# Instanță globală
+segmented_downloader = SegmentedDownloader()
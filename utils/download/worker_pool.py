@@ -0,0 +1,354 @@
+# utils/download/worker_pool.py - Procese worker yt-dlp de lungă durată, cu extractori preîncărcați
+# Versiunea: 1.0.0
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Marcaj pentru procesele worker: importul downloader-ului nu repetă upgrade-ul yt-dlp
+WORKER_PROCESS_ENV = 'DOWNLOAD_WORKER_PROCESS'
+
+# Câte un link reprezentativ per platformă: potrivirea lui compilează regex-urile
+# extractorilor yt-dlp și importă modulul extractorului care îl servește
+WARMUP_URLS = {
+    'tiktok': 'https://www.tiktok.com/@user/video/7234567890123456789',
+    'instagram': 'https://www.instagram.com/reel/Cabcdefghij/',
+    'twitter': 'https://x.com/user/status/1234567890123456789',
+    'facebook': 'https://www.facebook.com/watch/?v=1234567890',
+    'reddit': 'https://www.reddit.com/r/videos/comments/abc123/title/',
+    'vimeo': 'https://vimeo.com/123456789',
+    'dailymotion': 'https://www.dailymotion.com/video/x8abcde',
+    'pinterest': 'https://www.pinterest.com/pin/123456789012345678/',
+}
+
+
+class WorkerCrashed(RuntimeError):
+    """Procesul worker s-a terminat în timpul unui job (ex. OOM)"""
+
+
+def summarize_ms(samples) -> Dict[str, float]:
+    """Rezumat în milisecunde (count/avg/p50/p95/max) pentru durate în secunde"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0, 'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    return {
+        'count': len(ordered),
+        'avg': round(sum(ordered) / len(ordered) * 1000, 1),
+        'p50': round(ordered[len(ordered) // 2] * 1000, 1),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        'max': round(ordered[-1] * 1000, 1)
+    }
+
+
+def warm_ytdlp(platforms: Sequence[str]) -> List[str]:
+    """
+    Preîncarcă yt-dlp în procesul worker: downloader-ul, configurațiile per platformă
+    și extractorii care servesc link-urile platformelor suportate.
+
+    Returns:
+        Cheile extractorilor încărcați
+    """
+    import yt_dlp
+    from yt_dlp.extractor import gen_extractor_classes
+    from downloader import get_platform_specific_config
+
+    extractors = list(gen_extractor_classes())
+    loaded = []
+    for platform in platforms:
+        url = WARMUP_URLS.get(platform)
+        if not url:
+            continue
+        with yt_dlp.YoutubeDL(get_platform_specific_config(platform)) as ydl:
+            for extractor in extractors:
+                if extractor.suitable(url):
+                    ydl.get_info_extractor(extractor.ie_key())
+                    loaded.append(extractor.ie_key())
+                    break
+    return loaded
+
+
+def _rss_bytes() -> int:
+    """Memoria rezidentă a procesului curent"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # vârf, în lipsa psutil
+        except Exception:
+            return 0
+
+
+def _worker_main(conn, cancel_event, warmup: Optional[Callable], warmup_args: tuple):
+    """Bucla procesului worker: încălzire, apoi job-uri (func, args, kwargs) primite pe pipe"""
+    os.environ[WORKER_PROCESS_ENV] = '1'
+    started = time.perf_counter()
+    warmed = None
+    try:
+        if warmup is not None:
+            warmed = warmup(*warmup_args)
+    except Exception as e:
+        warmed = f"warmup failed: {e}"
+    conn.send(('ready', {'warmup_ms': round((time.perf_counter() - started) * 1000, 1),
+                         'warmed': warmed if isinstance(warmed, (list, str, type(None))) else repr(warmed),
+                         'rss_bytes': _rss_bytes()}))
+
+    # check_cancelled() din job vede anularea cerută de procesul principal
+    from utils.download import download_executor
+    job = download_executor.DownloadJob('worker')
+    job.cancel_event = cancel_event
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        func, args, kwargs = message
+        download_executor._job_context.job = job
+        try:
+            reply = (True, func(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        finally:
+            download_executor._job_context.job = None
+
+        try:
+            conn.send((*reply, _rss_bytes()))
+        except Exception as e:
+            # Rezultat sau excepție care nu se poate serializa
+            conn.send((False, RuntimeError(f"{type(reply[1]).__name__}: {reply[1]} ({e})"), _rss_bytes()))
+    conn.close()
+
+
+@dataclass
+class WorkerInfo:
+    """Starea unui proces worker, văzută din procesul principal"""
+    worker_id: int
+    process: Any
+    conn: Any
+    cancel_event: Any
+    started_at: float = field(default_factory=time.time)
+    ready: bool = False
+    warmup_ms: float = 0.0
+    warmed: Any = None
+    jobs: int = 0
+    failures: int = 0
+    rss_bytes: int = 0
+    busy: bool = False
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+
+class WorkerProcessPool:
+    """
+    Pool de procese worker de lungă durată (context spawn) pentru yt-dlp.
+
+    - fiecare worker rulează o dată funcția warmup (ex. warm_ytdlp) și apoi
+      primește job-uri pe un Pipe propriu, fără a reîncărca yt-dlp/extractorii;
+    - un worker este reciclat după max_jobs job-uri (memoria rămâne limitată),
+      înlocuitorul pornește imediat și se încălzește cât timp nu este folosit;
+    - un worker mort în timpul unui job este înlocuit, iar apelul primește WorkerCrashed;
+    - anularea este cooperativă: should_cancel() este verificat cât timp job-ul rulează,
+      iar worker-ul o vede prin check_cancelled() (hook-ul de progres yt-dlp);
+    - get_stats() raportează per worker RSS, job-uri și latența job-urilor.
+    """
+
+    def __init__(self, size: int, max_jobs: int = 50, warmup: Optional[Callable] = None,
+                 warmup_args: tuple = (), name: str = 'ytdlp-worker', poll_interval: float = 0.25):
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self.warmup = warmup
+        self.warmup_args = warmup_args
+        self.name = name
+        self.poll_interval = poll_interval
+
+        self._context = multiprocessing.get_context('spawn')
+        self._condition = threading.Condition()
+        self._workers: List[WorkerInfo] = []
+        self._pid: Optional[int] = None
+        self._next_id = 0
+        self.stats = {'jobs': 0, 'failures': 0, 'cancelled': 0, 'started': 0, 'recycled': 0, 'crashes': 0}
+
+    def start(self):
+        """Pornește (și încălzește în fundal) toate procesele worker"""
+        with self._condition:
+            self._ensure_workers()
+
+    def _ensure_workers(self):
+        """Completează pool-ul până la size; apelat cu lock-ul deținut"""
+        pid = os.getpid()
+        if self._pid != pid:
+            # Proces copil (fork): worker-ii moșteniți aparțin părintelui
+            self._workers = []
+            self._pid = pid
+        while len(self._workers) < self.size:
+            self._workers.append(self._spawn())
+
+    def _spawn(self) -> WorkerInfo:
+        self._next_id += 1
+        parent_conn, child_conn = self._context.Pipe()
+        cancel_event = self._context.Event()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, cancel_event, self.warmup, self.warmup_args),
+            name=f"{self.name}-{self._next_id}", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.stats['started'] += 1
+        return WorkerInfo(self._next_id, process, parent_conn, cancel_event)
+
+    def _acquire(self) -> WorkerInfo:
+        """Primul worker liber (preferabil deja încălzit)"""
+        with self._condition:
+            while True:
+                self._ensure_workers()
+                idle = [worker for worker in self._workers if not worker.busy]
+                if idle:
+                    worker = next((w for w in idle if w.ready), idle[0])
+                    worker.busy = True
+                    return worker
+                self._condition.wait()
+
+    def _wait_ready(self, worker: WorkerInfo):
+        kind, info = worker.conn.recv()
+        worker.ready = True
+        worker.warmup_ms = info['warmup_ms']
+        worker.warmed = info['warmed']
+        worker.rss_bytes = info['rss_bytes']
+        logger.info(f"🔥 Worker {self.name}-{worker.worker_id} (pid {worker.process.pid}) "
+                    f"încălzit în {worker.warmup_ms:.0f}ms")
+
+    def call(self, func: Callable, *args, should_cancel: Optional[Callable[[], bool]] = None, **kwargs) -> Any:
+        """
+        Rulează func(*args, **kwargs) într-un worker și întoarce rezultatul (blocant).
+
+        func, argumentele și rezultatul trebuie să fie picklable. Excepțiile din
+        worker sunt re-aruncate aici; WorkerCrashed dacă procesul a murit.
+        """
+        worker = self._acquire()
+        started = time.perf_counter()
+        sent = False
+        try:
+            if not worker.ready:
+                self._wait_ready(worker)
+            worker.cancel_event.clear()
+            worker.conn.send((func, args, kwargs))
+            sent = True
+            while not worker.conn.poll(self.poll_interval):
+                if should_cancel is not None and not worker.cancel_event.is_set() and should_cancel():
+                    worker.cancel_event.set()
+            ok, value, rss_bytes = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._replace(worker)
+            raise WorkerCrashed(f"Worker {self.name}-{worker.worker_id} terminat: {e}") from None
+        except BaseException:
+            if sent:
+                # Răspunsul job-ului în curs ar ajunge la următorul apelant: worker-ul este înlocuit
+                self._replace(worker)
+            else:
+                # Eroare la serializarea job-ului (nimic trimis) - worker-ul rămâne valid
+                self._release(worker)
+            raise
+
+        elapsed = time.perf_counter() - started
+        worker.jobs += 1
+        worker.rss_bytes = rss_bytes
+        worker.latencies.append(elapsed)
+        with self._condition:
+            self.stats['jobs'] += 1
+            if worker.cancel_event.is_set():
+                self.stats['cancelled'] += 1
+            elif not ok:
+                self.stats['failures'] += 1
+                worker.failures += 1
+        self._release(worker)
+
+        if ok:
+            return value
+        raise value
+
+    def _release(self, worker: WorkerInfo):
+        retire = worker.jobs >= self.max_jobs
+        with self._condition:
+            if retire and worker in self._workers:
+                self._workers.remove(worker)
+                self.stats['recycled'] += 1
+                self._ensure_workers()
+            worker.busy = False
+            self._condition.notify()
+        if retire:
+            logger.info(f"♻️ Worker {self.name}-{worker.worker_id} reciclat după {worker.jobs} job-uri "
+                        f"(RSS {worker.rss_bytes / 1024 / 1024:.0f}MB)")
+            self._stop(worker)
+
+    def _replace(self, worker: WorkerInfo):
+        """Înlocuiește un worker mort sau cu un job abandonat"""
+        logger.error(f"❌ Worker {self.name}-{worker.worker_id} (pid {worker.process.pid}) pierdut, îl înlocuiesc")
+        with self._condition:
+            if worker in self._workers:
+                self._workers.remove(worker)
+                self._ensure_workers()
+            self.stats['crashes'] += 1
+            self._condition.notify()
+        self._stop(worker, timeout=0.1)
+
+    @staticmethod
+    def _stop(worker: WorkerInfo, timeout: float = 5.0):
+        try:
+            worker.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        worker.conn.close()
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statisticile pool-ului și, per worker, RSS, job-uri și latența"""
+        with self._condition:
+            stats = dict(self.stats)
+            workers = list(self._workers) if self._pid == os.getpid() else []
+            for worker in workers:
+                # Worker-ii liberi care au terminat încălzirea își raportează deja RSS-ul
+                if not worker.busy and not worker.ready and worker.conn.poll():
+                    try:
+                        self._wait_ready(worker)
+                    except (EOFError, OSError):
+                        pass
+        stats['size'] = self.size
+        stats['max_jobs'] = self.max_jobs
+        stats['busy'] = sum(worker.busy for worker in workers)
+        stats['workers'] = [{
+            'id': worker.worker_id,
+            'pid': worker.process.pid,
+            'ready': worker.ready,
+            'busy': worker.busy,
+            'jobs': worker.jobs,
+            'failures': worker.failures,
+            'rss_bytes': worker.rss_bytes,
+            'rss_mb': round(worker.rss_bytes / 1024 / 1024, 1),
+            'warmup_ms': worker.warmup_ms,
+            'uptime_seconds': round(time.time() - worker.started_at, 1),
+            'latency_ms': summarize_ms(worker.latencies)
+        } for worker in workers]
+        return stats
+
+    def shutdown(self):
+        """Oprește toți worker-ii (job-urile în curs sunt lăsate să se termine)"""
+        with self._condition:
+            workers = self._workers if self._pid == os.getpid() else []
+            self._workers = []
+            self._pid = None
+        for worker in workers:
+            self._stop(worker)
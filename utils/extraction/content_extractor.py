@@ -30,6 +30,11 @@ except ImportError:
         PlatformError, UnsupportedURLError, DownloadError
     )
 
+from utils.extraction.json_scanner import extract_script_json, find_string_values
+from utils.extraction.method_planner import MethodPlanner, first_confident
+from utils.network.session_pool import redirect_session
+from utils.platform_router import extract_host, platform_router
+
 logger = logging.getLogger(__name__)
 
 class ExtractionMethod(Enum):
@@ -90,6 +95,8 @@ class ExtractionConfig:
     extract_thumbnails: bool = True
     extract_subtitles: bool = False
     extract_comments: bool = False
+    min_confidence: float = 0.7  # pragul la care cursa PARALLEL / COMPREHENSIVE se oprește
+    adaptive_methods: bool = True  # ordonează/sare metodele după statisticile per platformă
 
 class ContentExtractor:
     """
@@ -110,9 +117,18 @@ class ContentExtractor:
             'successful_extractions': 0,
             'failed_extractions': 0,
             'cache_hits': 0,
+            'page_fetches': 0,
+            'page_fetches_shared': 0,
             'method_usage': {method.value: 0 for method in ExtractionMethod}
         }
         
+        # Statistici latență/succes per (platformă, metodă) pentru ordonarea adaptivă
+        self.method_planner = MethodPlanner()
+        
+        # Pagini descărcate în extragerile în curs, împărțite între metode
+        self._pages: Dict[str, asyncio.Future] = {}
+        self._page_users: Dict[str, int] = {}
+        
         # Regex patterns comune
         self.common_patterns = {
             'video_id': {
@@ -170,6 +186,7 @@ class ContentExtractor:
                 return cached_result
         
         self.stats['total_extractions'] += 1
+        self._page_users[url] = self._page_users.get(url, 0) + 1
         
         try:
             # Determină strategia de extragere
@@ -211,6 +228,8 @@ class ContentExtractor:
                 extraction_time=time.time() - start_time,
                 error_message=str(e)
             )
+        finally:
+            self._release_page(url)
     
     async def _extract_fast(self, url: str, platform_hint: Optional[str]) -> ExtractionResult:
         """Extragere rapidă folosind doar metode simple"""
@@ -223,24 +242,15 @@ class ContentExtractor:
     
     async def _extract_comprehensive(self, url: str, platform_hint: Optional[str]) -> ExtractionResult:
         """Extragere comprehensivă folosind toate metodele"""
-        methods = [
-            self._extract_direct_link,
-            self._extract_with_regex,
-            self._extract_with_html_parsing,
-            self._extract_with_api_call,
-            self._extract_with_metadata_parsing
-        ]
+        platform = self._platform_key(url, platform_hint)
         
-        for method in methods:
+        for method in self._plan_methods(url, platform):
             try:
-                if method == self._extract_direct_link and not self._is_direct_media_link(url):
-                    continue
-                
-                result = await method(url, platform_hint)
-                if result.success and result.confidence_score > 0.7:
+                result = await self._run_method(method, url, platform_hint, platform)
+                if result.success and result.confidence_score >= self.config.min_confidence:
                     return result
             except Exception as e:
-                logger.debug(f"Method {method.__name__} failed: {e}")
+                logger.debug(f"Method {method.value} failed: {e}")
                 continue
         
         return ExtractionResult(
@@ -252,33 +262,23 @@ class ContentExtractor:
     
     async def _extract_fallback(self, url: str, platform_hint: Optional[str]) -> ExtractionResult:
         """Extragere cu fallback - încearcă metodele una câte una"""
-        methods = [
-            (self._extract_direct_link, "direct link"),
-            (self._extract_with_regex, "regex"),
-            (self._extract_with_html_parsing, "HTML parsing"),
-            (self._extract_with_api_call, "API call"),
-            (self._extract_with_metadata_parsing, "metadata parsing")
-        ]
-        
+        platform = self._platform_key(url, platform_hint)
         last_error = None
         
-        for method, method_name in methods:
+        for method in self._plan_methods(url, platform):
             try:
-                if method == self._extract_direct_link and not self._is_direct_media_link(url):
-                    continue
-                
-                logger.debug(f"🔄 Trying {method_name} for {url}")
-                result = await method(url, platform_hint)
+                logger.debug(f"🔄 Trying {method.value} for {url}")
+                result = await self._run_method(method, url, platform_hint, platform)
                 
                 if result.success:
-                    logger.info(f"✅ Success with {method_name}")
+                    logger.info(f"✅ Success with {method.value}")
                     return result
                 else:
                     last_error = result.error_message
                     
             except Exception as e:
                 last_error = str(e)
-                logger.debug(f"❌ {method_name} failed: {e}")
+                logger.debug(f"❌ {method.value} failed: {e}")
                 continue
         
         return ExtractionResult(
@@ -289,44 +289,20 @@ class ContentExtractor:
         )
     
     async def _extract_parallel(self, url: str, platform_hint: Optional[str]) -> ExtractionResult:
-        """Extragere în paralel - rulează toate metodele simultan"""
-        tasks = []
-        
-        # Adaugă task-urile pentru fiecare metodă
-        if self._is_direct_media_link(url):
-            tasks.append(asyncio.create_task(self._extract_direct_link(url, platform_hint)))
-        
-        tasks.extend([
-            asyncio.create_task(self._extract_with_regex(url, platform_hint)),
-            asyncio.create_task(self._extract_with_html_parsing(url, platform_hint)),
-            asyncio.create_task(self._extract_with_api_call(url, platform_hint)),
-            asyncio.create_task(self._extract_with_metadata_parsing(url, platform_hint))
-        ])
-        
-        # Așteaptă primul rezultat de succes
-        done, pending = await asyncio.wait(
-            tasks, 
-            return_when=asyncio.FIRST_COMPLETED,
-            timeout=self.config.timeout
-        )
-        
-        # Anulează task-urile rămase
-        for task in pending:
-            task.cancel()
-        
-        # Găsește cel mai bun rezultat
-        best_result = None
-        best_score = 0
+        """
+        Extragere în paralel - rulează metodele planificate simultan.
         
-        for task in done:
-            try:
-                result = await task
-                if result.success and result.confidence_score > best_score:
-                    best_result = result
-                    best_score = result.confidence_score
-            except Exception as e:
-                logger.debug(f"Parallel task failed: {e}")
+        Pagina este descărcată o singură dată și împărțită între metode;
+        cursa se oprește la primul rezultat reușit cu confidence peste
+        `min_confidence`, nu la primul task terminat.
+        """
+        platform = self._platform_key(url, platform_hint)
+        tasks = [
+            asyncio.create_task(self._run_method(method, url, platform_hint, platform))
+            for method in self._plan_methods(url, platform)
+        ]
         
+        best_result, errors = await first_confident(tasks, self.config.min_confidence, self.config.timeout)
         if best_result:
             return best_result
         
@@ -334,9 +310,50 @@ class ContentExtractor:
             success=False,
             method_used=ExtractionMethod.HTML_PARSING,
             extraction_time=0,
-            error_message="All parallel extraction methods failed"
+            error_message=errors[-1] if errors else "All parallel extraction methods failed"
         )
     
+    def _method_handlers(self) -> Dict[ExtractionMethod, Any]:
+        """Metodele de extragere, în ordinea implicită"""
+        return {
+            ExtractionMethod.DIRECT_LINK: self._extract_direct_link,
+            ExtractionMethod.REGEX_EXTRACTION: self._extract_with_regex,
+            ExtractionMethod.HTML_PARSING: self._extract_with_html_parsing,
+            ExtractionMethod.API_CALL: self._extract_with_api_call,
+            ExtractionMethod.METADATA_PARSING: self._extract_with_metadata_parsing,
+        }
+    
+    def _platform_key(self, url: str, platform_hint: Optional[str]) -> str:
+        """Platforma sub care se țin statisticile metodelor"""
+        return platform_hint or platform_router.route(url) or extract_host(url) or "unknown"
+    
+    def _plan_methods(self, url: str, platform: str) -> List[ExtractionMethod]:
+        """Metodele de încercat, ordonate adaptiv după statisticile platformei"""
+        methods = [method for method in self._method_handlers()
+                   if method != ExtractionMethod.DIRECT_LINK or self._is_direct_media_link(url)]
+        if not self.config.adaptive_methods:
+            return methods
+        
+        planned = self.method_planner.plan(platform, [method.value for method in methods])
+        return [ExtractionMethod(value) for value in planned]
+    
+    async def _run_method(self, method: ExtractionMethod, url: str,
+                          platform_hint: Optional[str], platform: str) -> ExtractionResult:
+        """Rulează o metodă și îi înregistrează latența și rezultatul"""
+        handler = self._method_handlers()[method]
+        start = time.perf_counter()
+        try:
+            result = await handler(url, platform_hint)
+        except asyncio.CancelledError:
+            # Pierderea cursei nu este un eșec al metodei
+            raise
+        except Exception:
+            self.method_planner.record(platform, method.value, time.perf_counter() - start, False)
+            raise
+        
+        self.method_planner.record(platform, method.value, time.perf_counter() - start, result.success)
+        return result
+    
     async def _extract_direct_link(self, url: str, platform_hint: Optional[str] = None) -> ExtractionResult:
         """Extrage conținut din link-uri directe către media"""
         try:
@@ -391,7 +408,7 @@ class ContentExtractor:
         """Extrage conținut folosind regex patterns"""
         try:
             # Obține conținutul HTML
-            html_content = await self._fetch_html(url)
+            html_content = await self._get_page(url)
             
             # Extrage metadata folosind regex
             metadata = self._extract_metadata_with_regex(html_content)
@@ -427,7 +444,7 @@ class ContentExtractor:
         """Extrage conținut prin parsing HTML"""
         try:
             # Obține conținutul HTML
-            html_content = await self._fetch_html(url)
+            html_content = await self._get_page(url)
             
             # Parse HTML pentru metadata
             metadata = self._parse_html_metadata(html_content)
@@ -491,7 +508,7 @@ class ContentExtractor:
     async def _extract_with_metadata_parsing(self, url: str, platform_hint: Optional[str]) -> ExtractionResult:
         """Extrage conținut prin parsing metadata (Open Graph, Twitter Cards, etc.)"""
         try:
-            html_content = await self._fetch_html(url)
+            html_content = await self._get_page(url)
             
             # Extrage Open Graph metadata
             og_metadata = self._extract_open_graph_metadata(html_content)
@@ -535,6 +552,44 @@ class ContentExtractor:
                 error_message=str(e)
             )
     
+    async def _get_page(self, url: str) -> str:
+        """
+        HTML-ul paginii, descărcat o singură dată per extragere.
+        
+        Metodele care rulează în aceeași extragere (sau în extrageri
+        simultane ale aceluiași URL) așteaptă aceeași descărcare. Fetch-ul
+        este protejat cu shield: anularea metodei care a pierdut cursa nu
+        anulează descărcarea pentru celelalte.
+        """
+        if url not in self._page_users:
+            # Apel în afara extract_content - fără partajare
+            return await self._fetch_html(url)
+        
+        page = self._pages.get(url)
+        if page is None:
+            page = asyncio.ensure_future(self._fetch_html(url))
+            self._pages[url] = page
+            self.stats['page_fetches'] += 1
+        else:
+            self.stats['page_fetches_shared'] += 1
+        return await asyncio.shield(page)
+    
+    def _release_page(self, url: str):
+        """Eliberează pagina partajată după ultima extragere care o folosește"""
+        users = self._page_users.get(url, 0) - 1
+        if users > 0:
+            self._page_users[url] = users
+            return
+        
+        self._page_users.pop(url, None)
+        page = self._pages.pop(url, None)
+        if page is None:
+            return
+        if not page.done():
+            page.cancel()
+        elif not page.cancelled():
+            page.exception()  # marchează eroarea ca preluată
+    
     async def _fetch_html(self, url: str) -> str:
         """Obține conținutul HTML al unei pagini"""
         headers = self.config.headers.copy()
@@ -545,13 +600,13 @@ class ContentExtractor:
         
         timeout = aiohttp.ClientTimeout(total=self.config.timeout)
         
-        async with aiohttp.ClientSession(
-            timeout=timeout,
-            headers=headers,
-            cookies=self.config.cookies
-        ) as session:
+        # Conexiunile keep-alive și DNS-ul sunt refolosite între cereri; cookie-urile
+        # setate de redirect-uri rămân în jar-ul acestei cereri
+        async with redirect_session(self.config.proxy, self.config.cookies) as session:
             async with session.get(
                 url,
+                headers=headers,
+                timeout=timeout,
                 ssl=self.config.verify_ssl,
                 allow_redirects=self.config.follow_redirects,
                 proxy=self.config.proxy
@@ -659,66 +714,24 @@ class ContentExtractor:
         return self._extract_metadata_with_regex(html_content)
     
     def _extract_json_from_html(self, html_content: str) -> Dict[str, Any]:
-        """Extrage date JSON din script tags"""
-        json_data = {}
-        
-        # Caută script tags cu JSON
-        script_patterns = [
-            r'<script[^>]*>\s*window\.__INITIAL_STATE__\s*=\s*({.+?});',
-            r'<script[^>]*>\s*window\.__APOLLO_STATE__\s*=\s*({.+?});',
-            r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>\s*({.+?})\s*</script>',
-            r'<script[^>]*>\s*var\s+\w+\s*=\s*({.+?});'
-        ]
-        
-        for pattern in script_patterns:
-            matches = re.findall(pattern, html_content, re.DOTALL | re.IGNORECASE)
-            for match in matches:
-                try:
-                    data = json.loads(match)
-                    json_data.update(data)
-                except json.JSONDecodeError:
-                    continue
-        
-        return json_data
+        """Extrage date JSON din script tags (o singură trecere, vezi json_scanner)"""
+        return extract_script_json(html_content)
     
     def _extract_media_urls_from_json(self, json_data: Dict[str, Any]) -> List[str]:
         """Extrage URL-uri media din datele JSON"""
-        media_urls = []
-        
-        # Caută în structura JSON pentru URL-uri media
-        def search_for_media_urls(obj, path=""):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key.lower() in ['url', 'src', 'video_url', 'media_url', 'download_url']:
-                        if isinstance(value, str) and self._is_media_url(value):
-                            media_urls.append(value)
-                    else:
-                        search_for_media_urls(value, f"{path}.{key}")
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    search_for_media_urls(item, f"{path}[{i}]")
-        
-        search_for_media_urls(json_data)
-        return list(set(media_urls))
+        return find_string_values(
+            json_data,
+            ['url', 'src', 'video_url', 'media_url', 'download_url'],
+            self._is_media_url
+        )
     
     def _extract_thumbnails_from_json(self, json_data: Dict[str, Any]) -> List[str]:
         """Extrage URL-uri thumbnail din datele JSON"""
-        thumbnail_urls = []
-        
-        def search_for_thumbnails(obj):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key.lower() in ['thumbnail', 'thumb', 'poster', 'image', 'cover']:
-                        if isinstance(value, str) and self._is_image_url(value):
-                            thumbnail_urls.append(value)
-                    else:
-                        search_for_thumbnails(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    search_for_thumbnails(item)
-        
-        search_for_thumbnails(json_data)
-        return list(set(thumbnail_urls))
+        return find_string_values(
+            json_data,
+            ['thumbnail', 'thumb', 'poster', 'image', 'cover'],
+            self._is_image_url
+        )
     
     def _enhance_metadata_with_json(self, metadata: VideoMetadata, json_data: Dict[str, Any]) -> VideoMetadata:
         """Îmbunătățește metadata cu datele din JSON"""
@@ -881,7 +894,9 @@ class ContentExtractor:
     
     def get_stats(self) -> Dict[str, Any]:
         """Returnează statisticile extractorului"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['method_performance'] = self.method_planner.get_stats()
+        return stats
     
     def clear_cache(self):
         """Curăță cache-ul"""
@@ -0,0 +1,124 @@
+# utils/extraction/json_scanner.py - Extragerea JSON-ului din script tags într-o singură trecere
+# Versiunea: 1.0.0
+
+"""
+Scanner pentru datele JSON încorporate în pagini (Instagram, TikTok etc.).
+
+În loc de regex-uri `{.+?}` cu DOTALL rulate de mai multe ori peste tot
+HTML-ul, scanner-ul parcurge o singură dată tag-urile <script>, recunoaște
+markerii cunoscuți (type="application/json", ld+json, `window.__X__ =`,
+`var x =`) și decodează exact un obiect de la offset-ul găsit cu
+json.JSONDecoder.raw_decode, direct din șirul original (fără copii).
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+_DECODER = json.JSONDecoder()
+
+_SCRIPT_TAG = re.compile(r'<script\b([^>]*)>', re.IGNORECASE)
+_JSON_TYPE = re.compile(r'''type\s*=\s*["']?application/(?:ld\+)?json''', re.IGNORECASE)
+
+# Atribuiri recunoscute la începutul unui script inline
+WINDOW_STATE_MARKERS: Tuple[str, ...] = (
+    '__INITIAL_STATE__',
+    '__APOLLO_STATE__',
+    '_sharedData',
+)
+_ASSIGNMENT = re.compile(
+    r'\s*(?:window\.(?:' + '|'.join(re.escape(marker) for marker in WINDOW_STATE_MARKERS) + r')'
+    r'|var\s+\w+)\s*=\s*',
+)
+
+_WHITESPACE = ' \t\n\r'
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    length = len(text)
+    while pos < length and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_script_json(html_content: str) -> Iterator[Any]:
+    """
+    Obiectele JSON găsite în script tags, în ordinea din pagină.
+
+    Pentru fiecare <script> se verifică doar începutul conținutului; după
+    un obiect decodat, căutarea continuă de la sfârșitul lui, așa că
+    fiecare caracter al paginii este parcurs o singură dată.
+    """
+    pos = 0
+    while True:
+        tag = _SCRIPT_TAG.search(html_content, pos)
+        if tag is None:
+            return
+        pos = tag.end()
+
+        if _JSON_TYPE.search(tag.group(1)):
+            start = _skip_whitespace(html_content, pos)
+        else:
+            assignment = _ASSIGNMENT.match(html_content, pos)
+            if assignment is None:
+                continue
+            start = assignment.end()
+
+        if start >= len(html_content) or html_content[start] not in '{[':
+            continue
+
+        try:
+            data, end = _DECODER.raw_decode(html_content, start)
+        except json.JSONDecodeError:
+            continue
+
+        pos = end
+        yield data
+
+
+def extract_script_json(html_content: str) -> Dict[str, Any]:
+    """
+    Combină obiectele JSON din pagină într-un singur dicționar.
+
+    Listele de nivel superior (ex. ld+json cu mai multe entități) își
+    contribuie elementele de tip dicționar.
+    """
+    json_data: Dict[str, Any] = {}
+    for data in iter_script_json(html_content):
+        if isinstance(data, dict):
+            json_data.update(data)
+        elif isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict):
+                    json_data.update(item)
+    return json_data
+
+
+def find_string_values(data: Any, keys: Iterable[str],
+                       predicate: Callable[[str], bool]) -> List[str]:
+    """
+    Valorile string de sub cheile date (case-insensitive) care trec de predicat.
+
+    Parcurgere iterativă cu stivă explicită: fără limita de recursivitate
+    pe JSON-uri adânc imbricate. Valorile cheilor potrivite nu sunt
+    explorate mai departe. Rezultatul este deduplicat, în ordinea găsirii.
+    """
+    wanted = {key.lower() for key in keys}
+    found: Dict[str, None] = {}
+    stack = [data]
+
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            children = []
+            for key, value in obj.items():
+                if isinstance(key, str) and key.lower() in wanted:
+                    if isinstance(value, str) and predicate(value):
+                        found[value] = None
+                elif isinstance(value, (dict, list)):
+                    children.append(value)
+            stack.extend(reversed(children))
+        elif isinstance(obj, list):
+            stack.extend(item for item in reversed(obj) if isinstance(item, (dict, list)))
+
+    return list(found)
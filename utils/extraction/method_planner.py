@@ -0,0 +1,173 @@
+# utils/extraction/method_planner.py - Ordonarea adaptivă a metodelor de extragere
+# Versiunea: 1.0.0
+
+"""
+Statistici de latență și succes per (platformă, metodă de extragere) și
+cursa "primul rezultat de încredere" folosită de strategia PARALLEL.
+
+MethodPlanner ordonează metodele după rata de succes observată (apoi după
+latență) și le sare pe cele care eșuează constant pe o platformă, cu o
+re-probare periodică pentru ca o metodă reparată să poată reveni.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MethodStats:
+    """Contoarele unei metode pe o platformă"""
+    attempts: int = 0
+    successes: int = 0
+    total_ms: float = 0.0
+    avg_ms: float = 0.0  # medie exponențială, urmărește schimbările recente
+    skipped: int = 0
+
+    @property
+    def success_rate(self) -> float:
+        """Rata de succes netezită (Laplace), 0.5 fără observații"""
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'success_rate': round(self.successes / self.attempts, 3) if self.attempts else 0.0,
+            'avg_ms': round(self.avg_ms, 1),
+            'skipped': self.skipped,
+        }
+
+
+class MethodPlanner:
+    """
+    Planificator adaptiv al metodelor de extragere.
+
+    O metodă este sărită pe o platformă după `min_samples` încercări cu rata
+    de succes sub `skip_below`; la fiecare `probe_every` planificări în care
+    ar fi fost sărită, este totuși încercată din nou.
+    """
+
+    def __init__(self, min_samples: int = 5, skip_below: float = 0.1,
+                 probe_every: int = 20, smoothing: float = 0.3):
+        self.min_samples = min_samples
+        self.skip_below = skip_below
+        self.probe_every = probe_every
+        self.smoothing = smoothing
+        self._stats: Dict[Tuple[str, str], MethodStats] = {}
+
+    def _get(self, platform: str, method: str) -> MethodStats:
+        key = (platform, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = MethodStats()
+        return stats
+
+    def record(self, platform: str, method: str, elapsed: float, success: bool):
+        """Înregistrează rezultatul unei rulări (elapsed în secunde)"""
+        stats = self._get(platform, method)
+        elapsed_ms = elapsed * 1000
+        stats.attempts += 1
+        stats.successes += 1 if success else 0
+        stats.total_ms += elapsed_ms
+        if stats.attempts == 1:
+            stats.avg_ms = elapsed_ms
+        else:
+            stats.avg_ms += self.smoothing * (elapsed_ms - stats.avg_ms)
+
+    def _should_skip(self, stats: MethodStats) -> bool:
+        if stats.attempts < self.min_samples:
+            return False
+        observed_rate = stats.successes / stats.attempts
+        return observed_rate < self.skip_below
+
+    def plan(self, platform: str, methods: Sequence[str]) -> List[str]:
+        """
+        Ordinea în care trebuie încercate metodele pe platformă.
+
+        Metodele fără statistici își păstrează poziția relativă (sortare
+        stabilă); dacă toate ar fi sărite, se returnează toate.
+        """
+        ordered = sorted(
+            methods,
+            key=lambda method: (-self._get(platform, method).success_rate,
+                                self._get(platform, method).avg_ms)
+        )
+
+        selected = []
+        for method in ordered:
+            stats = self._get(platform, method)
+            if self._should_skip(stats):
+                stats.skipped += 1
+                if stats.skipped % self.probe_every != 0:
+                    continue
+                logger.debug(f"🔁 Re-probing extraction method {method} on {platform}")
+            selected.append(method)
+
+        return selected or list(ordered)
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Statistici grupate pe platformă"""
+        report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (platform, method), stats in sorted(self._stats.items()):
+            if stats.attempts or stats.skipped:
+                report.setdefault(platform, {})[method] = stats.to_dict()
+        return report
+
+    def reset(self):
+        self._stats.clear()
+
+
+async def first_confident(tasks: Iterable[asyncio.Task], min_confidence: float,
+                          timeout: Optional[float] = None) -> Tuple[Optional[Any], List[str]]:
+    """
+    Așteaptă primul rezultat reușit cu `confidence_score >= min_confidence`.
+
+    Rezultatele eșuate sau sub prag nu opresc cursa. Dacă niciun rezultat nu
+    atinge pragul până la epuizarea task-urilor (sau la timeout), se
+    returnează cel mai bun rezultat reușit, dacă există. Task-urile rămase
+    sunt anulate. Returnează (rezultat sau None, mesajele de eroare).
+    """
+    pending = set(tasks)
+    best = None
+    errors: List[str] = []
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    try:
+        while pending:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    errors.append("timeout")
+                    break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except asyncio.CancelledError:
+                    continue
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+
+                if not result.success:
+                    if result.error_message:
+                        errors.append(result.error_message)
+                    continue
+                if best is None or result.confidence_score > best.confidence_score:
+                    best = result
+
+            if best is not None and best.confidence_score >= min_confidence:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+
+    return best, errors
@@ -0,0 +1,244 @@
+# utils/file_id_cache.py - Cache persistent pentru file_id-urile Telegram ale videoclipurilor trimise
+# Versiunea: 1.0.0
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from utils.common.validators import URLValidator
+from utils.log_writer import BackgroundBatchWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FileIdEntry:
+    """Un videoclip deja încărcat pe Telegram"""
+    file_id: str
+    media_type: str = 'video'
+    caption: Optional[str] = None
+    title: Optional[str] = None
+    file_size: Optional[int] = None
+    created_at: float = 0.0
+    last_access: float = 0.0
+    hits: int = 0
+
+
+class _SnapshotWriter(BackgroundBatchWriter):
+    """
+    Rescrie fișierul cache-ului pe thread-ul de fundal. Modificările dintr-un
+    flush_interval produc o singură rescriere, în afara căii cererii.
+    """
+
+    def __init__(self, cache: 'TelegramFileIdCache', flush_interval: float):
+        super().__init__(flush_interval=flush_interval, batch_size=1024, max_pending=1024,
+                         thread_name="file-id-cache-writer")
+        self.cache = cache
+        self.stats['snapshots'] = 0
+
+    def _write_batch(self, batch: List[Any]):
+        if self.cache._write_snapshot():
+            self.stats['snapshots'] += 1
+        else:
+            self.stats['errors'] += 1
+
+
+class TelegramFileIdCache:
+    """
+    Cache cheiat după ID-ul canonic al videoclipului (platformă + ID extras din
+    URL), care păstrează file_id-ul returnat de sendVideo. Un link cerut din nou
+    este retrimis prin file_id, fără descărcare și fără upload.
+
+    - TTL pentru intrări (file_id-urile pot fi invalidate de Telegram)
+    - Evicție LRU limitată la max_entries
+    - Persistență pe disc (JSON scris atomic), încărcat leneș la primul acces;
+      scrierea se face în fundal, cel mult o dată la flush_interval secunde
+      (flush() forțează scrierea, iar la ieșirea procesului se face automat)
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, ttl_seconds: int = 7 * 24 * 3600,
+                 max_entries: int = 5000, flush_interval: float = 2.0):
+        self.cache_file = cache_file or os.path.join("cache", "telegram_file_ids.json")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.entries: 'OrderedDict[str, FileIdEntry]' = OrderedDict()
+        self.lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._loaded = False
+        self._writer = _SnapshotWriter(self, flush_interval)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resetează statisticile cache-ului"""
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0,
+            'invalidations': 0,
+            'uncacheable': 0,
+            'bytes_saved': 0
+        }
+
+    @staticmethod
+    def make_key(url: str) -> Optional[str]:
+        """Cheia canonică 'platformă:id' pentru un URL, sau None dacă ID-ul nu poate fi extras"""
+        platform = URLValidator.detect_platform(url)
+        if not platform:
+            return None
+        video_id = URLValidator.extract_video_id(url, platform)
+        if not video_id:
+            return None
+        return f"{platform}:{video_id}"
+
+    def _ensure_loaded(self):
+        """Încarcă intrările de pe disc la primul acces; apelat cu lock-ul deținut"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            # Intrările sunt salvate în ordinea LRU (cea mai veche prima)
+            for key, raw in data.get('entries', []):
+                entry = FileIdEntry(**raw)
+                if now - entry.created_at <= self.ttl_seconds:
+                    self.entries[key] = entry
+            logger.info(f"📦 File ID cache încărcat: {len(self.entries)} intrări")
+        except Exception as e:
+            logger.warning(f"Nu s-a putut încărca file ID cache-ul din {self.cache_file}: {e}")
+
+    def _save(self):
+        """Marchează cache-ul pentru scriere; fișierul este rescris în fundal"""
+        self._writer.append(None)
+
+    def _write_snapshot(self) -> bool:
+        """Scrie cache-ul pe disc atomic (tmp + rename), pe thread-ul de scriere"""
+        with self.lock:
+            payload = {'entries': [[key, asdict(entry)] for key, entry in self.entries.items()]}
+        with self._io_lock:
+            try:
+                directory = os.path.dirname(self.cache_file) or '.'
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix='.file_ids_', dir=directory)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
+                return True
+            except Exception as e:
+                logger.warning(f"Nu s-a putut salva file ID cache-ul: {e}")
+                return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Scrie imediat modificările în așteptare pe disc"""
+        return self._writer.flush(timeout)
+
+    def get(self, url: str) -> Optional[FileIdEntry]:
+        """Returnează intrarea pentru URL dacă există și nu a expirat"""
+        key = self.make_key(url)
+        with self.lock:
+            if key is None:
+                self.stats['uncacheable'] += 1
+                return None
+
+            self._ensure_loaded()
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            now = time.time()
+            if now - entry.created_at > self.ttl_seconds:
+                del self.entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self.entries.move_to_end(key)
+            entry.last_access = now
+            entry.hits += 1
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry.file_size or 0
+            return entry
+
+    def put(self, url: str, file_id: str, media_type: str = 'video', caption: Optional[str] = None,
+            title: Optional[str] = None, file_size: Optional[int] = None) -> bool:
+        """Memorează file_id-ul pentru URL; returnează False dacă URL-ul nu are ID canonic"""
+        key = self.make_key(url)
+        if key is None or not file_id:
+            return False
+
+        with self.lock:
+            self._ensure_loaded()
+            now = time.time()
+            self.entries[key] = FileIdEntry(
+                file_id=file_id,
+                media_type=media_type,
+                caption=caption,
+                title=title,
+                file_size=file_size,
+                created_at=now,
+                last_access=now
+            )
+            self.entries.move_to_end(key)
+            self.stats['stores'] += 1
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+            self._save()
+        return True
+
+    def invalidate(self, url: str) -> bool:
+        """Elimină intrarea pentru URL (ex. Telegram a respins file_id-ul)"""
+        key = self.make_key(url)
+        if key is None:
+            return False
+        with self.lock:
+            self._ensure_loaded()
+            if self.entries.pop(key, None) is None:
+                return False
+            self.stats['invalidations'] += 1
+            self._save()
+        return True
+
+    def clear(self):
+        """Golește cache-ul (inclusiv pe disc)"""
+        with self.lock:
+            self.entries.clear()
+            self._loaded = True
+            self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returnează statisticile cache-ului"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        stats['bytes_saved_mb'] = round(stats['bytes_saved'] / (1024 * 1024), 2)
+        stats['disk_writes'] = self._writer.stats['snapshots']
+        stats['pending_writes'] = len(self._writer._pending)
+        return stats
+
+
+# Instanță globală
+file_id_cache = TelegramFileIdCache(
+    cache_file=os.getenv('FILE_ID_CACHE_FILE', os.path.join("cache", "telegram_file_ids.json")),
+    ttl_seconds=int(os.getenv('FILE_ID_CACHE_TTL_SECONDS', str(7 * 24 * 3600))),
+    max_entries=int(os.getenv('FILE_ID_CACHE_MAX_ENTRIES', '5000')),
+    flush_interval=float(os.getenv('FILE_ID_CACHE_FLUSH_SECONDS', '2'))
+)
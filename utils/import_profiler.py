@@ -0,0 +1,156 @@
+# utils/import_profiler.py - Profilarea timpului de import la pornire (cold start)
+# Versiunea: 1.0.0
+
+"""
+Echivalent în proces al `python -X importtime`, activat prin IMPORT_PROFILE=1.
+
+Un finder pus primul în sys.meta_path învelește loader-ul fiecărui modul
+importat și măsoară execuția lui: timp propriu (fără sub-importuri) și
+cumulativ. Raportul este logat la pornire și expus în /metrics.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PROFILE_ENV = 'IMPORT_PROFILE'
+IMPORT_PROFILE_TOP_ENV = 'IMPORT_PROFILE_TOP'
+
+
+class _TimedLoader:
+    """Loader care deleagă către cel original și cronometrează exec_module"""
+
+    def __init__(self, loader, profiler: 'ImportProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        create = getattr(self._loader, 'create_module', None)
+        return create(spec) if create else None
+
+    def exec_module(self, module):
+        # Modulul păstrează loader-ul original (importlib.resources, pkgutil etc.)
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """
+    Înregistrează timpul de import per modul. Doar firul care a instalat
+    profiler-ul este măsurat (importurile din alte fire trec neatinse).
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, float]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stack: List[List[float]] = []
+        self._thread_id: Optional[int] = None
+        self._installed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._installed
+
+    def install(self) -> 'ImportProfiler':
+        """Pune profiler-ul primul în sys.meta_path (idempotent)"""
+        if not self._installed:
+            self._thread_id = threading.get_ident()
+            self.started_at = time.perf_counter()
+            sys.meta_path.insert(0, self)
+            self._installed = True
+        return self
+
+    def install_from_env(self) -> 'ImportProfiler':
+        """Instalează profiler-ul dacă IMPORT_PROFILE este activ"""
+        if os.getenv(IMPORT_PROFILE_ENV, '').lower() in ('1', 'true', 'yes', 'on'):
+            self.install()
+        return self
+
+    def uninstall(self):
+        """Oprește măsurarea; înregistrările rămân disponibile pentru raport"""
+        if self._installed:
+            try:
+                sys.meta_path.remove(self)
+            except ValueError:
+                pass
+            self._installed = False
+            self.finished_at = time.perf_counter()
+
+    # Protocolul MetaPathFinder
+    def find_spec(self, fullname, path=None, target=None):
+        if threading.get_ident() != self._thread_id:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def invalidate_caches(self):
+        pass
+
+    def _enter(self):
+        # [început, timpul cumulat al sub-importurilor]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, module_name: str):
+        started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        self.records[module_name] = {
+            'self_ms': round((cumulative - children) * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        if self._stack:
+            self._stack[-1][1] += cumulative
+
+    def get_report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Cele mai costisitoare module, după timpul cumulativ"""
+        if top is None:
+            top = int(os.getenv(IMPORT_PROFILE_TOP_ENV, '25'))
+        ordered = sorted(self.records.items(), key=lambda item: item[1]['cumulative_ms'], reverse=True)
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            'enabled': self._installed,
+            'modules': len(self.records),
+            'total_import_ms': round(sum(timing['self_ms'] for timing in self.records.values()), 1),
+            'elapsed_ms': round((end - self.started_at) * 1000, 1) if self.started_at else 0.0,
+            'top': [dict(module=name, **timing) for name, timing in ordered[:top]],
+        }
+
+    def format_report(self, top: Optional[int] = None) -> str:
+        """Raport text în formatul `-X importtime` (self | cumulative | modul)"""
+        report = self.get_report(top)
+        lines = [f"import time: {'self [ms]':>10} | {'cumulative':>10} | imported package"]
+        for entry in report['top']:
+            lines.append(f"import time: {entry['self_ms']:>10.1f} | {entry['cumulative_ms']:>10.1f} | {entry['module']}")
+        lines.append(f"import time: {report['modules']} modules, {report['total_import_ms']:.1f}ms total")
+        return '\n'.join(lines)
+
+    def log_report(self, top: Optional[int] = None):
+        """Loghează raportul (apelat la finalul pornirii)"""
+        if not self.records:
+            return
+        logger.info("⏱️ Import profile (cold start):\n" + self.format_report(top))
+
+
+# Instanță globală; app.py o instalează înaintea celorlalte importuri
+import_profiler = ImportProfiler()
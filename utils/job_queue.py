@@ -0,0 +1,222 @@
+# utils/job_queue.py - Coadă de job-uri cu worker pool pentru procesarea webhook-urilor
+# Versiunea: 1.0.0
+
+import time
+import threading
+import logging
+from collections import deque, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """Job în așteptare în coadă"""
+    chat_id: Any
+    func: Callable
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class JobQueue:
+    """
+    Coadă de job-uri limitată, golită de un pool de worker threads.
+
+    - Backpressure: numărul total de job-uri în așteptare este limitat
+      (max_queue_size), iar fiecare chat poate avea cel mult max_per_chat
+      job-uri în așteptare sau în execuție.
+    - Fairness: job-urile sunt servite round-robin între chat-uri, astfel încât
+      un chat care trimite multe link-uri nu blochează celelalte chat-uri.
+    - Worker-ii sunt porniți leneș la primul submit (compatibil cu
+      gunicorn --preload, unde thread-urile nu supraviețuiesc fork-ului).
+    """
+
+    REJECTED_QUEUE_FULL = 'queue_full'
+    REJECTED_CHAT_LIMIT = 'chat_limit'
+
+    def __init__(self, num_workers: int = 2, max_queue_size: int = 50,
+                 max_per_chat: int = 3, name: str = 'jobs', wait_samples: int = 500):
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.max_per_chat = max(1, max_per_chat)
+        self.name = name
+
+        # chat_id -> deque de job-uri; ordinea cheilor este ordinea round-robin
+        self._chat_queues: 'OrderedDict[Any, Deque[Job]]' = OrderedDict()
+        self._size = 0
+        self._active = 0
+        self._chat_active: Dict[Any, int] = {}  # job-uri în execuție per chat
+        self._condition = threading.Condition()
+        self._workers = []
+        self._started = False
+        self._should_stop = False
+
+        self._wait_samples: Deque[float] = deque(maxlen=wait_samples)
+        self.reset_stats()
+
+        logger.info(f"🧵 Job queue '{name}' configurată: {self.num_workers} workers, "
+                    f"max {self.max_queue_size} job-uri, max {self.max_per_chat}/chat")
+
+    def reset_stats(self):
+        """Resetează statisticile cozii (starea curentă a cozii este păstrată)"""
+        with self._condition:
+            self.stats = {
+                'submitted': 0,
+                'completed': 0,
+                'failed': 0,
+                'rejected_queue_full': 0,
+                'rejected_chat_limit': 0,
+                'max_depth': self._size
+            }
+            self._wait_total = 0.0
+            self._wait_count = 0
+            self._wait_max = 0.0
+            self._wait_samples.clear()
+
+    def start(self):
+        """Pornește worker-ii (idempotent)"""
+        with self._condition:
+            if self._started:
+                return
+            self._started = True
+            self._should_stop = False
+            for i in range(self.num_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"{self.name}-worker-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        logger.info(f"🚀 Job queue '{self.name}' pornită cu {self.num_workers} workers")
+
+    def stop(self, timeout: float = 5.0):
+        """Oprește worker-ii după terminarea job-urilor curente"""
+        with self._condition:
+            self._should_stop = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        with self._condition:
+            self._workers = []
+            self._started = False
+
+    def submit(self, chat_id: Any, func: Callable, *args, **kwargs) -> Tuple[bool, Optional[str]]:
+        """
+        Adaugă un job în coadă fără să blocheze.
+
+        Returns:
+            (True, None) dacă job-ul a fost acceptat, altfel (False, motiv)
+        """
+        if not self._started:
+            self.start()
+
+        with self._condition:
+            if self._size >= self.max_queue_size:
+                self.stats['rejected_queue_full'] += 1
+                return False, self.REJECTED_QUEUE_FULL
+
+            chat_queue = self._chat_queues.get(chat_id)
+            chat_jobs = (len(chat_queue) if chat_queue is not None else 0) + self._chat_active.get(chat_id, 0)
+            if chat_jobs >= self.max_per_chat:
+                self.stats['rejected_chat_limit'] += 1
+                return False, self.REJECTED_CHAT_LIMIT
+
+            if chat_queue is None:
+                chat_queue = deque()
+                self._chat_queues[chat_id] = chat_queue
+            chat_queue.append(Job(chat_id=chat_id, func=func, args=args, kwargs=kwargs))
+
+            self._size += 1
+            self.stats['submitted'] += 1
+            if self._size > self.stats['max_depth']:
+                self.stats['max_depth'] = self._size
+
+            self._condition.notify()
+            return True, None
+
+    def _next_job(self) -> Optional[Job]:
+        """Scoate următorul job round-robin; apelat cu lock-ul deținut"""
+        while not self._chat_queues and not self._should_stop:
+            self._condition.wait()
+        if self._should_stop and not self._chat_queues:
+            return None
+
+        chat_id, chat_queue = self._chat_queues.popitem(last=False)
+        job = chat_queue.popleft()
+        if chat_queue:
+            # Chat-ul mai are job-uri: trece la finalul rândului
+            self._chat_queues[chat_id] = chat_queue
+        self._size -= 1
+        return job
+
+    def _worker_loop(self):
+        """Bucla unui worker: scoate job-uri și le execută"""
+        while True:
+            with self._condition:
+                job = self._next_job()
+                if job is None:
+                    return
+                self._active += 1
+                self._chat_active[job.chat_id] = self._chat_active.get(job.chat_id, 0) + 1
+                self._record_wait(time.time() - job.enqueued_at)
+
+            try:
+                job.func(*job.args, **job.kwargs)
+                success = True
+            except Exception as e:
+                success = False
+                logger.error(f"❌ Job eșuat pentru chat {job.chat_id} în '{self.name}': {e}")
+
+            with self._condition:
+                self._active -= 1
+                remaining = self._chat_active.pop(job.chat_id) - 1
+                if remaining:
+                    self._chat_active[job.chat_id] = remaining
+                self.stats['completed' if success else 'failed'] += 1
+
+    def _record_wait(self, wait_seconds: float):
+        """Înregistrează timpul petrecut de job în coadă; apelat cu lock-ul deținut"""
+        self._wait_total += wait_seconds
+        self._wait_count += 1
+        if wait_seconds > self._wait_max:
+            self._wait_max = wait_seconds
+        self._wait_samples.append(wait_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returnează starea cozii și statisticile timpului de așteptare"""
+        with self._condition:
+            samples = sorted(self._wait_samples)
+            stats = dict(self.stats)
+            stats.update({
+                'workers': self.num_workers,
+                'running': self._started,
+                'depth': self._size,
+                'active_jobs': self._active,
+                'chats_waiting': len(self._chat_queues),
+                'chats_active': len(self._chat_active),
+                'max_queue_size': self.max_queue_size,
+                'max_per_chat': self.max_per_chat,
+            })
+            wait_count = self._wait_count
+            wait_total = self._wait_total
+            wait_max = self._wait_max
+
+        if samples:
+            p50 = samples[len(samples) // 2]
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        else:
+            p50 = p95 = 0.0
+
+        stats['wait_time_ms'] = {
+            'count': wait_count,
+            'total': round(wait_total * 1000, 1),
+            'avg': round((wait_total / wait_count) * 1000, 1) if wait_count else 0.0,
+            'p50': round(p50 * 1000, 1),
+            'p95': round(p95 * 1000, 1),
+            'max': round(wait_max * 1000, 1)
+        }
+        return stats
@@ -0,0 +1,413 @@
+# utils/log_writer.py - Scriere JSONL în background, pe loturi, cu rotație și gzip
+# Versiunea: 1.0.0
+
+import os
+import re
+import gzip
+import json
+import time
+import atexit
+import shutil
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Sufixul de timp al segmentelor rotite: bot_activity.20250813-004627.jsonl[.gz]
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+# Sub această fereastră căutarea binară în fișier se încheie cu o citire secvențială
+SEEK_LINEAR_BYTES = 64 * 1024
+
+
+def _default_serializer(record: Any) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+class BackgroundBatchWriter:
+    """
+    Coadă în memorie golită pe loturi de un thread dedicat (baza writer-elor de log).
+
+    - append() doar pune înregistrarea în coadă, fără I/O pe thread-ul apelantului;
+    - thread-ul de scriere apelează _write_batch() la fiecare flush_interval sau
+      când coada atinge batch_size; flush()/close() îl trezesc imediat;
+    - coada este limitată (max_pending): la suprasarcină se pierd cele mai vechi
+      înregistrări nescrise, numărate în stats['dropped'];
+    - close() (înregistrat și cu atexit) scrie tot ce a rămas în coadă.
+
+    Thread-ul pornește leneș la primul append (și din nou după fork), compatibil
+    cu gunicorn --preload. Subclasele implementează _write_batch().
+    """
+
+    def __init__(self, flush_interval: float = 0.2, batch_size: int = 512, max_pending: int = 50000,
+                 thread_name: str = "batch-writer"):
+        self.flush_interval = max(0.001, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self.thread_name = thread_name
+
+        self._pending: Deque[Any] = deque(maxlen=max(1, max_pending))
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+
+        self.stats: Dict[str, int] = {'queued': 0, 'written': 0, 'dropped': 0, 'errors': 0}
+
+        atexit.register(self.close)
+
+    def append(self, record: Any):
+        """Adaugă o înregistrare în coada de scriere (non-blocant, fără I/O)"""
+        with self._condition:
+            if len(self._pending) == self._pending.maxlen:
+                self.stats['dropped'] += 1
+            self._pending.append(record)
+            self.stats['queued'] += 1
+
+            if self._closed:
+                return
+            self._ensure_writer()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _ensure_writer(self):
+        """Pornește thread-ul de scriere în procesul curent; apelat cu lock-ul deținut"""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        if self._pid is not None and self._pid != pid:
+            self._after_fork()
+        self._pid = pid
+        self._writing = False
+        self._thread = threading.Thread(target=self._writer_loop, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def _writer_loop(self):
+        """Bucla thread-ului de scriere"""
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size and not (self._closed or self._flush_requested):
+                    # Așteaptă să se adune un lot; flush()/close() trezesc imediat
+                    self._condition.wait(self.flush_interval)
+                self._flush_requested = False
+                batch = list(self._pending)
+                self._pending.clear()
+                closing = self._closed
+                self._writing = bool(batch)
+
+            if batch:
+                self._write_batch(batch)
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+                if closing and not self._pending:
+                    break
+
+        self._writer_stopped()
+
+    def _write_batch(self, batch: List[Any]):
+        """Scrie un lot de înregistrări (pe thread-ul de scriere)"""
+        raise NotImplementedError
+
+    def _after_fork(self):
+        """Proces copil: resursele moștenite (ex. handle-uri de fișier) aparțin părintelui"""
+
+    def _writer_stopped(self):
+        """Apelat după ultimul lot, la oprirea thread-ului sau după un flush sincron"""
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Așteaptă scrierea tuturor înregistrărilor din coadă"""
+        with self._condition:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                batch = list(self._pending)
+                self._pending.clear()
+            else:
+                self._flush_requested = True
+                self._condition.notify_all()
+                return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+        # Fără thread activ (ex. după fork sau după close): scrie sincron
+        if batch:
+            self._write_batch(batch)
+            self._writer_stopped()
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Oprește thread-ul de scriere după ce coada a fost scrisă (idempotent)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread if self._pid == os.getpid() else None
+
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistici ale writer-ului"""
+        stats = dict(self.stats)
+        stats['pending'] = len(self._pending)
+        return stats
+
+
+class RotatingJsonlWriter(BackgroundBatchWriter):
+    """
+    Writer JSONL cu un thread dedicat: apelantul doar pune înregistrarea în coadă.
+
+    - înregistrările sunt serializate și scrise pe thread-ul de scriere, câte un
+      singur write() per lot (la fiecare flush_interval sau la batch_size intrări);
+    - fișierul activ rămâne deschis între loturi;
+    - rotație după dimensiune (max_bytes) și/sau vechime (rotate_interval secunde):
+      segmentul închis primește în nume momentul primei înregistrări și este
+      comprimat opțional cu gzip; se păstrează ultimele backup_count segmente;
+    - coada este limitată (max_pending), surplusul este numărat în stats['dropped'].
+    """
+
+    def __init__(self, path: Union[str, Path], flush_interval: float = 0.2, batch_size: int = 512,
+                 max_pending: int = 50000, max_bytes: int = 10 * 1024 * 1024,
+                 rotate_interval: Optional[float] = None, backup_count: int = 14, compress: bool = True,
+                 serializer: Callable[[Any], str] = _default_serializer, timestamp_key: str = 'timestamp',
+                 thread_name: str = "jsonl-writer"):
+        super().__init__(flush_interval, batch_size, max_pending, thread_name)
+        self.path = Path(path).absolute()  # independent de cwd-ul thread-ului de scriere
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self.rotate_interval = rotate_interval if rotate_interval and rotate_interval > 0 else None
+        self.backup_count = max(0, backup_count)
+        self.compress = compress
+        self.serializer = serializer
+        self.timestamp_key = timestamp_key
+
+        self._segment_re = re.compile(
+            rf"^{re.escape(self.path.stem)}\.(\d{{8}}-\d{{6}})(?:-\d+)?{re.escape(self.path.suffix)}(\.gz)?$"
+        )
+
+        self._io_lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._segment_start: Optional[float] = None
+
+        self.stats.update({'batches': 0, 'bytes': 0, 'rotations': 0, 'compressed': 0, 'removed_segments': 0})
+
+    def _after_fork(self):
+        # Handle-ul moștenit aparține părintelui
+        self._file = None
+        self._segment_start = None
+
+    def _writer_stopped(self):
+        with self._io_lock:
+            self._close_file()
+
+    def _write_batch(self, batch: List[Any]):
+        """Serializează lotul și îl scrie cu un singur write(), rotind înainte dacă este cazul"""
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.serializer(record) + '\n')
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Cannot serialize log record: {e}")
+        if not lines:
+            return
+        data = ''.join(lines).encode('utf-8')
+
+        with self._io_lock:
+            try:
+                self._open_file()
+                if self._should_rotate(len(data)):
+                    self._rotate()
+                    self._open_file()
+
+                if self._size == 0:
+                    self._segment_start = self._record_time(batch[0])
+                self._file.write(data)
+                self._file.flush()
+
+                self._size += len(data)
+                self.stats['written'] += len(lines)
+                self.stats['batches'] += 1
+                self.stats['bytes'] += len(data)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Error writing log batch to {self.path}: {e}")
+                self._close_file()
+
+    def _record_time(self, record: Any) -> float:
+        value = record.get(self.timestamp_key) if isinstance(record, dict) else getattr(record, self.timestamp_key, None)
+        return float(value) if isinstance(value, (int, float)) else time.time()
+
+    def _open_file(self):
+        if self._file is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+        if self._size and self._segment_start is None:
+            self._segment_start = self._read_segment_start()
+
+    def _read_segment_start(self) -> float:
+        """Momentul primei înregistrări din fișierul activ existent"""
+        try:
+            with open(self.path, 'rb') as f:
+                value = json.loads(f.readline()).get(self.timestamp_key)
+            if isinstance(value, (int, float)):
+                return float(value)
+        except (OSError, ValueError, AttributeError):
+            pass
+        return self.path.stat().st_mtime
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        if self.rotate_interval and self._segment_start is not None:
+            return time.time() - self._segment_start >= self.rotate_interval
+        return False
+
+    def _rotate(self):
+        """Închide segmentul activ, îl redenumește cu momentul de start și îl comprimă"""
+        self._close_file()
+        start = self._segment_start or time.time()
+        stamp = datetime.fromtimestamp(start).strftime(SEGMENT_TIME_FORMAT)
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        counter = 1
+        while target.exists() or target.with_name(target.name + '.gz').exists():
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{counter}{self.path.suffix}")
+            counter += 1
+
+        os.replace(self.path, target)
+        self._size = 0
+        self._segment_start = None
+        self.stats['rotations'] += 1
+
+        if self.compress:
+            self._compress(target)
+        self._prune_segments()
+        logger.info(f"🔄 Rotated log segment {target.name}")
+
+    def _compress(self, source: Path):
+        gz_path = source.with_name(source.name + '.gz')
+        tmp_path = source.with_name(source.name + '.gz.tmp')
+        try:
+            with open(source, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp_path, gz_path)
+            source.unlink()
+            self.stats['compressed'] += 1
+        except OSError as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Error compressing log segment {source.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _prune_segments(self):
+        segments = self.segments()
+        for _, path in segments[:max(0, len(segments) - self.backup_count)]:
+            try:
+                path.unlink()
+                self.stats['removed_segments'] += 1
+            except OSError:
+                pass
+
+    def segments(self) -> List[Tuple[float, Path]]:
+        """Segmentele rotite (moment de start, cale), în ordine cronologică"""
+        result = []
+        try:
+            entries = list(self.path.parent.iterdir())
+        except FileNotFoundError:
+            return result
+        for entry in entries:
+            match = self._segment_re.match(entry.name)
+            if match:
+                start = datetime.strptime(match.group(1), SEGMENT_TIME_FORMAT).timestamp()
+                result.append((start, entry))
+        result.sort(key=lambda item: (item[0], item[1].name))
+        return result
+
+    def iter_records(self, since: Optional[float] = None,
+                     until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Înregistrările de pe disk cu timestamp în [since, until], în ordine cronologică.
+
+        Segmentele din afara intervalului sunt sărite după numele lor; în fișierele
+        necomprimate poziția de start se găsește prin căutare binară după timestamp,
+        cele gzip sunt citite secvențial. Înregistrările încă în coadă nu sunt incluse.
+        """
+        files = self.segments()
+        if self.path.exists():
+            files.append((self._segment_start or self._read_segment_start(), self.path))
+
+        for index, (start, path) in enumerate(files):
+            next_start = files[index + 1][0] if index + 1 < len(files) else None
+            if until is not None and start > until:
+                break
+            if since is not None and next_start is not None and next_start <= since:
+                continue
+            try:
+                yield from self._iter_file(path, since, until)
+            except OSError as e:
+                logger.warning(f"⚠️ Cannot read log segment {path.name}: {e}")
+
+    def _iter_file(self, path: Path, since: Optional[float], until: Optional[float]) -> Iterator[Dict[str, Any]]:
+        compressed = path.name.endswith('.gz')
+        with (gzip.open(path, 'rb') if compressed else open(path, 'rb')) as f:
+            if since is not None and not compressed:
+                f.seek(self._seek_timestamp(f, since))
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # linie incompletă (scriere întreruptă)
+                value = record.get(self.timestamp_key) if isinstance(record, dict) else None
+                if isinstance(value, (int, float)):
+                    if since is not None and value < since:
+                        continue
+                    if until is not None and value > until:
+                        return
+                yield record
+
+    def _line_time(self, line: bytes) -> Optional[float]:
+        try:
+            value = json.loads(line).get(self.timestamp_key)
+        except (ValueError, AttributeError):
+            return None
+        return float(value) if isinstance(value, (int, float)) else None
+
+    def _seek_timestamp(self, f, since: float) -> int:
+        """Offset-ul unui început de linie la sau înaintea primei înregistrări cu timestamp >= since"""
+        f.seek(0, os.SEEK_END)
+        low, high = 0, f.tell()  # low este mereu început de linie
+        while high - low > SEEK_LINEAR_BYTES:
+            middle = (low + high) // 2
+            f.seek(middle)
+            f.readline()  # sare peste linia parțială
+            position = f.tell()
+            line = f.readline()
+            if not line or position >= high:
+                high = middle
+                continue
+            value = self._line_time(line)
+            if value is not None and value < since:
+                low = position + len(line)
+            else:
+                high = middle
+        return low
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistici ale writer-ului"""
+        stats = super().get_stats()
+        stats['active_file_bytes'] = self._size
+        return stats
@@ -5,9 +5,12 @@ import time
 import logging
 import asyncio
 import threading
+import re
 import json
+import math
+import bisect
 import traceback
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, List, Optional, Any, Callable, Sequence, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 from collections import defaultdict, deque
@@ -89,6 +92,71 @@ class PerformanceTrace:
         self.status = status
         self.error = error
 
+
+# Limitele implicite ale bucket-urilor (seria 1-2.5-5, de la 0.1 la 500000 - pentru durate în ms)
+DEFAULT_HISTOGRAM_BUCKETS: Tuple[float, ...] = tuple(
+    round(base * 10 ** exponent, 6) for exponent in range(-1, 6) for base in (1, 2.5, 5)
+)
+
+_PROMETHEUS_NAME_RE = re.compile(r'[^a-zA-Z0-9_:]')
+
+LabelPairs = Tuple[Tuple[str, str], ...]
+
+
+class StreamingHistogram:
+    """
+    Histogramă cu bucket-uri fixe: înregistrarea costă O(log B) cu B constant
+    (bisect pe limite), memoria nu depinde de numărul de valori.
+
+    Count, sum, min și max sunt exacte; percentilele sunt interpolate liniar
+    în interiorul bucket-ului și limitate la [min, max].
+    """
+
+    __slots__ = ('bounds', 'bucket_counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_HISTOGRAM_BUCKETS):
+        self.bounds = tuple(sorted(bounds))
+        self.bucket_counts = [0] * (len(self.bounds) + 1)  # ultimul bucket: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """Adaugă o valoare"""
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Percentila q (0-1), estimată din bucket-uri"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else self.min
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * max(0.0, rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """Perechi (le, număr cumulat) în formatul Prometheus, inclusiv +Inf"""
+        result = []
+        total = 0
+        for bound, bucket_count in zip(self.bounds + (math.inf,), self.bucket_counts):
+            total += bucket_count
+            result.append((bound, total))
+        return result
+
+
 class MetricsCollector:
     """Colector central pentru metrici"""
     
@@ -96,8 +164,12 @@ class MetricsCollector:
         self.metrics: deque = deque(maxlen=max_metrics)
         self.counters: Dict[str, float] = defaultdict(float)
         self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = defaultdict(list)
-        self.timers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        self.histograms: Dict[str, StreamingHistogram] = {}
+        self.timers: Dict[str, StreamingHistogram] = {}
+        
+        # Cheie -> (nume, label-uri sortate): exportul nu mai parsează cheile text
+        self.series: Dict[str, Tuple[str, LabelPairs]] = {}
+        self.histogram_buckets: Dict[str, Tuple[float, ...]] = {}
         
         # Metrici agregrate
         self.aggregated_metrics = {}
@@ -116,20 +188,36 @@ class MetricsCollector:
         self.metrics.append(metric)
         
         # Actualizează storage-ul specific tipului
-        metric_key = self._get_metric_key(name, labels)
+        metric_key = self._series_key(name, labels)
         
         if metric_type == MetricType.COUNTER:
             self.counters[metric_key] += value
         elif metric_type == MetricType.GAUGE:
             self.gauges[metric_key] = value
         elif metric_type == MetricType.HISTOGRAM:
-            self.histograms[metric_key].append(value)
-            # Limitează dimensiunea histogramelor
-            if len(self.histograms[metric_key]) > 1000:
-                self.histograms[metric_key] = self.histograms[metric_key][-1000:]
+            self._get_histogram(self.histograms, metric_key, name).record(value)
         elif metric_type == MetricType.TIMER:
-            self.timers[metric_key].append(value)
+            self._get_histogram(self.timers, metric_key, name).record(value)
             
+    def _get_histogram(self, store: Dict[str, StreamingHistogram], key: str, name: str) -> StreamingHistogram:
+        histogram = store.get(key)
+        if histogram is None:
+            histogram = store.setdefault(
+                key, StreamingHistogram(self.histogram_buckets.get(name, DEFAULT_HISTOGRAM_BUCKETS))
+            )
+        return histogram
+        
+    def set_histogram_buckets(self, name: str, bounds: Sequence[float]):
+        """Limite proprii pentru bucket-urile unei histograme (aplicate seriilor noi)"""
+        self.histogram_buckets[name] = tuple(sorted(bounds))
+            
+    def _series_key(self, name: str, labels: Optional[Dict[str, str]]) -> str:
+        """Cheia metricii, înregistrând la prima folosire numele și label-urile ei"""
+        metric_key = self._get_metric_key(name, labels)
+        if metric_key not in self.series:
+            self.series[metric_key] = (name, tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items())))
+        return metric_key
+        
     def _get_metric_key(self, name: str, labels: Optional[Dict[str, str]]) -> str:
         """Generează cheia pentru o metrică"""
         if not labels:
@@ -141,6 +229,11 @@ class MetricsCollector:
         """Incrementează un counter"""
         self.record_metric(name, MetricType.COUNTER, value, labels)
         
+    def set_counter(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """Setează valoarea absolută a unui counter (totaluri ținute în altă componentă)"""
+        metric_key = self._series_key(name, labels)
+        self.counters[metric_key] = value
+        
     def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
         """Setează o valoare gauge"""
         self.record_metric(name, MetricType.GAUGE, value, labels)
@@ -165,42 +258,108 @@ class MetricsCollector:
         
     def get_histogram_stats(self, name: str, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
         """Obține statistici pentru histogram"""
-        key = self._get_metric_key(name, labels)
-        values = self.histograms.get(key, [])
+        return self._histogram_stats(self.histograms.get(self._get_metric_key(name, labels)))
         
-        if not values:
+    @staticmethod
+    def _histogram_stats(histogram: Optional[StreamingHistogram]) -> Dict[str, float]:
+        if histogram is None or not histogram.count:
             return {}
             
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-        
         return {
-            "count": n,
-            "sum": sum(sorted_values),
-            "mean": sum(sorted_values) / n,
-            "min": sorted_values[0],
-            "max": sorted_values[-1],
-            "p50": sorted_values[int(n * 0.5)],
-            "p90": sorted_values[int(n * 0.9)],
-            "p95": sorted_values[int(n * 0.95)],
-            "p99": sorted_values[int(n * 0.99)] if n > 10 else sorted_values[-1]
+            "count": histogram.count,
+            "sum": histogram.sum,
+            "mean": histogram.sum / histogram.count,
+            "min": histogram.min,
+            "max": histogram.max,
+            "p50": histogram.percentile(0.5),
+            "p90": histogram.percentile(0.9),
+            "p95": histogram.percentile(0.95),
+            "p99": histogram.percentile(0.99)
         }
         
     def get_timer_stats(self, name: str, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
         """Obține statistici pentru timer"""
-        key = self._get_metric_key(name, labels)
-        values = list(self.timers.get(key, []))
+        return self._timer_stats(self.timers.get(self._get_metric_key(name, labels)))
         
-        if not values:
+    @staticmethod
+    def _timer_stats(histogram: Optional[StreamingHistogram]) -> Dict[str, float]:
+        if histogram is None or not histogram.count:
             return {}
             
         return {
-            "count": len(values),
-            "total_ms": sum(values),
-            "avg_ms": sum(values) / len(values),
-            "min_ms": min(values),
-            "max_ms": max(values)
+            "count": histogram.count,
+            "total_ms": histogram.sum,
+            "avg_ms": histogram.sum / histogram.count,
+            "min_ms": histogram.min,
+            "max_ms": histogram.max
         }
+        
+    def export_prometheus(self, prefix: str = "") -> str:
+        """Exportă toate seriile în formatul text Prometheus (version 0.0.4)"""
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        
+        def family(name: str, metric_type: str) -> List[str]:
+            metric_name = _prometheus_name(prefix + name)
+            if metric_name not in families:
+                families[metric_name] = (metric_type, [])
+            return families[metric_name][1]
+        
+        for key, value in list(self.counters.items()):
+            name, labels = self.series[key]
+            family(name, "counter").append(_prometheus_sample(_prometheus_name(prefix + name), labels, value))
+            
+        for key, value in list(self.gauges.items()):
+            name, labels = self.series[key]
+            family(name, "gauge").append(_prometheus_sample(_prometheus_name(prefix + name), labels, value))
+            
+        for store, suffix in ((self.histograms, ""), (self.timers, "_ms")):
+            for key, histogram in list(store.items()):
+                name, labels = self.series[key]
+                if not name.endswith(suffix):
+                    name += suffix
+                metric_name = _prometheus_name(prefix + name)
+                lines = family(name, "histogram")
+                for bound, cumulative in histogram.cumulative_buckets():
+                    lines.append(_prometheus_sample(
+                        f"{metric_name}_bucket", labels + (("le", _prometheus_value(bound)),), cumulative
+                    ))
+                lines.append(_prometheus_sample(f"{metric_name}_sum", labels, histogram.sum))
+                lines.append(_prometheus_sample(f"{metric_name}_count", labels, histogram.count))
+                
+        output = []
+        for metric_name in sorted(families):
+            metric_type, lines = families[metric_name]
+            output.append(f"# TYPE {metric_name} {metric_type}")
+            output.extend(lines)
+        return "\n".join(output) + "\n" if output else ""
+
+
+def _prometheus_name(name: str) -> str:
+    """Nume de metrică valid Prometheus ([a-zA-Z_:][a-zA-Z0-9_:]*)"""
+    name = _PROMETHEUS_NAME_RE.sub('_', name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _prometheus_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _prometheus_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _prometheus_sample(name: str, labels: LabelPairs, value: float) -> str:
+    if labels:
+        label_str = ",".join(f'{_prometheus_name(k)}="{_prometheus_label_value(v)}"' for k, v in labels)
+        return f"{name}{{{label_str}}} {_prometheus_value(value)}"
+    return f"{name} {_prometheus_value(value)}"
+
 
 class AlertManager:
     """Manager pentru alerte și notificări"""
@@ -451,15 +610,30 @@ class MonitoringSystem:
         labels = {"platform": platform, "limit_type": limit_type}
         self.metrics.increment_counter("rate_limits_hit", labels=labels)
         
-    def record_cache_event(self, event_type: str, hit: bool = False):
-        """Înregistrează evenimente cache"""
+    def record_cache_event(self, event_type: str, hit: Optional[bool] = False,
+                           tier: Optional[str] = None, duration_ms: Optional[float] = None):
+        """
+        Înregistrează evenimente cache
+        
+        Args:
+            event_type: Tipul evenimentului (ex. 'metadata', 'get', 'put')
+            hit: Hit/miss; None pentru evenimente fără rezultat (ex. scrieri)
+            tier: Nivelul de cache ('memory', 'disk') pentru histograma de latență
+            duration_ms: Latența operației
+        """
         labels = {"event_type": event_type}
         self.metrics.increment_counter("cache_events", labels=labels)
         
-        if hit:
+        if hit is True:
             self.metrics.increment_counter("cache_hits", labels=labels)
-        else:
+        elif hit is False:
             self.metrics.increment_counter("cache_misses", labels=labels)
+        
+        if duration_ms is not None:
+            self.metrics.record_histogram(
+                "cache_latency_ms", duration_ms,
+                labels={"event_type": event_type, "tier": tier or "unknown"}
+            )
             
     def start_operation_trace(self, operation: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Începe urmărirea unei operațiuni"""
@@ -621,18 +795,16 @@ class MonitoringSystem:
             return f"{hours}h {minutes}m"
             
     def export_metrics(self, format_type: str = "json") -> Union[str, Dict[str, Any]]:
-        """Exportă metrici pentru sisteme externe"""
+        """Exportă metrici pentru sisteme externe (json, dict sau prometheus)"""
+        if format_type == "prometheus":
+            return self.export_prometheus()
         
         export_data = {
             "timestamp": time.time(),
             "counters": dict(self.metrics.counters),
             "gauges": dict(self.metrics.gauges),
-            "histograms": {k: self.metrics.get_histogram_stats(k.split('[')[0], 
-                                                              self._parse_labels(k))
-                          for k in self.metrics.histograms.keys()},
-            "timers": {k: self.metrics.get_timer_stats(k.split('[')[0],
-                                                      self._parse_labels(k))
-                      for k in self.metrics.timers.keys()},
+            "histograms": {k: self.metrics._histogram_stats(h) for k, h in list(self.metrics.histograms.items())},
+            "timers": {k: self.metrics._timer_stats(h) for k, h in list(self.metrics.timers.items())},
             "active_alerts": [asdict(alert) for alert in self.alerts.active_alerts.values()],
             "recent_alerts": [asdict(alert) for alert in list(self.alerts.alerts)[-10:]],  # Last 10
             "traces": {
@@ -646,22 +818,10 @@ class MonitoringSystem:
         else:
             return export_data
             
-    def _parse_labels(self, metric_key: str) -> Optional[Dict[str, str]]:
-        """Parse labels din cheia metricii"""
-        if '[' not in metric_key:
-            return None
-            
-        label_part = metric_key.split('[')[1].rstrip(']')
-        if not label_part:
-            return None
-            
-        labels = {}
-        for pair in label_part.split(','):
-            if '=' in pair:
-                key, value = pair.split('=', 1)
-                labels[key.strip()] = value.strip()
-                
-        return labels if labels else None
+    def export_prometheus(self) -> str:
+        """Exportă metricile în formatul text Prometheus, plus alertele active ca gauge"""
+        self.metrics.set_gauge("active_alerts", len(self.alerts.active_alerts))
+        return self.metrics.export_prometheus()
         
     def stop(self):
         """Oprește sistemul de monitoring"""
@@ -467,8 +467,9 @@ class NetworkManager:
     async def get_session(self, session_name: str = 'default', 
                          custom_config: Optional[Dict[str, Any]] = None) -> aiohttp.ClientSession:
         """Obține sau creează o sesiune HTTP"""
-        if session_name not in self.sessions:
-            await self._create_custom_session(session_name, custom_config or {})
+        session = self.sessions.get(session_name)
+        if session is None or session.closed:
+            await self._create_custom_session(session_name, custom_config or self.session_configs.get(session_name, {}))
         
         return self.sessions[session_name]
     
@@ -483,6 +484,7 @@ class NetworkManager:
             limit_per_host=connector_config.get('limit_per_host', 30),
             ttl_dns_cache=connector_config.get('ttl_dns_cache', 300),
             use_dns_cache=connector_config.get('use_dns_cache', True),
+            keepalive_timeout=connector_config.get('keepalive_timeout', 15),
             ssl=self.ssl_context if connector_config.get('verify_ssl', True) else False,
             enable_cleanup_closed=True
         )
@@ -495,10 +497,18 @@ class NetworkManager:
         default_headers = {'User-Agent': self.user_agent_rotator.get_random_user_agent()}
         default_headers.update(headers_config)
         
+        session_kwargs = {}
+        if config.get('trace_configs'):
+            session_kwargs['trace_configs'] = list(config['trace_configs'])
+        if config.get('cookie_jar') is not None:
+            session_kwargs['cookie_jar'] = config['cookie_jar']
+        
         session = aiohttp.ClientSession(
             connector=connector,
             timeout=timeout,
-            headers=default_headers
+            headers=default_headers,
+            cookies=config.get('cookies') or None,
+            **session_kwargs
         )
         
         self.sessions[name] = session
@@ -814,7 +824,8 @@ class NetworkManager:
         
         # Închide toate sesiunile
         for session_name, session in self.sessions.items():
-            await session.close()
+            if not session.closed:
+                await session.close()
             logger.debug(f"🔌 Closed session: {session_name}")
         
         self.sessions.clear()
@@ -0,0 +1,275 @@
+# utils/network/session_pool.py - Registry de sesiuni aiohttp partajate în proces
+# Versiunea: 1.0.0
+
+"""
+Sesiuni aiohttp partajate între ContentExtractor, DownloadManager și
+platforme, construite peste NetworkManager.get_session.
+
+O sesiune este cheiată după profilul de rețea (proxy + cookie-uri) și după
+event loop (sesiunile aiohttp nu pot fi folosite din alt loop). Conexiunile
+TLS rămân deschise (keep-alive) și DNS-ul este păstrat în cache, așa că
+cererile repetate către același host nu mai plătesc DNS + TCP + TLS.
+
+Cererile care urmăresc redirect-uri folosesc `redirect_session`: aceleași
+conexiuni, dar cu un cookie jar propriu cererii, ca un lanț de redirect-uri
+care setează cookie-uri să funcționeze ca în vechile sesiuni per apel.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+
+from utils.network.network_manager import NetworkManager, network_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SessionProfile:
+    """Profilul de rețea al unei sesiuni: proxy și cookie-uri inițiale"""
+    proxy: Optional[str] = None
+    cookies: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def create(cls, proxy: Optional[str] = None, cookies: Optional[Dict[str, str]] = None) -> 'SessionProfile':
+        return cls(proxy=proxy or None, cookies=tuple(sorted((cookies or {}).items())))
+
+    @property
+    def key(self) -> str:
+        """Cheie scurtă, fără să expună proxy-ul sau cookie-urile în nume/loguri"""
+        if not self.proxy and not self.cookies:
+            return 'anonymous'
+        digest = hashlib.sha1(repr((self.proxy, self.cookies)).encode('utf-8')).hexdigest()
+        return digest[:12]
+
+
+@dataclass
+class ConnectionStats:
+    """Contoare alimentate de TraceConfig-ul aiohttp"""
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+    per_host: Dict[str, int] = field(default_factory=dict)
+    max_hosts: int = 256
+
+    OTHER_HOSTS = 'other'
+
+    def count_host(self, host: str):
+        """Numără cererea pentru host; peste `max_hosts` host-uri distincte restul intră în 'other'"""
+        if host not in self.per_host and len(self.per_host) >= self.max_hosts:
+            host = self.OTHER_HOSTS
+        self.per_host[host] = self.per_host.get(host, 0) + 1
+
+
+class SessionRegistry:
+    """
+    Sesiuni aiohttp comune procesului, una per (profil, event loop).
+
+    Profilul anonim folosește un DummyCookieJar: cookie-urile primite de la
+    un site nu ajung în cererile altor utilizatori. Profilurile cu cookie-uri
+    își păstrează propriul jar, ca o sesiune de browser. Pentru redirect-uri,
+    `redirect_session` dă fiecărei cereri anonime un jar temporar.
+    """
+
+    def __init__(self, manager: Optional[NetworkManager] = None,
+                 limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 keepalive_timeout: Optional[float] = None, ttl_dns_cache: int = 300,
+                 max_hosts: Optional[int] = None):
+        self.manager = manager or network_manager
+        self.limit = limit or int(os.getenv('HTTP_POOL_LIMIT', '100'))
+        self.limit_per_host = limit_per_host or int(os.getenv('HTTP_POOL_PER_HOST', '8'))
+        self.keepalive_timeout = keepalive_timeout or float(os.getenv('HTTP_KEEPALIVE_SECONDS', '30'))
+        self.ttl_dns_cache = ttl_dns_cache
+        self.stats = ConnectionStats(max_hosts=max_hosts or int(os.getenv('HTTP_STATS_MAX_HOSTS', '256')))
+        self.sessions_created = 0
+        self.redirect_sessions = 0
+        self._names: Dict[Tuple[str, int], str] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._trace_config = self._build_trace_config()
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        stats = self.stats
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+            stats.count_host(params.url.host or '')
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            stats.dns_cache_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def _session_config(self, profile: SessionProfile) -> Dict[str, Any]:
+        if profile.cookies:
+            cookie_jar = aiohttp.CookieJar()
+            cookie_jar.update_cookies(dict(profile.cookies))
+        else:
+            cookie_jar = aiohttp.DummyCookieJar()
+        return {
+            'connector': {
+                'limit': self.limit,
+                'limit_per_host': self.limit_per_host,
+                'ttl_dns_cache': self.ttl_dns_cache,
+                'use_dns_cache': True,
+                'keepalive_timeout': self.keepalive_timeout,
+            },
+            # Fără timeout total la nivel de sesiune: descărcările lungi își dau propriul timeout
+            'timeout': {'total': None, 'connect': 15},
+            'trace_configs': [self._trace_config],
+            'cookie_jar': cookie_jar,
+        }
+
+    async def get_session(self, proxy: Optional[str] = None,
+                          cookies: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+        """
+        Sesiunea partajată pentru profilul dat, în event loop-ul curent.
+
+        Proxy-ul se transmite în continuare per cerere (`proxy=`); profilul
+        doar separă pool-urile de conexiuni. Sesiunea nu trebuie închisă de
+        apelant.
+        """
+        loop = asyncio.get_running_loop()
+        profile = SessionProfile.create(proxy, cookies)
+        key = (profile.key, id(loop))
+
+        with self._lock:
+            name = self._names.get(key)
+            if name is not None and self._loops.get(name) is not loop:
+                # id() refolosit de un loop nou după închiderea celui vechi
+                name = None
+            if name is None:
+                self._prune_closed_loops()
+                self._generation += 1
+                name = f"shared:{profile.key}:{self._generation}:{os.getpid()}"
+                self._names[key] = name
+                self._loops[name] = loop
+
+        existing = self.manager.sessions.get(name)
+        if existing is not None and not existing.closed:
+            return existing
+
+        self.sessions_created += 1
+        logger.info(f"🔗 Shared HTTP session for profile {profile.key} "
+                    f"(limit {self.limit}, {self.limit_per_host}/host, keep-alive {self.keepalive_timeout:.0f}s)")
+        return await self.manager.get_session(name, self._session_config(profile))
+
+    @asynccontextmanager
+    async def redirect_session(self, proxy: Optional[str] = None,
+                               cookies: Optional[Dict[str, str]] = None) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Sesiune pentru cereri care urmăresc redirect-uri.
+
+        DummyCookieJar-ul profilului anonim ar pierde cookie-urile setate pe
+        parcursul lanțului de redirect-uri, așa că cererea primește o sesiune
+        de scurtă durată cu propriul CookieJar, peste connector-ul partajat
+        (fără conexiuni sau DNS noi). Profilurile cu cookie-uri au deja un
+        jar real și primesc direct sesiunea partajată.
+        """
+        shared = await self.get_session(proxy, cookies)
+        if not isinstance(shared.cookie_jar, aiohttp.DummyCookieJar):
+            yield shared
+            return
+
+        session = aiohttp.ClientSession(
+            connector=shared.connector,
+            connector_owner=False,
+            # unsafe=True: păstrează și cookie-urile host-urilor IP; jar-ul e aruncat după cerere
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=shared.timeout,
+            trace_configs=[self._trace_config],
+        )
+        self.redirect_sessions += 1
+        try:
+            yield session
+        finally:
+            # Închide doar sesiunea; connector-ul rămâne al sesiunii partajate
+            await session.close()
+
+    def _prune_closed_loops(self):
+        """Uită sesiunile ale căror event loop-uri s-au închis (apelat sub lock)"""
+        for key, name in list(self._names.items()):
+            loop = self._loops.get(name)
+            if loop is None or loop.is_closed():
+                self._names.pop(key, None)
+                self._loops.pop(name, None)
+                self.manager.sessions.pop(name, None)
+                self.manager.session_configs.pop(name, None)
+
+    async def close(self):
+        """Închide sesiunile create în event loop-ul curent"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            names = [name for name, owner in self._loops.items() if owner is loop]
+            for key, name in list(self._names.items()):
+                if name in names:
+                    self._names.pop(key, None)
+                    self._loops.pop(name, None)
+        for name in names:
+            session = self.manager.sessions.pop(name, None)
+            self.manager.session_configs.pop(name, None)
+            if session is not None and not session.closed:
+                await session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistici de refolosire a conexiunilor"""
+        stats = self.stats
+        opened = stats.connections_created + stats.connections_reused
+        dns_lookups = stats.dns_cache_hits + stats.dns_cache_misses
+        top_hosts = sorted(stats.per_host.items(), key=lambda item: item[1], reverse=True)[:10]
+        return {
+            'sessions': len(self._names),
+            'sessions_created': self.sessions_created,
+            'redirect_sessions': self.redirect_sessions,
+            'requests': stats.requests,
+            'connections_created': stats.connections_created,
+            'connections_reused': stats.connections_reused,
+            'connection_reuse_rate': round(stats.connections_reused / opened * 100, 1) if opened else 0.0,
+            'dns_cache_hits': stats.dns_cache_hits,
+            'dns_cache_misses': stats.dns_cache_misses,
+            'dns_cache_hit_rate': round(stats.dns_cache_hits / dns_lookups * 100, 1) if dns_lookups else 0.0,
+            'top_hosts': dict(top_hosts),
+            'tracked_hosts': len(stats.per_host),
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+        }
+
+
+# Instanță globală folosită de extractor, download manager și platforme
+session_registry = SessionRegistry()
+
+
+async def get_shared_session(proxy: Optional[str] = None,
+                             cookies: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+    """Scurtătură pentru session_registry.get_session"""
+    return await session_registry.get_session(proxy, cookies)
+
+
+def redirect_session(proxy: Optional[str] = None, cookies: Optional[Dict[str, str]] = None):
+    """Scurtătură pentru session_registry.redirect_session (`async with`)"""
+    return session_registry.redirect_session(proxy, cookies)
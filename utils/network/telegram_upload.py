@@ -0,0 +1,277 @@
+# utils/network/telegram_upload.py - Sesiune HTTP partajată și upload multipart în streaming pentru Bot API
+# Versiunea: 1.0.0
+
+import os
+import re
+import html
+import uuid
+import logging
+import threading
+from typing import Any, Dict, IO, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Limita Telegram pentru caption (în unități UTF-16, după parsarea entităților)
+CAPTION_MAX_LENGTH = 1024
+
+# Tag-urile acceptate de Telegram în parse_mode HTML
+ALLOWED_HTML_TAGS = {
+    'b', 'strong', 'i', 'em', 'u', 'ins', 's', 'strike', 'del',
+    'a', 'code', 'pre', 'span', 'tg-spoiler', 'tg-emoji', 'blockquote'
+}
+
+_HTML_TOKEN_RE = re.compile(
+    r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)((?:\s+[^<>]*)?)>'   # tag de deschidere/închidere
+    r'|&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z]+);'            # entitate HTML
+    r'|[<>&]'                                           # caracter neescapat
+)
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+upload_stats = {
+    'uploads': 0,
+    'bytes_streamed': 0,
+    'caption_plain_fallbacks': 0,
+    'caption_reuploads': 0
+}
+_stats_lock = threading.Lock()
+
+
+def get_telegram_session() -> requests.Session:
+    """
+    Sesiunea HTTP partajată pentru api.telegram.org (conexiuni TLS refolosite).
+
+    Creată leneș și recreată după fork (gunicorn --preload), deoarece
+    conexiunile din pool nu pot fi partajate între procese.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            pool_size = int(os.getenv('TELEGRAM_HTTP_POOL_SIZE', '10'))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+            _session_pid = pid
+            logger.info(f"🔌 Sesiune HTTP Telegram creată (pool {pool_size} conexiuni)")
+    return _session
+
+
+def record_upload_stat(name: str, value: int = 1):
+    """Incrementează o statistică de upload"""
+    with _stats_lock:
+        upload_stats[name] += value
+
+
+def get_upload_stats() -> Dict[str, int]:
+    """Returnează statisticile de upload"""
+    with _stats_lock:
+        return dict(upload_stats)
+
+
+class MultipartStream:
+    """
+    Corp multipart/form-data citit în bucăți: câmpurile text sunt serializate
+    în memorie, fișierele sunt citite de pe disc doar pe măsură ce sunt trimise.
+    Obiectul expune `len` pentru Content-Length, așa că requests îl trimite în
+    streaming fără chunked encoding.
+    """
+
+    def __init__(self, fields: Dict[str, Any], files: Dict[str, Tuple[str, IO[bytes], str]],
+                 chunk_size: int = 64 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.chunk_size = chunk_size
+        self._parts: List[Any] = []
+        self.len = 0
+        self.bytes_read = 0
+
+        for name, value in fields.items():
+            if value is None:
+                continue
+            self._add_bytes(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode('utf-8')
+            )
+
+        for name, (filename, fileobj, mime_type) in files.items():
+            safe_filename = filename.replace('"', '').replace('\r', '').replace('\n', '')
+            self._add_bytes(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; filename="{safe_filename}"\r\n'
+                f'Content-Type: {mime_type}\r\n\r\n'.encode('utf-8')
+            )
+            start = fileobj.tell()
+            size = os.fstat(fileobj.fileno()).st_size - start
+            self._parts.append((fileobj, size))
+            self.len += size
+            self._add_bytes(b'\r\n')
+
+        self._add_bytes(f'--{self.boundary}--\r\n'.encode('utf-8'))
+        self._index = 0
+        self._offset = 0
+
+    def _add_bytes(self, data: bytes):
+        self._parts.append(data)
+        self.len += len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        """Citește cel mult size bytes din corpul multipart"""
+        if size is None or size < 0:
+            size = self.chunk_size
+        chunks = []
+        remaining = size
+        while remaining > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            if isinstance(part, bytes):
+                chunk = part[self._offset:self._offset + remaining]
+                self._offset += len(chunk)
+                done = self._offset >= len(part)
+            else:
+                fileobj, part_size = part
+                chunk = fileobj.read(min(remaining, part_size - self._offset))
+                self._offset += len(chunk)
+                done = not chunk or self._offset >= part_size
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            if done:
+                self._index += 1
+                self._offset = 0
+        data = b''.join(chunks)
+        self.bytes_read += len(data)
+        return data
+
+
+def _utf16_length(text: str) -> int:
+    """Lungimea în unități UTF-16, cum o numără Telegram"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def caption_to_plain_text(caption: str, max_length: int = CAPTION_MAX_LENGTH) -> str:
+    """Elimină tag-urile HTML, decodează entitățile și trunchiază la limita Telegram"""
+    text = html.unescape(re.sub(r'<[^<>]+>', '', caption or ''))
+    if _utf16_length(text) <= max_length:
+        return text
+    while _utf16_length(text) > max_length - 3:
+        text = text[:-1]
+    return text + '...'
+
+
+def validate_html_caption(caption: str, max_length: int = CAPTION_MAX_LENGTH) -> Tuple[bool, Optional[str]]:
+    """
+    Verifică local un caption HTML înainte de upload, cu regulile parser-ului
+    Telegram: doar tag-uri suportate, închise corect, fără '<', '>' sau '&'
+    neescapate, și textul vizibil sub limita de lungime.
+
+    Returns:
+        (valid, motiv)
+    """
+    if not caption:
+        return True, None
+
+    stack: List[str] = []
+    visible = []
+    position = 0
+    for match in _HTML_TOKEN_RE.finditer(caption):
+        visible.append(caption[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+
+        if match.group(2):
+            closing, tag = match.group(1), match.group(2).lower()
+            if tag not in ALLOWED_HTML_TAGS:
+                return False, f"tag nesuportat <{tag}>"
+            if closing:
+                if not stack or stack[-1] != tag:
+                    return False, f"tag închis greșit </{tag}>"
+                stack.pop()
+            else:
+                stack.append(tag)
+        elif token.startswith('&') and len(token) > 1:
+            visible.append(html.unescape(token))
+        else:
+            return False, f"caracter neescapat '{token}'"
+    visible.append(caption[position:])
+
+    if stack:
+        return False, f"tag neînchis <{stack[-1]}>"
+    if _utf16_length(''.join(visible)) > max_length:
+        return False, "caption prea lung"
+    return True, None
+
+
+def prepare_caption(caption: str) -> Tuple[str, Optional[str]]:
+    """
+    Pregătește caption-ul pentru upload astfel încât Telegram să nu-l respingă:
+    HTML-ul valid este păstrat, altfel se trimite text simplu.
+
+    Returns:
+        (caption de trimis, parse_mode)
+    """
+    valid, reason = validate_html_caption(caption)
+    if valid:
+        return caption, 'HTML'
+
+    logger.warning(f"Caption HTML invalid ({reason}), upload cu text simplu")
+    record_upload_stat('caption_plain_fallbacks')
+    return caption_to_plain_text(caption), None
+
+
+def is_caption_error(response: requests.Response) -> bool:
+    """Eroarea Telegram se referă la caption/entități (nu la fișier)"""
+    if response.status_code != 400:
+        return False
+    try:
+        description = (response.json().get('description') or '').lower()
+    except Exception:
+        description = response.text.lower()
+    return 'entit' in description or 'caption' in description
+
+
+def upload_media(token: str, method: str, chat_id: Any, field: str, file_path: str,
+                 caption: Optional[str] = None, extra_fields: Optional[Dict[str, Any]] = None,
+                 mime_type: str = 'video/mp4', timeout: Tuple[int, int] = (30, 600)) -> requests.Response:
+    """
+    Trimite un fișier prin Bot API (ex. sendVideo) în streaming, pe sesiunea partajată.
+
+    Caption-ul este validat înainte de upload: Telegram respinge întreaga cerere
+    (inclusiv fișierul) la o eroare de parsare, deci nu există mesaj pe care să
+    se aplice editMessageCaption. Dacă Telegram respinge totuși un caption
+    validat, fișierul este retrimis o singură dată cu text simplu (contorizat
+    în 'caption_reuploads', ar trebui să rămână 0).
+    """
+    send_caption, parse_mode = prepare_caption(caption) if caption else (None, None)
+    url = f"https://api.telegram.org/bot{token}/{method}"
+
+    def post(caption_text, caption_parse_mode):
+        fields = {'chat_id': chat_id, 'caption': caption_text, 'parse_mode': caption_parse_mode}
+        fields.update(extra_fields or {})
+        with open(file_path, 'rb') as media_file:
+            body = MultipartStream(fields, {field: (os.path.basename(file_path), media_file, mime_type)})
+            response = get_telegram_session().post(
+                url,
+                data=body,
+                headers={'Content-Type': body.content_type, 'Content-Length': str(body.len)},
+                timeout=timeout
+            )
+        record_upload_stat('uploads')
+        record_upload_stat('bytes_streamed', body.bytes_read)
+        return response
+
+    response = post(send_caption, parse_mode)
+    if parse_mode and is_caption_error(response):
+        logger.warning(f"Caption respins de Telegram după validare: {response.text[:200]}")
+        record_upload_stat('caption_reuploads')
+        response = post(caption_to_plain_text(send_caption), None)
+    return response
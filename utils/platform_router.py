@@ -0,0 +1,138 @@
+# utils/platform_router.py - Rutare URL -> platformă printr-un index de sufixe de domeniu
+# Versiunea: 1.0.0
+
+import re
+import logging
+import threading
+from typing import Container, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Domeniile cunoscute înainte ca platformele să fie încărcate (downloader, webhook).
+# Subdomeniile (www., m., vm., player. etc.) sunt acoperite de căutarea pe sufix.
+DEFAULT_PLATFORM_DOMAINS = {
+    'tiktok': ['tiktok.com'],
+    'instagram': ['instagram.com', 'instagr.am', 'ig.me'],
+    'facebook': ['facebook.com', 'fb.watch', 'fb.me'],
+    'twitter': ['twitter.com', 'x.com', 't.co'],
+    'threads': ['threads.net', 'threads.com'],
+    'pinterest': ['pinterest.com', 'pinterest.co.uk', 'pinterest.fr', 'pinterest.de', 'pinterest.ca', 'pin.it'],
+    'reddit': ['reddit.com', 'redd.it'],
+    'vimeo': ['vimeo.com'],
+    'dailymotion': ['dailymotion.com', 'dai.ly'],
+    'soundcloud': ['soundcloud.com', 'snd.sc'],
+    'youtube': ['youtube.com', 'youtu.be'],
+}
+
+# Schemă opțională, credențiale opționale, apoi host-ul (fără port, cale sau IPv6 literal)
+_HOST_RE = re.compile(r'\s*(?:[A-Za-z][A-Za-z0-9+.-]*://|//)?+(?:[^@/?#\s]*@)?+([^\[\]:/?#@\s]+)')
+
+# Caractere care încadrează adesea un link într-un mesaj
+_TOKEN_STRIP = '<>()[]{}"\'.,;!?'
+
+
+def extract_host(url: str) -> Optional[str]:
+    """Host-ul unui URL (lowercase, fără port/credențiale); acceptă și URL-uri fără schemă"""
+    if not url:
+        return None
+    match = _HOST_RE.match(url)
+    host = match.group(1).rstrip('.').lower() if match else None
+    return host or None
+
+
+class DomainRouter:
+    """
+    Index de sufixe de domeniu -> platforme, construit o singură dată din
+    `supported_domains` ale platformelor.
+
+    Rutarea parsează URL-ul o dată și caută host-ul și sufixele lui într-un
+    dict (vm.tiktok.com -> tiktok.com -> com): cost proporțional cu numărul
+    de etichete din host, independent de numărul de platforme.
+    """
+
+    def __init__(self, domains: Optional[Dict[str, Iterable[str]]] = None):
+        self._domains: Dict[str, Tuple[str, ...]] = {}
+        self._priorities: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'routed': 0, 'unrouted': 0}
+        for platform, platform_domains in (domains or {}).items():
+            self.register(platform, platform_domains)
+
+    @staticmethod
+    def _normalize_domain(domain: str) -> str:
+        domain = domain.strip().lower().rstrip('.')
+        for prefix in ('*.', '.', 'www.'):
+            if domain.startswith(prefix):
+                domain = domain[len(prefix):]
+        return domain
+
+    def register(self, platform: str, domains: Iterable[str], priority: int = 999):
+        """
+        Adaugă domeniile unei platforme în index. Dacă mai multe platforme
+        revendică același domeniu, candidații sunt ordonați după prioritate.
+        """
+        with self._lock:
+            self._priorities[platform] = priority
+            # Dict nou publicat atomic: citirile rămân fără lock
+            updated = dict(self._domains)
+            for domain in domains or ():
+                domain = self._normalize_domain(domain)
+                if not domain or '.' not in domain:
+                    continue
+                candidates = [name for name in updated.get(domain, ()) if name != platform]
+                candidates.append(platform)
+                candidates.sort(key=lambda name: self._priorities.get(name, 999))
+                updated[domain] = tuple(candidates)
+            self._domains = updated
+
+    def has_platform(self, platform: str) -> bool:
+        """Platforma are domenii înregistrate în index"""
+        return platform in self._priorities
+
+    def candidates(self, url: str) -> Tuple[str, ...]:
+        """Platformele care revendică domeniul URL-ului, în ordinea priorității"""
+        self.stats['lookups'] += 1
+        host = extract_host(url)
+        domains = self._domains
+        while host and '.' in host:
+            found = domains.get(host)
+            if found:
+                self.stats['routed'] += 1
+                return found
+            host = host[host.index('.') + 1:]
+        self.stats['unrouted'] += 1
+        return ()
+
+    def route(self, url: str, platforms: Optional[Container[str]] = None) -> Optional[str]:
+        """Platforma pentru URL (prima după prioritate, opțional restrânsă la `platforms`)"""
+        for name in self.candidates(url):
+            if platforms is None or name in platforms:
+                return name
+        return None
+
+    def find_in_text(self, text: str, platforms: Optional[Container[str]] = None) -> Optional[Tuple[str, str]]:
+        """
+        Primul link dintr-un mesaj care aparține unei platforme cunoscute.
+
+        Returns:
+            (platformă, link) sau None
+        """
+        for token in (text or '').split():
+            token = token.strip(_TOKEN_STRIP)
+            if '.' not in token:
+                continue
+            platform = self.route(token, platforms)
+            if platform:
+                return platform, token
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Statistici de rutare"""
+        stats = dict(self.stats)
+        stats['domains'] = len(self._domains)
+        stats['platforms'] = len(self._priorities)
+        return stats
+
+
+# Instanță globală, completată de PlatformManager/PlatformRegistry la încărcarea platformelor
+platform_router = DomainRouter(DEFAULT_PLATFORM_DOMAINS)
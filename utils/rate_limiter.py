@@ -2,29 +2,156 @@
 # utils/rate_limiter.py - Rate Limiting pentru protecție anti-spam
 # Versiunea: 1.0.0
 
+import math
 import time
 import threading
-from collections import defaultdict
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+class RateWindow:
+    """
+    Limitare de rată per cheie cu GCRA (Generic Cell Rate Algorithm).
+    
+    Pentru fiecare cheie se păstrează un singur timestamp (TAT - momentul teoretic
+    în care „găleata” se golește): fiecare cerere îl avansează cu window / limit.
+    Actualizările sunt O(1), iar cheile a căror stare a expirat (TAT în trecut,
+    echivalent cu o cheie nouă) sunt eliminate amortizat, deci memoria este
+    proporțională cu numărul de chei active, nu cu numărul de cereri.
+    
+    - allow(): permite cel mult `burst` cereri într-o rafală și `limit` cereri
+      pe fereastră în regim susținut; cererile respinse nu consumă din limită;
+    - reserve(): înregistrează cererea și întoarce cât trebuie așteptat (pacing);
+    - hit(): înregistrează cererea și întoarce numărul estimat de cereri din
+      ultima fereastră (pentru reguli de tip „cereri pe minut”).
+    """
+    
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None,
+                 max_keys: Optional[int] = None):
+        self.limit = max(1, int(limit))
+        self.window = float(window)
+        self.burst = max(1, int(burst if burst is not None else self.limit))
+        self.max_keys = max_keys
+        
+        self.interval = self.window / self.limit
+        self._tolerance = self.burst * self.interval
+        
+        # cheie -> TAT, în ordinea ultimei actualizări (cele mai vechi la început)
+        self._tat: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.stats = {'allowed': 0, 'rejected': 0, 'expired': 0, 'evicted': 0}
+    
+    def _expire(self, now: float, force: bool = False):
+        """Elimină cheile expirate de la începutul ordinii (amortizat O(1)); cu lock-ul deținut"""
+        if now < self._next_sweep and not force:
+            return
+        self._next_sweep = now + self.interval
+        tat = self._tat
+        while tat:
+            key, key_tat = next(iter(tat.items()))
+            if key_tat > now:
+                break
+            del tat[key]
+            self.stats['expired'] += 1
+    
+    def _advance(self, key: Hashable, now: float, tolerance: Optional[float] = None) -> Optional[float]:
+        """
+        Înregistrează o cerere și întoarce noul backlog (TAT - now); cu lock-ul deținut.
+        Cu `tolerance`, cererea care ar depăși-o nu este înregistrată și se întoarce None.
+        """
+        previous = self._tat.get(key, now)
+        new_tat = (previous if previous > now else now) + self.interval
+        if tolerance is not None and new_tat - now > tolerance:
+            return None
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        
+        # Peste max_keys se renunță la cheile actualizate cel mai demult
+        if self.max_keys is not None:
+            while len(self._tat) > self.max_keys:
+                self._tat.popitem(last=False)
+                self.stats['evicted'] += 1
+        return new_tat - now
+    
+    def allow(self, key: Hashable = 'default', now: Optional[float] = None) -> bool:
+        """Consumă o cerere dacă limita o permite"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            if self._advance(key, now, self._tolerance + 1e-9) is None:
+                self.stats['rejected'] += 1
+                return False
+            self.stats['allowed'] += 1
+            return True
+    
+    def reserve(self, key: Hashable = 'default', now: Optional[float] = None) -> float:
+        """Înregistrează cererea; întoarce secundele de așteptat până devine conformă"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            delay = max(0.0, self._advance(key, now) - self._tolerance)
+            self.stats['allowed' if delay == 0 else 'rejected'] += 1
+            return delay
+    
+    def hit(self, key: Hashable = 'default', now: Optional[float] = None) -> float:
+        """Înregistrează cererea; întoarce numărul estimat de cereri din ultima fereastră"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return round(self._advance(key, now) / self.interval, 3)
+    
+    def remaining(self, key: Hashable = 'default', now: Optional[float] = None) -> int:
+        """Câte cereri mai pot fi făcute acum fără respingere"""
+        now = time.time() if now is None else now
+        with self._lock:
+            backlog = max(self._tat.get(key, now) - now, 0.0)
+        return max(0, min(self.burst, int(math.floor((self._tolerance - backlog) / self.interval + 1e-9))))
+    
+    def reset_after(self, key: Hashable = 'default', now: Optional[float] = None) -> float:
+        """Secunde până când cheia revine la starea inițială (limită completă)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return max(0.0, self._tat.get(key, now) - now)
+    
+    def forget(self, key: Hashable) -> bool:
+        """Șterge starea unei chei"""
+        with self._lock:
+            return self._tat.pop(key, None) is not None
+    
+    def active_keys(self, now: Optional[float] = None) -> int:
+        """Numărul de chei cu stare încă relevantă"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now, force=True)
+            return len(self._tat)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistici ale ferestrei"""
+        stats = dict(self.stats)
+        stats['keys'] = self.active_keys()
+        stats['limit'] = self.limit
+        stats['window_seconds'] = self.window
+        stats['burst'] = self.burst
+        return stats
+
 class SimpleRateLimiter:
     """Rate limiter simplu pentru protecție anti-spam"""
     
-    def __init__(self, max_requests: int = 5, time_window: int = 60):
+    def __init__(self, max_requests: int = 5, time_window: int = 60, burst_allowance: int = 0):
         """
         Inițializează rate limiter-ul
         
         Args:
             max_requests: Numărul maxim de cereri permise
             time_window: Fereastra de timp în secunde
+            burst_allowance: Cereri suplimentare tolerate într-o rafală
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: Dict[str, List[float]] = defaultdict(list)
-        self.lock = threading.Lock()
+        self.window = RateWindow(max_requests, time_window, burst=max_requests + max(0, burst_allowance))
         
         logger.info(f"🛡️ Rate limiter initialized: {max_requests} requests per {time_window}s")
     
@@ -38,23 +165,16 @@ class SimpleRateLimiter:
         Returns:
             True dacă cererea este permisă, False altfel
         """
-        with self.lock:
-            now = time.time()
-            user_requests = self.requests[user_id]
-            
-            # Curăță cererile vechi
-            user_requests[:] = [req_time for req_time in user_requests 
-                              if now - req_time < self.time_window]
-            
-            # Verifică limita
-            if len(user_requests) >= self.max_requests:
-                logger.warning(f"🚫 Rate limit exceeded for user {user_id}: {len(user_requests)}/{self.max_requests}")
-                return False
-            
-            # Adaugă cererea curentă
-            user_requests.append(now)
-            logger.debug(f"✅ Request allowed for user {user_id}: {len(user_requests)}/{self.max_requests}")
-            return True
+        if not self.window.allow(user_id):
+            logger.warning(f"🚫 Rate limit exceeded for user {user_id}: {self.max_requests}/{self.time_window}s")
+            return False
+        
+        logger.debug(f"✅ Request allowed for user {user_id}: {self.window.remaining(user_id)} remaining")
+        return True
+    
+    async def acquire(self, key: str = 'default') -> bool:
+        """Variantă async a is_allowed (folosită de PlatformManager per platformă)"""
+        return self.is_allowed(key)
     
     def get_remaining_requests(self, user_id: str) -> int:
         """
@@ -66,15 +186,7 @@ class SimpleRateLimiter:
         Returns:
             Numărul de cereri rămase
         """
-        with self.lock:
-            now = time.time()
-            user_requests = self.requests[user_id]
-            
-            # Curăță cererile vechi
-            user_requests[:] = [req_time for req_time in user_requests 
-                              if now - req_time < self.time_window]
-            
-            return max(0, self.max_requests - len(user_requests))
+        return self.window.remaining(user_id)
     
     def get_reset_time(self, user_id: str) -> float:
         """
@@ -86,16 +198,7 @@ class SimpleRateLimiter:
         Returns:
             Timpul în secunde până la resetare
         """
-        with self.lock:
-            user_requests = self.requests[user_id]
-            
-            if not user_requests:
-                return 0.0
-            
-            oldest_request = min(user_requests)
-            reset_time = oldest_request + self.time_window - time.time()
-            
-            return max(0.0, reset_time)
+        return self.window.reset_after(user_id)
     
     def clear_user(self, user_id: str):
         """
@@ -104,10 +207,8 @@ class SimpleRateLimiter:
         Args:
             user_id: ID-ul utilizatorului
         """
-        with self.lock:
-            if user_id in self.requests:
-                del self.requests[user_id]
-                logger.info(f"🗑️ Cleared rate limit history for user {user_id}")
+        if self.window.forget(user_id):
+            logger.info(f"🗑️ Cleared rate limit history for user {user_id}")
     
     def get_stats(self) -> Dict[str, int]:
         """
@@ -116,26 +217,14 @@ class SimpleRateLimiter:
         Returns:
             Dicționar cu statistici
         """
-        with self.lock:
-            now = time.time()
-            active_users = 0
-            total_requests = 0
-            
-            for user_id, user_requests in self.requests.items():
-                # Curăță cererile vechi
-                user_requests[:] = [req_time for req_time in user_requests 
-                                  if now - req_time < self.time_window]
-                
-                if user_requests:
-                    active_users += 1
-                    total_requests += len(user_requests)
-            
-            return {
-                'active_users': active_users,
-                'total_requests': total_requests,
-                'max_requests_per_window': self.max_requests,
-                'time_window_seconds': self.time_window
-            }
+        window_stats = self.window.get_stats()
+        return {
+            'active_users': window_stats['keys'],
+            'allowed_requests': window_stats['allowed'],
+            'rejected_requests': window_stats['rejected'],
+            'max_requests_per_window': self.max_requests,
+            'time_window_seconds': self.time_window
+        }
 
 # Alias pentru compatibilitate
 RateLimiter = SimpleRateLimiter
@@ -13,6 +13,8 @@ from enum import Enum
 import hashlib
 import secrets
 
+from utils.security.threat_scanner import ThreatScanner
+
 logger = logging.getLogger(__name__)
 
 class ValidationLevel(Enum):
@@ -44,6 +46,17 @@ class ValidationResult:
     risk_score: int  # 0-100
     recommendations: List[str]
 
+# Categoriile scanate la fiecare validare: (mesaj amenințare, risc per pattern)
+THREAT_CATEGORIES = {
+    'sql_injection': ("SQL injection pattern detected", 40),
+    'xss': ("XSS pattern detected", 50),
+    'path_traversal': ("Path traversal pattern detected", 60),
+    'command_injection': ("Command injection pattern detected", 70),
+}
+
+# Caractere de control eliminate din mesaje (păstrează \t, \n, \r)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
 class InputSanitizer:
     """Sistem avansat de sanitizare și validare input"""
     
@@ -113,6 +126,15 @@ class InputSanitizer:
             '[', ']', ';', '|', '&', '*', '?', '~', '^', '!'
         }
         
+        # Toate detectoarele de pattern-uri rulează într-o singură trecere peste input;
+        # pattern-urile sunt compilate aici, la inițializare
+        self.threat_scanner = ThreatScanner({
+            'sql_injection': self.sql_injection_patterns,
+            'xss': self.xss_patterns,
+            'path_traversal': self.path_traversal_patterns,
+            'command_injection': self.command_injection_patterns,
+        })
+        
         logger.info(f"🛡️ InputSanitizer initialized with {validation_level.value} validation level")
     
     def sanitize_and_validate(self, value: Any, input_type: InputType, 
@@ -185,25 +207,10 @@ class InputSanitizer:
                 threats_detected.extend(email_threats)
                 risk_score += email_risk
             
-            # Detectează SQL injection
-            sql_threats, sql_risk = self._detect_sql_injection(sanitized_value)
-            threats_detected.extend(sql_threats)
-            risk_score += sql_risk
-            
-            # Detectează XSS
-            xss_threats, xss_risk = self._detect_xss(sanitized_value)
-            threats_detected.extend(xss_threats)
-            risk_score += xss_risk
-            
-            # Detectează path traversal
-            traversal_threats, traversal_risk = self._detect_path_traversal(sanitized_value)
-            threats_detected.extend(traversal_threats)
-            risk_score += traversal_risk
-            
-            # Detectează command injection
-            cmd_inj_threats, cmd_inj_risk = self._detect_command_injection(sanitized_value)
-            threats_detected.extend(cmd_inj_threats)
-            risk_score += cmd_inj_risk
+            # Detectează SQL injection, XSS, path traversal și command injection
+            scan_threats, scan_risk = self._threats_from_scan(self.threat_scanner.scan(sanitized_value))
+            threats_detected.extend(scan_threats)
+            risk_score += scan_risk
             
             # Aplicare sanitizare finală bazată pe nivel
             if self.validation_level == ValidationLevel.PARANOID:
@@ -257,11 +264,12 @@ class InputSanitizer:
                 return True
             
             # Verifică pentru caractere de control
-            if any(ord(c) < 32 and c not in '\t\n\r' for c in value):
+            if _CONTROL_CHARS_RE.search(value):
                 return True
             
             # Verifică pentru secvențe Unicode suspicious
-            if r'\u' in value.lower() or r'\x' in value.lower():
+            value_lower = value.lower()
+            if r'\u' in value_lower or r'\x' in value_lower:
                 return True
                 
             return False
@@ -453,55 +461,52 @@ class InputSanitizer:
         except Exception as e:
             return email, [f"Email sanitization error: {str(e)}"], 50
     
-    def _detect_sql_injection(self, value: str) -> Tuple[List[str], int]:
-        """Detectează SQL injection"""
+    def _threats_from_scan(self, scan: Dict[str, List[str]],
+                           category: Optional[str] = None) -> Tuple[List[str], int]:
+        """Convertește rezultatul scanării în amenințări și scor de risc"""
         threats = []
         risk_score = 0
         
-        value_lower = value.lower()
-        
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                threats.append(f"SQL injection pattern detected: {pattern}")
-                risk_score += 40
+        for scan_category, (message, risk) in THREAT_CATEGORIES.items():
+            if category and scan_category != category:
+                continue
+            for pattern in scan.get(scan_category, ()):
+                threats.append(f"{message}: {pattern}")
+                risk_score += risk
         
         return threats, risk_score
     
+    def _detect_sql_injection(self, value: str) -> Tuple[List[str], int]:
+        """Detectează SQL injection"""
+        return self._threats_from_scan(self.threat_scanner.scan(value), 'sql_injection')
+    
     def _detect_xss(self, value: str) -> Tuple[List[str], int]:
         """Detectează XSS"""
-        threats = []
-        risk_score = 0
-        
-        for pattern in self.xss_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                threats.append(f"XSS pattern detected: {pattern}")
-                risk_score += 50
-        
-        return threats, risk_score
+        return self._threats_from_scan(self.threat_scanner.scan(value), 'xss')
     
     def _detect_path_traversal(self, value: str) -> Tuple[List[str], int]:
         """Detectează path traversal"""
-        threats = []
-        risk_score = 0
-        
-        for pattern in self.path_traversal_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                threats.append(f"Path traversal pattern detected: {pattern}")
-                risk_score += 60
-        
-        return threats, risk_score
+        return self._threats_from_scan(self.threat_scanner.scan(value), 'path_traversal')
     
     def _detect_command_injection(self, value: str) -> Tuple[List[str], int]:
         """Detectează command injection"""
-        threats = []
-        risk_score = 0
-        
-        for pattern in self.command_injection_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                threats.append(f"Command injection pattern detected: {pattern}")
-                risk_score += 70
-        
-        return threats, risk_score
+        return self._threats_from_scan(self.threat_scanner.scan(value), 'command_injection')
+    
+    def sanitize_message(self, text: str) -> str:
+        """
+        Curăță un mesaj Telegram fără să altereze link-urile: elimină caracterele
+        de control și spațiile de la capete. Amenințările sunt raportate dintr-o
+        singură scanare; validarea strictă rămâne la sanitize_and_validate.
+        """
+        if not text:
+            return text
+        
+        cleaned = _CONTROL_CHARS_RE.sub('', text).strip()
+        scan = self.threat_scanner.scan(cleaned)
+        if scan:
+            logger.debug(f"🔍 Message threat categories: {sorted(scan)}")
+        
+        return cleaned
     
     def _strict_sanitize(self, value: str) -> str:
         """Sanitizare strictă"""
@@ -2,13 +2,14 @@
 # Versiunea: 1.0.0 - Protecție Avansată
 
 import os
+import re
 import time
 import json
 import hashlib
 import logging
 import asyncio
 import requests
-from typing import Dict, List, Optional, Set, Any, Callable
+from typing import Deque, Dict, FrozenSet, List, Optional, Set, Any, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -16,8 +17,18 @@ from collections import defaultdict, deque
 import threading
 from pathlib import Path
 
+from utils.security.threat_scanner import ThreatScanner
+from utils.security.threat_log import ThreatLogWriter
+from utils.rate_limiter import RateWindow
+
 logger = logging.getLogger(__name__)
 
+# Semnăturile căutate în payload-ul cererilor (request_data), scanate într-o singură trecere
+PAYLOAD_SIGNATURES = {
+    'path_traversal': ['../', '..\\', '%2e%2e', '%252e%252e'],
+    'injection': ['<script', 'javascript:', 'eval(', 'union select', "'; drop"],
+}
+
 class ThreatLevel(Enum):
     """Nivelurile de amenințare"""
     LOW = "low"
@@ -76,11 +87,12 @@ class SecurityMonitor:
     """Monitor de securitate în timp real"""
     
     def __init__(self):
-        self.threats: List[SecurityThreat] = []
+        # Ring buffer: doar cele mai recente amenințări rămân în memorie
+        self.max_threats_in_memory = int(os.getenv('SECURITY_THREATS_MEMORY_LIMIT', '1000'))
+        self.threats: Deque[SecurityThreat] = deque(maxlen=self.max_threats_in_memory)
         self.blocked_ips: Set[str] = set()
         self.blocked_users: Set[int] = set()
         self.suspicious_ips: Dict[str, int] = defaultdict(int)
-        self.request_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
         self.webhook_integrity_checks: List[Dict[str, Any]] = []
         
         # Configurări
@@ -89,16 +101,30 @@ class SecurityMonitor:
         self.suspicious_threshold = 10
         self.webhook_check_interval = 300  # 5 minute
         
+        # Rata cererilor per IP: O(1) per cerere, memorie doar pentru IP-urile active
+        self.request_rate = RateWindow(self.max_requests_per_minute, 60, max_keys=100000)
+        
         # Reguli de securitate
+        self.payload_scanner = ThreatScanner({
+            category: [re.escape(signature) for signature in signatures]
+            for category, signatures in PAYLOAD_SIGNATURES.items()
+        })
+        self._last_payload_scan = ('', frozenset())
         self.security_rules = self._initialize_security_rules()
         
         # Token și webhook pentru monitorizare
         self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.expected_webhook_url = os.getenv('WEBHOOK_URL')
         
-        # Fișier pentru persistența amenințărilor
-        self.threats_file = Path("logs/security_threats.json")
+        # Fișier pentru persistența amenințărilor: JSONL append-only, scris în background
+        self.legacy_threats_file = Path("logs/security_threats.json")
+        self.threats_file = Path("logs/security_threats.jsonl")
         self.threats_file.parent.mkdir(exist_ok=True)
+        self.threat_log = ThreatLogWriter(
+            self.threats_file,
+            keep_records=self.max_threats_in_memory,
+            flush_interval=float(os.getenv('SECURITY_THREAT_LOG_FLUSH_SECONDS', '1.0'))
+        )
         
         # Încarcă amenințările existente
         self._load_threats()
@@ -138,8 +164,7 @@ class SecurityMonitor:
         rules.append(SecurityRule(
             name="path_traversal_detection",
             description="Detectează atacuri path traversal",
-            condition=lambda data: any(pattern in str(data.get('request_data', '')) 
-                                     for pattern in ['../', '..\\', '%2e%2e', '%252e%252e']),
+            condition=lambda data: 'path_traversal' in self._payload_categories(data),
             threat_type=AttackType.PATH_TRAVERSAL,
             threat_level=ThreatLevel.HIGH,
             mitigation_actions=["block_ip", "log_incident"]
@@ -149,8 +174,7 @@ class SecurityMonitor:
         rules.append(SecurityRule(
             name="injection_detection",
             description="Detectează atacuri de injecție",
-            condition=lambda data: any(pattern in str(data.get('request_data', '')).lower() 
-                                     for pattern in ['<script', 'javascript:', 'eval(', 'union select', "'; drop"]),
+            condition=lambda data: 'injection' in self._payload_categories(data),
             threat_type=AttackType.INJECTION,
             threat_level=ThreatLevel.HIGH,
             mitigation_actions=["block_ip", "sanitize_input"]
@@ -168,14 +192,32 @@ class SecurityMonitor:
         
         return rules
     
+    def _payload_categories(self, data: Dict[str, Any]) -> FrozenSet[str]:
+        """Categoriile de semnături din payload; regulile aceleiași cereri refolosesc scanarea"""
+        payload = str(data.get('request_data', ''))
+        if not payload:
+            return frozenset()
+        
+        last_payload, last_categories = self._last_payload_scan
+        if payload == last_payload:
+            return last_categories
+        
+        categories = self.payload_scanner.categories(payload)
+        self._last_payload_scan = (payload, categories)
+        return categories
+    
     def _load_threats(self):
-        """Încarcă amenințările din fișier"""
+        """Încarcă amenințările din jurnalul JSONL (fișierul JSON vechi este migrat o singură dată)"""
         try:
-            if self.threats_file.exists():
-                with open(self.threats_file, 'r', encoding='utf-8') as f:
-                    threats_data = json.load(f)
-                
-                for threat_data in threats_data:
+            self.threat_log.migrate_legacy_json(self.legacy_threats_file)
+        except Exception as e:
+            logger.error(f"❌ Error migrating legacy threats file: {e}")
+        
+        try:
+            threats_data = self.threat_log.read_records()
+            
+            for threat_data in threats_data[-self.max_threats_in_memory:]:
+                try:
                     threat = SecurityThreat(
                         threat_type=AttackType(threat_data['threat_type']),
                         level=ThreatLevel(threat_data['level']),
@@ -186,36 +228,30 @@ class SecurityMonitor:
                         mitigated=threat_data.get('mitigated', False),
                         mitigation_actions=threat_data.get('mitigation_actions', [])
                     )
-                    self.threats.append(threat)
-                
+                except (KeyError, ValueError, TypeError):
+                    continue
+                self.threats.append(threat)
+            
+            if self.threats:
                 logger.info(f"📊 Loaded {len(self.threats)} security threats from file")
         except Exception as e:
             logger.error(f"❌ Error loading threats: {e}")
     
-    def _save_threats(self):
-        """Salvează amenințările în fișier"""
+    def _save_threat(self, threat: SecurityThreat):
+        """Adaugă amenințarea în jurnal; scrierea pe disk are loc în background"""
         try:
-            threats_data = [threat.to_dict() for threat in self.threats[-1000:]]  # Păstrează ultimele 1000
-            
-            with open(self.threats_file, 'w', encoding='utf-8') as f:
-                json.dump(threats_data, f, indent=2, ensure_ascii=False)
-                
+            self.threat_log.append(threat.to_dict())
         except Exception as e:
-            logger.error(f"❌ Error saving threats: {e}")
+            logger.error(f"❌ Error saving threat: {e}")
     
     def analyze_request(self, request_data: Dict[str, Any]) -> Optional[SecurityThreat]:
         """Analizează o cerere pentru amenințări de securitate"""
         ip_address = request_data.get('ip_address')
         user_id = request_data.get('user_id')
         
-        # Actualizează istoricul de cereri
+        # Actualizează rata cererilor (estimare pe ultimul minut)
         if ip_address:
-            self.request_history[ip_address].append(time.time())
-            
-            # Calculează cereri pe minut
-            now = time.time()
-            recent_requests = [t for t in self.request_history[ip_address] if now - t < 60]
-            request_data['requests_per_minute'] = len(recent_requests)
+            request_data['requests_per_minute'] = self.request_rate.hit(ip_address)
         
         # Verifică fiecare regulă de securitate
         for rule in self.security_rules:
@@ -240,8 +276,8 @@ class SecurityMonitor:
                     if rule.auto_mitigate:
                         self._mitigate_threat(threat, rule.mitigation_actions)
                     
-                    # Salvează amenințările
-                    self._save_threats()
+                    # Salvează amenințarea (fără I/O pe request)
+                    self._save_threat(threat)
                     
                     logger.warning(f"🚨 Security threat detected: {rule.name} from {ip_address}")
                     return threat
@@ -390,6 +426,7 @@ class SecurityMonitor:
                         
                         self.threats.append(threat)
                         self._mitigate_threat(threat, ["alert_admin", "log_incident"])
+                        self._save_threat(threat)
                         
                         logger.critical(f"🚨 WEBHOOK HIJACKED! Expected: {self.expected_webhook_url}, Got: {current_url}")
                         return False
@@ -424,13 +461,10 @@ class SecurityMonitor:
         try:
             # Curăță amenințările mai vechi de 30 de zile
             cutoff_date = datetime.now() - timedelta(days=30)
-            self.threats = [t for t in self.threats if t.timestamp > cutoff_date]
-            
-            # Curăță istoricul de cereri mai vechi de 1 oră
-            cutoff_time = time.time() - 3600
-            for ip, requests in self.request_history.items():
-                while requests and requests[0] < cutoff_time:
-                    requests.popleft()
+            self.threats = deque(
+                (t for t in list(self.threats) if t.timestamp > cutoff_date),
+                maxlen=self.max_threats_in_memory
+            )
             
             # Resetează contoarele de IP-uri suspecte
             for ip in list(self.suspicious_ips.keys()):
@@ -462,7 +496,7 @@ class SecurityMonitor:
     
     def get_security_status(self) -> Dict[str, Any]:
         """Returnează statusul de securitate"""
-        recent_threats = [t for t in self.threats if t.timestamp > datetime.now() - timedelta(hours=24)]
+        recent_threats = [t for t in list(self.threats) if t.timestamp > datetime.now() - timedelta(hours=24)]
         
         threat_counts = defaultdict(int)
         for threat in recent_threats:
@@ -477,17 +511,19 @@ class SecurityMonitor:
             "suspicious_ips": len(self.suspicious_ips),
             "threat_breakdown": dict(threat_counts),
             "last_webhook_check": self.webhook_integrity_checks[-1] if self.webhook_integrity_checks else None,
-            "webhook_integrity_ok": self.webhook_integrity_checks[-1]['is_valid'] if self.webhook_integrity_checks else None
+            "webhook_integrity_ok": self.webhook_integrity_checks[-1]['is_valid'] if self.webhook_integrity_checks else None,
+            "threat_log": self.threat_log.get_stats()
         }
     
     def get_recent_threats(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Returnează amenințările recente"""
-        recent_threats = sorted(self.threats, key=lambda t: t.timestamp, reverse=True)[:limit]
+        recent_threats = sorted(list(self.threats), key=lambda t: t.timestamp, reverse=True)[:limit]
         return [threat.to_dict() for threat in recent_threats]
     
     def stop_monitoring(self):
         """Oprește monitorizarea"""
         self.monitoring_active = False
+        self.threat_log.close()
         logger.info("🛑 Security monitoring stopped")
 
 # Instanță globală
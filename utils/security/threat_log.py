@@ -0,0 +1,129 @@
+# utils/security/threat_log.py - Jurnal append-only (JSONL) pentru amenințările de securitate
+# Versiunea: 1.0.0
+
+import os
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from utils.log_writer import BackgroundBatchWriter
+
+logger = logging.getLogger(__name__)
+
+
+class ThreatLogWriter(BackgroundBatchWriter):
+    """
+    Scriere în background a amenințărilor într-un fișier JSONL append-only.
+
+    Coada și thread-ul de scriere sunt cele din BackgroundBatchWriter; loturile
+    sunt adăugate la finalul fișierului. Când fișierul depășește
+    keep_records * compact_factor linii, este compactat (rescris atomic cu
+    ultimele keep_records înregistrări).
+    """
+
+    def __init__(self, path: Union[str, Path], keep_records: int = 1000, flush_interval: float = 1.0,
+                 batch_size: int = 256, max_pending: int = 10000, compact_factor: int = 2):
+        super().__init__(max(0.01, flush_interval), batch_size, max_pending, thread_name="threat-log-writer")
+        self.path = Path(path).absolute()  # independent de cwd-ul thread-ului de scriere
+        self.keep_records = max(1, keep_records)
+        self.compact_factor = max(2, compact_factor)
+        self._lines: Optional[int] = None
+
+        self.stats.update({'flushes': 0, 'compactions': 0})
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Adaugă un lot la finalul fișierului și compactează dacă este cazul"""
+        try:
+            lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in batch)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._lines is None:
+                self._lines = self._count_lines()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+            self._lines += len(batch)
+            self.stats['written'] += len(batch)
+            self.stats['flushes'] += 1
+
+            if self._lines > self.keep_records * self.compact_factor:
+                self._compact()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Error writing threat log: {e}")
+
+    def _count_lines(self) -> int:
+        try:
+            with open(self.path, 'rb') as f:
+                return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 16), b''))
+        except FileNotFoundError:
+            return 0
+
+    def _compact(self):
+        """Rescrie atomic fișierul păstrând doar ultimele keep_records linii"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            kept = deque(f, maxlen=self.keep_records)
+
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(tmp_path, self.path)
+
+        self._lines = len(kept)
+        self.stats['compactions'] += 1
+        logger.info(f"🗜️ Threat log compacted to {len(kept)} records")
+
+    def migrate_legacy_json(self, legacy_path: Union[str, Path]) -> int:
+        """
+        Importă o singură dată fișierul JSON vechi (o listă de amenințări): înregistrările
+        sunt puse înaintea celor din JSONL (sunt mai vechi), fișierul este rescris atomic,
+        iar fișierul vechi este redenumit în *.migrated. Apelat înainte de primul append.
+
+        Returns:
+            Numărul de înregistrări importate
+        """
+        legacy_path = Path(legacy_path)
+        if not legacy_path.exists():
+            return 0
+
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            legacy_records = json.load(f)
+        if not isinstance(legacy_records, list):
+            raise ValueError(f"{legacy_path} does not contain a list of threats")
+        legacy_records = legacy_records[-self.keep_records:]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in legacy_records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as current:
+                    f.writelines(current)
+        os.replace(tmp_path, self.path)
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + '.migrated'))
+
+        self._lines = None  # recalculat la următoarea scriere
+        logger.info(f"📦 Migrated {len(legacy_records)} threats from {legacy_path.name} to {self.path.name}")
+        return len(legacy_records)
+
+    def read_records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ultimele înregistrări din fișier; liniile incomplete sau corupte sunt ignorate"""
+        records: Deque[Dict[str, Any]] = deque(maxlen=limit or self.keep_records)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return list(records)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistici ale jurnalului"""
+        stats = super().get_stats()
+        stats['file_records'] = self._lines
+        return stats
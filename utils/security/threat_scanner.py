@@ -0,0 +1,272 @@
+# utils/security/threat_scanner.py - Scanner combinat pentru pattern-urile de amenințări
+# Versiunea: 1.0.0
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+    import sre_constants as _sre
+
+logger = logging.getLogger(__name__)
+
+# Limita pentru expandarea unui pattern în șiruri literale (produs cartezian)
+MAX_LITERAL_EXPANSION = 64
+
+# Singurele caractere non-ASCII pe care re.IGNORECASE le echivalează cu litere ASCII
+_ASCII_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's', 'K': 'k'})
+
+
+def fold_case(text: str) -> str:
+    """Lowercase compatibil cu re.IGNORECASE pentru potrivirea literalelor ASCII"""
+    if not text.isascii():
+        text = text.translate(_ASCII_FOLD)
+    return text.lower()
+
+
+def _item_strings(op, av) -> Optional[Set[str]]:
+    """Șirurile finite pe care le poate potrivi un element parsat, sau None"""
+    if op == _sre.LITERAL:
+        return {chr(av)}
+    if op == _sre.IN:
+        if all(kind == _sre.LITERAL for kind, _ in av):
+            return {chr(code) for _, code in av}
+        return None
+    if op == _sre.SUBPATTERN:
+        _, add_flags, del_flags, sub = av
+        if add_flags or del_flags:
+            return None
+        return _literal_strings(sub)
+    if op == _sre.BRANCH:
+        strings = set()
+        for branch in av[1]:
+            branch_strings = _literal_strings(branch)
+            if branch_strings is None:
+                return None
+            strings |= branch_strings
+        return strings
+    if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT):
+        low, high, sub = av
+        if high != 1:
+            return None
+        strings = _literal_strings(sub)
+        if strings is None:
+            return None
+        return strings | {''} if low == 0 else strings
+    return None
+
+
+def _literal_strings(items) -> Optional[Set[str]]:
+    """Mulțimea exactă de șiruri pe care le poate potrivi o secvență, sau None"""
+    results = {''}
+    for op, av in items:
+        options = _item_strings(op, av)
+        if options is None:
+            return None
+        results = {prefix + option for prefix in results for option in options}
+        if len(results) > MAX_LITERAL_EXPANSION:
+            return None
+    return results
+
+
+def _selectivity(strings: Set[str]) -> Tuple[int, int]:
+    return min(len(s) for s in strings), -len(strings)
+
+
+def _required_strings(items) -> Optional[Set[str]]:
+    """Șiruri dintre care cel puțin unul apare în orice potrivire a secvenței"""
+    candidates = []
+    run = []
+
+    def flush():
+        if run:
+            strings = _literal_strings(run)
+            if strings and '' not in strings:
+                candidates.append(strings)
+            run.clear()
+
+    for op, av in items:
+        if _item_strings(op, av) is not None:
+            run.append((op, av))
+            continue
+        flush()
+        nested = None
+        if op == _sre.SUBPATTERN and not (av[1] or av[2]):
+            nested = _required_strings(av[3])
+        elif op == _sre.BRANCH:
+            nested = set()
+            for branch in av[1]:
+                branch_strings = _required_strings(branch)
+                if branch_strings is None:
+                    nested = None
+                    break
+                nested |= branch_strings
+        elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT) and av[0] >= 1:
+            nested = _required_strings(av[2])
+        if nested:
+            candidates.append(nested)
+    flush()
+
+    if not candidates:
+        return None
+    return max(candidates, key=_selectivity)
+
+
+def _trie_regex(literals) -> str:
+    """Alternanță sub formă de trie: la fiecare poziție se încearcă doar ramura primului caracter"""
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Greedy: se preferă literalul cel mai lung de la poziția curentă
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+@dataclass
+class _PatternPlan:
+    """Cum este verificat un pattern după trecerea combinată"""
+    index: int
+    category: str
+    pattern: str
+    regex: Optional['re.Pattern'] = None         # None: pattern pur literal
+    literals: FrozenSet[str] = frozenset()       # literale exacte sau obligatorii
+    always: bool = False                         # potrivește șirul vid
+
+
+class ThreatScanner:
+    """
+    Scanner compilat pentru mai multe categorii de pattern-uri regex.
+
+    Fiecare pattern este analizat o singură dată la construcție:
+    - pattern-urile care se reduc la o mulțime finită de literale (ex. `(union|select|...)`)
+      sunt rezolvate exclusiv din trecerea combinată;
+    - pattern-urile cu un literal obligatoriu (ex. `<script[^>]*>.*?</script>`) sunt
+      confirmate cu regex-ul propriu doar dacă literalul a apărut în text;
+    - restul rulează direct.
+
+    Toate literalele sunt compilate într-un singur regex în formă de trie, parcurs
+    o dată pe textul normalizat; rezultatul este identic cu `re.search` per pattern.
+    """
+
+    def __init__(self, categories: Dict[str, Sequence[str]], flags: int = re.IGNORECASE):
+        self.flags = flags
+        self._fold = bool(flags & re.IGNORECASE)
+        self._plans: List[_PatternPlan] = []
+        self._categories: Tuple[str, ...] = tuple(categories)
+        self.stats = {'scans': 0, 'literal_hits': 0, 'regex_checks': 0, 'regex_skipped': 0}
+
+        literals: Set[str] = set()
+        for category, patterns in categories.items():
+            for pattern in patterns:
+                plan = self._plan_pattern(len(self._plans), category, pattern)
+                literals |= plan.literals
+                self._plans.append(plan)
+
+        # Pentru fiecare literal: literalele care îi sunt prefix (potrivite la aceeași poziție)
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            literal: tuple(other for other in literals if literal.startswith(other))
+            for literal in literals
+        }
+        self._literal_regex = (
+            re.compile('(?=(' + _trie_regex(literals) + '))', re.DOTALL) if literals else None
+        )
+        self._regex_only = tuple(plan for plan in self._plans if plan.regex is not None and not plan.literals)
+
+        logger.debug(
+            f"🛡️ ThreatScanner: {len(self._plans)} patterns, {len(literals)} literals, "
+            f"{len(self._regex_only)} regex-only"
+        )
+
+    def _normalize_literal(self, literal: str) -> str:
+        return literal.lower() if self._fold else literal
+
+    def _plan_pattern(self, index: int, category: str, pattern: str) -> _PatternPlan:
+        regex = re.compile(pattern, self.flags)
+        plan = _PatternPlan(index=index, category=category, pattern=pattern, regex=regex)
+
+        if regex.search(''):
+            plan.always = True
+            return plan
+
+        try:
+            parsed = _sre_parse.parse(pattern, self.flags & ~re.IGNORECASE).data
+        except Exception:
+            return plan
+
+        exact = _literal_strings(parsed)
+        if exact and all(s.isascii() for s in exact):
+            plan.literals = frozenset(self._normalize_literal(s) for s in exact if s)
+            plan.regex = None
+            return plan
+
+        required = _required_strings(parsed)
+        if required and all(s.isascii() for s in required):
+            plan.literals = frozenset(self._normalize_literal(s) for s in required)
+        return plan
+
+    def _find_literals(self, text: str) -> Set[str]:
+        """Toate literalele prezente în text, într-o singură trecere"""
+        if self._literal_regex is None:
+            return set()
+        found: Set[str] = set()
+        for match in self._literal_regex.finditer(fold_case(text) if self._fold else text):
+            longest = match.group(1)
+            if longest not in found:
+                found.update(self._prefixes[longest])
+        return found
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        Pattern-urile potrivite în text, grupate pe categorii (în ordinea declarării).
+
+        Returns:
+            {categorie: [pattern, ...]} doar pentru categoriile cu potriviri
+        """
+        self.stats['scans'] += 1
+        found = self._find_literals(text) if text else set()
+        if found:
+            self.stats['literal_hits'] += 1
+
+        result: Dict[str, List[str]] = {}
+        for plan in self._plans:
+            if plan.always:
+                matched = True
+            elif plan.literals and plan.literals.isdisjoint(found):
+                self.stats['regex_skipped'] += plan.regex is not None
+                matched = False
+            elif plan.regex is None:
+                matched = True
+            else:
+                self.stats['regex_checks'] += 1
+                matched = plan.regex.search(text) is not None
+            if matched:
+                result.setdefault(plan.category, []).append(plan.pattern)
+        return result
+
+    def categories(self, text: str) -> FrozenSet[str]:
+        """Categoriile de amenințări prezente în text"""
+        return frozenset(self.scan(text))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Statistici de scanare"""
+        stats = dict(self.stats)
+        stats['patterns'] = len(self._plans)
+        stats['literals'] = len(self._prefixes)
+        stats['regex_only'] = len(self._regex_only)
+        return stats
@@ -0,0 +1,220 @@
+# utils/singleflight.py - Coalescing pentru cereri identice aflate în execuție (singleflight)
+# Versiunea: 1.0.0
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+from utils.common.validators import URLValidator
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_url_key(url: str) -> str:
+    """
+    Cheia canonică a unui URL: 'platformă:id' când ID-ul video poate fi extras,
+    altfel URL-ul normalizat (fără www., fără fragment).
+    """
+    platform = URLValidator.detect_platform(url)
+    if platform:
+        video_id = URLValidator.extract_video_id(url, platform)
+        if video_id:
+            return f"{platform}:{video_id}"
+
+    parsed = urlparse(URLValidator.normalize_url(url.strip()))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc, parsed.path.rstrip('/'),
+                       parsed.params, parsed.query, ''))
+
+
+class _Flight:
+    """O execuție în curs, împărțită între toți cei care au cerut aceeași cheie"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.holders = 1
+
+
+class FlightLease:
+    """
+    Rezultatul unei execuții partajate. Resursele rezultatului (ex. fișierul
+    descărcat) rămân valabile până când toți deținătorii apelează release().
+    """
+
+    def __init__(self, group: 'SingleFlight', flight: _Flight, shared: bool):
+        self._group = group
+        self._flight = flight
+        self._released = False
+        self.shared = shared
+
+    @property
+    def result(self) -> Any:
+        return self._flight.result
+
+    def release(self):
+        """Eliberează rezultatul (idempotent)"""
+        if self._released:
+            return
+        self._released = True
+        self._group._release(self._flight)
+
+    def __enter__(self) -> 'FlightLease':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+class SingleFlight:
+    """
+    Registru de execuții în curs pentru cod sincron (thread-uri).
+
+    Apelurile concurente cu aceeași cheie așteaptă o singură execuție a funcției
+    și primesc toate același rezultat. Callback-ul on_release este apelat o
+    singură dată, după ce ultimul deținător a eliberat rezultatul.
+    """
+
+    def __init__(self, name: str = 'singleflight',
+                 on_release: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.on_release = on_release
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resetează statisticile"""
+        with self._lock:
+            self.stats = {
+                'calls': 0,
+                'executions': 0,
+                'deduplicated': 0,
+                'errors': 0,
+                'max_waiters': 0
+            }
+
+    def acquire(self, key: str, func: Callable, *args, **kwargs) -> FlightLease:
+        """
+        Execută func(*args, **kwargs) sau se alătură execuției în curs pentru key.
+
+        Returns:
+            FlightLease; apelantul trebuie să apeleze release() după ce a folosit rezultatul
+
+        Raises:
+            Excepția aruncată de func (propagată tuturor celor care așteaptă)
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.holders += 1
+                self.stats['deduplicated'] += 1
+                if flight.holders - 1 > self.stats['max_waiters']:
+                    self.stats['max_waiters'] = flight.holders - 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.stats['executions'] += 1
+                leader = True
+
+        if leader:
+            try:
+                flight.result = func(*args, **kwargs)
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                    if flight.error is not None:
+                        self.stats['errors'] += 1
+                flight.done.set()
+        else:
+            logger.info(f"🔗 '{self.name}': cerere alăturată execuției în curs pentru {key}")
+            flight.done.wait()
+
+        lease = FlightLease(self, flight, shared=not leader)
+        if flight.error is not None:
+            lease.release()
+            raise flight.error
+        return lease
+
+    def _release(self, flight: _Flight):
+        """Decrementează deținătorii și apelează on_release la ultimul"""
+        with self._lock:
+            flight.holders -= 1
+            last = flight.holders == 0
+        if last and flight.error is None and self.on_release:
+            try:
+                self.on_release(flight.result)
+            except Exception as e:
+                logger.warning(f"Eroare în on_release pentru '{self.name}': {e}")
+
+    def is_shared(self, key: str) -> bool:
+        """True dacă execuția în curs pentru key are și alți deținători în afară de lider"""
+        with self._lock:
+            flight = self._flights.get(key)
+            return flight is not None and flight.holders > 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returnează statisticile de deduplicare"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._flights)
+        stats['dedup_rate'] = round(stats['deduplicated'] / stats['calls'] * 100, 1) if stats['calls'] else 0.0
+        return stats
+
+
+class AsyncSingleFlight:
+    """
+    Varianta asyncio: corutinele concurente cu aceeași cheie așteaptă același
+    task. Task-ul este protejat cu asyncio.shield, astfel încât anularea unui
+    apelant nu anulează descărcarea partajată.
+    """
+
+    def __init__(self, name: str = 'singleflight'):
+        self.name = name
+        self._tasks: Dict[Any, asyncio.Task] = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resetează statisticile"""
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'deduplicated': 0
+        }
+
+    async def do(self, key: Any, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Execută await func(*args, **kwargs) sau se alătură execuției în curs.
+
+        Returns:
+            (rezultat, shared) - shared=True dacă rezultatul a venit de la alt apelant
+        """
+        self.stats['calls'] += 1
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.stats['deduplicated'] += 1
+            logger.info(f"🔗 '{self.name}': cerere alăturată execuției în curs pentru {key}")
+        else:
+            self.stats['executions'] += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, k=key: self._tasks.pop(k, None) if self._tasks.get(k) is t else None)
+
+        result = await asyncio.shield(task)
+        return result, shared
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returnează statisticile de deduplicare"""
+        stats = dict(self.stats)
+        stats['in_flight'] = len(self._tasks)
+        stats['dedup_rate'] = round(stats['deduplicated'] / stats['calls'] * 100, 1) if stats['calls'] else 0.0
+        return stats